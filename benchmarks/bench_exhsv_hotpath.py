@@ -3,7 +3,9 @@
 Benchmark: ExHSV hot-path micro-optimizations.
 
 Profiles each stage of the exg_standardised_hue + GreenOnBrown.inference
-pipeline and tests optimized alternatives.
+pipeline and tests optimized alternatives, then compares the production float
+kernel against the integer fixed-point kernel (exhsv-int) for speed and mask
+agreement.
 
 Usage:
     python benchmarks/bench_exhsv_hotpath.py
@@ -21,6 +23,8 @@ import numpy as np
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
+from utils.algorithms import exg_standardised_hue, exg_standardised_hue_int
+
 
 def make_field_image(h=720, w=1280):
     """Synthetic field image with green plants on brown soil."""
@@ -236,6 +240,15 @@ def exhsv_opt5_uint16_nodiv(image, hue_min=30, hue_max=90, brightness_min=5, bri
     return image_out
 
 
+def gob_threshold(output, kernel, exg_min=30, exg_max=250):
+    """GreenOnBrown.inference threshold stage, returns the binary mask fed to findContours."""
+    np.clip(output, exg_min, exg_max, out=output)
+    output = output.astype(np.uint8)
+    threshold_out = cv2.adaptiveThreshold(output, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                          cv2.THRESH_BINARY_INV, 31, 2)
+    return cv2.morphologyEx(threshold_out, cv2.MORPH_CLOSE, kernel, iterations=1)
+
+
 def gob_inference_opt(image, output, kernel, exg_min=30, exg_max=250, min_detection_area=1):
     """Optimized GreenOnBrown.inference post-processing.
 
@@ -402,6 +415,23 @@ def main():
     t_gob_opt = timeit(gob_opt, args.rounds, args.warmup,
                        'OPT: in-place clip, skip abs')
 
+    print()
+    print('--- Production float vs integer kernel (utils.algorithms) ---')
+    t_float = timeit(lambda: exg_standardised_hue(image), args.rounds, args.warmup,
+                     'exhsv      (float32)')
+    t_int = timeit(lambda: exg_standardised_hue_int(image), args.rounds, args.warmup,
+                   'exhsv-int  (uint8/uint16 fused divide)')
+
+    out_float = exg_standardised_hue(image)
+    out_int = exg_standardised_hue_int(image)
+    diff = np.abs(out_float.astype(int) - out_int.astype(int))
+    mask_float = gob_threshold(out_float.copy(), kernel) > 0
+    mask_int = gob_threshold(out_int.copy(), kernel) > 0
+    union = np.count_nonzero(mask_float | mask_int)
+    iou = np.count_nonzero(mask_float & mask_int) / union if union else 1.0
+    print(f'  Grey-level diff: max={diff.max()}  pixels differing={np.mean(diff > 0) * 100:.1f}%')
+    print(f'  Threshold mask IoU (float vs int): {iou:.4f}')
+
     print()
     print('=' * 65)
     print('SUMMARY')
@@ -425,6 +455,10 @@ def main():
     print(f'  ---')
     print(f'  Combined current:   {total_cur:.2f}ms')
     print(f'  Combined optimized: {total_opt:.2f}ms  ({total_saved:+.2f}ms, {total_pct:.0f}% faster)')
+    pct_int = ((t_float - t_int) / t_float * 100) if t_float > 0 else 0
+    print(f'  ---')
+    print(f'  exhsv (float):      {t_float:.2f}ms')
+    print(f'  exhsv-int:          {t_int:.2f}ms  ({t_int - t_float:+.2f}ms, {pct_int:.0f}% faster, mask IoU {iou:.4f})')
     print('=' * 65)
 
 
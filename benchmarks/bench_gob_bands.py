@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Benchmark: band-parallel GreenOnBrown inference.
+
+Runs GreenOnBrown.inference() single-threaded and split into N horizontal
+bands on a thread pool, for each blob backend, and reports the speedup
+against band count. Every banded run is checked against the single-threaded
+detections (they must be identical).
+
+OpenCV's own parallel_for is pinned to one thread while timing so the
+numbers show only the band-level parallelism. Speedup is bounded by the
+number of cores: on a 4-core Pi expect the best results at 3-4 bands.
+
+Usage:
+    python benchmarks/bench_gob_bands.py
+    python benchmarks/bench_gob_bands.py --image-size 1456x1088 --max-bands 4
+    python benchmarks/bench_gob_bands.py --algorithm exhsv-int --backend cca
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.greenonbrown import GreenOnBrown
+
+
+GOB_KWARGS = dict(exg_min=25, exg_max=200, hue_min=39, hue_max=83,
+                  saturation_min=50, saturation_max=220,
+                  brightness_min=60, brightness_max=190, min_detection_area=10)
+
+
+def make_field_image(h=1088, w=1456):
+    """Synthetic field image with green plants (some spanning band seams) on noisy brown soil."""
+    rng = np.random.RandomState(42)
+    img = np.zeros((h, w, 3), dtype=np.uint8)
+    img[:] = (40, 80, 120)  # Brown soil (BGR)
+    img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+    for _ in range(40):
+        cx, cy = rng.randint(20, w - 20), rng.randint(20, h - 20)
+        axes = (rng.randint(5, 60), rng.randint(5, 120))
+        cv2.ellipse(img, (cx, cy), axes, rng.randint(0, 180), 0, 360, (30, 180, 30), -1)
+    return img
+
+
+def timeit(func, rounds=50, warmup=5, label=''):
+    """Time a function, return median ms."""
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - t0) * 1000)
+    med = np.median(times)
+    mean = np.mean(times)
+    mn = min(times)
+    print(f'  {label:30s}  median={med:6.2f}ms  mean={mean:6.2f}ms  min={mn:6.2f}ms')
+    return med
+
+
+def detections(result):
+    """Order-independent (boxes, centres) for comparing lists and int32 arrays."""
+    _, boxes, centres, _ = result
+    pairs = sorted(zip([tuple(map(int, b)) for b in boxes], [tuple(map(int, c)) for c in centres]))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Band-parallel GreenOnBrown benchmark')
+    parser.add_argument('--rounds', type=int, default=50, help='Timing rounds (default: 50)')
+    parser.add_argument('--warmup', type=int, default=5, help='Warmup rounds (default: 5)')
+    parser.add_argument('--image-size', type=str, default='1456x1088', help='Image WxH (default: 1456x1088)')
+    parser.add_argument('--algorithm', type=str, default='exhsv', help='GoB algorithm (default: exhsv)')
+    parser.add_argument('--backend', choices=['contours', 'cca', 'both'], default='both',
+                        help='Blob backend (default: both)')
+    parser.add_argument('--max-bands', type=int, default=4, help='Largest band count to test (default: 4)')
+    args = parser.parse_args()
+
+    w, h = map(int, args.image_size.split('x'))
+    image = make_field_image(h, w)
+    backends = ['contours', 'cca'] if args.backend == 'both' else [args.backend]
+    cv2.setNumThreads(1)
+
+    print('=== Band-Parallel GreenOnBrown Benchmark ===')
+    print(f'Image: {w}x{h} ({w*h:,} pixels), Algorithm: {args.algorithm}, '
+          f'Rounds: {args.rounds}, CPUs: {os.cpu_count()}')
+
+    summary = []
+    for backend in backends:
+        print()
+        print(f'--- Backend: {backend} ---')
+        reference = None
+        baseline = None
+        for bands in range(1, args.max_bands + 1):
+            detector = GreenOnBrown(algorithm=args.algorithm, blob_backend=backend, bands=bands)
+            result = detections(detector.inference(image, algorithm=args.algorithm, **GOB_KWARGS))
+            if reference is None:
+                reference = result
+            label = f'{bands} band{"s" if bands > 1 else ""}'
+            t = timeit(lambda: detector.inference(image, algorithm=args.algorithm, **GOB_KWARGS),
+                       args.rounds, args.warmup, label)
+            if baseline is None:
+                baseline = t
+            match = 'EXACT' if result == reference else 'MISMATCH'
+            summary.append((backend, bands, t, baseline / t, match, len(result)))
+
+    print()
+    print('=== SUMMARY: speedup vs band count ===')
+    print(f'  {"backend":10s} {"bands":>5s} {"median":>9s} {"speedup":>8s}  {"detections":>10s}  vs 1 band')
+    for backend, bands, t, speedup, match, count in summary:
+        print(f'  {backend:10s} {bands:5d} {t:7.2f}ms {speedup:7.2f}x  {count:10d}  {match}')
+
+
+if __name__ == '__main__':
+    main()
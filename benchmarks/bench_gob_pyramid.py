@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Benchmark: coarse-to-fine (pyramid) GreenOnBrown detection.
+
+Runs GreenOnBrown.inference() at full resolution and with pyramid_scale 2 and
+4 on a set of recorded frames (a directory of images or a video), and reports
+per-frame latency plus recall against the full-resolution detections. A
+full-resolution box counts as recalled when a pyramid box overlaps it with
+IoU >= --iou. Without --input a set of synthetic sparse-weed frames is used.
+
+Usage:
+    python benchmarks/bench_gob_pyramid.py --input owl_data/
+    python benchmarks/bench_gob_pyramid.py --input field_run.mp4 --max-frames 200
+    python benchmarks/bench_gob_pyramid.py --algorithm exhsv-int
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.greenonbrown import GreenOnBrown, PYRAMID_SCALES
+
+
+GOB_KWARGS = dict(exg_min=25, exg_max=200, hue_min=39, hue_max=83,
+                  saturation_min=50, saturation_max=220,
+                  brightness_min=60, brightness_max=190, min_detection_area=10)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def synthetic_frames(count=20, h=1088, w=1456):
+    """Sparse weeds (3-25px radius) on noisy brown soil, the case pyramid mode is meant for."""
+    rng = np.random.RandomState(42)
+    for _ in range(count):
+        img = np.zeros((h, w, 3), dtype=np.uint8)
+        img[:] = (40, 80, 120)  # Brown soil (BGR)
+        img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+        for _ in range(rng.randint(5, 40)):
+            centre = (rng.randint(10, w - 10), rng.randint(10, h - 10))
+            cv2.circle(img, centre, rng.randint(3, 25), (30, rng.randint(120, 200), 30), -1)
+        yield img
+
+
+def recorded_frames(path, max_frames):
+    """Frames from a directory of images or a video file."""
+    if os.path.isdir(path):
+        names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:max_frames]:
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while count < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        count += 1
+        yield frame
+    cap.release()
+
+
+def box_iou(a, b):
+    """IoU matrix between two (N, 4) / (M, 4) arrays of [x, y, w, h] boxes."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    iw = np.clip(np.minimum(ax2[:, None], bx2) - np.maximum(a[:, None, 0], b[:, 0]), 0, None)
+    ih = np.clip(np.minimum(ay2[:, None], by2) - np.maximum(a[:, None, 1], b[:, 1]), 0, None)
+    inter = iw * ih
+    union = (a[:, 2] * a[:, 3])[:, None] + b[:, 2] * b[:, 3] - inter
+    return inter / np.maximum(union, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pyramid GreenOnBrown benchmark')
+    parser.add_argument('--input', type=str, default=None, help='Directory of images or video file')
+    parser.add_argument('--max-frames', type=int, default=100, help='Frames to read from --input (default: 100)')
+    parser.add_argument('--algorithm', type=str, default='exhsv', help='GoB algorithm (default: exhsv)')
+    parser.add_argument('--iou', type=float, default=0.5, help='IoU for a recalled box (default: 0.5)')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs per frame (default: 5)')
+    args = parser.parse_args()
+
+    if args.input:
+        frames = list(recorded_frames(args.input, args.max_frames))
+        source = args.input
+    else:
+        frames = list(synthetic_frames())
+        source = 'synthetic sparse weeds'
+    if not frames:
+        print(f'No frames found in {args.input}')
+        return
+
+    h, w = frames[0].shape[:2]
+    print('=== Pyramid GreenOnBrown Benchmark ===')
+    print(f'Source: {source} ({len(frames)} frames, {w}x{h}), Algorithm: {args.algorithm}')
+
+    detectors = {scale: GreenOnBrown(algorithm=args.algorithm, pyramid_scale=scale) for scale in PYRAMID_SCALES}
+    reference = {}
+    rows = []
+    for scale, detector in detectors.items():
+        times = []
+        matched = total = exact = extra = 0
+        for i, frame in enumerate(frames):
+            _, boxes, _, _ = detector.inference(frame, algorithm=args.algorithm, **GOB_KWARGS)
+            for _ in range(args.repeats):
+                t0 = time.perf_counter()
+                detector.inference(frame, algorithm=args.algorithm, **GOB_KWARGS)
+                times.append((time.perf_counter() - t0) * 1000)
+
+            boxes = [tuple(map(int, b)) for b in boxes]
+            if scale == 1:
+                reference[i] = boxes
+                continue
+            ref = reference[i]
+            total += len(ref)
+            exact += len(set(ref) & set(boxes))
+            if ref and boxes:
+                iou = box_iou(ref, boxes)
+                matched += int(np.sum(iou.max(axis=1) >= args.iou))
+                extra += int(np.sum(iou.max(axis=0) < args.iou))
+            else:
+                extra += len(boxes)
+
+        rows.append((scale, np.median(times), np.mean(times),
+                     matched / total if total else 1.0, exact / total if total else 1.0, extra))
+
+    base = rows[0][1]
+    print()
+    print(f'  {"scale":>5s} {"median":>9s} {"mean":>9s} {"speedup":>8s} {"recall":>7s} {"exact":>7s} {"extra":>6s}')
+    for scale, med, mean, recall, exact, extra in rows:
+        label = 'full' if scale == 1 else f'1/{scale}'
+        recall_s = '-' if scale == 1 else f'{recall:.1%}'
+        exact_s = '-' if scale == 1 else f'{exact:.1%}'
+        extra_s = '-' if scale == 1 else str(extra)
+        print(f'  {label:>5s} {med:7.2f}ms {mean:7.2f}ms {base / med:7.2f}x {recall_s:>7s} {exact_s:>7s} {extra_s:>6s}')
+    print()
+    print(f'  recall: full-resolution boxes matched at IoU >= {args.iou}; exact: identical boxes; '
+          f'extra: pyramid boxes with no full-resolution match')
+
+
+if __name__ == '__main__':
+    main()
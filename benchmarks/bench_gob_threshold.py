@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Benchmark: GreenOnBrown adaptive threshold methods.
+
+Runs GreenOnBrown.inference() with each threshold_method ('gaussian', the
+original, 'mean' and 'lowres') on a set of frames and reports, per method:
+  - latency of the adaptive threshold step alone and of the full inference() call
+  - mask IoU against the 'gaussian' mask (after the morphological close)
+  - box agreement: gaussian boxes matched by a box with IoU >= --iou
+
+Frames come from --input (a directory of images or a video); without it a
+synthetic field image set is used.
+
+Usage:
+    python benchmarks/bench_gob_threshold.py
+    python benchmarks/bench_gob_threshold.py --input owl_data/ --algorithm exhsv-int
+    python benchmarks/bench_gob_threshold.py --input field_run.mp4 --max-frames 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.greenonbrown import GreenOnBrown, ThresholdProfile, THRESHOLD_METHODS
+
+
+PROFILE = ThresholdProfile(exg_min=25, exg_max=200, hue_min=39, hue_max=83,
+                           saturation_min=50, saturation_max=220,
+                           brightness_min=60, brightness_max=190, min_detection_area=10)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def synthetic_frames(count=10, h=1088, w=1456):
+    """Green plants of mixed size on noisy brown soil with a lighting gradient (what the local mean adapts to)."""
+    rng = np.random.RandomState(42)
+    gradient = np.linspace(0.7, 1.2, w, dtype=np.float32)[None, :, None]
+    for _ in range(count):
+        img = np.zeros((h, w, 3), dtype=np.uint8)
+        img[:] = (40, 80, 120)  # Brown soil (BGR)
+        img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+        for _ in range(rng.randint(20, 60)):
+            cx, cy = rng.randint(10, w - 10), rng.randint(10, h - 10)
+            axes = (rng.randint(3, 40), rng.randint(3, 60))
+            cv2.ellipse(img, (cx, cy), axes, rng.randint(0, 180), 0, 360, (30, rng.randint(120, 200), 30), -1)
+        yield np.clip(img * gradient, 0, 255).astype(np.uint8)
+
+
+def recorded_frames(path, max_frames):
+    """Frames from a directory of images or a video file."""
+    if os.path.isdir(path):
+        names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:max_frames]:
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while count < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        count += 1
+        yield frame
+    cap.release()
+
+
+def box_iou(a, b):
+    """IoU matrix between two (N, 4) / (M, 4) arrays of [x, y, w, h] boxes."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    iw = np.clip(np.minimum(ax2[:, None], bx2) - np.maximum(a[:, None, 0], b[:, 0]), 0, None)
+    ih = np.clip(np.minimum(ay2[:, None], by2) - np.maximum(a[:, None, 1], b[:, 1]), 0, None)
+    inter = iw * ih
+    union = (a[:, 2] * a[:, 3])[:, None] + b[:, 2] * b[:, 3] - inter
+    return inter / np.maximum(union, 1)
+
+
+def colour_index(func, algorithm, frame):
+    """The clipped uint8 colour index the threshold step sees, or None for hsv (already binary)."""
+    if algorithm == 'hsv':
+        return None
+    if algorithm in ('exhsv', 'exhsv-int'):
+        index = func(frame, bounds=PROFILE.hsv_bounds)
+    else:
+        index = func(frame)
+    return np.clip(index, PROFILE.exg_min, PROFILE.exg_max).astype(np.uint8)
+
+
+def threshold_ms(detector, index, method, repeats):
+    """Median time of the adaptive threshold step alone on a precomputed colour index."""
+    workspace = detector._get_workspace(index.shape)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        detector._adaptive_threshold(index, workspace, method, 31)
+        times.append((time.perf_counter() - t0) * 1000)
+    return np.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GreenOnBrown threshold method benchmark')
+    parser.add_argument('--input', type=str, default=None, help='Directory of images or video file')
+    parser.add_argument('--max-frames', type=int, default=100, help='Frames to read from --input (default: 100)')
+    parser.add_argument('--algorithm', type=str, default='exhsv', help='GoB algorithm (default: exhsv)')
+    parser.add_argument('--iou', type=float, default=0.5, help='Box IoU for a matched detection (default: 0.5)')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs per frame (default: 5)')
+    args = parser.parse_args()
+
+    if args.input:
+        frames = list(recorded_frames(args.input, args.max_frames))
+        source = args.input
+    else:
+        frames = list(synthetic_frames())
+        source = 'synthetic field'
+    if not frames:
+        print(f'No frames found in {args.input}')
+        return
+
+    h, w = frames[0].shape[:2]
+    print('=== GreenOnBrown Threshold Method Benchmark ===')
+    print(f'Source: {source} ({len(frames)} frames, {w}x{h}), Algorithm: {args.algorithm}')
+
+    detectors = {method: GreenOnBrown(algorithm=args.algorithm, threshold_method=method)
+                 for method in THRESHOLD_METHODS}
+    func = detectors['gaussian'].algorithms[args.algorithm]
+    reference = {}
+    rows = []
+    for method, detector in detectors.items():
+        step_times, total_times, mask_ious = [], [], []
+        matched = total = 0
+        for i, frame in enumerate(frames):
+            index = colour_index(func, args.algorithm, frame)
+            if index is not None:
+                step_times.append(threshold_ms(detector, index, method, args.repeats))
+
+            _, boxes, _, _ = detector.inference(frame, algorithm=args.algorithm, profile=PROFILE)
+            for _ in range(args.repeats):
+                t0 = time.perf_counter()
+                detector.inference(frame, algorithm=args.algorithm, profile=PROFILE)
+                total_times.append((time.perf_counter() - t0) * 1000)
+
+            mask = detector._threshold_mask(frame, detector._get_workspace(frame.shape), func,
+                                            args.algorithm, PROFILE).astype(bool)
+            boxes = [tuple(map(int, b)) for b in boxes]
+            if method == 'gaussian':
+                reference[i] = (mask.copy(), boxes)
+                continue
+
+            ref_mask, ref_boxes = reference[i]
+            union = np.count_nonzero(ref_mask | mask)
+            mask_ious.append(np.count_nonzero(ref_mask & mask) / union if union else 1.0)
+            total += len(ref_boxes)
+            if ref_boxes and boxes:
+                matched += int(np.sum(box_iou(ref_boxes, boxes).max(axis=1) >= args.iou))
+
+        rows.append((method, np.median(step_times) if step_times else float('nan'), np.median(total_times),
+                     np.mean(mask_ious) if mask_ious else 1.0, matched / total if total else 1.0))
+
+    base = rows[0][2]
+    print()
+    print(f'  {"method":>8s} {"threshold":>10s} {"inference":>10s} {"speedup":>8s} {"mask IoU":>9s} {"boxes":>7s}')
+    for method, step, total, mask_iou, box_match in rows:
+        ref = method == 'gaussian'
+        print(f'  {method:>8s} {step:8.2f}ms {total:8.2f}ms {base / total:7.2f}x '
+              f'{"-" if ref else f"{mask_iou:.1%}":>9s} {"-" if ref else f"{box_match:.1%}":>7s}')
+    print()
+    print(f'  threshold: adaptive threshold step alone; inference: full inference() call; '
+          f'mask IoU and boxes (matched at IoU >= {args.iou}) are against gaussian')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,16 @@ Benchmark: Sequential vs Parallel hybrid inference.
 Runs the old (sequential mask-then-ExHSV) and new (parallel ExHSV + YOLO)
 approaches side by side on the same synthetic image with a real YOLO model.
 
+Also times the crop safety filter (step 6 of the hybrid pipeline): the old
+per-centre Python loop against the vectorised centre test and the box-overlap
+test, for increasing detection counts. --filter-only runs just that part and
+needs no YOLO model.
+
 Usage:
     python benchmarks/bench_hybrid_parallel.py
     python benchmarks/bench_hybrid_parallel.py --rounds 50
     python benchmarks/bench_hybrid_parallel.py --resolution 640
+    python benchmarks/bench_hybrid_parallel.py --filter-only --image-size 1456x1088
 """
 
 import argparse
@@ -24,8 +30,13 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
 from concurrent.futures import ThreadPoolExecutor
-from utils.greenonbrown import GreenOnBrown
-from ultralytics import YOLO
+from utils.greenonbrown import GreenOnBrown, MAX_DETECTIONS
+from utils.greenongreen import GreenOnGreen
+
+try:
+    from ultralytics import YOLO
+except ImportError:
+    YOLO = None
 
 
 # ---------------------------------------------------------------------------
@@ -186,6 +197,66 @@ def time_exhsv_only(gob, image, exhsv_kwargs, rounds):
     return times
 
 
+# ---------------------------------------------------------------------------
+# Crop safety filter: Python loop vs vectorised
+# ---------------------------------------------------------------------------
+
+def filter_loop(boxes, weed_centres, crop_mask):
+    """Previous step 6: per-centre bounds check and mask lookup, capped afterwards."""
+    h_full, w_full = crop_mask.shape[:2]
+    filtered_boxes = []
+    filtered_centres = []
+    for i, centre in enumerate(weed_centres):
+        cx, cy = centre
+        if 0 <= cy < h_full and 0 <= cx < w_full:
+            if crop_mask[cy, cx] == 0:
+                filtered_boxes.append(boxes[i])
+                filtered_centres.append(centre)
+    return filtered_boxes[:MAX_DETECTIONS], filtered_centres[:MAX_DETECTIONS]
+
+
+def make_crop_mask(h, w, crop_buffer_px=20):
+    """Three dilated crop rows down the frame, as YOLO + step 4 would produce."""
+    mask = np.zeros((h, w), dtype=np.uint8)
+    for x in (w // 4, w // 2, 3 * w // 4):
+        cv2.rectangle(mask, (x - w // 20, 0), (x + w // 20, h), 255, -1)
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * crop_buffer_px + 1, 2 * crop_buffer_px + 1))
+    return cv2.dilate(mask, kernel)
+
+
+def bench_safety_filter(w, h, rounds, counts=(50, 500, 5000)):
+    crop_mask = make_crop_mask(h, w)
+    rng = np.random.RandomState(0)
+
+    def median_ms(func):
+        times = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            func()
+            times.append((time.perf_counter() - t0) * 1000)
+        return np.median(times)
+
+    print(f'\nCrop safety filter ({w}x{h} mask, {rounds} rounds)...')
+    print('  lists: contours blob backend output; arrays: cca backend output (int32)')
+    print(f'  {"detections":>10s} {"input":>6s} {"loop":>9s} {"centre":>9s} {"overlap":>9s} {"speedup":>8s}  '
+          f'centre == loop')
+    for count in counts:
+        xy = np.stack([rng.randint(0, w - 40, count), rng.randint(0, h - 40, count)], axis=1)
+        box_arr = np.concatenate([xy, rng.randint(4, 40, (count, 2))], axis=1).astype(np.int32)
+        centre_arr = box_arr[:, :2] + box_arr[:, 2:] // 2
+        for kind, boxes, centres in (('lists', box_arr.tolist(), centre_arr.tolist()),
+                                     ('arrays', box_arr, centre_arr)):
+            loop = median_ms(lambda: filter_loop(boxes, centres, crop_mask))
+            centre = median_ms(lambda: GreenOnGreen._filter_crop_detections(boxes, centres, crop_mask))
+            overlap = median_ms(lambda: GreenOnGreen._filter_crop_detections(boxes, centres, crop_mask, 0.3))
+            expected = filter_loop(boxes, centres, crop_mask)
+            result = GreenOnGreen._filter_crop_detections(boxes, centres, crop_mask)
+            same = all(np.array_equal(np.asarray(e).reshape(-1, n), np.asarray(r).reshape(-1, n))
+                       for e, r, n in zip(expected, result, (4, 2)))
+            print(f'  {count:10d} {kind:>6s} {loop:7.3f}ms {centre:7.3f}ms {overlap:7.3f}ms {loop / centre:7.2f}x  '
+                  f'{"EXACT" if same else "MISMATCH"}')
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -196,10 +267,19 @@ def main():
     parser.add_argument('--warmup', type=int, default=5, help='Warmup rounds (default: 5)')
     parser.add_argument('--resolution', type=int, default=320, help='YOLO inference resolution (default: 320)')
     parser.add_argument('--image-size', type=str, default='640x480', help='Image WxH (default: 640x480)')
+    parser.add_argument('--filter-only', action='store_true',
+                        help='Only time the crop safety filter (no YOLO model needed)')
     args = parser.parse_args()
 
     w, h = map(int, args.image_size.split('x'))
 
+    if args.filter_only:
+        bench_safety_filter(w, h, args.rounds)
+        return
+    if YOLO is None:
+        print('ultralytics is not installed; use --filter-only or pip install -r requirements-gog.txt')
+        return
+
     print(f'=== Hybrid Inference Benchmark ===')
     print(f'Image: {w}x{h}, YOLO imgsz: {args.resolution}, Rounds: {args.rounds}, Warmup: {args.warmup}')
     print()
@@ -297,6 +377,8 @@ def main():
                                    detect_class_ids, confidence, exhsv_kwargs)
     print(f'\nSanity check: sequential found {len(seq_boxes)} weeds, parallel found {len(par_boxes)} weeds')
 
+    bench_safety_filter(w, h, args.rounds)
+
     executor.shutdown(wait=False)
 
 
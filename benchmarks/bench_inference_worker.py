@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+"""
+Benchmark: pipelined GreenOnGreen inference on a thread (InferencePipeline) vs in a worker
+process fed through shared memory (InferenceWorker).
+
+Both run one frame behind the loop. The loop does a fixed amount of Python work per frame
+(actuation, MQTT, stream encoding) and optional background threads keep the interpreter
+busy the way the MQTT client and MJPEG streamer do. Reported per mode:
+
+  - loop rate (frames per second through submit())
+  - end-to-end latency, capture to result in the loop (mean / p50 / p95 / max)
+  - inference time as measured where the model runs
+
+By default the detector is synthetic: a GIL-holding Python pre/post-processing step around
+a GIL-free "forward pass" (sleep), so the contention shows without a model. With Ultralytics
+installed, --yolo runs the first model found in models/ (or --model) instead.
+
+Usage:
+    python benchmarks/bench_inference_worker.py
+    python benchmarks/bench_inference_worker.py --frames 300 --python-ms 12 --model-ms 25
+    python benchmarks/bench_inference_worker.py --main-ms 10 --background-threads 2
+    python benchmarks/bench_inference_worker.py --yolo --resolution 320
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Ensure project root is importable
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from functools import partial
+from utils.greenonbrown import Detections
+from utils.greenongreen import GreenOnGreen, InferencePipeline
+from utils.inference_worker import InferenceWorker
+
+try:
+    from ultralytics import YOLO
+except ImportError:
+    YOLO = None
+
+
+def busy(ms):
+    """Hold the GIL with pure-Python work for about ms milliseconds."""
+    end = time.perf_counter() + ms / 1000
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+class SyntheticDetector:
+    """
+    Pure-mode GreenOnGreen stand-in: python_ms of GIL-holding pre/post-processing around a
+    model_ms forward pass that releases the GIL, like NCNN inside Ultralytics.
+    Defined at module level so the worker process can build it.
+    """
+
+    def __init__(self, python_ms=8.0, model_ms=20.0):
+        self.python_ms = python_ms
+        self.model_ms = model_ms
+        self.hybrid_mode = False
+        self.tracking_enabled = False
+        self.inference_resolution = 320
+        self._pure_imgsz = {}
+        self._detect_class_ids = None
+        self.last_detections = Detections()
+        self.last_track_ids, self.last_class_ids, self.last_confidences = [], [], []
+        self.last_raw_boxes, self.detection_mask = [], None
+
+    def set_inference_resolution(self, imgsz):
+        self.inference_resolution = imgsz
+        self._pure_imgsz = {'imgsz': imgsz}
+
+    def inference(self, image, confidence=0.5, show_display=False, build_mask=False):
+        busy(self.python_ms / 2)     # letterbox, tensor conversion
+        time.sleep(self.model_ms / 1000)
+        busy(self.python_ms / 2)     # NMS, Results wrapping, tracker update
+        boxes = [[10, 10, 20, 20]]
+        self.last_detections = Detections(boxes=boxes, class_ids=np.array([0]), confidences=np.array([0.9]))
+        self.last_track_ids, self.last_class_ids, self.last_confidences = [], [0], [0.9]
+        self.last_raw_boxes, self.detection_mask = boxes, None
+        return [], boxes, [[20, 20]], image
+
+
+def find_model():
+    """Find a YOLO model in models/."""
+    models_dir = os.path.join(PROJECT_ROOT, 'models')
+    for f in sorted(os.listdir(models_dir)):
+        if f.endswith('.pt'):
+            return os.path.join(models_dir, f)
+    for d in sorted(os.listdir(models_dir)):
+        path = os.path.join(models_dir, d)
+        if os.path.isdir(path) and any(f.endswith('.param') for f in os.listdir(path)):
+            return path
+    raise FileNotFoundError('No YOLO model found in models/')
+
+
+def background_load(stop, ms):
+    """A thread doing Python work in ms bursts, like the MQTT client or the stream encoder."""
+    while not stop.is_set():
+        busy(ms)
+        time.sleep(0.001)
+
+
+def run_loop(pipeline, frames, main_ms, confidence):
+    """Drive pipeline.submit() like owl.py's frame loop; returns (fps, latencies_ms, inference_ms)."""
+    latencies, inference = [], []
+    start = time.perf_counter()
+    for frame in frames:
+        result = pipeline.submit(frame, time.perf_counter(), confidence=confidence)
+        if result is not None:
+            latencies.append((time.perf_counter() - result.capture_time) * 1000)
+            inference.append(result.inference_ms)
+        busy(main_ms)
+    elapsed = time.perf_counter() - start
+    result = pipeline.drain()
+    if result is not None:
+        latencies.append((time.perf_counter() - result.capture_time) * 1000)
+        inference.append(result.inference_ms)
+    return len(frames) / elapsed, np.array(latencies), np.array(inference)
+
+
+def report(name, fps, latencies, inference):
+    print(f'  {name:<18} {fps:7.1f} fps   latency mean {latencies.mean():6.1f}  p50 {np.percentile(latencies, 50):6.1f}'
+          f'  p95 {np.percentile(latencies, 95):6.1f}  max {latencies.max():6.1f} ms'
+          f'   inference {inference.mean():6.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Thread vs process pipelined GreenOnGreen inference')
+    parser.add_argument('--frames', type=int, default=200, help='Frames per mode')
+    parser.add_argument('--warmup', type=int, default=10, help='Frames before timing starts')
+    parser.add_argument('--image-size', default='640x480', help='Frame size WxH')
+    parser.add_argument('--main-ms', type=float, default=8.0, help='Python work per frame in the loop')
+    parser.add_argument('--background-threads', type=int, default=1,
+                        help='Threads doing Python work alongside the loop')
+    parser.add_argument('--python-ms', type=float, default=8.0,
+                        help='Synthetic detector: GIL-holding pre/post-processing per frame')
+    parser.add_argument('--model-ms', type=float, default=20.0,
+                        help='Synthetic detector: GIL-free forward pass per frame')
+    parser.add_argument('--yolo', action='store_true', help='Use a real GreenOnGreen model')
+    parser.add_argument('--model', default=None, help='Model path for --yolo (default: first in models/)')
+    parser.add_argument('--resolution', type=int, default=320, help='Inference resolution for --yolo')
+    parser.add_argument('--confidence', type=float, default=0.5)
+    args = parser.parse_args()
+
+    w, h = map(int, args.image_size.lower().split('x'))
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (h, w, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.warmup + args.frames)]
+
+    if args.yolo:
+        if YOLO is None:
+            print('Ultralytics is not installed: run without --yolo for the synthetic detector')
+            return
+        model_path = args.model or find_model()
+        detector = GreenOnGreen(model_path=model_path, inference_resolution=args.resolution)
+        factory = None
+        print(f'Detector: {model_path} @ {args.resolution}')
+    else:
+        detector = SyntheticDetector(args.python_ms, args.model_ms)
+        factory = partial(SyntheticDetector, args.python_ms, args.model_ms)
+        print(f'Detector: synthetic, {args.python_ms} ms Python + {args.model_ms} ms GIL-free model')
+    print(f'Loop: {args.main_ms} ms Python per frame, {args.background_threads} background thread(s), '
+          f'{w}x{h}, {args.frames} frames\n')
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=background_load, args=(stop, 2.0), daemon=True)
+               for _ in range(args.background_threads)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        modes = [
+            ('thread pipeline', lambda: InferencePipeline(detector)),
+            ('worker process', lambda: InferenceWorker(detector, frames[0].shape, factory=factory)),
+        ]
+        for name, make in modes:
+            pipeline = make()
+            if isinstance(pipeline, InferenceWorker) and not pipeline.wait_ready():
+                # Otherwise every frame would be timed on the in-process fallback
+                raise SystemExit('Inference worker failed to start')
+            try:
+                for frame in frames[:args.warmup]:
+                    pipeline.submit(frame, time.perf_counter(), confidence=args.confidence)
+                pipeline.drain()
+                report(name, *run_loop(pipeline, frames[args.warmup:], args.main_ms, args.confidence))
+            finally:
+                pipeline.close()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+if __name__ == '__main__':
+    main()
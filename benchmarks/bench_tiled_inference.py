@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Benchmark: tiled YOLO inference, latency vs recall of small weeds.
+
+Shrinking a 1456x1088 frame to a 320 px model input leaves a 20 px weed with about
+4 px. Tiled inference runs YOLO on overlapping tiles instead, each at the model
+input size, so small weeds keep more pixels at roughly one model run per tile.
+
+Part 1 (always, no model needed) times the work tiling adds around the model:
+cutting the tiles, moving boxes to frame coordinates and the class-aware NMS merge.
+
+Part 2 (with ultralytics and a model in models/ or --model) runs each tile grid over
+the frames and reports median/p95 latency. With YOLO .txt labels for the images
+(next to them or in --labels), it also reports recall over all labels and over
+small labels (shorter side below --small px in the frame), counting a label as
+found when a detection centre falls inside it.
+
+Usage:
+    python benchmarks/bench_tiled_inference.py
+    python benchmarks/bench_tiled_inference.py --images field/images --labels field/labels
+    python benchmarks/bench_tiled_inference.py --model models/yolo11n_ncnn_model --grids 1x1,2x2,3x3 --overlap 0.25
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.greenongreen import class_aware_nms, tile_windows
+from utils.preset_sweep import list_images, read_labels, score
+
+try:
+    from ultralytics import YOLO
+except ImportError:
+    YOLO = None
+
+
+def find_model():
+    """Find a YOLO model in models/ (a .pt file or an NCNN directory), or None."""
+    models_dir = os.path.join(PROJECT_ROOT, 'models')
+    if not os.path.isdir(models_dir):
+        return None
+    for f in sorted(os.listdir(models_dir)):
+        if f.endswith('.pt'):
+            return os.path.join(models_dir, f)
+    for d in sorted(os.listdir(models_dir)):
+        path = os.path.join(models_dir, d)
+        if os.path.isdir(path) and any(f.endswith('.param') for f in os.listdir(path)):
+            return path
+    return None
+
+
+def make_test_image(h=1088, w=1456):
+    """Synthetic BGR field frame: green plants of mixed sizes on noisy brown soil."""
+    rng = np.random.RandomState(42)
+    img = np.full((h, w, 3), (40, 80, 120), dtype=np.uint8)
+    img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+    for _ in range(40):
+        cv2.circle(img, (rng.randint(20, w - 20), rng.randint(20, h - 20)), rng.randint(4, 40), (30, 180, 30), -1)
+    return img
+
+
+def parse_grids(spec):
+    """'1x1,2x2,3x2' -> [(1, 1), (2, 2), (3, 2)] as (columns, rows)."""
+    return [tuple(int(v) for v in grid.lower().split('x')) for grid in spec.split(',')]
+
+
+def timed(func, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - t0) * 1000)
+    return np.median(times), np.percentile(times, 95)
+
+
+def bench_overhead(image, grids, overlap, rounds, detections):
+    h, w = image.shape[:2]
+    rng = np.random.RandomState(0)
+    print()
+    print(f'  {"grid":>6s} {"tiles":>6s} {"tile px":>9s} {"cut":>9s} {"merge":>9s}')
+    for columns, rows in grids:
+        windows = tile_windows(w, h, columns, rows, overlap=overlap)
+        n = detections * len(windows)
+        xy = rng.uniform(0, [w - 40, h - 40], (n, 2)).astype(np.float32)
+        xyxy = np.column_stack([xy, xy + rng.uniform(8, 40, (n, 2))]).astype(np.float32)
+        conf = rng.uniform(0.25, 1, n).astype(np.float32)
+        cls = rng.randint(0, 3, n).astype(np.int32)
+
+        cut_ms = timed(lambda: [image[y0:y1, x0:x1] for x0, y0, x1, y1 in windows], rounds)[0]
+        merge_ms = timed(lambda: class_aware_nms(xyxy, conf, cls), rounds)[0]
+        x0, y0, x1, y1 = windows[0]
+        print(f'  {columns}x{rows:<4d} {len(windows):6d} {f"{x1 - x0}x{y1 - y0}":>9s} '
+              f'{cut_ms:7.3f}ms {merge_ms:7.3f}ms')
+    print(f'  merge: {detections} detections per tile before NMS')
+
+
+def small_labels(labels, small_px):
+    return labels[np.minimum(labels[:, 2], labels[:, 3]) < small_px]
+
+
+def bench_model(model_path, frames, labels, grids, overlap, imgsz, conf, small_px):
+    from utils.greenongreen import GreenOnGreen
+
+    detector = GreenOnGreen(model_path=model_path, confidence=conf, inference_resolution=imgsz,
+                            tile_overlap=overlap)
+    labelled = labels is not None
+    print()
+    print(f'Model: {os.path.basename(model_path)}, {len(frames)} frames at {imgsz}px')
+    header = f'  {"grid":>6s} {"median":>9s} {"p95":>9s} {"det/frame":>9s}'
+    if labelled:
+        header += f' {"recall":>7s} {f"small<{small_px}px":>12s}'
+    print(header)
+
+    for columns, rows in grids:
+        detector.tiles = (columns, rows)
+        detector.inference(frames[0], confidence=conf)  # warm up, builds the tile windows
+        times = []
+        found = total = small_found = small_total = detections = 0
+        for i, frame in enumerate(frames):
+            t0 = time.perf_counter()
+            _, boxes, _, _ = detector.inference(frame, confidence=conf)
+            times.append((time.perf_counter() - t0) * 1000)
+            detections += len(boxes)
+            if labelled:
+                _, _, hit, n = score(boxes, labels[i])
+                found, total = found + hit, total + n
+                _, _, hit, n = score(boxes, small_labels(labels[i], small_px))
+                small_found, small_total = small_found + hit, small_total + n
+
+        line = (f'  {columns}x{rows:<4d} {np.median(times):7.1f}ms {np.percentile(times, 95):7.1f}ms '
+                f'{detections / len(frames):9.1f}')
+        if labelled:
+            line += f' {found / max(total, 1):7.3f} {small_found / max(small_total, 1):12.3f}'
+        print(line)
+
+    if labelled:
+        print(f'  recall: labels holding a detection centre; small = shorter side below {small_px}px')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiled YOLO inference: latency vs small-weed recall')
+    parser.add_argument('--images', default=None, help='Directory of frames (default: one synthetic frame)')
+    parser.add_argument('--labels', default=None, help='Directory of YOLO .txt labels (default: next to the images)')
+    parser.add_argument('--max-images', type=int, default=50, help='Use at most this many images (default: 50)')
+    parser.add_argument('--grids', default='1x1,2x1,2x2,3x2,3x3', help='Tile grids as CxR (default: 1x1,...,3x3)')
+    parser.add_argument('--overlap', type=float, default=0.2, help='Tile overlap fraction (default: 0.2)')
+    parser.add_argument('--imgsz', type=int, default=320, help='Model input size per tile (default: 320)')
+    parser.add_argument('--small', type=int, default=32, help='Small-label threshold in frame pixels (default: 32)')
+    parser.add_argument('--rounds', type=int, default=200, help='Timed calls per step in part 1 (default: 200)')
+    parser.add_argument('--detections', type=int, default=20, help='Detections per tile in part 1 (default: 20)')
+    parser.add_argument('--model', default=None, help='YOLO model for part 2 (default: first in models/)')
+    parser.add_argument('--conf', type=float, default=0.25, help='Confidence threshold for part 2')
+    args = parser.parse_args()
+
+    grids = parse_grids(args.grids)
+    if args.images:
+        paths = list_images(args.images, args.max_images)
+        frames = [cv2.imread(path) for path in paths]
+        labels = [read_labels(path, frame.shape, args.labels) for path, frame in zip(paths, frames)]
+        if not any(len(label) for label in labels):
+            labels = None
+    else:
+        frames, labels = [make_test_image()], None
+
+    h, w = frames[0].shape[:2]
+    print('=== Tiled YOLO Inference Benchmark ===')
+    print(f'Frame: {w}x{h}, overlap {args.overlap}, grids {args.grids}')
+    bench_overhead(frames[0], grids, args.overlap, args.rounds, args.detections)
+
+    model_path = args.model or find_model()
+    if YOLO is None or model_path is None:
+        print()
+        print('Skipping model timing and recall: needs ultralytics and a model (--model or models/)')
+        return
+    bench_model(model_path, frames, labels, grids, args.overlap, args.imgsz, args.conf, args.small)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,11 @@
 Benchmark: Tracking overhead for weed detection pipeline.
 
 Measures the cost of adding ByteTrack + ClassSmoother + CropMaskStabilizer
-to the GoG/GoG-hybrid detection loop. Operates on synthetic detection outputs
-(no images, no YOLO inference) to isolate tracking overhead.
+to the GoG/GoG-hybrid detection loop, and compares the NumPy WeedTracker used
+for GreenOnBrown against ByteTrack on latency, ID switches and dropout coverage.
+Operates on synthetic detection outputs (no images, no YOLO inference) to
+isolate tracking overhead. The ByteTrack sections are skipped when ultralytics
+is not installed.
 
 Usage:
     python benchmarks/bench_tracker.py
@@ -26,8 +29,13 @@ import numpy as np
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
-from ultralytics.trackers.byte_tracker import BYTETracker, STrack
-from ultralytics.trackers.utils.matching import iou_distance
+from utils.tracker import WeedTracker
+
+try:
+    from ultralytics.trackers.byte_tracker import BYTETracker, STrack
+    from ultralytics.trackers.utils.matching import iou_distance
+except ImportError:
+    BYTETracker = STrack = iou_distance = None
 
 
 # ============================================================
@@ -47,6 +55,7 @@ class SyntheticScene:
         self.rng = np.random.RandomState(seed)
         self.frame_width = frame_width
         self.frame_height = frame_height
+        self.last_ids = []  # ground-truth id of each detection from the last generate_frame()
 
         self.objects = []
         for i in range(num_objects):
@@ -71,6 +80,7 @@ class SyntheticScene:
         class_ids = []
         confidences = []
         ground_truth = []
+        self.last_ids = []
 
         for obj in self.objects:
             # Update position
@@ -110,6 +120,7 @@ class SyntheticScene:
             boxes.append([x, y_clamped, obj['w'], obj['h']])
             class_ids.append(cls)
             confidences.append(conf)
+            self.last_ids.append(obj['id'])
 
         return boxes, class_ids, confidences, ground_truth
 
@@ -561,6 +572,128 @@ def bench_accuracy(num_objects=10, num_frames=200, drop_rate=0.1,
     }
 
 
+def bench_weedtracker_update(num_objects_list, num_frames=200):
+    """Benchmark WeedTracker.update() for various detection counts."""
+    print('\n=== WeedTracker.update() Latency ===')
+    print(f'{"Objects":>8} {"Median":>8} {"Mean":>8} {"P95":>8} {"P99":>8} {"Min":>8} {"Max":>8}')
+    print('-' * 62)
+
+    results = {}
+    for n_obj in num_objects_list:
+        scene = SyntheticScene(num_objects=n_obj, speed_px_per_frame=10)
+        tracker = WeedTracker(max_age=5)
+
+        frames = []
+        for f in range(num_frames):
+            boxes, _, _, _ = scene.generate_frame(f, drop_rate=0.1)
+            frames.append(np.array(boxes, dtype=np.float32).reshape(-1, 4))
+
+        frame_idx = [0]
+
+        def run_update():
+            idx = frame_idx[0] % len(frames)
+            if idx == 0:
+                tracker.reset()
+            tracker.update(frames[idx])
+            frame_idx[0] += 1
+
+        stats = timeit_ms(run_update, rounds=num_frames, warmup=min(20, num_frames // 2))
+        results[n_obj] = stats
+        print(f'{n_obj:>8} {stats["median"]:>7.2f}ms {stats["mean"]:>7.2f}ms '
+              f'{stats["p95"]:>7.2f}ms {stats["p99"]:>7.2f}ms '
+              f'{stats["min"]:>7.2f}ms {stats["max"]:>7.2f}ms')
+
+    return results
+
+
+def _id_switches(pairs, last_track):
+    """Count ground-truth objects whose track id changed since they were last matched."""
+    switches = 0
+    for gt_id, tid in pairs:
+        if gt_id in last_track and last_track[gt_id] != tid:
+            switches += 1
+        last_track[gt_id] = tid
+    return switches
+
+
+def bench_tracker_comparison(num_objects=10, num_frames=300, drop_rate=0.1, burst_every=40, burst_len=4):
+    """Compare WeedTracker with ByteTrack on the same detections.
+
+    Every burst_every frames, a third of the objects drop out for burst_len frames. Reported per tracker:
+    update latency, ID switches (a ground-truth object seen under a new track id) and dropout coverage
+    (the share of dropped-out, in-frame objects still covered by a coasting track, so the nozzle could
+    still fire on them).
+    """
+    print(f'\n=== WeedTracker vs ByteTrack ({num_objects} obj, {drop_rate:.0%} drop, '
+          f'{burst_len}-frame bursts every {burst_every}) ===')
+
+    def run(tracker_name):
+        scene = SyntheticScene(num_objects=num_objects, speed_px_per_frame=12)
+        if tracker_name == 'weedtracker':
+            tracker = WeedTracker(max_age=burst_len + 1)
+        else:
+            tracker = make_bytetracker()
+            STrack.reset_id()
+        times, last_track = [], {}
+        switches = observations = dropped = covered = 0
+        burst_ids = set(range(0, num_objects, 3))
+
+        for f in range(num_frames):
+            in_burst = f % burst_every < burst_len and f >= burst_every
+            boxes, cls_ids, confs, gt = scene.generate_frame(
+                f, drop_rate=drop_rate, burst_drop_ids=burst_ids if in_burst else None)
+            gt_ids = list(scene.last_ids)
+
+            t0 = time.perf_counter()
+            if tracker_name == 'weedtracker':
+                ids = tracker.update(np.array(boxes, dtype=np.float32).reshape(-1, 4), cls_ids, confs)
+                times.append((time.perf_counter() - t0) * 1000)
+                pairs = list(zip(gt_ids, ids.tolist()))
+                coasting = [t['xyxy'].tolist() for t in tracker.get_lost_tracks()]
+            else:
+                output = tracker.update(boxes_to_results_format(boxes, cls_ids, confs), None)
+                times.append((time.perf_counter() - t0) * 1000)
+                # Column 7 is the index of the detection each output track was matched to
+                pairs = [(gt_ids[int(row[7])], int(row[4])) for row in output]
+                coasting = [t.xyxy.tolist() for t in tracker.lost_stracks]
+
+            observations += len(pairs)
+            switches += _id_switches(pairs, last_track)
+
+            # Dropout coverage: objects in frame but not detected
+            seen = set(gt_ids)
+            for g in gt:
+                if g['id'] in seen:
+                    continue
+                dropped += 1
+                x, y, w, h = g['box']
+                cx, cy = x + w / 2, y + h / 2
+                if any(x1 <= cx <= x2 and y1 <= cy <= y2 for x1, y1, x2, y2 in coasting):
+                    covered += 1
+
+        return {
+            'median_ms': float(np.median(times)),
+            'p95_ms': float(np.percentile(times, 95)),
+            'id_switches': switches,
+            'observations': observations,
+            'dropped': dropped,
+            'dropout_coverage': covered / max(dropped, 1),
+        }
+
+    names = ['weedtracker'] + (['bytetrack'] if BYTETracker is not None else [])
+    results = {name: run(name) for name in names}
+
+    print(f'  {"Tracker":14s} {"Median":>8} {"P95":>8} {"ID sw":>7} {"Dropped":>8} {"Covered":>8}')
+    print(f'  {"-"*14} {"-"*8} {"-"*8} {"-"*7} {"-"*8} {"-"*8}')
+    for name, r in results.items():
+        print(f'  {name:14s} {r["median_ms"]:>7.3f}ms {r["p95_ms"]:>7.3f}ms {r["id_switches"]:>7d} '
+              f'{r["dropped"]:>8d} {r["dropout_coverage"]:>7.1%}')
+    if BYTETracker is None:
+        print('  (ultralytics not installed: ByteTrack skipped)')
+
+    return results
+
+
 def bench_iou_computation(num_objects_list):
     """Benchmark raw IoU distance matrix computation (core of matching)."""
     print('\n=== IoU Distance Matrix Computation ===')
@@ -611,7 +744,7 @@ def main():
 
     print('=' * 62)
     print('  OWL Tracking Overhead Benchmark')
-    print('  Measures: ByteTrack + ClassSmoother + CropMaskStabilizer')
+    print('  Measures: ByteTrack + ClassSmoother + CropMaskStabilizer, WeedTracker')
     print('=' * 62)
 
     obj_counts = [5, 10, 20, 40, 50]
@@ -619,9 +752,22 @@ def main():
     all_results = {}
 
     # Individual component benchmarks
-    all_results['bytetracker'] = bench_bytetracker_update(obj_counts)
+    all_results['weedtracker'] = bench_weedtracker_update(obj_counts)
     all_results['class_smoother'] = bench_class_smoother(obj_counts)
     all_results['crop_mask'] = bench_crop_mask_stabilizer([5, 10, 20, 30])
+
+    # WeedTracker (GreenOnBrown) against ByteTrack (GoG)
+    all_results['tracker_comparison'] = bench_tracker_comparison(
+        num_objects=args.objects, num_frames=args.frames)
+    all_results['tracker_comparison_dense'] = bench_tracker_comparison(
+        num_objects=40, num_frames=args.frames)
+
+    if BYTETracker is None:
+        print('\nultralytics not installed: skipping the ByteTrack pipeline benchmarks.')
+        _save(all_results)
+        return
+
+    all_results['bytetracker'] = bench_bytetracker_update(obj_counts)
     all_results['iou_matrix'] = bench_iou_computation(obj_counts)
 
     # Full pipeline
@@ -660,7 +806,10 @@ def main():
     print(f'  Tracking % of budget (Pi5): {typical * 2.5 / 33.3 * 100:.1f}%')
     print(f'  Tracking % of budget (Pi4): {typical * 6 / 33.3 * 100:.1f}%')
 
-    # Save results
+    _save(all_results)
+
+
+def _save(all_results):
     out_path = os.path.join(PROJECT_ROOT, 'benchmarks',
                             f'{time.strftime("%Y-%m-%d")}_tracker_overhead.json')
     with open(out_path, 'w') as f:
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-frame YOLO overhead outside the model, model.predict() vs FastPredictor.
+
+Part 1 (always, no model needed) times the work around the model for one camera frame:
+  - generic: what model.predict() does per call, with fresh allocations: letterbox via
+    resize + copyMakeBorder, BGR->RGB, HWC->CHW, contiguous copy, float conversion, /255;
+    then per-box Python extraction of the boxes
+  - fast: FastPredictor.preprocess() into the preallocated canvas and input tensor, then
+    one vectorised scale_boxes() call
+Both produce the same input tensor (checked).
+
+Part 2 (with ultralytics and a model in models/ or --model) times full calls:
+model.predict(), FastPredictor.predict() and the bare backend call, and reports the
+overhead of each path as total minus backend.
+
+Usage:
+    python benchmarks/bench_yolo_preprocess.py
+    python benchmarks/bench_yolo_preprocess.py --image-size 1456x1088 --imgsz 416
+    python benchmarks/bench_yolo_preprocess.py --model models/yolo11n_ncnn_model --rounds 100
+"""
+
+import argparse
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.greenongreen import FastPredictor
+
+try:
+    from ultralytics import YOLO
+except ImportError:
+    YOLO = None
+
+
+def find_model():
+    """Find a YOLO model in models/ (a .pt file or an NCNN directory), or None."""
+    models_dir = os.path.join(PROJECT_ROOT, 'models')
+    if not os.path.isdir(models_dir):
+        return None
+    for f in sorted(os.listdir(models_dir)):
+        if f.endswith('.pt'):
+            return os.path.join(models_dir, f)
+    for d in sorted(os.listdir(models_dir)):
+        path = os.path.join(models_dir, d)
+        if os.path.isdir(path) and any(f.endswith('.param') for f in os.listdir(path)):
+            return path
+    return None
+
+
+def make_test_image(h=480, w=640):
+    """Synthetic BGR field frame: green plants on noisy brown soil."""
+    rng = np.random.RandomState(42)
+    img = np.full((h, w, 3), (40, 80, 120), dtype=np.uint8)
+    img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+    for _ in range(15):
+        cv2.circle(img, (rng.randint(50, w - 50), rng.randint(50, h - 50)), rng.randint(15, 40), (30, 180, 30), -1)
+    return img
+
+
+def generic_preprocess(image, imgsz):
+    """model.predict()'s preprocessing for one frame, allocating as it goes."""
+    h, w = image.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    dw, dh = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    boxed = cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    batch = np.stack([boxed])[..., ::-1].transpose(0, 3, 1, 2)
+    batch = np.ascontiguousarray(batch).astype(np.float32)
+    batch /= 255
+    return batch
+
+
+def generic_boxes(det, scale, pad):
+    """Per-box extraction as inference() does on Results boxes."""
+    boxes = []
+    for row in det:
+        x1, y1, x2, y2 = ((v - p) / scale for v, p in zip(row[:4], (pad[0], pad[1], pad[0], pad[1])))
+        x1, y1, x2, y2 = map(int, (x1, y1, x2, y2))
+        boxes.append([x1, y1, x2 - x1, y2 - y1])
+    return boxes
+
+
+def timed(func, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - t0) * 1000)
+    return np.median(times), np.percentile(times, 95)
+
+
+def bench_overhead(image, imgsz, rounds, detections):
+    predictor = FastPredictor(MagicMock(), image.shape, imgsz)
+    np.testing.assert_array_equal(predictor.preprocess(image), generic_preprocess(image, imgsz))
+
+    rng = np.random.RandomState(0)
+    xy = rng.uniform(0, imgsz - 40, (detections, 2)).astype(np.float32)
+    det = np.column_stack([xy, xy + 30, np.full((detections, 2), 0.5, np.float32)])
+    pad = predictor._offset[:2]
+
+    rows = [
+        ('generic preprocess', timed(lambda: generic_preprocess(image, imgsz), rounds)),
+        ('fast preprocess', timed(lambda: predictor.preprocess(image), rounds)),
+        (f'generic boxes ({detections})', timed(lambda: generic_boxes(det, predictor.scale, pad), rounds)),
+        (f'fast boxes ({detections})', timed(lambda: predictor.scale_boxes(det[:, :4].copy()), rounds)),
+    ]
+    print()
+    print(f'  {"step":>22s} {"median":>9s} {"p95":>9s}')
+    for name, (median, p95) in rows:
+        print(f'  {name:>22s} {median:7.3f}ms {p95:7.3f}ms')
+    generic = rows[0][1][0] + rows[2][1][0]
+    fast = rows[1][1][0] + rows[3][1][0]
+    print(f'  {"total outside model":>22s} generic {generic:.3f}ms, fast {fast:.3f}ms ({generic / fast:.1f}x)')
+
+
+def bench_model(model_path, image, imgsz, rounds, conf):
+    model = YOLO(model_path)
+    predictor = FastPredictor(model, image.shape, imgsz)
+    predictor.predict(image, conf=conf)  # binds the backend (and warms up predict())
+    model.predict(source=image, imgsz=imgsz, conf=conf, verbose=False, device='cpu')
+
+    def backend_only():
+        with predictor._torch.inference_mode():
+            predictor._backend(predictor._tensor)
+
+    predict_ms = timed(lambda: model.predict(source=image, imgsz=imgsz, conf=conf, verbose=False, device='cpu'),
+                       rounds)[0]
+    fast_ms = timed(lambda: predictor.predict(image, conf=conf), rounds)[0]
+    backend_ms = timed(backend_only, rounds)[0]
+
+    print()
+    print(f'Model: {os.path.basename(model_path)}')
+    print(f'  {"path":>16s} {"total":>9s} {"overhead":>9s}')
+    print(f'  {"model.predict()":>16s} {predict_ms:7.2f}ms {predict_ms - backend_ms:7.2f}ms')
+    print(f'  {"FastPredictor":>16s} {fast_ms:7.2f}ms {fast_ms - backend_ms:7.2f}ms')
+    print(f'  {"backend only":>16s} {backend_ms:7.2f}ms {"-":>9s}')
+    print()
+    print('  overhead: total minus the bare backend call (letterbox, tensor conversion, NMS, box mapping)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLO per-frame overhead: model.predict() vs FastPredictor')
+    parser.add_argument('--image-size', default='640x480', help='Camera frame WxH (default: 640x480)')
+    parser.add_argument('--imgsz', type=int, default=320, help='Model input size (default: 320)')
+    parser.add_argument('--rounds', type=int, default=200, help='Timed calls per step (default: 200)')
+    parser.add_argument('--detections', type=int, default=20, help='Boxes for the box-mapping step (default: 20)')
+    parser.add_argument('--model', default=None, help='YOLO model for part 2 (default: first in models/)')
+    parser.add_argument('--conf', type=float, default=0.25, help='Confidence threshold for part 2')
+    args = parser.parse_args()
+
+    w, h = map(int, args.image_size.lower().split('x'))
+    image = make_test_image(h, w)
+    print('=== YOLO Preprocessing Overhead Benchmark ===')
+    print(f'Frame: {w}x{h} -> {args.imgsz}px input, {args.rounds} rounds')
+    bench_overhead(image, args.imgsz, args.rounds, args.detections)
+
+    model_path = args.model or find_model()
+    if YOLO is None or model_path is None:
+        print()
+        print('Skipping full-call timing: needs ultralytics and a model (--model or models/)')
+        return
+    bench_model(model_path, image, args.imgsz, args.rounds, args.conf)
+
+
+if __name__ == '__main__':
+    main()
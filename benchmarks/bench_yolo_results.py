@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Benchmark: reading YOLO results per box vs in bulk.
+
+GreenOnGreen used to walk result.boxes one box at a time, calling int() on
+box.xyxy[0] and reading box.cls[0] and box.conf[0]. Indexing a Boxes object
+creates a new Boxes each time, and every element access is a small tensor
+operation. The bulk path converts .xyxy, .cls, .conf and .id once per frame
+and does the box and centre maths with array operations.
+
+Uses ultralytics' Boxes on torch tensors when both are installed. Otherwise
+it uses a NumPy stand-in with the same per-box indexing, which understates the
+per-box cost of torch tensors.
+
+Usage:
+    python benchmarks/bench_yolo_results.py
+    python benchmarks/bench_yolo_results.py --counts 10,50,200 --rounds 500 --tracked
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.greenongreen import GreenOnGreen
+
+try:
+    import torch
+    from ultralytics.engine.results import Boxes
+except ImportError:
+    torch = Boxes = None
+
+
+class _Array(np.ndarray):
+    """ndarray with the .cpu().numpy() chain of a torch tensor."""
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self)
+
+
+class NumpyBoxes:
+    """ultralytics Boxes stand-in: (N, 6 or 7) rows of x1, y1, x2, y2, [id,] conf, cls."""
+
+    def __init__(self, data):
+        self.data = data.view(_Array)
+        self.is_track = data.shape[-1] == 7
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, i):
+        return NumpyBoxes(self.data[i:i + 1] if isinstance(i, int) else self.data[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def id(self):
+        return self.data[:, -3] if self.is_track else None
+
+    @property
+    def conf(self):
+        return self.data[:, -2]
+
+    @property
+    def cls(self):
+        return self.data[:, -1]
+
+
+def make_boxes(count, tracked):
+    rng = np.random.RandomState(count)
+    xy = rng.uniform(0, 1400, (count, 2))
+    columns = [xy, xy + rng.uniform(8, 60, (count, 2))]
+    if tracked:
+        columns.append(np.arange(1, count + 1, dtype=np.float64)[:, None])
+    columns += [rng.uniform(0.25, 1, (count, 1)), rng.randint(0, 3, (count, 1)).astype(np.float64)]
+    data = np.hstack(columns).astype(np.float32)
+    if Boxes is not None:
+        return Boxes(torch.from_numpy(data), (1088, 1456))
+    return NumpyBoxes(data)
+
+
+def per_box(yolo_boxes, tracked):
+    """The pre-change loop: one tensor access per coordinate, class and score."""
+    boxes, weed_centres, track_ids, class_ids, confidences = [], [], [], [], []
+    for i, box in enumerate(yolo_boxes):
+        x1, y1, x2, y2 = map(int, box.xyxy[0])
+        w, h = x2 - x1, y2 - y1
+        boxes.append([x1, y1, w, h])
+        weed_centres.append([x1 + w // 2, y1 + h // 2])
+        if tracked:
+            track_ids.append(int(yolo_boxes.id[i]))
+        class_ids.append(int(box.cls[0]))
+        confidences.append(float(box.conf[0]))
+    return boxes, weed_centres, track_ids, class_ids, confidences
+
+
+def bulk(yolo_boxes, tracked):
+    """GreenOnGreen's path: one conversion per attribute, vectorised box maths."""
+    xyxy, class_ids, confidences, track_ids = GreenOnGreen._box_arrays(yolo_boxes)
+    boxes, weed_centres = GreenOnGreen._xyxy_to_boxes(xyxy)
+    return boxes, weed_centres, track_ids, class_ids, confidences
+
+
+def timed(func, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - t0) * 1000)
+    return np.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLO result handling: per-box loop vs bulk arrays')
+    parser.add_argument('--counts', default='5,20,50,100,300', help='Detections per frame (default: 5,...,300)')
+    parser.add_argument('--rounds', type=int, default=300, help='Timed calls per count (default: 300)')
+    parser.add_argument('--tracked', action='store_true', help='Include tracker IDs, as with tracking enabled')
+    args = parser.parse_args()
+
+    print('=== YOLO Result Extraction Benchmark ===')
+    print(f'Boxes: {"ultralytics Boxes on torch tensors" if Boxes is not None else "NumPy stand-in"}, '
+          f'tracked: {args.tracked}')
+    print()
+    print(f'  {"boxes":>6s} {"per-box":>10s} {"bulk":>10s} {"saving":>10s} {"speedup":>8s}')
+    for count in (int(c) for c in args.counts.split(',')):
+        yolo_boxes = make_boxes(count, args.tracked)
+        reference, result = per_box(yolo_boxes, args.tracked), bulk(yolo_boxes, args.tracked)
+        assert reference[:2] == result[:2], 'bulk boxes differ from the per-box loop'
+
+        loop_ms = timed(lambda: per_box(yolo_boxes, args.tracked), args.rounds)
+        bulk_ms = timed(lambda: bulk(yolo_boxes, args.tracked), args.rounds)
+        print(f'  {count:6d} {loop_ms:8.3f}ms {bulk_ms:8.3f}ms {loop_ms - bulk_ms:8.3f}ms '
+              f'{loop_ms / bulk_ms:7.1f}x')
+    print()
+    print('  saving: per-frame time saved by the bulk path')
+
+
+if __name__ == '__main__':
+    main()
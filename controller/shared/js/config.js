@@ -17,7 +17,14 @@ const CONFIG_FIELD_DEFS = {
         'relay_num': { type: 'select', options: ['1', '2', '4', '8', '12', '16'], help: 'Number of relays' },
         'actuation_duration': { type: 'number', step: 0.01, min: 0.01, max: 2.0, help: 'Spray duration in seconds' },
         'delay': { type: 'number', step: 0.01, min: 0, max: 5.0, help: 'Delay before actuation' },
-        'actuation_zone': { type: 'number', min: 1, max: 100, help: 'Actuation zone (% of frame from bottom)' }
+        'actuation_zone': { type: 'number', min: 1, max: 100, help: 'Actuation zone (% of frame from bottom)' },
+        'actuation_zone_only': { type: 'boolean', help: 'Only run colour detection on the actuation zone (GoB and hybrid)' },
+        'actuation_zone_margin': { type: 'number', min: 0, max: 200, help: 'Extra rows above the actuation zone processed so blobs crossing into it stay whole' },
+        'static_reuse': { type: 'boolean', help: 'Reuse the last detection result while the scene is static (vehicle stopped)' },
+        'static_reuse_signal': { type: 'select', options: ['frame', 'gps', 'both'], help: 'Static when: frame difference, GPS speed, or both' },
+        'static_reuse_max_age': { type: 'number', step: 0.05, min: 0.05, max: 10, help: 'Longest a result is reused for (seconds)' },
+        'static_reuse_threshold': { type: 'number', min: 0, max: 255, help: 'Largest thumbnail pixel difference still treated as the same scene' },
+        'static_reuse_speed': { type: 'number', step: 0.1, min: 0, max: 20, help: 'Ground speed (km/h) at or below which the vehicle counts as stopped' }
     },
     'MQTT': {
         'enable': { type: 'boolean', help: 'Enable MQTT communication' },
@@ -47,7 +54,14 @@ const CONFIG_FIELD_DEFS = {
         'brightness_min': { type: 'number', min: 0, max: 255 },
         'brightness_max': { type: 'number', min: 0, max: 255 },
         'min_detection_area': { type: 'number', min: 1, max: 10000 },
-        'invert_hue': { type: 'boolean' }
+        'invert_hue': { type: 'boolean' },
+        'blob_backend': { type: 'select', options: ['contours', 'cca'], help: 'Blob extraction: contours (default) or cca (faster on noisy, many-blob masks)' },
+        'parallel_bands': { type: 'number', min: 1, max: 8, help: 'Split the frame into N horizontal bands processed on N threads (1 = off)' },
+        'pyramid_scale': { type: 'select', options: ['1', '2', '4'], help: 'Find candidates at 1/2 or 1/4 resolution, then refine each at full resolution (1 = off)' },
+        'threshold_method': { type: 'text', help: 'Adaptive threshold: gaussian (default), mean or lowres; per algorithm with e.g. "gaussian, exhsv:lowres"' },
+        'custom_budget_ms': { type: 'number', step: 0.5, min: 0, max: 1000, help: 'Latency budget per custom algorithm call in ms (0 = off)' },
+        'custom_budget_frames': { type: 'number', min: 1, max: 1000, help: 'Consecutive frames over budget before acting' },
+        'custom_budget_action': { type: 'select', options: ['log', 'fallback'], help: 'Over budget: log an error, or log and fall back to exhsv' }
     },
     'GreenOnGreen': {
         'model_path': { type: 'text', help: 'Path to YOLO model (NCNN dir or .pt file)' },
@@ -56,7 +70,20 @@ const CONFIG_FIELD_DEFS = {
         'actuation_mode': { type: 'select', options: ['centre', 'zone'], help: 'centre = box centre, zone = mask pixel coverage per lane' },
         'min_detection_pixels': { type: 'number', min: 1, max: 10000, help: 'Min weed pixels in lane to trigger relay (zone mode only)' },
         'inference_resolution': { type: 'number', min: 160, max: 1280, help: 'YOLO input resolution (lower = faster)' },
-        'crop_buffer_px': { type: 'number', min: 0, max: 50, help: 'Buffer around detected crop in pixels (hybrid mode)' }
+        'crop_buffer_px': { type: 'number', min: 0, max: 50, help: 'Buffer around detected crop in pixels (hybrid mode)' },
+        'crop_overlap_max': { type: 'number', step: 0.05, min: 0, max: 1, help: 'Drop weeds whose box overlaps crop by more than this fraction (0 = centre-pixel test, hybrid mode)' },
+        'analytic_crop_filter': { type: 'boolean', help: 'Test weeds against crop boxes/polygons plus buffer directly instead of a full-frame dilated mask (hybrid mode)' },
+        'pipelined_inference': { type: 'boolean', help: 'Run YOLO one frame behind the main loop for higher frame rate (gog mode)' },
+        'inference_worker': { type: 'boolean', help: 'Pipelined YOLO in a separate process fed through shared memory, restarted if it dies (gog mode)' },
+        'fast_predict': { type: 'boolean', help: 'Preallocated letterbox/input tensor for YOLO detect models at inference_resolution (gog mode, no tracking)' },
+        'tile_columns': { type: 'number', min: 1, max: 8, help: 'Tile grid columns for small-weed YOLO inference (1 x 1 = off, gog mode, no tracking)' },
+        'tile_rows': { type: 'number', min: 1, max: 8, help: 'Tile grid rows' },
+        'tile_overlap': { type: 'number', step: 0.05, min: 0, max: 0.5, help: 'Fraction of each tile shared with its neighbour' },
+        'keyframe_interval': { type: 'number', min: 1, max: 10, help: 'Run YOLO on at most every Nth frame, moving its boxes by image motion in between (1 = off, gog mode)' },
+        'keyframe_max_travel': { type: 'number', step: 0.05, min: 0.05, max: 1, help: 'Largest image motion between model runs, as a fraction of frame height' },
+        'keyframe_budget_ms': { type: 'number', step: 1, min: 0, max: 1000, help: 'Run YOLO every frame while a model frame fits in this loop time (0 = off)' },
+        'resolution_governor': { type: 'boolean', help: 'Step inference_resolution with speed and loop time to keep frames within one actuation length (gog modes, needs GPS)' },
+        'resolution_ladder': { type: 'text', help: 'Comma-separated input sizes the governor steps through, e.g. 256,320,416,512' }
     },
     'DataCollection': {
         'image_sample_enable': { type: 'boolean', help: 'Enable image saving' },
@@ -106,7 +133,7 @@ const CONFIG_FIELD_DEFS = {
         'port': { type: 'number', min: 1, max: 65535, help: 'Dashboard web server port' }
     },
     'Tracking': {
-        'tracking_enabled': { type: 'boolean', help: 'Enable weed tracking (class smoothing + crop mask persistence)' },
+        'tracking_enabled': { type: 'boolean', help: 'Enable weed tracking (class smoothing + crop mask persistence; IDs, persistence and one firing per weed for GoB)' },
         'track_high_thresh': { type: 'number', min: 0.01, max: 0.5, step: 0.01, help: 'First-pass confidence threshold (lower = more detections matched)' },
         'track_low_thresh': { type: 'number', min: 0.01, max: 0.3, step: 0.01, help: 'Second-pass threshold for marginal detections' },
         'new_track_thresh': { type: 'number', min: 0.01, max: 0.5, step: 0.01, help: 'Minimum confidence to start a new track' },
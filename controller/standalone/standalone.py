@@ -536,7 +536,8 @@ class OWLDashboard:
             try:
                 data = request.get_json() or {}
                 algorithm = data.get('algorithm', '').lower()
-                valid = {'exg', 'exgr', 'maxg', 'nexg', 'exhsv', 'hsv', 'gndvi', 'gog', 'gog-hybrid'}
+                valid = {'exg', 'exgr', 'maxg', 'nexg', 'nexg-int', 'exhsv', 'exhsv-int', 'hsv', 'gndvi',
+                         'gog', 'gog-hybrid'}
                 if algorithm not in valid:
                     return jsonify({'success': False, 'error': f'Invalid algorithm: {algorithm}'}), 400
                 result = self.mqtt_client._send_command('set_algorithm', value=algorithm)
@@ -7,6 +7,7 @@ import argparse
 import time
 import threading
 from collections import deque
+from functools import partial
 
 try:
     import serial
@@ -76,8 +77,13 @@ try:
     from utils.video_manager import VideoStream, StreamingHandler, ThreadedHTTPServer
     from utils.image_sampler import ImageRecorder
     from utils.algorithms import fft_blur
-    from utils.greenonbrown import GreenOnBrown
+    from utils.relay_assignment import assign_relays, merge_lost_tracks
+    from utils.greenonbrown import AlgorithmTimings, Detections, GreenOnBrown, ThresholdProfile
+    from utils.detector_loader import DetectorLoader
+    from utils.keyframe import KeyframeScheduler
+    from utils.resolution_governor import DEFAULT_LADDER, ResolutionGovernor, parse_ladder
     from utils.frame_reader import FrameReader
+    from utils.scene_gate import StaticSceneGate
     from utils.config_manager import ConfigValidator
     from utils.log_manager import LogManager, MQTTLogHandler
     from utils.shared_types import Sensitivity
@@ -142,6 +148,17 @@ class Owl:
         self.brightness_max = self.config.getint('GreenOnBrown', 'brightness_max')
         self.min_detection_area = self.config.getint('GreenOnBrown', 'min_detection_area')
         self.invert_hue = self.config.getboolean('GreenOnBrown', 'invert_hue')
+        self.refresh_threshold_profile()
+        self.blob_backend = self.config.get('GreenOnBrown', 'blob_backend', fallback='contours').strip().lower()
+        self.parallel_bands = self.config.getint('GreenOnBrown', 'parallel_bands', fallback=1)
+        self.pyramid_scale = self.config.getint('GreenOnBrown', 'pyramid_scale', fallback=1)
+        self.threshold_method = self.config.get('GreenOnBrown', 'threshold_method', fallback='gaussian')
+        # Custom algorithm timings (published in the MQTT state) and optional latency budget
+        self.algorithm_timings = AlgorithmTimings(
+            budget_ms=self.config.getfloat('GreenOnBrown', 'custom_budget_ms', fallback=0.0),
+            budget_frames=self.config.getint('GreenOnBrown', 'custom_budget_frames', fallback=30))
+        self.custom_budget_action = self.config.get('GreenOnBrown', 'custom_budget_action',
+                                                    fallback='log').strip().lower()
 
         # Sensitivity preset manager
         from utils.sensitivity_manager import SensitivityManager
@@ -203,6 +220,7 @@ class Owl:
         self.dash = None
         self.stream_active = None
         self.latest_stream_frame = None
+        self._stream_annotate = None
         mqtt_enable = self.config.getboolean('MQTT', 'enable', fallback=False)
 
         broker_ip = self.config.get('MQTT', 'broker_ip', fallback='localhost')
@@ -435,6 +453,8 @@ class Owl:
         else:
             self.actuation_duration = self.config.getfloat('System', 'actuation_duration')
             self.delay = self.config.getfloat('System', 'delay')
+        # Ground length one actuation covers; None = actuation_duration at the current speed
+        self.actuation_length_cm = self.config.getfloat('Actuation', 'actuation_length_cm', fallback=None)
 
         # Loop time tracking (30-frame rolling window)
         self._loop_times = deque(maxlen=30)
@@ -476,15 +496,56 @@ class Owl:
         # to be updated too. Fairly straightforward, so an opportunity for more precise application
         self.relay_num = self.config.getint('System', 'relay_num')
         self.actuation_zone = self.config.getint('System', 'actuation_zone', fallback=100)
+        # Only run GoB/hybrid colour detection on the actuation zone rows (+ margin for blobs crossing into it)
+        self.actuation_zone_only = self.config.getboolean('System', 'actuation_zone_only', fallback=False)
+        self.actuation_zone_margin = self.config.getint('System', 'actuation_zone_margin', fallback=32)
+        self.detection_roi_rows = None
+
+        # Reuse the last detection result while the scene is static (vehicle stopped). Off unless enabled
+        self._scene_gate = None
+        if self.config.getboolean('System', 'static_reuse', fallback=False):
+            self._scene_gate = StaticSceneGate(
+                signal=self.config.get('System', 'static_reuse_signal', fallback='frame').strip().lower(),
+                max_age=self.config.getfloat('System', 'static_reuse_max_age', fallback=1.0),
+                threshold=self.config.getint('System', 'static_reuse_threshold', fallback=8),
+                speed_kmh=self.config.getfloat('System', 'static_reuse_speed', fallback=0.5))
+            self.logger.info(f"Static-scene reuse enabled: signal={self._scene_gate.signal}, "
+                             f"max age={self._scene_gate.max_age}s")
 
         # GreenOnGreen / hybrid config
         self.inference_resolution = self.config.getint('GreenOnGreen', 'inference_resolution', fallback=320)
         self.crop_buffer_px = self.config.getint('GreenOnGreen', 'crop_buffer_px', fallback=20)
+        self.crop_overlap_max = self.config.getfloat('GreenOnGreen', 'crop_overlap_max', fallback=0.0)
+        self.analytic_crop_filter = self.config.getboolean('GreenOnGreen', 'analytic_crop_filter', fallback=False)
+        self.pipelined_inference = self.config.getboolean('GreenOnGreen', 'pipelined_inference', fallback=False)
+        # Pipelined inference in a worker process fed through shared memory instead of a thread
+        self.inference_worker = self.config.getboolean('GreenOnGreen', 'inference_worker', fallback=False)
+        self.fast_predict = self.config.getboolean('GreenOnGreen', 'fast_predict', fallback=False)
+        self.inference_tiles = (self.config.getint('GreenOnGreen', 'tile_columns', fallback=1),
+                                self.config.getint('GreenOnGreen', 'tile_rows', fallback=1))
+        self.tile_overlap = self.config.getfloat('GreenOnGreen', 'tile_overlap', fallback=0.2)
+        # Keyframe inference: YOLO on every k-th frame, detections moved by image motion in between
+        self.keyframe_interval = self.config.getint('GreenOnGreen', 'keyframe_interval', fallback=1)
+        self.keyframe_max_travel = self.config.getfloat('GreenOnGreen', 'keyframe_max_travel', fallback=0.25)
+        self.keyframe_budget_ms = self.config.getfloat('GreenOnGreen', 'keyframe_budget_ms', fallback=0.0)
+        if self.keyframe_interval > 1 and (self.pipelined_inference or self.inference_worker):
+            self.logger.warning('keyframe_interval is ignored while pipelined_inference or inference_worker is enabled')
+        # Resolution governor: steps inference_resolution to keep the ground gap between frames covered
+        self.resolution_governor = self.config.getboolean('GreenOnGreen', 'resolution_governor', fallback=False)
+        try:
+            self.resolution_ladder = parse_ladder(self.config.get('GreenOnGreen', 'resolution_ladder',
+                                                                  fallback=','.join(map(str, DEFAULT_LADDER))))
+        except ValueError as e:
+            self.logger.warning(f"{e}, using {DEFAULT_LADDER}")
+            self.resolution_ladder = DEFAULT_LADDER
         self._pending_algorithm = None
         self._pending_trackbar_updates = {}
         self._pending_model = None
         self._pending_detect_classes = None
         self._gog_detector = None
+        # Model being built in the background by a live switch, and the last load's outcome for MQTT
+        self._loading_model = None
+        self._detector_load = {}
 
         # Tracking config (ByteTrack + class smoothing + crop mask persistence)
         self.tracking_enabled = self.config.getboolean('Tracking', 'tracking_enabled', fallback=False)
@@ -499,12 +560,17 @@ class Owl:
             'Tracking', 'detection_persist_frames', fallback=5)
         self._class_smoother = None
         self._crop_stabilizer = None
+        self._gob_tracker = None
+        self._actuation_gate = None
         if self.tracking_enabled:
-            from utils.tracker import ClassSmoother, CropMaskStabilizer
-            # Both created regardless of algorithm — smoother unused in hybrid mode
-            # but algorithm can change mid-session, so both must be ready
+            from utils.tracker import ActuationGate, ClassSmoother, CropMaskStabilizer, WeedTracker
+            # All created regardless of algorithm — smoother unused in hybrid mode
+            # but algorithm can change mid-session, so all must be ready
             self._class_smoother = ClassSmoother(window=self._track_class_window)
             self._crop_stabilizer = CropMaskStabilizer(max_age=self._track_crop_persist)
+            # GreenOnBrown has no tracker of its own: IDs, dropout persistence and one firing per weed
+            self._gob_tracker = WeedTracker(max_age=max(1, self.detection_persist_frames))
+            self._actuation_gate = ActuationGate()
             self.logger.info(f'Tracking enabled: class_window={self._track_class_window}, '
                              f'crop_persist={self._track_crop_persist}')
 
@@ -530,6 +596,11 @@ class Owl:
 
             # Calculate actuation zone Y threshold
             self.actuation_y_thresh = int(self.cropped_height * (1.0 - self.actuation_zone / 100.0))
+            if self.actuation_zone_only and self.actuation_zone < 100:
+                roi_start = max(0, self.actuation_y_thresh - self.actuation_zone_margin)
+                self.detection_roi_rows = (roi_start, self.cropped_height)
+                self.logger.info(f'[INFO] Actuation-zone-only detection: rows {roi_start}-{self.cropped_height} '
+                                 f'of {self.cropped_height}')
 
             # Calculate lane coords relative to cropped frame
             for i in range(self.relay_num):
@@ -574,37 +645,106 @@ class Owl:
         actuation_mode = self.config.get('GreenOnGreen', 'actuation_mode', fallback='centre')
         min_detection_pixels = self.config.getint('GreenOnGreen', 'min_detection_pixels', fallback=50)
         _zone_tracking_warned = False
+        # Static-scene reuse: last (contours, boxes, centres, Detections) and what it was computed with
+        last_result = None
+        last_result_key = None
+        # Pipelined gog inference: the model runs on frame N while the loop handles frame N-1's result
+        # (InferencePipeline on a thread, or InferenceWorker in a separate process)
+        pipeline = None
+        # Keyframe gog inference: the model runs on some frames, the rest reuse its detections moved by image motion
+        keyframes = None
+        keyframes_detector = None
+        if self.keyframe_interval > 1 and not (self.pipelined_inference or self.inference_worker):
+            keyframes = KeyframeScheduler(max_interval=self.keyframe_interval, max_travel=self.keyframe_max_travel,
+                                          budget_ms=self.keyframe_budget_ms)
+            self.logger.info(f"Keyframe inference enabled: model on at most every {self.keyframe_interval} frames")
+
+        # Resolution governor: steps the YOLO input size with loop time and ground speed
+        governor = None
+        if self.resolution_governor:
+            governor = ResolutionGovernor(ladder=self.resolution_ladder, start=self.inference_resolution)
+            self.inference_resolution = governor.imgsz
+            self.logger.info(f"Resolution governor enabled: {governor.ladder}, starting at {governor.imgsz}px")
 
         # GoB shared config — already initialised in __init__() and may have been
         # updated by SensitivityManager.apply_preset(), so do NOT re-read from config.
 
-        def _create_detector(algo):
-            """Three-way detector factory."""
+        def _create_detector(algo, model_path=None, crop_stabilizer=None):
+            """Three-way detector factory; hybrid detectors share self._crop_stabilizer unless given another."""
             current_classes = self._detect_classes_list or None
+            model_path = model_path or self._model_path
             if algo == 'gog':
                 from utils.greenongreen import GreenOnGreen
-                return GreenOnGreen(
-                    model_path=self._model_path,
+                detector = GreenOnGreen(
+                    model_path=model_path,
                     confidence=self._gog_confidence,
                     detect_classes=current_classes,
                     tracking_enabled=self.tracking_enabled,
                     detection_persist_frames=self.detection_persist_frames,
+                    inference_resolution=self.inference_resolution,
+                    fast_predict=self.fast_predict,
+                    tiles=self.inference_tiles,
+                    tile_overlap=self.tile_overlap,
                 )
             elif algo == 'gog-hybrid':
                 from utils.greenongreen import GreenOnGreen
-                return GreenOnGreen(
-                    model_path=self._model_path,
+                detector = GreenOnGreen(
+                    model_path=model_path,
                     confidence=self._gog_confidence,
                     detect_classes=current_classes,
                     hybrid_mode=True,
                     inference_resolution=self.inference_resolution,
                     crop_buffer_px=self.crop_buffer_px,
+                    crop_overlap_max=self.crop_overlap_max,
+                    analytic_crop_filter=self.analytic_crop_filter,
                     tracking_enabled=self.tracking_enabled,
-                    crop_stabilizer=self._crop_stabilizer,
+                    crop_stabilizer=crop_stabilizer or self._crop_stabilizer,
                     detection_persist_frames=self.detection_persist_frames,
                 )
             else:
-                return GreenOnBrown(algorithm=algo)
+                return GreenOnBrown(algorithm=algo, blob_backend=self.blob_backend, bands=self.parallel_bands,
+                                    pyramid_scale=self.pyramid_scale, threshold_method=self.threshold_method,
+                                    timings=self.algorithm_timings)
+            if governor is not None:
+                detector.set_inference_resolution(governor.imgsz)
+            return detector
+
+        def _warm_up(detector, algo, shape):
+            """One dummy inference so first-call setup happens on the loader thread, not mid-drive."""
+            dummy = np.zeros(shape, dtype=np.uint8)
+            if algo in ('gog', 'gog-hybrid'):
+                detector.inference(dummy, confidence=self._gog_confidence)
+                detector.reset_tracker()
+            else:
+                detector.inference(dummy, algorithm=algo, profile=self.threshold_profile)
+
+        def _report_load(status, algo, model_path, **fields):
+            """Publish the state of a background detector load to the dashboard."""
+            self._detector_load = {'status': status, 'algorithm': algo,
+                                   'model': os.path.basename(str(model_path or '')), **fields}
+            if self.dash and hasattr(self.dash, 'set_detector_load'):
+                self.dash.set_detector_load(self._detector_load)
+
+        def _loader_stabilizer():
+            """
+            A private CropMaskStabilizer for a detector built on the loader thread: its warm-up runs tracking
+            and reset_tracker(), which must not touch the live detector's crop tracks. The shared one is
+            attached when the detector is swapped in.
+            """
+            if self._crop_stabilizer is None:
+                return None
+            from utils.tracker import CropMaskStabilizer
+            return CropMaskStabilizer(max_age=self._track_crop_persist)
+
+        def _request_detector(algo, model_path, shape):
+            """Build and warm up a detector in the background; it is swapped in by loader.poll()."""
+            loader.request((algo, model_path),
+                           factory=lambda: _create_detector(algo, model_path, _loader_stabilizer()),
+                           warmup=lambda detector: _warm_up(detector, algo, shape))
+            self.logger.info(f"Loading {algo} detector in the background")
+            _report_load('loading', algo, model_path)
+
+        loader = DetectorLoader()
 
         try:
             weed_detector = _create_detector(algorithm)
@@ -638,12 +778,21 @@ class Owl:
 
                 # Reset tracker when detection toggled off
                 if prev_detection_enable and not self._detection_enable:
+                    if pipeline is not None:
+                        pipeline.drain()  # the tracker must be idle before it is reset
+                        if self.tracking_enabled and hasattr(pipeline, 'reset_tracker'):
+                            pipeline.reset_tracker()  # the worker process has a tracker of its own
+                    if keyframes is not None:
+                        keyframes.reset()
                     if (self.tracking_enabled and weed_detector
                             and hasattr(weed_detector, 'reset_tracker')):
                         weed_detector.reset_tracker()
                         if self._class_smoother:
                             self._class_smoother.reset()
                         self.logger.info("Tracker state reset (detection disabled)")
+                    if self._gob_tracker is not None:
+                        self._gob_tracker.reset()
+                        self._actuation_gate.reset()
                 prev_detection_enable = self._detection_enable
 
                 # Create new session directory when recording starts
@@ -679,43 +828,62 @@ class Owl:
                     self.saturation_max = cv2.getTrackbarPos("Sat-Max", self.window_name)
                     self.brightness_min = cv2.getTrackbarPos("Bright-Min", self.window_name)
                     self.brightness_max = cv2.getTrackbarPos("Bright-Max", self.window_name)
+                    # Only recompile when a slider actually moved
+                    if ThresholdProfile.from_attributes(self) != self.threshold_profile:
+                        self.refresh_threshold_profile()
 
                 # Pre-load detectors/models outside detection guard so they're
-                # ready instantly when the user enables detection.
+                # ready instantly when the user enables detection. Switches are built
+                # and warmed up in the background; the current detector keeps running
+                # until the new one is swapped in below.
                 # Live algorithm switching
-                if self._pending_algorithm and (weed_detector is None or self._pending_algorithm != algorithm):
-                    try:
-                        weed_detector = _create_detector(self._pending_algorithm)
-                        algorithm = self._pending_algorithm
-                        if algorithm in ('gog', 'gog-hybrid'):
-                            self._gog_detector = weed_detector
-                        self.logger.info(f"Live algorithm switch to: {algorithm}")
-                        if self.dash:
-                            self.dash.state.pop('algorithm_error', None)
-                    except Exception as e:
-                        self.logger.error(f"Failed to load detector for {self._pending_algorithm}: {e}")
-                        # Revert — keep using current weed_detector and algorithm
-                        if self.dash:
-                            self.dash.state['algorithm'] = algorithm
-                            self.dash.state['algorithm_error'] = str(e)
-                    self._pending_algorithm = None
-
-                # Live model switching
+                target = loader.loading_key
+                if self._pending_algorithm and (
+                        self._pending_algorithm != (target or (algorithm,))[0]
+                        or (weed_detector is None and target is None)):
+                    _request_detector(self._pending_algorithm, target[1] if target else self._model_path,
+                                      frame[self.crop_slice].shape)
+                self._pending_algorithm = None
+
+                # Live model switching (applies to the newest requested algorithm)
                 if self._pending_model:
                     new_model = self._pending_model
                     self._pending_model = None
-                    try:
+                    self._loading_model = new_model
+                    _request_detector((loader.loading_key or (algorithm,))[0], new_model,
+                                      frame[self.crop_slice].shape)
+
+                loaded = loader.poll()
+                if loaded is not None:
+                    new_algorithm, new_model = loaded.key
+                    self._loading_model = None
+                    if loaded.error is None:
+                        weed_detector = loaded.detector
+                        algorithm = new_algorithm
                         self._model_path = new_model
-                        weed_detector = _create_detector(algorithm)
                         if algorithm in ('gog', 'gog-hybrid'):
                             self._gog_detector = weed_detector
-                        self.logger.info(f"Live model switch to: {new_model}")
+                        # Keep the persisted crop positions across the switch (on this thread, between frames)
+                        if algorithm == 'gog-hybrid' and self._crop_stabilizer is not None:
+                            weed_detector.set_crop_stabilizer(self._crop_stabilizer)
+                        if self._gob_tracker is not None:
+                            self._gob_tracker.reset()
+                        # detect_classes may have changed while the detector was loading
+                        if hasattr(weed_detector, 'update_detect_classes'):
+                            weed_detector.update_detect_classes(self._detect_classes_list or None)
+                        self.logger.info(f"Live switch to {algorithm}: loaded in {loaded.load_s:.2f}s, "
+                                         f"warm-up {loaded.warmup_s:.2f}s")
                         if self.dash:
                             self.dash.state.pop('algorithm_error', None)
-                    except Exception as e:
-                        self.logger.error(f"Failed to switch model: {e}")
+                    else:
+                        self.logger.error(f"Failed to load detector for {new_algorithm}: {loaded.error}")
+                        # Revert — keep using current weed_detector and algorithm
                         if self.dash:
-                            self.dash.state['algorithm_error'] = str(e)
+                            self.dash.state['algorithm'] = algorithm
+                            self.dash.state['algorithm_error'] = str(loaded.error)
+                    _report_load('ready' if loaded.error is None else 'error', new_algorithm, new_model,
+                                 load_s=round(loaded.load_s, 3), warmup_s=round(loaded.warmup_s, 3),
+                                 error=str(loaded.error) if loaded.error is not None else None)
 
                 # Live detect_classes update
                 if self._pending_detect_classes is not None:
@@ -733,18 +901,113 @@ class Owl:
                         and weed_detector.crop_buffer_px != self.crop_buffer_px):
                     weed_detector.set_crop_buffer(self.crop_buffer_px)
 
+                # Pipelined inference is tied to one gog detector: drop it on a switch
+                if pipeline is not None and (algorithm != 'gog' or pipeline.detector is not weed_detector):
+                    pipeline.close()
+                    pipeline = None
+                # Keyframe detections belong to the detector that made them
+                if keyframes is not None and keyframes_detector is not weed_detector:
+                    keyframes.reset()
+                    keyframes_detector = weed_detector
+
                 if self._detection_enable and weed_detector is not None:
                     cropped_frame = frame[self.crop_slice]
-
-                    return_image_out = self.show_display or bool(self.dash)
-
-                    if algorithm == 'gog':
+                    persisted_boxes = []
+                    # Per-frame tracking/mask state; a pipelined result carries its own frame's copy
+                    gog_state = weed_detector
+                    detection_time = None
+                    predicted = False
+                    # Track IDs aligned with weed_centres, for one firing per tracked weed (GoB tracking)
+                    actuation_ids = None
+
+                    # Only the local display needs an annotated frame every loop; dashboard frames
+                    # are annotated lazily when streamed (see set_latest_stream_frame)
+                    return_image_out = self.show_display
+
+                    reuse = False
+                    if self._scene_gate is not None:
+                        result_key = (weed_detector, self.threshold_profile, self._gog_confidence,
+                                      self.detection_roi_rows, tuple(self._detect_classes_list),
+                                      self.crop_buffer_px)
+                        if result_key != last_result_key:
+                            self._scene_gate.reset()
+                            last_result, last_result_key = None, result_key
+                        reuse = (self._scene_gate.should_reuse(cropped_frame, self._ground_speed_kmh())
+                                 and last_result is not None)
+
+                    if reuse:
+                        cnts, boxes, weed_centres, detections = last_result
+                        boxes, weed_centres = boxes.copy(), weed_centres.copy()
+                        image_out = (weed_detector.annotate(cropped_frame.copy(), detections)
+                                     if return_image_out else cropped_frame)
+                    elif algorithm == 'gog' and (self.pipelined_inference or self.inference_worker):
+                        from utils.greenongreen import PipelineResult
+                        if pipeline is not None and getattr(pipeline, 'frame_shape', cropped_frame.shape) != cropped_frame.shape:
+                            pipeline.close()  # the worker's shared-memory slots are sized for one frame shape
+                            pipeline = None
+                        if pipeline is None:
+                            pipeline = self._create_pipeline(weed_detector, cropped_frame.shape)
+                        # A worker still loading, restarting or given up runs frames on a thread here instead
+                        result = pipeline.submit(
+                            cropped_frame, loop_start, source=frame,
+                            confidence=self._gog_confidence,
+                            show_display=return_image_out,
+                            build_mask=(actuation_mode == 'zone' and not self.tracking_enabled))
+                        if result is None:
+                            # First frame in flight, nothing to act on yet. The model is reading cropped_frame,
+                            # so the display overlay gets a copy to write on
+                            result = PipelineResult(frame=cropped_frame, source=frame, capture_time=loop_start,
+                                                    image_out=cropped_frame.copy() if return_image_out
+                                                    else cropped_frame)
+                        # Everything below (actuation, stream, sampler) handles the frame the result came from
+                        cropped_frame, frame, detection_time = result.frame, result.source, result.capture_time
+                        cnts, boxes, weed_centres, image_out = (result.contours, result.boxes,
+                                                                result.weed_centres, result.image_out)
+                        detections = result.last_detections
+                        gog_state = result
+                    elif (algorithm == 'gog' and keyframes is not None
+                          and not keyframes.should_run(cropped_frame, self._ground_speed_kmh(), now=loop_start)):
+                        # Between keyframes: the last keyframe's detections, moved by the image motion since
+                        cnts, boxes, weed_centres, detections = keyframes.predict()
+                        image_out = (weed_detector.annotate(cropped_frame.copy(), detections)
+                                     if return_image_out else cropped_frame)
+                        predicted = True
+                    elif algorithm == 'gog':
                         cnts, boxes, weed_centres, image_out = weed_detector.inference(
                             cropped_frame,
                             confidence=self._gog_confidence,
                             show_display=return_image_out,
                             build_mask=(actuation_mode == 'zone' and not self.tracking_enabled)
                         )
+                        detections = weed_detector.last_detections
+                    elif algorithm == 'gog-hybrid':
+                        cnts, boxes, weed_centres, image_out = weed_detector.inference(
+                            cropped_frame,
+                            confidence=self._gog_confidence,
+                            show_display=return_image_out,
+                            roi_rows=self.detection_roi_rows,
+                            profile=self.threshold_profile
+                        )
+                        detections = weed_detector.last_detections
+                    else:
+                        cnts, boxes, weed_centres, image_out = weed_detector.inference(
+                            cropped_frame,
+                            show_display=return_image_out,
+                            algorithm=algorithm,
+                            label='WEED',
+                            roi_rows=self.detection_roi_rows,
+                            profile=self.threshold_profile
+                        )
+                        track_ids = ()
+                        if self._gob_tracker is not None:
+                            actuation_ids = self._gob_tracker.update(boxes).tolist()
+                            track_ids = tuple(actuation_ids)
+                        # Its own copy, so nothing done to this frame's boxes later reaches the drawn detections
+                        detections = Detections(boxes=boxes.copy(), label='WEED', track_ids=track_ids)
+                        if self.algorithm_timings.over_budget(algorithm):
+                            self._custom_algorithm_over_budget(algorithm)
+
+                    if algorithm == 'gog' and not reuse and not predicted:
                         if (self.tracking_enabled and actuation_mode == 'zone'
                                 and not _zone_tracking_warned):
                             self.logger.warning(
@@ -755,11 +1018,11 @@ class Owl:
                         # Apply class smoothing: filter to target classes using majority-vote
                         if (self.tracking_enabled
                                 and self._class_smoother
-                                and weed_detector.last_track_ids):
+                                and gog_state.last_track_ids):
                             smoothed = self._class_smoother.update(
-                                weed_detector.last_track_ids,
-                                weed_detector.last_class_ids,
-                                weed_detector.last_confidences,
+                                gog_state.last_track_ids,
+                                gog_state.last_class_ids,
+                                gog_state.last_confidences,
                                 frame_count=frame_count
                             )
                             target_ids = set(weed_detector._detect_class_ids or [])
@@ -767,8 +1030,8 @@ class Owl:
                                 filtered_boxes = []
                                 filtered_centres = []
                                 for tid, raw_box in zip(
-                                        weed_detector.last_track_ids,
-                                        weed_detector.last_raw_boxes):
+                                        gog_state.last_track_ids,
+                                        gog_state.last_raw_boxes):
                                     if smoothed.get(tid, -1) in target_ids:
                                         x, y, w, h = raw_box
                                         filtered_centres.append([x + w // 2, y + h // 2])
@@ -776,74 +1039,52 @@ class Owl:
                                 boxes = filtered_boxes
                                 weed_centres = filtered_centres
 
-                    elif algorithm == 'gog-hybrid':
-                        cnts, boxes, weed_centres, image_out = weed_detector.inference(
-                            cropped_frame,
-                            confidence=self._gog_confidence,
-                            show_display=return_image_out,
-                            exg_min=self.exg_min, exg_max=self.exg_max,
-                            hue_min=self.hue_min, hue_max=self.hue_max,
-                            saturation_min=self.saturation_min, saturation_max=self.saturation_max,
-                            brightness_min=self.brightness_min, brightness_max=self.brightness_max,
-                            min_detection_area=self.min_detection_area, invert_hue=self.invert_hue
-                        )
-                    else:
-                        cnts, boxes, weed_centres, image_out = weed_detector.inference(
-                            cropped_frame,
-                            exg_min=self.exg_min,
-                            exg_max=self.exg_max,
-                            hue_min=self.hue_min,
-                            hue_max=self.hue_max,
-                            saturation_min=self.saturation_min,
-                            saturation_max=self.saturation_max,
-                            brightness_min=self.brightness_min,
-                            brightness_max=self.brightness_max,
-                            show_display=return_image_out,
-                            algorithm=algorithm,
-                            min_detection_area=self.min_detection_area,
-                            invert_hue=self.invert_hue,
-                            label='WEED'
-                        )
+                    if self._scene_gate is not None and not reuse:
+                        last_result = (cnts, boxes, weed_centres, detections)
 
                     # Merge Kalman-predicted lost tracks into detection output
                     # Only for pure gog mode — in hybrid, lost_stracks are crops not weeds
-                    if (self.tracking_enabled
-                            and self.detection_persist_frames > 0
-                            and algorithm == 'gog'
-                            and hasattr(weed_detector, 'get_lost_tracks')):
-                        lost = weed_detector.get_lost_tracks(
+                    # (predicted frames already carry the merged boxes of their keyframe) —
+                    # and for GoB, whose tracker predicts lost tracks at constant velocity
+                    lost_source = None
+                    if self.tracking_enabled and self.detection_persist_frames > 0 and not predicted:
+                        if algorithm == 'gog' and hasattr(weed_detector, 'get_lost_tracks'):
+                            lost_source = gog_state
+                        elif actuation_ids is not None:
+                            lost_source = self._gob_tracker
+                    if lost_source is not None:
+                        lost = lost_source.get_lost_tracks(
                             max_age=self.detection_persist_frames)
-                        target_ids = set(weed_detector._detect_class_ids or [])
-                        persisted_boxes = []
+                        gob = lost_source is self._gob_tracker
+                        target_ids = set() if gob else set(weed_detector._detect_class_ids or [])
+                        lost_boxes = []
+                        lost_centres = []
                         for lt in lost:
                             smoothed_cls = (self._class_smoother.get_class(lt['track_id'])
-                                            if self._class_smoother else lt['cls'])
+                                            if self._class_smoother and not gob else lt['cls'])
                             if target_ids and smoothed_cls not in target_ids:
                                 continue
                             x1, y1, x2, y2 = [int(v) for v in lt['xyxy']]
                             w, h = x2 - x1, y2 - y1
-                            boxes.append([x1, y1, w, h])
-                            weed_centres.append([int((x1 + x2) / 2), int((y1 + y2) / 2)])
-                            cls_name = weed_detector.model.names.get(lt['cls'], 'unknown')
+                            lost_boxes.append([x1, y1, w, h])
+                            lost_centres.append([int((x1 + x2) / 2), int((y1 + y2) / 2)])
+                            if actuation_ids is not None:
+                                actuation_ids.append(lt['track_id'])
+                            cls_name = 'WEED' if gob else weed_detector.model.names.get(lt['cls'], 'unknown')
                             persisted_boxes.append({
                                 'x': x1, 'y': y1, 'w': w, 'h': h,
                                 'track_id': lt['track_id'], 'age': lt['age'],
                                 'conf': lt['score'], 'cls_name': cls_name,
                             })
 
+                        boxes, weed_centres = merge_lost_tracks(boxes, weed_centres, lost_boxes, lost_centres)
+
                         # Draw persisted boxes on image_out with dimmed colour
                         if persisted_boxes and image_out is not None and return_image_out:
-                            for pb in persisted_boxes:
-                                cv2.rectangle(image_out,
-                                              (pb['x'], pb['y']),
-                                              (pb['x'] + pb['w'], pb['y'] + pb['h']),
-                                              (0, 120, 0), 2)
-                                lbl = (f"ID{pb['track_id']} [{pb['age']}] "
-                                       f"{int(pb['conf'] * 100)}% {pb['cls_name']}")
-                                cv2.putText(image_out, lbl,
-                                            (pb['x'], pb['y'] - 10),
-                                            cv2.FONT_HERSHEY_SIMPLEX, 0.5,
-                                            (0, 120, 0), 1)
+                            self._draw_persisted_boxes(image_out, persisted_boxes)
+
+                    if keyframes is not None and algorithm == 'gog' and not reuse and not predicted:
+                        keyframes.record(cnts, boxes, weed_centres, detections)
 
                     if len(weed_centres) > 0:
                         if self.dash:
@@ -852,16 +1093,18 @@ class Owl:
                             self.controller.weed_detect_indicator()
 
                     # Zone-based actuation (segmentation models with gog/gog-hybrid)
+                    # Predicted keyframe frames have no mask of their own and use centres
                     if (algorithm.startswith('gog')
                             and actuation_mode == 'zone'
-                            and hasattr(weed_detector, 'detection_mask')
-                            and weed_detector.detection_mask is not None):
-                        actuation_time = time.time()
+                            and not predicted
+                            and hasattr(gog_state, 'detection_mask')
+                            and gog_state.detection_mask is not None):
+                        actuation_time = detection_time or time.time()
                         for i in range(self.relay_num):
                             lane_start = self.lane_coords_int[i]
                             lane_end = int(lane_start + self.lane_width)
                             lane_pixels = np.count_nonzero(
-                                weed_detector.detection_mask[self.actuation_y_thresh:, lane_start:lane_end]
+                                gog_state.detection_mask[self.actuation_y_thresh:, lane_start:lane_end]
                             )
                             if lane_pixels >= min_detection_pixels:
                                 self.relay_controller.receive(
@@ -872,13 +1115,16 @@ class Owl:
                     else:
                         # Centre-based actuation (default, works for all model types)
                         # One timestamp per frame, deduplicated relay calls (at most relay_num)
-                        if weed_centres:
-                            actuation_time = time.time()
-                            fired = set()
-                            for centre in weed_centres:
-                                if centre[1] >= self.actuation_y_thresh:
-                                    relay_id = min(int(centre[0] / self.lane_width), self.relay_num - 1)
-                                    fired.add(relay_id)
+                        # weed_centres is a list of [x, y] or an (N, 2) int32 array, so never test its truthiness
+                        # A pipelined result is acted on a frame late; its capture time lets the relay allow for that
+                        if len(weed_centres) > 0:
+                            actuation_time = detection_time or time.time()
+                            # A tracked weed fires once per actuation, not on every frame it spends in the zone
+                            fired = assign_relays(
+                                weed_centres, self.actuation_y_thresh, self.lane_width, self.relay_num,
+                                track_ids=actuation_ids,
+                                gate=self._actuation_gate if actuation_ids is not None else None,
+                                hold_s=self.actuation_duration, now=actuation_time)
                             for relay_id in fired:
                                 self.relay_controller.receive(
                                     relay=relay_id,
@@ -897,18 +1143,18 @@ class Owl:
 
                 if self.dash and frame_count % 5 == 0:  # send every 5th frame to the streamer to reduce overhead
                     try:
-                        if self._detection_enable and image_out is not None:
-                            final_frame_to_stream = image_out
+                        if not self._detection_enable or weed_detector is None:
+                            self.set_latest_stream_frame(frame, self._annotate_stream_frame)
+                        elif return_image_out:
+                            # Already annotated for the local display
+                            self.set_latest_stream_frame(image_out, self._annotate_stream_frame)
                         else:
-                            final_frame_to_stream = frame
-
-                        if self.actuation_zone < 100:
-                            cv2.line(final_frame_to_stream,
-                                     (0, self.actuation_y_thresh),
-                                     (final_frame_to_stream.shape[1], self.actuation_y_thresh),
-                                     (0, 255, 255), 1)
-
-                        self.set_latest_stream_frame(final_frame_to_stream)
+                            # Boxes are drawn on the streaming thread, and only for the frames streamed
+                            self.set_latest_stream_frame(cropped_frame, partial(
+                                self._annotate_stream_frame,
+                                detector=weed_detector,
+                                detections=detections,
+                                persisted_boxes=persisted_boxes))
                     except Exception as e:
                         self.logger.error(f"Error sending frame to dashboard: {e}")
 
@@ -958,6 +1204,11 @@ class Owl:
                 self._loop_times.append(loop_time_ms)
                 self._avg_loop_time_ms = sum(self._loop_times) / len(self._loop_times)
 
+                if (governor is not None and self._detection_enable and weed_detector is not None
+                        and algorithm in ('gog', 'gog-hybrid')):
+                    # A running pipeline applies the change between frames, not under the model's feet
+                    self._govern_resolution(governor, pipeline if pipeline is not None else weed_detector)
+
                 # FPS logging (time-based, replaces imutils FPS)
                 if log_fps:
                     fps_frame_count += 1
@@ -1026,6 +1277,10 @@ class Owl:
             self.logger.error(f"[CRITICAL ERROR] STOPPED: {e}", exc_info=True)
             self.stop()
 
+        finally:
+            if pipeline is not None:
+                pipeline.close()
+
     def stop(self):
         """Gracefully shut down all OWL components."""
 
@@ -1106,6 +1361,14 @@ class Owl:
                 print(f"Failed to stop LogManager: {log_error}", file=sys.stderr)
             sys.exit(0)
 
+    def refresh_threshold_profile(self):
+        """
+        Compile the current threshold attributes into a new ThresholdProfile and swap it in. Call after changing
+        any of them; the detection loop reads self.threshold_profile once per frame, so a single reference
+        assignment from the MQTT or controller thread is the whole update.
+        """
+        self.threshold_profile = ThresholdProfile.from_attributes(self)
+
     def save_parameters(self):
         timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
         new_config_filename = f"{timestamp}_{self._config_path.name}"
@@ -1232,16 +1495,75 @@ class Owl:
             self.logger.error(f"An unexpected error occurred while starting MJPEG streaming server: {e}", exc_info=True)
             raise errors.MJPEGStreamError(host=host, port=port, original_error=e) from e
 
-    def set_latest_stream_frame(self, frame):
-        """Thread-safe method to update the frame for the stream."""
+    def _custom_algorithm_over_budget(self, algorithm):
+        """Log a custom algorithm that stayed over its latency budget and, if configured, switch to exhsv."""
+        timings = self.algorithm_timings
+        stats = timings.snapshot().get(algorithm, {})
+        message = (f"Custom algorithm '{algorithm}' over its {timings.budget_ms:.1f}ms budget for "
+                   f"{timings.budget_frames} frames (P50 {stats.get('p50_ms', 0):.1f}ms, "
+                   f"P95 {stats.get('p95_ms', 0):.1f}ms)")
+        timings.reset_budget(algorithm)
+
+        if self.custom_budget_action != 'fallback':
+            self.logger.error(message)
+            return
+
+        self.logger.error(f"{message}: falling back to exhsv")
+        # Same path as a dashboard algorithm switch; the timings stay in the MQTT state for diagnosis
+        self._pending_algorithm = 'exhsv'
+        if self.dash:
+            self.dash.state['algorithm'] = 'exhsv'
+
+    def set_latest_stream_frame(self, frame, annotate=None):
+        """
+        Thread-safe method to update the frame for the stream. annotate(image) draws on the stored copy;
+        it is deferred to the first get_latest_stream_frame() call, so it runs on the streaming thread
+        and never for a frame that is replaced before anyone asks for it.
+        """
+        frame = frame.copy()
         with self.stream_lock:
-            self.latest_stream_frame = frame.copy()
+            self.latest_stream_frame = frame
+            self._stream_annotate = annotate
 
     def get_latest_stream_frame(self):
         """Thread-safe method to get the latest frame for the stream."""
         with self.stream_lock:
+            if self._stream_annotate is not None:
+                annotate, self._stream_annotate = self._stream_annotate, None
+                try:
+                    annotate(self.latest_stream_frame)
+                except Exception as e:
+                    self.logger.error(f"Error annotating stream frame: {e}")
             return self.latest_stream_frame
 
+    def _annotate_stream_frame(self, image, detector=None, detections=None, persisted_boxes=()):
+        """Draw a frame's detections, persisted tracks and the actuation line for the dashboard stream."""
+        if detector is not None:
+            detector.annotate(image, detections)
+        self._draw_persisted_boxes(image, persisted_boxes)
+
+        if self.actuation_zone < 100:
+            cv2.line(image,
+                     (0, self.actuation_y_thresh),
+                     (image.shape[1], self.actuation_y_thresh),
+                     (0, 255, 255), 1)
+        return image
+
+    @staticmethod
+    def _draw_persisted_boxes(image, persisted_boxes):
+        """Kalman-predicted (lost) tracks in a dimmed green, labelled with track ID and age."""
+        for pb in persisted_boxes:
+            cv2.rectangle(image,
+                          (pb['x'], pb['y']),
+                          (pb['x'] + pb['w'], pb['y'] + pb['h']),
+                          (0, 120, 0), 2)
+            lbl = (f"ID{pb['track_id']} [{pb['age']}] "
+                   f"{int(pb['conf'] * 100)}% {pb['cls_name']}")
+            cv2.putText(image, lbl,
+                        (pb['x'], pb['y'] - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                        (0, 120, 0), 1)
+
     def get_system_stats(self):
         """
         Get system statistics with robust error handling.
@@ -1324,6 +1646,7 @@ class Owl:
             self.logger.warning(f"Error getting system stats: {e}")
 
         stats['avg_loop_time_ms'] = round(self._avg_loop_time_ms, 1)
+        stats['algorithm_timings'] = self.algorithm_timings.snapshot()
         stats['actuation_duration'] = self.actuation_duration
         stats['delay'] = self.delay
 
@@ -1403,6 +1726,53 @@ class Owl:
 
             time.sleep(self._STATE_CHECK_INTERVAL)
 
+    def _create_pipeline(self, detector, frame_shape):
+        """
+        InferenceWorker with inference_worker set, else InferencePipeline. The worker starts in the background,
+        so this returns straight away; if its shared memory or process cannot be created, a thread is used instead.
+        """
+        from utils.greenongreen import InferencePipeline
+        lost_track_age = self.detection_persist_frames if self.tracking_enabled else 0
+        if self.inference_worker:
+            from utils.inference_worker import InferenceWorker
+            try:
+                return InferenceWorker(detector, frame_shape, lost_track_age=lost_track_age)
+            except (OSError, ValueError) as e:
+                self.logger.error(f'Could not start the inference worker ({e}); using in-process pipelined inference instead')
+                self.inference_worker, self.pipelined_inference = False, True
+        return InferencePipeline(detector, lost_track_age=lost_track_age)
+
+    def _govern_resolution(self, governor, detector):
+        """
+        Step the YOLO input size if the ground gap between frames nears the actuation length.
+        detector is the GreenOnGreen, or the pipeline running it, whose set_inference_resolution() is called.
+        """
+        speed_kmh = self._ground_speed_kmh()
+        length_cm = self.actuation_length_cm
+        if length_cm is None:
+            # Without a configured length, one actuation covers actuation_duration at the current speed
+            length_cm = (speed_kmh or 0.0) / 3.6 * self.actuation_duration * 100.0
+        change = governor.update(self._avg_loop_time_ms, speed_kmh, length_cm)
+        if change is None:
+            return
+
+        self.inference_resolution = change['imgsz']
+        detector.set_inference_resolution(change['imgsz'])
+        # Average only loop times at the new size before the governor looks again
+        self._loop_times.clear()
+        self.logger.info(f"Inference resolution {change['previous']} -> {change['imgsz']}px: "
+                         f"frame gap {change['gap_cm']}cm vs actuation {change['actuation_length_cm']}cm "
+                         f"at {change['speed_kmh']} km/h, avg loop {change['avg_loop_time_ms']}ms")
+        if self.dash and hasattr(self.dash, 'set_resolution_governor'):
+            self.dash.set_resolution_governor(change)
+
+    def _ground_speed_kmh(self):
+        """Ground speed from the serial GPS, or None without a valid fix (browser GPS has no speed)."""
+        if self._gps_state is None:
+            return None
+        snapshot = self._gps_state.get_dict()
+        return snapshot['speed_kmh'] if snapshot['fix_valid'] else None
+
     # Dashboard GPS is stale if no update received for this many seconds.
     # Browser watchPosition fires every 1-5s when active; 3s gives fast LED feedback
     # when the farmer closes the browser or switches apps.
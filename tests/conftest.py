@@ -202,6 +202,7 @@ def mock_owl(tmp_config_dir):
 
     # AI tab params
     owl._pending_model = None
+    owl._loading_model = None
     owl._pending_detect_classes = None
     owl._gog_detector = None
     owl._model_path = 'models'
@@ -228,6 +228,13 @@ class TestSetActuationParams:
         })
         assert mqtt_publisher.state['avg_loop_time_ms'] == 35.2
 
+    def test_algorithm_timings_in_state(self, mqtt_publisher, mock_owl):
+        """Custom algorithm timings from get_system_stats() land in the state."""
+        timings = {'slow_green': {'calls': 120, 'p50_ms': 12.5, 'p95_ms': 20.1, 'over_budget': 0}}
+        mqtt_publisher.update_system_stats({'avg_loop_time_ms': 35.2, 'algorithm_timings': timings})
+
+        assert mqtt_publisher.state['algorithm_timings'] == timings
+
 
 # ---------------------------------------------------------------------------
 # Networked API endpoint tests
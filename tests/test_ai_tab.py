@@ -132,6 +132,23 @@ class TestListAvailableModels:
 
         assert result == []
 
+    def test_catalogue_state_lists_model_details(self, mqtt_publisher, tmp_path):
+        """Heartbeat state carries per-model format and task from the cached catalogue."""
+        models_dir = tmp_path / 'models'
+        models_dir.mkdir()
+        (models_dir / 'yolo11n-seg.pt').touch()
+        ncnn_dir = models_dir / 'yolo8n_ncnn'
+        ncnn_dir.mkdir()
+        (ncnn_dir / 'model.param').touch()
+
+        with patch('utils.mqtt_manager.os.path.dirname') as mock_dir:
+            mock_dir.return_value = str(tmp_path)
+            catalogue = mqtt_publisher._model_catalogue_state()
+
+        assert catalogue['yolo11n-seg.pt']['format'] == 'pt'
+        assert catalogue['yolo11n-seg.pt']['task'] == 'segment'
+        assert catalogue['yolo8n_ncnn']['format'] == 'ncnn'
+
 
 # ---------------------------------------------------------------------------
 # State sync includes new AI fields
@@ -206,6 +223,33 @@ class TestRefreshAIState:
         assert mqtt_publisher.state['current_model'] == ''
         assert mqtt_publisher.state['model_classes'] == {}
 
+    def test_refresh_keeps_model_while_loading(self, mqtt_publisher, mock_owl):
+        """A model still loading in the background should not be replaced by the old detector's."""
+        mock_gog = MagicMock()
+        mock_gog._model_filename = 'old.pt'
+        mock_gog.model.names = {0: 'weed'}
+        mock_owl._gog_detector = mock_gog
+        mqtt_publisher.state['current_model'] = 'new.pt'
+        mock_owl._loading_model = os.path.join('models', 'new.pt')
+
+        mqtt_publisher._refresh_ai_state()
+
+        assert mqtt_publisher.state['current_model'] == 'new.pt'
+
+    def test_detector_load_published(self, mqtt_publisher):
+        info = {'status': 'ready', 'algorithm': 'gog', 'model': 'new.pt', 'load_s': 1.2, 'warmup_s': 0.4}
+        mqtt_publisher.set_detector_load(info)
+
+        assert mqtt_publisher.state['detector_load'] == info
+
+    def test_resolution_governor_published(self, mqtt_publisher):
+        change = {'imgsz': 256, 'previous': 320, 'gap_cm': 9.5, 'reason': 'gap'}
+        mqtt_publisher.set_resolution_governor(change)
+
+        published = mqtt_publisher.state['resolution_governor']
+        assert published['imgsz'] == 256 and published['reason'] == 'gap'
+        assert 'time' in published
+
 
 # ---------------------------------------------------------------------------
 # GreenOnGreen.update_detect_classes
@@ -0,0 +1,171 @@
+"""
+Tests for offline batch inference: GreenOnBrown.inference_batch, run_batch and the columnar writer.
+
+Run: pytest tests/test_batch_inference.py -v
+"""
+
+import itertools
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.batch_inference import DETECTION_COLUMNS, GOG_BATCH_SIZE, _run_chunk, iter_sources, run_batch, write_columns
+from utils.greenonbrown import GreenOnBrown, ThresholdProfile
+
+PROFILE = ThresholdProfile(exg_min=25, exg_max=200, hue_min=39, hue_max=83,
+                           saturation_min=50, saturation_max=220,
+                           brightness_min=60, brightness_max=190, min_detection_area=10)
+
+
+def _field_frames(count=5, h=240, w=320):
+    rng = np.random.RandomState(7)
+    for _ in range(count):
+        img = np.zeros((h, w, 3), dtype=np.uint8)
+        img[:] = (40, 80, 120)
+        img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+        for _ in range(rng.randint(2, 8)):
+            cv2.circle(img, (rng.randint(10, w - 10), rng.randint(10, h - 10)), rng.randint(4, 15),
+                       (30, 170, 30), -1)
+        yield img
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for i, frame in enumerate(_field_frames()):
+        cv2.imwrite(str(tmp_path / f'{i:03d}.png'), frame)
+    return tmp_path
+
+
+def _expected(directory, algorithm='exhsv'):
+    gob = GreenOnBrown(algorithm=algorithm)
+    frames = [cv2.imread(str(path)) for path in sorted(directory.glob('*.png'))]
+    return [sorted(map(tuple, boxes.tolist()))
+            for boxes, _ in gob.inference_batch(frames, algorithm=algorithm, profile=PROFILE)]
+
+
+def _per_frame(detections, frame_count):
+    boxes = np.stack([detections[name] for name in ('x', 'y', 'w', 'h')], axis=1)
+    return [sorted(map(tuple, boxes[detections['frame'] == i].tolist())) for i in range(frame_count)]
+
+
+class TestInferenceBatch:
+    def test_matches_per_frame_inference(self):
+        frames = list(_field_frames())
+        gob = GreenOnBrown(algorithm='exhsv')
+        expected = [gob.inference(frame, algorithm='exhsv', profile=PROFILE)[1:3] for frame in frames]
+
+        results = list(gob.inference_batch(frames, algorithm='exhsv', profile=PROFILE))
+
+        assert len(results) == len(frames)
+        for (boxes, centres), (exp_boxes, exp_centres) in zip(results, expected):
+            assert boxes.dtype == np.int32 and boxes.shape == (len(exp_boxes), 4)
+            assert centres.shape == (len(exp_centres), 2)
+            np.testing.assert_array_equal(boxes, np.asarray(exp_boxes).reshape(-1, 4))
+
+    def test_threshold_keywords_compile_a_profile(self):
+        frames = list(_field_frames(2))
+        kwargs = {name: getattr(PROFILE, name) for name in ThresholdProfile.FIELDS}
+        gob = GreenOnBrown(algorithm='exg')
+
+        by_kwargs = [b.tolist() for b, _ in gob.inference_batch(frames, algorithm='exg', **kwargs)]
+        by_profile = [b.tolist() for b, _ in gob.inference_batch(frames, algorithm='exg', profile=PROFILE)]
+
+        assert by_kwargs == by_profile
+
+    def test_profile_survives_pickling(self):
+        profile = ThresholdProfile(hue_min=40, hue_max=80, invert_hue=True)
+        restored = pickle.loads(pickle.dumps(profile))
+
+        assert restored == profile
+        assert len(restored.hsv_bounds) == 2
+        assert dict(restored.params) == dict(profile.params)
+
+
+class TestRunBatch:
+    def test_in_process_matches_detector(self, image_dir):
+        spec = {'algorithm': 'exhsv', 'profile': PROFILE}
+        detections, frames, stats = run_batch(str(image_dir), spec, workers=1, chunk_size=2)
+
+        assert stats['frames'] == 5
+        assert stats['detections'] == len(detections['frame']) == int(frames['frame_detections'].sum())
+        assert stats['fps'] > 0
+        assert list(frames['frame_index']) == list(range(5))
+        assert frames['frame_source'][0].endswith('000.png')
+        assert _per_frame(detections, 5) == _expected(image_dir)
+        assert np.all(detections['class_id'] == -1)
+        assert np.all(np.isnan(detections['confidence']))
+
+    def test_process_pool_matches_in_process(self, image_dir):
+        spec = {'algorithm': 'exhsv', 'profile': PROFILE}
+        serial, _, _ = run_batch(str(image_dir), spec, workers=1, chunk_size=2)
+        pooled, frames, stats = run_batch(str(image_dir), spec, workers=2, chunk_size=2)
+
+        assert stats['workers'] == 2
+        assert list(frames['frame_index']) == list(range(5))
+        for name in DETECTION_COLUMNS:
+            np.testing.assert_array_equal(pooled[name], serial[name])
+
+    def test_resolution_resizes_frames(self, image_dir):
+        spec = {'algorithm': 'exhsv', 'profile': PROFILE, 'resolution': (160, 120)}
+        detections, _, _ = run_batch(str(image_dir), spec, workers=1)
+
+        assert np.all(detections['x'] + detections['w'] <= 160)
+        assert np.all(detections['y'] + detections['h'] <= 120)
+
+    def test_video_source(self, tmp_path):
+        path = str(tmp_path / 'run.avi')
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (320, 240))
+        for frame in _field_frames(4):
+            writer.write(frame)
+        writer.release()
+
+        sources = list(iter_sources(path, max_frames=3))
+
+        assert [source for source, _ in sources] == ['run.avi:0', 'run.avi:1', 'run.avi:2']
+        assert all(frame.shape == (240, 320, 3) for _, frame in sources)
+
+    def test_invalid_path_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            list(iter_sources(str(tmp_path / 'missing')))
+
+    def test_batched_gog_time_spread_over_frames(self):
+        class BatchedDetector:
+            """Stands in for pure-mode GreenOnGreen: one slow predict call per batch."""
+            def inference_batch(self, frames, confidence=0.5, batch_size=8):
+                frames = iter(frames)
+                while batch := list(itertools.islice(frames, batch_size)):
+                    time.sleep(0.04)
+                    for _ in batch:
+                        yield (np.empty((0, 4), np.int32), np.empty((0, 2), np.int32),
+                               np.empty(0, np.int32), np.empty(0, np.float32))
+
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        chunk = [(i, f'{i}.png', frame) for i in range(2 * GOG_BATCH_SIZE)]
+
+        _, frames = _run_chunk(chunk, BatchedDetector(), {'algorithm': 'gog'})
+
+        # 40 ms per batch shared by its frames, rather than 40 ms on the first and ~0 on the rest
+        assert frames['frame_ms'].min() > 40 / GOG_BATCH_SIZE * 0.9
+        assert frames['frame_ms'].sum() == pytest.approx(80, rel=0.5)
+
+
+class TestWriteColumns:
+    def test_npz_round_trip(self, image_dir, tmp_path):
+        detections, frames, _ = run_batch(str(image_dir), {'algorithm': 'exg', 'profile': PROFILE}, workers=1)
+
+        path = write_columns(tmp_path / 'out', detections, frames)
+
+        assert path.endswith('out.npz')
+        data = np.load(path)
+        for name in DETECTION_COLUMNS:
+            np.testing.assert_array_equal(data[name], detections[name])
+        assert list(data['frame_source']) == list(frames['frame_source'])
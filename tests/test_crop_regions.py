@@ -0,0 +1,104 @@
+"""
+Tests for CropRegions: analytic crop-buffer membership against the dilated full-frame mask it replaces.
+
+Run: pytest tests/test_crop_regions.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.crop_regions import CropRegions
+
+SHAPE = (240, 320)
+
+
+def _star(cx, cy, radius, points=10):
+    """A concave crop-like polygon."""
+    angles = np.linspace(0, 2 * np.pi, points, endpoint=False)
+    radii = np.where(np.arange(points) % 2 == 0, radius, radius / 2)
+    return np.stack([cx + radii * np.cos(angles), cy + radii * np.sin(angles)], axis=1).astype(np.float32)
+
+
+def _regions(buffer_px):
+    regions = CropRegions(SHAPE, buffer_px=buffer_px)
+    regions.add_boxes([[20, 30, 70, 90], [290, -10, 340, 40]])  # the second crosses the frame edge
+    regions.add_polygons([_star(160, 120, 50), _star(190, 140, 30)])  # overlapping crops
+    return regions
+
+
+class TestContains:
+    def test_box_with_buffer(self):
+        regions = CropRegions(SHAPE, buffer_px=10)
+        regions.add_boxes([[100, 100, 150, 150]])
+
+        inside = regions.contains([[120, 120], [160, 125], [161, 125], [157, 157], [158, 158]])
+
+        assert inside.tolist() == [True, True, False, True, False]
+
+    def test_concave_polygon(self):
+        regions = CropRegions(SHAPE, buffer_px=0)
+        regions.add_polygons([_star(160, 120, 50).reshape(-1, 1, 2)])
+
+        # Centre, a tip, and the notch between two tips
+        inside = regions.contains([[160, 120], [205, 120], [160 + 45 * np.cos(np.pi / 5), 120 + 45 * np.sin(np.pi / 5)]])
+
+        assert inside.tolist() == [True, True, False]
+
+    @pytest.mark.parametrize('buffer_px', [0, 5, 20])
+    def test_matches_dilated_mask(self, buffer_px):
+        regions = _regions(buffer_px)
+        mask, _ = regions.masks()
+        ys, xs = np.mgrid[0:SHAPE[0]:3, 0:SHAPE[1]:3]
+        points = np.stack([xs.ravel(), ys.ravel()], axis=1)
+
+        agree = regions.contains(points) == (mask[points[:, 1], points[:, 0]] > 0)
+
+        # Only pixel rounding on region edges may differ
+        assert agree.mean() > 0.99
+
+    def test_empty(self):
+        assert CropRegions(SHAPE, 10).contains([[5, 5]]).tolist() == [False]
+        assert _regions(10).contains(np.empty((0, 2))).shape == (0,)
+
+
+class TestOverlap:
+    @pytest.mark.parametrize('buffer_px', [0, 12])
+    def test_matches_dilated_mask(self, buffer_px):
+        regions = _regions(buffer_px)
+        mask, _ = regions.masks()
+        boxes = np.array([[60, 80, 30, 30], [120, 100, 25, 40], [300, 20, 40, 30],
+                          [5, 200, 20, 20], [-10, 25, 40, 20]])
+
+        expected = []
+        for x, y, w, h in boxes.tolist():
+            x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, SHAPE[1]), min(y + h, SHAPE[0])
+            expected.append(cv2.countNonZero(mask[y0:y1, x0:x1]) / (w * h))
+
+        np.testing.assert_allclose(regions.overlap(boxes), expected)
+
+
+class TestMasks:
+    def test_overlapping_polygons_fill_as_union(self):
+        regions = CropRegions(SHAPE)
+        regions.add_polygons([np.array([[10, 10], [60, 10], [60, 60], [10, 60]]),
+                              np.array([[30, 30], [80, 30], [80, 80], [30, 80]])])
+
+        mask, undilated = regions.masks()
+
+        assert mask is undilated
+        assert mask[45, 45] == 255
+
+    def test_built_once(self):
+        regions = _regions(8)
+        mask, undilated = regions.masks()
+
+        assert regions.masks()[0] is mask
+        assert np.count_nonzero(mask) > np.count_nonzero(undilated)
@@ -0,0 +1,107 @@
+"""
+Tests for DetectorLoader: background build and warm-up, superseded requests and failures.
+
+Run: pytest tests/test_detector_loader.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.detector_loader import DetectorLoader
+
+
+def _wait(loader, timeout=2.0):
+    """Poll like the frame loop does until a load is handed over."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        loaded = loader.poll()
+        if loaded is not None:
+            return loaded
+        time.sleep(0.005)
+    raise AssertionError('load did not finish')
+
+
+class TestDetectorLoader:
+    def test_builds_and_warms_up_off_thread(self):
+        loader = DetectorLoader()
+        threads = []
+
+        def factory():
+            threads.append(threading.current_thread())
+            time.sleep(0.02)
+            return {'warm': False}
+
+        def warmup(detector):
+            time.sleep(0.02)
+            detector['warm'] = True
+
+        loader.request(('gog', 'a.pt'), factory, warmup)
+        loaded = _wait(loader)
+
+        assert loaded.key == ('gog', 'a.pt')
+        assert loaded.error is None
+        assert loaded.detector == {'warm': True}
+        assert threads[0] is not threading.current_thread()
+        assert loaded.load_s >= 0.015 and loaded.warmup_s >= 0.015
+        assert loader.poll() is None
+        assert loader.loading_key is None
+
+    def test_poll_is_none_while_loading(self):
+        loader = DetectorLoader()
+        release = threading.Event()
+        loader.request('a', lambda: release.wait(2) and 'detector')
+
+        assert loader.poll() is None
+        assert loader.loading_key == 'a'
+        release.set()
+        assert _wait(loader).detector == 'detector'
+
+    def test_newer_request_supersedes_running_load(self):
+        loader = DetectorLoader()
+        release = threading.Event()
+        built = []
+
+        def factory(name):
+            def build():
+                if name == 'first':
+                    release.wait(2)
+                built.append(name)
+                return name
+            return build
+
+        loader.request('first', factory('first'))
+        loader.request('second', factory('second'))
+        loader.request('third', factory('third'))
+        assert loader.loading_key == 'third'
+        release.set()
+
+        loaded = _wait(loader)
+
+        assert loaded.key == 'third'
+        assert built == ['first', 'third']
+
+    @pytest.mark.parametrize('failing', ['factory', 'warmup'])
+    def test_failure_is_returned_not_raised(self, failing):
+        loader = DetectorLoader()
+
+        def factory():
+            if failing == 'factory':
+                raise FileNotFoundError('no model')
+            return 'detector'
+
+        def warmup(detector):
+            raise RuntimeError('bad input shape')
+
+        loader.request('gog', factory, warmup)
+        loaded = _wait(loader)
+
+        assert loaded.detector is None
+        assert isinstance(loaded.error, FileNotFoundError if failing == 'factory' else RuntimeError)
@@ -471,3 +471,670 @@ class TestCCARelayAssignment:
         assert cnt_relays == cca_relays
         # Verify the blob above zone was filtered out
         assert len(cnt_relays) == 2
+
+
+# ---------------------------------------------------------------------------
+# TestIntegerExHSV: integer fixed-point kernel matches the float kernel
+# ---------------------------------------------------------------------------
+
+class TestIntegerExHSV:
+    """exg_standardised_int / exg_standardised_hue_int stay within +1 grey level of the float versions."""
+
+    @staticmethod
+    def _random_image(seed=0, height=240, width=320):
+        rng = np.random.RandomState(seed)
+        image = rng.randint(0, 256, (height, width, 3), dtype=np.uint8)
+        image[:10, :10] = 0  # black pixels exercise the zero-sum path
+        return image
+
+    def test_nexg_int_within_tolerance(self):
+        from utils.algorithms import exg_standardised, exg_standardised_int
+
+        image = self._random_image()
+        diff = exg_standardised_int(image).astype(int) - exg_standardised(image).astype(int)
+
+        assert diff.min() >= 0
+        assert diff.max() <= 1
+
+    @pytest.mark.parametrize('invert_hue', [False, True])
+    def test_exhsv_int_within_tolerance(self, invert_hue):
+        from utils.algorithms import exg_standardised_hue, exg_standardised_hue_int
+
+        image = self._random_image(seed=1)
+        kwargs = dict(hue_min=39, hue_max=83, saturation_min=50, saturation_max=220,
+                      brightness_min=60, brightness_max=190, invert_hue=invert_hue)
+        float_out = exg_standardised_hue(image, **kwargs)
+        int_out = exg_standardised_hue_int(image, **kwargs)
+
+        assert int_out.dtype == np.uint8
+        assert np.abs(int_out.astype(int) - float_out.astype(int)).max() <= 1
+
+    def test_gob_exhsv_int_same_detections(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        gob = GreenOnBrown(algorithm='exhsv-int')
+        kwargs = dict(exg_min=25, exg_max=200, hue_min=39, hue_max=83,
+                      saturation_min=50, saturation_max=220,
+                      brightness_min=60, brightness_max=190, min_detection_area=10)
+
+        _, float_boxes, float_centres, _ = gob.inference(image, algorithm='exhsv', **kwargs)
+        _, int_boxes, int_centres, _ = gob.inference(image, algorithm='exhsv-int', **kwargs)
+
+        assert len(int_boxes) > 0
+        assert _sort_by_xy(int_boxes, int_centres) == _sort_by_xy(float_boxes, float_centres)
+
+
+# ---------------------------------------------------------------------------
+# TestFrameWorkspace: preallocated per-resolution buffers in GreenOnBrown
+# ---------------------------------------------------------------------------
+
+class TestFrameWorkspace:
+
+    WORKSPACE_ALGORITHMS = ['exg', 'nexg', 'exhsv', 'nexg-int', 'exhsv-int', 'hsv']
+
+    @pytest.mark.parametrize('name', ['exg_standardised', 'exg_standardised_int'])
+    def test_kernel_out_matches_allocating_call(self, name):
+        from utils import algorithms
+        from utils.greenonbrown import FrameWorkspace
+
+        func = getattr(algorithms, name)
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        workspace = FrameWorkspace(image.shape)
+        out = np.empty(image.shape[:2], dtype=np.uint8)
+
+        result = func(image, out=out, workspace=workspace)
+
+        assert result is out
+        np.testing.assert_array_equal(out, func(image))
+
+    @pytest.mark.parametrize('invert_hue', [False, True])
+    def test_hsv_out_matches_allocating_call(self, invert_hue):
+        from utils.algorithms import exg_standardised_hue, hsv
+        from utils.greenonbrown import FrameWorkspace
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        workspace = FrameWorkspace(image.shape)
+        out = np.empty(image.shape[:2], dtype=np.uint8)
+
+        mask, _ = hsv(image, invert_hue=invert_hue, out=out, workspace=workspace)
+        np.testing.assert_array_equal(mask, hsv(image, invert_hue=invert_hue)[0])
+        exhsv_out = exg_standardised_hue(image, invert_hue=invert_hue, out=out, workspace=workspace)
+        np.testing.assert_array_equal(exhsv_out, exg_standardised_hue(image, invert_hue=invert_hue))
+
+    def test_workspace_reused_and_rebuilt_on_resize(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        gob = GreenOnBrown(algorithm='exhsv')
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        gob.inference(image, algorithm='exhsv')
+        workspace = gob._workspace
+        gob.inference(image, algorithm='exhsv')
+        assert gob._workspace is workspace
+        assert workspace.nbytes > 0
+
+        gob.inference(cv2.resize(image, (320, 240)), algorithm='exhsv')
+        assert gob._workspace is not workspace
+        assert gob._workspace.shape == (240, 320)
+
+    @pytest.mark.parametrize('algorithm', WORKSPACE_ALGORITHMS)
+    def test_steady_state_allocations(self, algorithm):
+        import tracemalloc
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        frame_bytes = image.shape[0] * image.shape[1]
+        gob = GreenOnBrown(algorithm=algorithm)
+        for _ in range(3):
+            gob.inference(image, algorithm=algorithm)
+
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            for _ in range(10):
+                gob.inference(image, algorithm=algorithm)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Only small per-contour arrays remain; no single-channel frame is allocated
+        assert peak - baseline < frame_bytes // 10
+        assert current - baseline < frame_bytes // 100
+
+
+# ---------------------------------------------------------------------------
+# TestCCABackend: production 'cca' blob backend returning int32 arrays
+# ---------------------------------------------------------------------------
+
+class TestCCABackend:
+
+    KWARGS = dict(exg_min=25, exg_max=200, hue_min=39, hue_max=83,
+                  saturation_min=50, saturation_max=220,
+                  brightness_min=60, brightness_max=190, min_detection_area=10)
+
+    def test_same_detections_as_contours(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        _, ref_boxes, ref_centres, _ = GreenOnBrown().inference(image, algorithm='exhsv', **self.KWARGS)
+        cnts, boxes, centres, _ = GreenOnBrown(blob_backend='cca').inference(image, algorithm='exhsv',
+                                                                              **self.KWARGS)
+
+        assert cnts is None
+        assert len(ref_boxes) > 0
+        assert _sort_by_xy(boxes.tolist(), centres.tolist()) == _sort_by_xy(ref_boxes, ref_centres)
+
+    def test_returns_int32_arrays(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        _, boxes, centres, _ = GreenOnBrown(blob_backend='cca').inference(image, algorithm='exhsv',
+                                                                          **self.KWARGS)
+
+        assert isinstance(boxes, np.ndarray) and boxes.dtype == np.int32
+        assert isinstance(centres, np.ndarray) and centres.dtype == np.int32
+        assert boxes.shape == (len(boxes), 4)
+        assert centres.shape == (len(boxes), 2)
+        np.testing.assert_array_equal(centres, boxes[:, :2] + boxes[:, 2:] // 2)
+
+    def test_empty_mask_returns_empty_arrays(self):
+        from utils.greenonbrown import FrameWorkspace, GreenOnBrown
+
+        mask = np.zeros((120, 160), dtype=np.uint8)
+        boxes, centres = GreenOnBrown._blobs_cca(mask, 1, FrameWorkspace(mask.shape))
+
+        assert boxes.shape == (0, 4)
+        assert centres.shape == (0, 2)
+
+    def test_keeps_largest_max_detections(self):
+        from utils.greenonbrown import FrameWorkspace, GreenOnBrown
+
+        mask = np.zeros((400, 800), dtype=np.uint8)
+        sizes = []
+        for i in range(MAX_DETECTIONS + 30):
+            side = 2 + i % 9
+            x, y = (i % 40) * 20, (i // 40) * 20
+            mask[y:y + side, x:x + side] = 255
+            sizes.append(side * side)
+
+        boxes, _ = GreenOnBrown._blobs_cca(mask, 1, FrameWorkspace(mask.shape))
+
+        assert len(boxes) == MAX_DETECTIONS
+        kept_areas = sorted((boxes[:, 2] * boxes[:, 3]).tolist(), reverse=True)
+        assert kept_areas == sorted(sizes, reverse=True)[:MAX_DETECTIONS]
+
+    def test_invalid_backend_raises(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        with pytest.raises(ValueError):
+            GreenOnBrown(blob_backend='watershed')
+
+    def test_relay_assignment_accepts_arrays(self):
+        """owl.py's lane assignment fires the same relays for list and array centres."""
+        from utils.relay_assignment import assign_relays
+        lane_width, relay_num, y_thresh = 160.0, 4, 100
+        centres = [[10, 50], [170, 150], [639, 479], [330, 100], [480, 99]]
+
+        def assign(weed_centres):
+            return assign_relays(weed_centres, y_thresh, lane_width, relay_num)
+
+        expected = TestCCARelayAssignment._run_actuation_logic(centres, lane_width, relay_num, y_thresh)
+        assert sorted(assign(centres)) == expected
+        assert sorted(assign(np.array(centres, dtype=np.int32))) == expected
+        assert assign(np.empty((0, 2), dtype=np.int32)) == set()
+
+    def test_image_sampler_accepts_arrays(self, tmp_path):
+        pytest.importorskip('piexif')
+        from utils.image_sampler import ImageRecorder
+
+        recorder = ImageRecorder.__new__(ImageRecorder)
+        recorder.save_directory = str(tmp_path)
+        frame = TestCCAFullPipelineEquivalence._make_test_image()
+        boxes = np.array([[10, 20, 30, 40], [100, 120, 50, 25]], dtype=np.int32)
+        centres = boxes[:, :2] + boxes[:, 2:] // 2
+
+        recorder.save_bboxes(frame, 1, boxes, 'ts', None)
+        recorder.save_squares(frame, 2, centres, 'ts', None)
+
+        assert len(list(tmp_path.glob('*.jpg'))) == 4
+
+
+# ---------------------------------------------------------------------------
+# TestBandParallel: banded inference matches the single-threaded pipeline
+# ---------------------------------------------------------------------------
+
+class TestBandParallel:
+
+    @staticmethod
+    def _seam_image(width=640, height=480):
+        """Field image with tall plants that cross every band seam for 2-4 bands."""
+        image = TestCCAFullPipelineEquivalence._make_test_image(width, height)
+        for cx in range(60, width, 120):
+            cv2.ellipse(image, (cx, height // 2), (12, height // 2 - 20), 0, 0, 360, (30, 160, 50), -1)
+        return image
+
+    @staticmethod
+    def _detections(result):
+        _, boxes, centres, _ = result
+        return sorted(zip([tuple(map(int, b)) for b in boxes], [tuple(map(int, c)) for c in centres]))
+
+    @pytest.mark.parametrize('blob_backend', ['contours', 'cca'])
+    @pytest.mark.parametrize('bands', [2, 3, 4])
+    @pytest.mark.parametrize('algorithm', ['exhsv', 'hsv', 'nexg-int'])
+    def test_matches_single_threaded(self, blob_backend, bands, algorithm):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = self._seam_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm=algorithm)
+        single = GreenOnBrown(blob_backend=blob_backend)
+        banded = GreenOnBrown(blob_backend=blob_backend, bands=bands)
+
+        expected = self._detections(single.inference(image, **kwargs))
+        result = self._detections(banded.inference(image, **kwargs))
+
+        assert len(expected) > 0
+        assert result == expected
+        np.testing.assert_array_equal(banded._workspace.buffer('morph', image.shape[:2]),
+                                      single._workspace.buffer('morph', image.shape[:2]))
+
+    def test_seam_blob_merged_once(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = np.full((480, 640, 3), (60, 80, 120), dtype=np.uint8)
+        cv2.rectangle(image, (300, 100), (340, 380), (30, 160, 50), -1)
+
+        _, boxes, _, _ = GreenOnBrown(blob_backend='cca', bands=4).inference(image, algorithm='exhsv',
+                                                                             **TestCCABackend.KWARGS)
+
+        assert len(boxes) == 1
+        x, y, w, h = boxes[0]
+        assert y <= 100 and y + h >= 380
+
+    def test_small_frames_fall_back_to_single_band(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = self._seam_image(160, 120)
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv')
+        expected = self._detections(GreenOnBrown().inference(image, **kwargs))
+
+        assert self._detections(GreenOnBrown(bands=4).inference(image, **kwargs)) == expected
+
+    def test_invalid_band_count_raises(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        with pytest.raises(ValueError):
+            GreenOnBrown(bands=0)
+
+
+# ---------------------------------------------------------------------------
+# TestRowROI: actuation-zone-only processing returns full-frame coordinates
+# ---------------------------------------------------------------------------
+
+class TestRowROI:
+
+    @staticmethod
+    def _zone_image():
+        """Plants above and inside a bottom 30% actuation zone of a 640x480 frame."""
+        image = np.full((480, 640, 3), (60, 80, 120), dtype=np.uint8)
+        for cx, cy in [(80, 60), (300, 150), (500, 220), (120, 400), (330, 420), (560, 440)]:
+            cv2.circle(image, (cx, cy), 14, (30, 160, 50), -1)
+        return image
+
+    @pytest.mark.parametrize('blob_backend', ['contours', 'cca'])
+    @pytest.mark.parametrize('bands', [1, 2])
+    def test_zone_detections_in_frame_coordinates(self, blob_backend, bands):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = self._zone_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv')
+        roi_start = 336 - 32  # actuation_zone=30 -> y_thresh 336, minus the default margin
+
+        full = TestBandParallel._detections(GreenOnBrown(blob_backend=blob_backend).inference(image, **kwargs))
+        roi = TestBandParallel._detections(GreenOnBrown(blob_backend=blob_backend, bands=bands).inference(
+            image, roi_rows=(roi_start, 480), **kwargs))
+
+        assert len(roi) == 3
+        assert roi == [d for d in full if d[0][1] >= roi_start]
+
+    def test_only_roi_rows_processed(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = self._zone_image()
+        gob = GreenOnBrown()
+        _, _, _, image_out = gob.inference(image, algorithm='exhsv', roi_rows=(304, 480), show_display=True)
+
+        assert gob._workspace.shape == (176, 640)
+        assert image_out.shape == image.shape
+
+
+# ---------------------------------------------------------------------------
+# TestPyramid: coarse-to-fine detection matches full resolution on sparse scenes
+# ---------------------------------------------------------------------------
+
+class TestPyramid:
+
+    @staticmethod
+    def _sparse_image(width=960, height=720, seed=3):
+        rng = np.random.RandomState(seed)
+        image = np.full((height, width, 3), (40, 80, 120), dtype=np.uint8)
+        image = cv2.add(image, rng.randint(0, 25, image.shape).astype(np.uint8))
+        for _ in range(15):
+            centre = (rng.randint(10, width - 10), rng.randint(10, height - 10))
+            cv2.circle(image, centre, rng.randint(4, 20), (30, rng.randint(120, 200), 30), -1)
+        return image
+
+    @pytest.mark.parametrize('blob_backend', ['contours', 'cca'])
+    @pytest.mark.parametrize('pyramid_scale', [2, 4])
+    @pytest.mark.parametrize('algorithm', ['exhsv', 'exhsv-int', 'hsv'])
+    def test_matches_full_resolution(self, blob_backend, pyramid_scale, algorithm):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = self._sparse_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm=algorithm)
+        expected = TestBandParallel._detections(GreenOnBrown(blob_backend=blob_backend).inference(image, **kwargs))
+        result = TestBandParallel._detections(
+            GreenOnBrown(blob_backend=blob_backend, pyramid_scale=pyramid_scale).inference(image, **kwargs))
+
+        assert len(expected) > 5
+        assert result == expected
+
+    def test_dense_scene_falls_back_to_full_resolution(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestBandParallel._seam_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv')
+        gob = GreenOnBrown(pyramid_scale=2)
+
+        result = TestBandParallel._detections(gob.inference(image, **kwargs))
+
+        assert result == TestBandParallel._detections(GreenOnBrown().inference(image, **kwargs))
+
+    def test_with_roi_rows(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = self._sparse_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv', roi_rows=(300, 720))
+        expected = TestBandParallel._detections(GreenOnBrown().inference(image, **kwargs))
+
+        assert TestBandParallel._detections(GreenOnBrown(pyramid_scale=4).inference(image, **kwargs)) == expected
+
+    def test_invalid_scale_raises(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        with pytest.raises(ValueError):
+            GreenOnBrown(pyramid_scale=3)
+
+    def test_refine_buffers_allocated_once(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        gob = GreenOnBrown(pyramid_scale=4)
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv')
+        gob.inference(self._sparse_image(seed=3), **kwargs)
+        buffers = dict(gob._refine_workspace._buffers)
+
+        # Other candidate sizes on the next frame reuse the same arrays
+        gob.inference(self._sparse_image(seed=4), **kwargs)
+
+        assert buffers and gob._refine_workspace._buffers.keys() == buffers.keys()
+        assert all(gob._refine_workspace._buffers[name] is buf for name, buf in buffers.items())
+
+    def test_region_workspace_views(self):
+        from utils.greenonbrown import RegionWorkspace
+
+        workspace = RegionWorkspace((120, 160))
+        large = workspace.buffer('small', (90, 100, 3))
+        small = workspace.buffer('small', (30, 40, 3))
+
+        assert small.flags['C_CONTIGUOUS'] and small.shape == (30, 40, 3)
+        assert np.shares_memory(small, large)
+        assert workspace.nbytes == 120 * 160 * 3
+
+
+# ---------------------------------------------------------------------------
+# TestThresholdProfile: compiled, immutable thresholds give the same detections as keyword arguments
+# ---------------------------------------------------------------------------
+
+class TestThresholdProfile:
+    def _profile(self, **overrides):
+        from utils.greenonbrown import ThresholdProfile
+
+        kwargs = {key: value for key, value in TestCCABackend.KWARGS.items() if key in ThresholdProfile.FIELDS}
+        kwargs.update(overrides)
+        return ThresholdProfile(**kwargs)
+
+    @pytest.mark.parametrize('algorithm', ['exg', 'nexg', 'exhsv', 'exhsv-int', 'hsv', 'maxg'])
+    @pytest.mark.parametrize('invert_hue', [False, True])
+    def test_matches_keyword_thresholds(self, algorithm, invert_hue):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm=algorithm, invert_hue=invert_hue)
+        expected = TestBandParallel._detections(GreenOnBrown().inference(image, **kwargs))
+
+        profile = self._profile(invert_hue=invert_hue)
+        result = TestBandParallel._detections(GreenOnBrown().inference(image, algorithm=algorithm, profile=profile))
+
+        assert result == expected
+
+    def test_profile_overrides_keyword_thresholds(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        expected = TestBandParallel._detections(
+            GreenOnBrown().inference(image, **dict(TestCCABackend.KWARGS, algorithm='exhsv')))
+
+        result = TestBandParallel._detections(
+            GreenOnBrown().inference(image, algorithm='exhsv', exg_min=250, hue_min=0, hue_max=1,
+                                     profile=self._profile()))
+
+        assert result == expected
+
+    def test_is_immutable(self):
+        import dataclasses
+
+        profile = self._profile()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            profile.exg_min = 0
+        with pytest.raises(TypeError):
+            profile.params['exg_min'] = 0
+        with pytest.raises(ValueError):
+            profile.hsv_bounds[0][0][0] = 0
+
+    def test_invert_hue_compiles_two_ranges(self):
+        assert len(self._profile().hsv_bounds) == 1
+
+        bounds = self._profile(hue_min=40, hue_max=80, invert_hue=True).hsv_bounds
+        assert [(lo[0], hi[0]) for lo, hi in bounds] == [(0, 40), (80, 180)]
+
+    def test_equality_tracks_threshold_values(self):
+        assert self._profile() == self._profile()
+        assert self._profile() != self._profile(exg_min=1)
+
+
+# ---------------------------------------------------------------------------
+# TestThresholdMethod: pluggable adaptive threshold stage
+# ---------------------------------------------------------------------------
+
+class TestThresholdMethod:
+    def test_parse_default_and_per_algorithm(self):
+        from utils.greenonbrown import parse_threshold_method
+
+        assert parse_threshold_method('gaussian') == {None: 'gaussian'}
+        assert parse_threshold_method('mean, exhsv:lowres, HSV : gaussian') == {
+            None: 'mean', 'exhsv': 'lowres', 'hsv': 'gaussian'}
+        assert parse_threshold_method('exg:mean') == {None: 'gaussian', 'exg': 'mean'}
+
+    @pytest.mark.parametrize('spec', ['median', 'exhsv:fast', {'exg': 'box'}])
+    def test_invalid_method_raises(self, spec):
+        from utils.greenonbrown import GreenOnBrown
+
+        with pytest.raises(ValueError):
+            GreenOnBrown(threshold_method=spec)
+
+    def test_gaussian_is_default(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv')
+
+        assert (TestBandParallel._detections(GreenOnBrown(threshold_method='gaussian').inference(image, **kwargs))
+                == TestBandParallel._detections(GreenOnBrown().inference(image, **kwargs)))
+
+    def test_mean_matches_opencv_box_mean(self):
+        from utils.greenonbrown import GreenOnBrown, FrameWorkspace
+
+        index = np.random.RandomState(0).randint(0, 255, (240, 320)).astype(np.uint8)
+        expected = cv2.adaptiveThreshold(index, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 31, 2)
+
+        result = GreenOnBrown._adaptive_threshold(index, FrameWorkspace(index.shape), 'mean', 31)
+
+        np.testing.assert_array_equal(result, expected)
+
+    def test_lowres_close_to_full_resolution_mean(self):
+        from utils.greenonbrown import GreenOnBrown, FrameWorkspace
+
+        # Smooth index (a blurred field) so the low-resolution mean is a good approximation
+        index = cv2.GaussianBlur(np.random.RandomState(0).randint(0, 255, (480, 640)).astype(np.uint8), (0, 0), 3)
+        mean = GreenOnBrown._adaptive_threshold(index, FrameWorkspace(index.shape), 'mean', 31) > 0
+        lowres = GreenOnBrown._adaptive_threshold(index, FrameWorkspace(index.shape), 'lowres', 31) > 0
+
+        assert np.count_nonzero(mean & lowres) / np.count_nonzero(mean | lowres) > 0.9
+
+    def test_lowres_small_crop_falls_back_to_mean(self):
+        from utils.greenonbrown import GreenOnBrown, FrameWorkspace
+
+        index = np.random.RandomState(1).randint(0, 255, (20, 200)).astype(np.uint8)
+
+        np.testing.assert_array_equal(GreenOnBrown._adaptive_threshold(index, FrameWorkspace(index.shape), 'lowres', 31),
+                                      GreenOnBrown._adaptive_threshold(index, FrameWorkspace(index.shape), 'mean', 31))
+
+    def test_per_algorithm_selection(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exg')
+        per_algorithm = GreenOnBrown(threshold_method='gaussian, exg:mean')
+
+        assert (TestBandParallel._detections(per_algorithm.inference(image, **kwargs))
+                == TestBandParallel._detections(GreenOnBrown(threshold_method='mean').inference(image, **kwargs)))
+        kwargs['algorithm'] = 'exhsv'
+        assert (TestBandParallel._detections(per_algorithm.inference(image, **kwargs))
+                == TestBandParallel._detections(GreenOnBrown().inference(image, **kwargs)))
+
+    @pytest.mark.parametrize('method', ['mean', 'lowres'])
+    def test_runs_with_bands_and_pyramid(self, method):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestPyramid._sparse_image()
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv')
+        for detector in (GreenOnBrown(threshold_method=method, bands=2),
+                         GreenOnBrown(threshold_method=method, pyramid_scale=2)):
+            _, boxes, centres, _ = detector.inference(image, **kwargs)
+            assert len(boxes) == len(centres) > 0
+
+
+# ---------------------------------------------------------------------------
+# TestAnnotate: drawing detections later gives the same image as show_display
+# ---------------------------------------------------------------------------
+
+class TestAnnotate:
+    def test_matches_show_display(self):
+        from utils.greenonbrown import Detections, GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        gob = GreenOnBrown(algorithm='exhsv')
+        kwargs = dict(TestCCABackend.KWARGS, algorithm='exhsv', label='WEED')
+        _, _, _, shown = gob.inference(image, show_display=True, **kwargs)
+        _, boxes, _, image_out = gob.inference(image, **kwargs)
+
+        assert image_out is image
+        assert len(boxes) > 0
+        np.testing.assert_array_equal(gob.annotate(image.copy(), Detections(boxes=boxes, label='WEED')), shown)
+
+    def test_draws_in_place(self):
+        from utils.greenonbrown import Detections, GreenOnBrown
+
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        out = GreenOnBrown.annotate(image, Detections(boxes=np.array([[10, 10, 20, 20]], dtype=np.int32)))
+
+        assert out is image
+        assert np.any(image)
+
+
+# ---------------------------------------------------------------------------
+# TestAlgorithmTimings: custom algorithm timing collector and latency budget
+# ---------------------------------------------------------------------------
+
+class TestAlgorithmTimings:
+    @staticmethod
+    def _with_custom(gob, name, delay_s=0.0):
+        import time
+
+        def custom(image):
+            if delay_s:
+                time.sleep(delay_s)
+            return image[:, :, 1].copy()
+
+        gob.algorithms[name] = custom
+        gob.custom_algorithms.add(name)
+        return gob
+
+    def test_custom_calls_are_timed(self):
+        from utils.greenonbrown import GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        gob = self._with_custom(GreenOnBrown(), 'plain_green')
+        for _ in range(5):
+            gob.inference(image, algorithm='plain_green')
+        gob.inference(image, algorithm='exhsv')
+
+        stats = gob.timings.snapshot()
+        assert list(stats) == ['plain_green']  # built-ins are not timed
+        assert stats['plain_green']['calls'] == 5
+        assert 0 <= stats['plain_green']['p50_ms'] <= stats['plain_green']['p95_ms']
+
+    def test_rolling_percentiles(self):
+        from utils.greenonbrown import AlgorithmTimings
+
+        timings = AlgorithmTimings(window=100)
+        for ms in range(1000):
+            timings.record('algo', float(ms))
+
+        stats = timings.snapshot()['algo']
+        assert stats['calls'] == 1000
+        assert stats['p50_ms'] == pytest.approx(949.5)
+        assert stats['p95_ms'] == pytest.approx(994.05)
+
+    def test_budget_needs_consecutive_frames(self):
+        from utils.greenonbrown import AlgorithmTimings
+
+        timings = AlgorithmTimings(budget_ms=10, budget_frames=3)
+        for ms in (20, 20, 5, 20, 20):
+            timings.record('algo', ms)
+        assert not timings.over_budget('algo')
+
+        timings.record('algo', 20)
+        assert timings.over_budget('algo')
+        timings.reset_budget('algo')
+        assert not timings.over_budget('algo')
+
+    def test_no_budget_never_over(self):
+        from utils.greenonbrown import AlgorithmTimings
+
+        timings = AlgorithmTimings()
+        for _ in range(100):
+            timings.record('algo', 1e6)
+        assert not timings.over_budget('algo')
+
+    def test_shared_between_detectors(self):
+        from utils.greenonbrown import AlgorithmTimings, GreenOnBrown
+
+        image = TestCCAFullPipelineEquivalence._make_test_image()
+        timings = AlgorithmTimings(budget_ms=1, budget_frames=2)
+        for _ in range(2):
+            gob = self._with_custom(GreenOnBrown(timings=timings), 'slow_green', delay_s=0.005)
+            gob.inference(image, algorithm='slow_green')
+
+        assert timings.snapshot()['slow_green']['calls'] == 2
+        assert timings.over_budget('slow_green')
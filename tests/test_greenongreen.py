@@ -19,6 +19,15 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 
+class _Tensor(np.ndarray):
+    """ndarray with the .cpu().numpy() chain of a torch tensor."""
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self)
+
+
 def make_mock_boxes(box_mocks, track_ids=None):
     """Create a mock YOLO Boxes object that supports attribute access and iteration.
 
@@ -27,6 +36,9 @@ def make_mock_boxes(box_mocks, track_ids=None):
     individual box objects.  Using a plain Python list for ``result.boxes``
     prevents setting ``.id`` because lists don't allow arbitrary attributes.
 
+    The whole-result ``.xyxy``, ``.cls`` and ``.conf`` tensors (what GreenOnGreen
+    reads) are stacked from the per-box mocks.
+
     Args:
         box_mocks: list of individual box MagicMock objects (iterable items).
         track_ids: numpy array of track IDs, or None.
@@ -34,8 +46,15 @@ def make_mock_boxes(box_mocks, track_ids=None):
     Returns:
         A MagicMock that behaves like a YOLO Boxes object.
     """
+    def stacked(attr, width):
+        values = [np.asarray(getattr(box, attr)[0], dtype=np.float32).reshape(-1) for box in box_mocks]
+        return np.array(values, dtype=np.float32).reshape(-1, width).view(_Tensor)
+
     mock_boxes = MagicMock()
-    mock_boxes.id = track_ids
+    mock_boxes.id = None if track_ids is None else np.asarray(track_ids).view(_Tensor)
+    mock_boxes.xyxy = stacked('xyxy', 4)
+    mock_boxes.cls = stacked('cls', 1).reshape(-1)
+    mock_boxes.conf = stacked('conf', 1).reshape(-1)
     # Make iteration over mock_boxes yield the individual box mocks
     mock_boxes.__iter__ = MagicMock(return_value=iter(box_mocks))
     mock_boxes.__len__ = MagicMock(return_value=len(box_mocks))
@@ -58,7 +77,7 @@ def make_mock_yolo(task='detect', names=None):
     mock_box.xyxy = [np.array([100, 50, 200, 150])]
     mock_box.conf = [np.array([0.85])]
     mock_box.cls = [np.array([0])]
-    mock_result.boxes = [mock_box]
+    mock_result.boxes = make_mock_boxes([mock_box])
 
     # Mock masks (None for detection, populated for segmentation)
     if task == 'segment':
@@ -307,6 +326,25 @@ class TestInference:
         # Different object (copy)
         assert image_out is not image
 
+    @patch('utils.greenongreen.YOLO')
+    def test_annotate_last_detections_matches_show_display(self, mock_yolo_cls, tmp_path):
+        """annotate() on a plain inference() call draws what show_display would have."""
+        (tmp_path / 'model.pt').touch()
+        mock_model = make_mock_yolo(task='segment')
+        mock_box = mock_model.predict.return_value[0].boxes[0]
+        mock_box.conf, mock_box.cls = [np.float32(0.85)], [np.int64(0)]
+        mock_yolo_cls.return_value = mock_model
+
+        from utils.greenongreen import GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path))
+
+        image = np.full((480, 640, 3), 90, dtype=np.uint8)
+        _, _, _, shown = gog.inference(image, show_display=True)
+        _, _, _, image_out = gog.inference(image)
+
+        assert image_out is image
+        np.testing.assert_array_equal(gog.annotate(image.copy()), shown)
+
     @patch('utils.greenongreen.YOLO')
     def test_build_mask_segmentation(self, mock_yolo_cls, tmp_path):
         """build_mask=True with segmentation model creates detection_mask."""
@@ -358,7 +396,7 @@ class TestInference:
         mock_model = make_mock_yolo(task='detect')
         # Override predict to return empty result
         mock_result = MagicMock()
-        mock_result.boxes = []
+        mock_result.boxes = make_mock_boxes([])
         mock_result.masks = None
         mock_model.predict.return_value = [mock_result]
         mock_yolo_cls.return_value = mock_model
@@ -389,7 +427,7 @@ class TestZoneActuation:
         mock_box.xyxy = [np.array([100, 50, 200, 150])]
         mock_box.conf = [np.array([0.9])]
         mock_box.cls = [np.array([0])]
-        mock_result.boxes = [mock_box]
+        mock_result.boxes = make_mock_boxes([mock_box])
 
         # Mask polygon covering x=100-200, y=50-150
         mask_xy = np.array([[100, 50], [200, 50], [200, 150], [100, 150]], dtype=np.float32)
@@ -524,6 +562,25 @@ class TestHybridMode:
         assert gog._dilate_kernel is not old_kernel
         assert gog._dilate_kernel.shape == (51, 51)
 
+    @patch('utils.greenongreen.YOLO')
+    def test_set_crop_stabilizer(self, mock_yolo_cls, tmp_path):
+        """A detector warmed up on its own stabilizer leaves the shared one alone until it is attached."""
+        (tmp_path / 'model.pt').touch()
+        mock_yolo_cls.return_value = make_mock_yolo()
+
+        from utils.greenongreen import GreenOnGreen
+        from utils.tracker import CropMaskStabilizer
+        shared = CropMaskStabilizer(max_age=3)
+        shared.update([7], [[10, 10, 50, 50]])
+        gog = GreenOnGreen(model_path=str(tmp_path), hybrid_mode=True, tracking_enabled=True,
+                           crop_stabilizer=CropMaskStabilizer(max_age=3))
+
+        gog.reset_tracker()
+        assert len(shared.get_all_crop_regions()) == 1
+
+        gog.set_crop_stabilizer(shared)
+        assert gog._crop_stabilizer is shared
+
     @patch('utils.greenongreen.YOLO')
     def test_hybrid_executor_created(self, mock_yolo_cls, tmp_path):
         """hybrid_mode=True creates thread pool executor; False does not."""
@@ -584,6 +641,60 @@ class TestHybridMode:
         # Returns a copy, not original
         assert image_out is not image
 
+    @patch('utils.greenongreen.YOLO')
+    @patch('utils.greenonbrown.GreenOnBrown')
+    def test_hybrid_annotate_matches_show_display(self, mock_gob_cls, mock_yolo_cls, tmp_path):
+        """Hybrid annotate() redraws the crop overlay, buffer zone and weed boxes later."""
+        (tmp_path / 'model.pt').touch()
+        mock_yolo_cls.return_value = make_mock_yolo(task='detect')
+
+        mock_gob = MagicMock()
+        mock_gob.inference.return_value = (None, [[10, 10, 20, 20]], [[20, 20]], None)
+        mock_gob_cls.return_value = mock_gob
+
+        from utils.greenongreen import GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path), hybrid_mode=True, crop_buffer_px=10)
+
+        image = np.full((480, 640, 3), 90, dtype=np.uint8)
+        _, boxes, _, shown = gog.inference(image, show_display=True)
+        _, _, _, image_out = gog.inference(image)
+
+        assert boxes == [[10, 10, 20, 20]]
+        assert image_out is image
+        detections = gog.last_detections
+        assert detections.crop_mask is not detections.crop_mask_undilated
+        np.testing.assert_array_equal(gog.annotate(image.copy(), detections), shown)
+
+    @patch('utils.greenongreen.YOLO')
+    @patch('utils.greenonbrown.GreenOnBrown')
+    def test_analytic_crop_filter_matches_mask(self, mock_gob_cls, mock_yolo_cls, tmp_path):
+        """analytic_crop_filter drops the same weeds as the dilated mask and draws the same overlay."""
+        (tmp_path / 'model.pt').touch()
+        mock_yolo_cls.return_value = make_mock_yolo(task='detect')
+
+        # Crop at (100,50)-(200,150); with a 10px buffer the second weed is inside, the third just outside
+        mock_gob = MagicMock()
+        mock_gob.inference.return_value = (
+            None, [[150, 100, 20, 20], [200, 150, 10, 10], [205, 157, 10, 10], [400, 300, 20, 20]],
+            [[160, 110], [205, 155], [210, 162], [410, 310]], None)
+        mock_gob_cls.return_value = mock_gob
+
+        from utils.greenongreen import GreenOnGreen
+        mask_gog = GreenOnGreen(model_path=str(tmp_path), hybrid_mode=True, crop_buffer_px=10)
+        gog = GreenOnGreen(model_path=str(tmp_path), hybrid_mode=True, crop_buffer_px=10,
+                           analytic_crop_filter=True)
+
+        image = np.full((480, 640, 3), 90, dtype=np.uint8)
+        _, mask_boxes, _, mask_shown = mask_gog.inference(image, show_display=True)
+        _, boxes, centres, image_out = gog.inference(image)
+
+        assert boxes == mask_boxes == [[205, 157, 10, 10], [400, 300, 20, 20]]
+        assert centres == [[210, 162], [410, 310]]
+        assert image_out is image
+        detections = gog.last_detections
+        assert detections.crop_mask is None and detections.crop_regions is not None
+        np.testing.assert_array_equal(gog.annotate(image.copy(), detections), mask_shown)
+
 
 class TestConfigIntegration:
     """Test that updated config files are valid."""
@@ -908,3 +1019,439 @@ class TestTrackingMode:
 
         # Should not crash; weed detection still works
         assert len(boxes) == 1  # weed at (300,300) outside crop at (100,50)
+
+    @patch('utils.greenongreen.YOLO')
+    @patch('utils.greenonbrown.GreenOnBrown')
+    def test_hybrid_tracking_analytic_crop_filter(self, mock_gob_cls, mock_yolo_cls, tmp_path):
+        """With analytic_crop_filter, stabilized crops filter weeds without building a mask."""
+        (tmp_path / 'model.pt').touch()
+        mock_model = make_mock_yolo()
+
+        mock_result = MagicMock()
+        mock_box = MagicMock()
+        mock_box.xyxy = [np.array([100, 50, 200, 150])]
+        mock_box.conf = [np.array([0.8])]
+        mock_box.cls = [np.array([1])]
+        mock_result.boxes = make_mock_boxes([mock_box], track_ids=np.array([3]))
+        mock_result.masks = None
+        mock_model.track.return_value = [mock_result]
+        mock_yolo_cls.return_value = mock_model
+
+        mock_gob = MagicMock()
+        mock_gob.inference.return_value = (
+            None, [[150, 100, 20, 20], [300, 300, 20, 20]], [[160, 110], [310, 310]], None)
+        mock_gob_cls.return_value = mock_gob
+
+        from utils.greenongreen import GreenOnGreen
+        from utils.tracker import CropMaskStabilizer
+
+        gog = GreenOnGreen(model_path=str(tmp_path), hybrid_mode=True, tracking_enabled=True,
+                           crop_stabilizer=CropMaskStabilizer(max_age=3), analytic_crop_filter=True)
+
+        _, boxes, _, _ = gog.inference(np.zeros((480, 640, 3), dtype=np.uint8))
+
+        assert boxes == [[300, 300, 20, 20]]
+        assert gog.last_detections.crop_mask is None
+        assert len(gog.last_detections.crop_regions) == 1
+
+
+class TestInferenceBatch:
+    """Batch API for offline evaluation: frames go to YOLO batch_size at a time."""
+
+    @staticmethod
+    def _batch_result(xyxy, cls, conf):
+        result = MagicMock()
+        result.boxes.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4).view(_Tensor)
+        result.boxes.cls = np.asarray(cls, dtype=np.float32).view(_Tensor)
+        result.boxes.conf = np.asarray(conf, dtype=np.float32).view(_Tensor)
+        return result
+
+    @patch('utils.greenongreen.YOLO')
+    def test_batches_frames_and_returns_arrays(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_model = make_mock_yolo(task='detect')
+        mock_model.predict.side_effect = lambda source, **kwargs: [
+            self._batch_result([[100, 50, 200.7, 150]], [0], [0.9]) if i % 2 == 0
+            else self._batch_result([], [], []) for i in range(len(source))]
+        mock_yolo_cls.return_value = mock_model
+
+        from utils.greenongreen import GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path))
+        frames = [np.zeros((240, 320, 3), dtype=np.uint8) for _ in range(5)]
+
+        results = list(gog.inference_batch(frames, confidence=0.4, batch_size=2))
+
+        assert mock_model.predict.call_count == 3
+        assert [len(call.kwargs['source']) for call in mock_model.predict.call_args_list] == [2, 2, 1]
+        assert len(results) == 5
+        boxes, centres, class_ids, confidences = results[0]
+        np.testing.assert_array_equal(boxes, [[100, 50, 100, 100]])
+        np.testing.assert_array_equal(centres, [[150, 100]])
+        assert class_ids.tolist() == [0]
+        assert confidences.tolist() == pytest.approx([0.9])
+        assert results[1][0].shape == (0, 4)
+
+
+class TestCropSafetyFilter:
+    """Hybrid step 6: vectorised crop-mask filter over (N, 2) centres or box overlap."""
+
+    @staticmethod
+    def _mask():
+        mask = np.zeros((100, 200), dtype=np.uint8)
+        mask[:, 100:] = 255  # right half is crop
+        return mask
+
+    def test_centre_test_lists(self):
+        from utils.greenongreen import GreenOnGreen
+
+        boxes = [[10, 10, 20, 20], [110, 10, 20, 20], [90, 50, 20, 10], [190, 90, 20, 20]]
+        centres = [[20, 20], [120, 20], [100, 55], [200, 100]]  # last is outside the frame
+
+        out_boxes, out_centres = GreenOnGreen._filter_crop_detections(boxes, centres, self._mask())
+
+        assert out_boxes == [[10, 10, 20, 20]]
+        assert out_centres == [[20, 20]]
+
+    def test_centre_test_arrays(self):
+        from utils.greenongreen import GreenOnGreen
+
+        boxes = np.array([[10, 10, 20, 20], [110, 10, 20, 20], [40, 60, 10, 10]], dtype=np.int32)
+        centres = boxes[:, :2] + boxes[:, 2:] // 2
+
+        out_boxes, out_centres = GreenOnGreen._filter_crop_detections(boxes, centres, self._mask())
+
+        assert isinstance(out_boxes, np.ndarray)
+        np.testing.assert_array_equal(out_boxes, boxes[[0, 2]])
+        np.testing.assert_array_equal(out_centres, centres[[0, 2]])
+
+    def test_overlap_fraction(self):
+        from utils.greenongreen import GreenOnGreen
+
+        # Centre in the crop, but only 60% of the box overlaps it
+        boxes = [[92, 0, 20, 10]]
+        centres = [[102, 5]]
+
+        assert GreenOnGreen._filter_crop_detections(boxes, centres, self._mask())[0] == []
+        assert GreenOnGreen._filter_crop_detections(boxes, centres, self._mask(), 0.7)[0] == boxes
+        assert GreenOnGreen._filter_crop_detections(boxes, centres, self._mask(), 0.5)[0] == []
+
+    def test_caps_at_max_detections(self):
+        from utils.greenongreen import GreenOnGreen
+        from utils.greenonbrown import MAX_DETECTIONS
+
+        boxes = [[x % 90, 0, 2, 2] for x in range(2 * MAX_DETECTIONS)]
+        centres = [[x + 1, y + 1] for x, y, _, _ in boxes]
+
+        out_boxes, out_centres = GreenOnGreen._filter_crop_detections(boxes, centres, self._mask())
+
+        assert out_boxes == boxes[:MAX_DETECTIONS]
+        assert out_centres == centres[:MAX_DETECTIONS]
+
+    def test_empty(self):
+        from utils.greenongreen import GreenOnGreen
+
+        assert GreenOnGreen._filter_crop_detections([], [], self._mask()) == ([], [])
+
+
+class TestInferencePipeline:
+    """Pipelined pure-mode inference: frame N runs on the worker while the caller handles N-1."""
+
+    @staticmethod
+    def _frame_model(delay=0.0):
+        """Mock YOLO placing one box at x = the frame's first pixel value, optionally slow."""
+        import time
+
+        def predict(source, **kwargs):
+            time.sleep(delay)
+            x = int(source[0, 0, 0])
+            box = MagicMock()
+            box.xyxy = [np.array([x, 10, x + 20, 30])]
+            box.conf, box.cls = [np.float32(0.9)], [np.int64(0)]
+            result = MagicMock()
+            result.boxes = make_mock_boxes([box])
+            result.masks = None
+            return [result]
+
+        mock_model = make_mock_yolo(task='detect')
+        mock_model.predict.side_effect = predict
+        return mock_model
+
+    @patch('utils.greenongreen.YOLO')
+    def test_results_lag_one_frame_with_capture_time(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_yolo_cls.return_value = self._frame_model()
+
+        from utils.greenongreen import GreenOnGreen, InferencePipeline
+        pipeline = InferencePipeline(GreenOnGreen(model_path=str(tmp_path)))
+        frames = [np.full((240, 320, 3), x, dtype=np.uint8) for x in (10, 50, 90)]
+
+        results = [pipeline.submit(frame, 100.0 + i, source=f'frame{i}', confidence=0.4)
+                   for i, frame in enumerate(frames)]
+        results.append(pipeline.drain())
+        pipeline.close()
+
+        assert results[0] is None
+        for i, result in enumerate(results[1:]):
+            assert result.frame is frames[i]
+            assert result.source == f'frame{i}'
+            assert result.capture_time == 100.0 + i
+            assert result.boxes == [[frames[i][0, 0, 0], 10, 20, 20]]
+            assert result.last_raw_boxes == result.boxes
+            assert result.last_detections.boxes == result.boxes
+        assert pipeline.drain() is None
+
+    @patch('utils.greenongreen.YOLO')
+    def test_inference_overlaps_caller_work(self, mock_yolo_cls, tmp_path):
+        import time
+        (tmp_path / 'model.pt').touch()
+        mock_yolo_cls.return_value = self._frame_model(delay=0.05)
+
+        from utils.greenongreen import GreenOnGreen, InferencePipeline
+        pipeline = InferencePipeline(GreenOnGreen(model_path=str(tmp_path)))
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+        start = time.perf_counter()
+        for _ in range(10):
+            pipeline.submit(frame, time.time())
+            time.sleep(0.05)  # capture, actuation and streaming for the previous result
+        pipeline.close()
+        elapsed = time.perf_counter() - start
+
+        # Serial would take 10 x (0.05 + 0.05) = 1.0s
+        assert elapsed < 0.8
+
+    @patch('utils.greenongreen.YOLO')
+    def test_resolution_changes_between_frames(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_model = self._frame_model(delay=0.05)
+        mock_yolo_cls.return_value = mock_model
+
+        from utils.greenongreen import GreenOnGreen, InferencePipeline
+        gog = GreenOnGreen(model_path=str(tmp_path))
+        pipeline = InferencePipeline(gog)
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+        pipeline.submit(frame, 0.0)
+        pipeline.set_inference_resolution(416)  # frame in flight: not applied yet
+        assert gog.inference_resolution == 320
+
+        pipeline.submit(frame, 1.0)
+        pipeline.close()
+
+        assert gog.inference_resolution == 416
+        first, second = mock_model.predict.call_args_list
+        assert 'imgsz' not in first.kwargs and second.kwargs['imgsz'] == 416
+
+    def test_lost_tracks_are_filtered_by_age(self):
+        from utils.greenongreen import PipelineResult
+        lost = [{'track_id': 1, 'age': 1}, {'track_id': 2, 'age': 4}]
+        result = PipelineResult(frame=None, source=None, capture_time=0.0, lost_tracks=lost)
+
+        assert [t['track_id'] for t in result.get_lost_tracks(max_age=2)] == [1]
+        assert result.get_lost_tracks() == lost
+
+    @patch('utils.greenongreen.YOLO')
+    @patch('utils.greenonbrown.GreenOnBrown')
+    def test_hybrid_mode_rejected(self, mock_gob_cls, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_yolo_cls.return_value = make_mock_yolo(task='detect')
+
+        from utils.greenongreen import GreenOnGreen, InferencePipeline
+        gog = GreenOnGreen(model_path=str(tmp_path), hybrid_mode=True)
+
+        with pytest.raises(ValueError):
+            InferencePipeline(gog)
+
+
+class TestFastPredictor:
+    """Fixed-shape letterbox/tensor fast path for pure detect models."""
+
+    @staticmethod
+    def _reference_preprocess(image, imgsz):
+        """What model.predict() does: Ultralytics LetterBox (centred, grey border), BGR->RGB, CHW, /255."""
+        h, w = image.shape[:2]
+        r = min(imgsz / h, imgsz / w)
+        new_w, new_h = int(round(w * r)), int(round(h * r))
+        dw, dh = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+        resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+        boxed = cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        chw = np.ascontiguousarray(boxed[None, ..., ::-1].transpose(0, 3, 1, 2))
+        return chw.astype(np.float32) / 255
+
+    @pytest.mark.parametrize('shape, imgsz', [((480, 640), 320), ((1088, 1456), 416), ((320, 320), 320)])
+    def test_preprocess_matches_ultralytics_letterbox(self, shape, imgsz):
+        from utils.greenongreen import FastPredictor
+        image = np.random.RandomState(0).randint(0, 256, (*shape, 3)).astype(np.uint8)
+        predictor = FastPredictor(MagicMock(), shape, imgsz)
+
+        out = predictor.preprocess(image)
+        again = predictor.preprocess(image)
+
+        assert again is out
+        np.testing.assert_array_equal(out, self._reference_preprocess(image, imgsz))
+
+    def test_scale_boxes_inverts_letterbox(self):
+        from utils.greenongreen import FastPredictor
+        predictor = FastPredictor(MagicMock(), (480, 640), 320)
+        # 640x480 -> 320x240 centred in 320x320: 40 px pad top
+        xyxy = np.array([[50, 65, 150, 115], [0, 0, 320, 320]], dtype=np.float32)
+
+        np.testing.assert_allclose(predictor.scale_boxes(xyxy), [[100, 50, 300, 150], [0, 0, 640, 480]])
+
+    @patch('utils.greenongreen.YOLO')
+    def test_gog_fast_inference(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_model = make_mock_yolo(task='detect')
+        mock_yolo_cls.return_value = mock_model
+
+        from utils.greenongreen import FastPredictor, GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path), fast_predict=True, inference_resolution=320,
+                           detect_classes=['weed'])
+        image = np.full((480, 640, 3), 90, dtype=np.uint8)
+        det = np.array([[50, 65, 150, 115, 0.9, 0], [10, 45, 20, 55, 0.6, 0]], dtype=np.float32)
+
+        with patch.object(FastPredictor, '_detect', return_value=det) as detect:
+            contours, boxes, centres, image_out = gog.inference(image, confidence=0.4)
+
+        detect.assert_called_once_with(0.4, [0])
+        mock_model.predict.assert_not_called()
+        assert contours is None and image_out is image
+        assert boxes == [[100, 50, 200, 100], [20, 10, 20, 20]]
+        assert centres == [[200, 100], [30, 20]]
+        assert gog.last_detections.confidences.tolist() == pytest.approx([0.9, 0.6])
+        annotated = gog.annotate(image.copy())
+        assert not np.array_equal(annotated, image)
+
+    @patch('utils.greenongreen.YOLO')
+    def test_fast_predict_skipped_when_tracking(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_model = make_mock_yolo(task='detect')
+        result = MagicMock()
+        result.boxes = make_mock_boxes([])
+        result.masks = None
+        mock_model.track.return_value = [result]
+        mock_yolo_cls.return_value = mock_model
+
+        from utils.greenongreen import GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path), fast_predict=True, tracking_enabled=True)
+        gog.inference(np.zeros((240, 320, 3), dtype=np.uint8))
+
+        assert gog._fast_predictor is None
+        mock_model.track.assert_called_once()
+
+
+class TestSetInferenceResolution:
+    """Live input-size changes from the resolution governor."""
+
+    @patch('utils.greenongreen.YOLO')
+    def test_pure_mode_passes_imgsz_once_set(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_model = make_mock_yolo(task='detect')
+        result = MagicMock()
+        result.boxes = make_mock_boxes([])
+        result.masks = None
+        mock_model.predict.return_value = [result]
+        mock_yolo_cls.return_value = mock_model
+
+        from utils.greenongreen import GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path))
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        gog.inference(image)
+        assert 'imgsz' not in mock_model.predict.call_args.kwargs
+
+        gog.set_inference_resolution(416)
+        gog.inference(image)
+
+        assert gog.inference_resolution == 416
+        assert mock_model.predict.call_args.kwargs['imgsz'] == 416
+
+    @patch('utils.greenongreen.YOLO')
+    def test_fast_predictor_rebuilt_for_new_size(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_yolo_cls.return_value = make_mock_yolo(task='detect')
+
+        from utils.greenongreen import FastPredictor, GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path), fast_predict=True, inference_resolution=320)
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        with patch.object(FastPredictor, '_detect', return_value=np.empty((0, 6), dtype=np.float32)):
+            gog.inference(image)
+            assert gog._fast_predictor.imgsz == 320
+            gog.set_inference_resolution(256)
+            gog.inference(image)
+
+        assert gog._fast_predictor.imgsz == 256
+
+
+class TestTiledInference:
+    """Overlapping tiles at model input size, merged with class-aware NMS."""
+
+    @pytest.mark.parametrize('columns, rows, overlap', [(1, 1, 0.2), (2, 2, 0.2), (3, 2, 0.25), (3, 3, 0.0)])
+    def test_tile_windows_cover_frame(self, columns, rows, overlap):
+        from utils.greenongreen import tile_windows
+        windows = tile_windows(1456, 1088, columns, rows, overlap=overlap)
+
+        assert len(windows) == columns * rows
+        covered = np.zeros((1088, 1456), dtype=bool)
+        for x0, y0, x1, y1 in windows:
+            assert 0 <= x0 < x1 <= 1456 and 0 <= y0 < y1 <= 1088
+            covered[y0:y1, x0:x1] = True
+        assert covered.all()
+        sizes = {(x1 - x0, y1 - y0) for x0, y0, x1, y1 in windows}
+        assert len(sizes) == 1
+        if columns > 1:
+            (x0, _, x1, _), (next_x0, _, _, _) = windows[:2]
+            assert x1 - next_x0 == pytest.approx((x1 - x0) * overlap, abs=2)
+
+    def test_class_aware_nms(self):
+        from utils.greenongreen import class_aware_nms
+        xyxy = np.array([[100, 100, 140, 140],   # full weed, seen by one tile
+                         [120, 100, 140, 140],   # its fragment at the neighbouring tile's edge
+                         [100, 100, 140, 140],   # same place, other class
+                         [300, 300, 320, 320]], dtype=np.float32)
+        confidences = np.array([0.9, 0.6, 0.5, 0.4], dtype=np.float32)
+        class_ids = np.array([0, 0, 1, 0], dtype=np.int32)
+
+        assert class_aware_nms(xyxy, confidences, class_ids).tolist() == [0, 2, 3]
+        assert class_aware_nms(xyxy, confidences, class_ids, tile_ids=np.array([0, 1, 0, 0])).tolist() == [0, 2, 3]
+        assert class_aware_nms(np.empty((0, 4), np.float32), np.empty(0, np.float32),
+                               np.empty(0, np.int32)).tolist() == []
+
+    def test_class_aware_nms_keeps_nested_boxes_in_one_tile(self):
+        from utils.greenongreen import class_aware_nms
+        xyxy = np.array([[100, 100, 180, 180],   # large weed
+                         [110, 110, 130, 130],   # small weed inside its box, kept by YOLO's IoU NMS
+                         [102, 100, 180, 178]],  # near-duplicate of the large weed
+                        dtype=np.float32)
+        confidences = np.array([0.9, 0.6, 0.5], dtype=np.float32)
+        class_ids = np.zeros(3, dtype=np.int32)
+
+        assert class_aware_nms(xyxy, confidences, class_ids, tile_ids=np.zeros(3)).tolist() == [0, 1]
+        # The same small box from another tile is a seam fragment
+        assert class_aware_nms(xyxy, confidences, class_ids, tile_ids=np.array([0, 1, 0])).tolist() == [0]
+
+    @patch('utils.greenongreen.YOLO')
+    def test_gog_tiled_inference(self, mock_yolo_cls, tmp_path):
+        (tmp_path / 'model.pt').touch()
+        mock_model = make_mock_yolo(task='detect')
+        # 2x1 tiles of a 640x240 frame, 0.2 overlap: x 0-356 and 284-640.
+        # The weed at frame x 300-340 is seen whole by both tiles.
+        per_tile = [TestInferenceBatch._batch_result([[300, 10, 340, 50], [10, 100, 30, 120]], [0, 0], [0.8, 0.7]),
+                    TestInferenceBatch._batch_result([[16, 10, 56, 50]], [0], [0.9])]
+        per_tile[0].masks = per_tile[1].masks = None
+        mock_model.predict.return_value = per_tile
+        mock_yolo_cls.return_value = mock_model
+
+        from utils.greenongreen import GreenOnGreen
+        gog = GreenOnGreen(model_path=str(tmp_path), tiles=(2, 1), tile_overlap=0.2, inference_resolution=320)
+        image = np.zeros((240, 640, 3), dtype=np.uint8)
+        contours, boxes, centres, _ = gog.inference(image, confidence=0.3)
+
+        kwargs = mock_model.predict.call_args.kwargs
+        assert [tile.shape for tile in kwargs['source']] == [(240, 356, 3), (240, 356, 3)]
+        assert kwargs['imgsz'] == 320
+        assert contours is None
+        assert boxes == [[300, 10, 40, 40], [10, 100, 20, 20]]
+        assert centres == [[320, 30], [20, 110]]
+        assert gog.last_detections.confidences.tolist() == pytest.approx([0.9, 0.7])
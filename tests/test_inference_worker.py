@@ -0,0 +1,255 @@
+"""
+Tests for InferenceWorker: out-of-process inference through shared-memory ring slots, with restarts.
+
+The worker process runs FakeDetector (below) instead of YOLO, so these tests need no model.
+
+Run: pytest tests/test_inference_worker.py -v
+"""
+
+import os
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.greenonbrown import Detections
+from utils.inference_worker import TRACK_ID_OFFSET, InferenceWorker
+
+SHAPE = (48, 64, 3)
+CRASH, FAIL, HANG = 255, 254, 253
+
+
+class FakeDetector:
+    """
+    Stands in for a pure-mode GreenOnGreen in both processes. One box per frame at x = frame[0, 0, 0],
+    labelled with where it ran; the class filter and input size come back as class id and confidence.
+    In the worker a first pixel of CRASH kills the process, HANG blocks it, and FAIL raises.
+    """
+
+    def __init__(self, tracking_enabled=False, label='caller', load_s=0.0, fail_load=False):
+        if fail_load:
+            raise RuntimeError('no model')
+        time.sleep(load_s)
+        self.hybrid_mode = False
+        self.tracking_enabled = tracking_enabled
+        self.label = label
+        self.inference_resolution = 320
+        self._pure_imgsz = {}
+        self._detect_class_ids = None
+        self.last_detections = Detections()
+        self.last_track_ids, self.last_class_ids, self.last_confidences = [], [], []
+        self.last_raw_boxes, self.detection_mask = [], None
+        self.resets = 0
+
+    def set_inference_resolution(self, imgsz):
+        self.inference_resolution = imgsz
+        self._pure_imgsz = {'imgsz': imgsz}
+
+    def reset_tracker(self):
+        self.resets += 1
+
+    def get_lost_tracks(self, max_age=None):
+        return [{'track_id': self.resets, 'xyxy': [0, 0, 4, 4], 'cls': 0, 'score': 0.5, 'age': 1}]
+
+    def inference(self, image, confidence=0.5, show_display=False, build_mask=False):
+        x = int(image[0, 0, 0])
+        if self.label == 'worker':
+            if x == CRASH:
+                os._exit(3)
+            if x == HANG:
+                time.sleep(60)
+            if x == FAIL:
+                raise ValueError('bad frame')
+        boxes = [[x, 2, 10, 12]]
+        contours = [np.array([[x, 2], [x + 10, 2], [x + 10, 14], [x, 14]], dtype=np.int32).reshape(-1, 1, 2)]
+        self.last_detections = Detections(
+            boxes=list(boxes), contours=contours, label=self.label,
+            track_ids=(x + 100,) if self.tracking_enabled else (),
+            class_ids=np.array([(self._detect_class_ids or [0])[0]]),
+            confidences=np.array([self.inference_resolution / 1000]))
+        self.last_raw_boxes = list(boxes)
+        return contours, boxes, [[x + 5, 8]], image
+
+    def annotate(self, image, detections=None):
+        for x, y, w, h in detections.boxes:
+            cv2.rectangle(image, (x, y), (x + w, y + h), (0, 0, 255), 1)
+        return image
+
+
+def _frame(x):
+    frame = np.zeros(SHAPE, dtype=np.uint8)
+    frame[0, 0, 0] = x
+    return frame
+
+
+@pytest.fixture
+def make_worker():
+    workers = []
+
+    def make(tracking_enabled=False, ready=True, worker_kwargs=None, **kwargs):
+        factory = partial(FakeDetector, tracking_enabled, 'worker', **(worker_kwargs or {}))
+        worker = InferenceWorker(FakeDetector(tracking_enabled), SHAPE, factory=factory, **kwargs)
+        workers.append(worker)
+        if ready:
+            assert worker.wait_ready(timeout_s=30)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.close()
+
+
+class TestInferenceWorker:
+    def test_results_one_frame_behind(self, make_worker):
+        worker = make_worker()
+
+        assert worker.submit(_frame(1), 10.0, source='a', confidence=0.4) is None
+        result = worker.submit(_frame(2), 11.0, source='b')
+
+        assert result.source == 'a' and result.capture_time == 10.0
+        assert result.boxes == [[1, 2, 10, 12]]
+        assert result.weed_centres == [[6, 8]]
+        assert result.last_detections.label == 'worker'
+        assert result.last_detections.confidences.tolist() == pytest.approx([0.32])
+        assert result.last_track_ids == [] and result.lost_tracks == []
+        assert worker.drain().boxes == [[2, 2, 10, 12]]
+        assert not worker.in_flight
+
+    def test_boxes_not_shared_with_detections(self, make_worker):
+        worker = make_worker()
+
+        worker.submit(_frame(1), 0.0)
+        result = worker.drain()
+        result.boxes.extend([[0, 0, 4, 4]])  # owl.py merges lost tracks in place
+
+        assert result.last_detections.boxes == [[1, 2, 10, 12]]
+        assert result.last_raw_boxes == [[1, 2, 10, 12]]
+
+    def test_frame_may_be_reused_after_submit(self, make_worker):
+        worker = make_worker()
+        frame = _frame(3)
+
+        worker.submit(frame, 0.0)
+        frame[0, 0, 0] = 9  # already copied into the ring
+
+        assert worker.drain().boxes == [[3, 2, 10, 12]]
+
+    def test_display_and_mask_built_in_caller(self, make_worker):
+        worker = make_worker()
+        frame = _frame(20)
+
+        worker.submit(frame, 0.0, show_display=True, build_mask=True)
+        result = worker.drain()
+
+        assert result.image_out is not frame and result.image_out[2, 20, 2] == 255
+        assert result.detection_mask[8, 25] == 255 and result.detection_mask[8, 40] == 0
+
+    def test_follows_caller_detector_settings(self, make_worker):
+        worker = make_worker()
+        worker.detector._detect_class_ids = [2]
+        worker.set_inference_resolution(416)
+
+        worker.submit(_frame(1), 0.0)
+        detections = worker.drain().last_detections
+
+        assert detections.class_ids.tolist() == [2]
+        assert detections.confidences.tolist() == pytest.approx([0.416])
+
+    def test_tracking_state_and_reset(self, make_worker):
+        worker = make_worker(tracking_enabled=True, lost_track_age=5)
+
+        worker.submit(_frame(4), 0.0)
+        result = worker.drain()
+        assert result.last_track_ids == [TRACK_ID_OFFSET + 104]
+        assert result.last_class_ids == [0]
+        assert result.lost_tracks[0]['track_id'] == TRACK_ID_OFFSET + 1  # one reset after the warm-up frame
+
+        worker.reset_tracker()
+        worker.submit(_frame(4), 0.0)
+        assert worker.drain().get_lost_tracks(max_age=5)[0]['track_id'] == TRACK_ID_OFFSET + 2
+
+    def test_frame_error_gives_empty_result(self, make_worker):
+        worker = make_worker()
+
+        worker.submit(_frame(FAIL), 0.0)
+        result = worker.submit(_frame(5), 1.0)
+
+        assert result.boxes == [] and result.capture_time == 0.0
+        assert worker.drain().boxes == [[5, 2, 10, 12]]
+
+    def test_runs_in_process_until_worker_ready(self, make_worker):
+        start = time.perf_counter()
+        worker = make_worker(ready=False, worker_kwargs={'load_s': 1.0})
+        assert time.perf_counter() - start < 0.5  # the constructor does not wait for the model
+
+        assert worker.submit(_frame(1), 0.0) is None
+        assert worker.submit(_frame(2), 1.0).last_detections.label == 'caller'
+        assert not worker.ready
+
+        assert worker.wait_ready(timeout_s=30)
+        handed_over = worker.submit(_frame(3), 2.0)  # frame 2 was still on the local thread
+        assert handed_over.boxes == [[2, 2, 10, 12]] and handed_over.last_detections.label == 'caller'
+        result = worker.submit(_frame(4), 3.0)
+        assert result.boxes == [[3, 2, 10, 12]] and result.last_detections.label == 'worker'
+
+    def test_restarts_after_crash_in_background(self, make_worker):
+        worker = make_worker(tracking_enabled=True)
+
+        worker.submit(_frame(CRASH), 0.0)
+        assert worker.submit(_frame(6), 1.0) is None  # both frames in flight are dropped
+        assert worker.restarts == 1 and not worker.ready
+        assert worker.detector.resets == 1  # the caller's tracker was idle while the worker ran
+
+        # The caller's detector covers the restart
+        worker.submit(_frame(7), 2.0)
+        assert worker.drain().last_detections.label == 'caller'
+
+        assert worker.wait_ready(timeout_s=30)
+        worker.submit(_frame(8), 3.0)
+        result = worker.drain()
+        assert result.boxes == [[8, 2, 10, 12]] and result.last_detections.label == 'worker'
+        assert result.last_track_ids == [2 * TRACK_ID_OFFSET + 108]  # second launch, apart from the first
+
+    def test_hung_worker_detected_from_typical_frame_time(self, make_worker):
+        worker = make_worker()
+        for x in range(1, 4):
+            worker.submit(_frame(x), 0.0)
+        worker.drain()
+
+        start = time.perf_counter()
+        worker.submit(_frame(HANG), 0.0)
+        assert worker.submit(_frame(5), 1.0) is None
+
+        assert time.perf_counter() - start < 2.0  # not result_timeout_s
+        assert worker.restarts == 1
+
+    def test_gives_up_after_max_restarts(self, make_worker):
+        worker = make_worker(max_restarts=0)
+
+        worker.submit(_frame(CRASH), 0.0)
+        worker.submit(_frame(1), 1.0)
+        assert worker.gave_up
+
+        worker.submit(_frame(2), 2.0)
+        assert worker.drain().last_detections.label == 'caller'
+
+    def test_load_failure_falls_back_to_caller(self, make_worker):
+        worker = make_worker(ready=False, worker_kwargs={'fail_load': True}, max_restarts=1)
+
+        assert not worker.wait_ready(timeout_s=30)
+        assert worker.gave_up and worker.restarts == 1
+        worker.submit(_frame(1), 0.0)
+        assert worker.drain().boxes == [[1, 2, 10, 12]]
+
+    def test_rejects_other_frame_shapes(self, make_worker):
+        worker = make_worker()
+        with pytest.raises(ValueError):
+            worker.submit(np.zeros((10, 10, 3), dtype=np.uint8), 0.0)
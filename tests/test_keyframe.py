@@ -0,0 +1,126 @@
+"""
+Tests for keyframe inference: image motion estimation, keyframe scheduling and carried-forward detections.
+
+Run: pytest tests/test_keyframe.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.greenonbrown import Detections
+from utils.keyframe import KeyframeScheduler, MotionEstimator
+
+DT = 1 / 30
+
+
+def _ground(h=240, w=320):
+    rng = np.random.RandomState(0)
+    texture = cv2.GaussianBlur(rng.randint(0, 255, (h, w, 3)).astype(np.uint8), (7, 7), 0)
+    return cv2.resize(texture, (w, h))
+
+
+def _frames(n, step_y=0, step_x=0):
+    """Ground sliding by (step_x, step_y) px per frame."""
+    ground = _ground()
+    return [np.roll(ground, (i * step_y, i * step_x), axis=(0, 1)) for i in range(n)]
+
+
+def _run(scheduler, frames, speed_kmh=None):
+    return [scheduler.should_run(frame, speed_kmh, now=i * DT) for i, frame in enumerate(frames)]
+
+
+class TestMotionEstimator:
+    def test_measures_translation(self):
+        motion = MotionEstimator()
+        for frame in _frames(10, step_y=6, step_x=-2):
+            dx, dy = motion.update(frame, DT)
+
+        assert motion.measured
+        assert (dx, dy) == pytest.approx((-2, 6), abs=0.5)
+        assert motion.velocity == pytest.approx((-60, 180), abs=15)
+
+    def test_blank_frame_keeps_predicted_velocity(self):
+        motion = MotionEstimator()
+        for frame in _frames(10, step_y=6):
+            motion.update(frame, DT)
+
+        dx, dy = motion.update(np.full_like(_ground(), 90), DT)
+
+        assert not motion.measured
+        assert dy == pytest.approx(6, abs=0.5)
+
+
+class TestKeyframeScheduler:
+    def test_static_scene_runs_every_max_interval(self):
+        scheduler = KeyframeScheduler(max_interval=3)
+        runs = []
+        for i, frame in enumerate(_frames(9)):
+            run = scheduler.should_run(frame, now=i * DT)
+            runs.append(run)
+            if run:
+                scheduler.record(None, [], [])
+
+        assert runs == [True, False, False] * 3
+
+    def test_interval_shrinks_with_image_speed(self):
+        slow, fast = KeyframeScheduler(max_interval=8), KeyframeScheduler(max_interval=8)
+        _run(slow, _frames(10, step_y=2))
+        _run(fast, _frames(10, step_y=20))
+
+        # 0.25 of 240 px = 60 px per gap: about 30 frames at 2 px, 3 at 20 px (rounded down)
+        assert slow.interval == 8
+        assert fast.interval in (2, 3)
+
+    def test_gps_speed_stands_in_for_blank_frames(self):
+        scheduler = KeyframeScheduler(max_interval=8)
+        _run(scheduler, _frames(10, step_y=20), speed_kmh=5.0)
+        blank = np.full_like(_ground(), 90)
+
+        for i in range(10, 20):
+            scheduler.should_run(blank, speed_kmh=5.0, now=i * DT)
+        assert not scheduler.motion.measured
+        assert scheduler.interval in (2, 3)
+
+        scheduler.should_run(blank, speed_kmh=10.0, now=20 * DT)
+        assert scheduler.interval == 1
+
+    def test_budget_runs_every_frame(self):
+        scheduler = KeyframeScheduler(max_interval=5, budget_ms=50)
+        runs = []
+        for i, frame in enumerate(_frames(6)):
+            run = scheduler.should_run(frame, now=i * DT)
+            runs.append(run)
+            if run:
+                scheduler.record(None, [], [])
+
+        assert all(runs)
+
+    def test_predict_moves_boxes_with_the_ground(self):
+        scheduler = KeyframeScheduler(max_interval=5)
+        frames = _frames(3, step_y=10)
+        contour = np.array([[[100, 40]], [[120, 40]], [[120, 60]]], dtype=np.int32)
+        detections = Detections(boxes=[[100, 40, 20, 20], [10, 230, 20, 8]], contours=[contour],
+                                class_ids=np.array([0, 1]), confidences=np.array([0.9, 0.6]))
+
+        assert scheduler.should_run(frames[0], now=0)
+        scheduler.record(None, [[100, 40, 20, 20], [10, 230, 20, 8]], [[110, 50], [20, 234]], detections)
+        scheduler.should_run(frames[1], now=DT)
+        scheduler.should_run(frames[2], now=2 * DT)
+        contours, boxes, centres, moved = scheduler.predict()
+
+        # The box near the bottom edge has left the frame
+        assert len(boxes) == 1
+        assert boxes[0][1] == pytest.approx(60, abs=2) and boxes[0][0] == 100
+        assert centres[0][1] == pytest.approx(70, abs=2)
+        assert contours is None
+        assert moved.boxes[0][1] == boxes[0][1]
+        assert moved.contours[0][0, 0, 1] == boxes[0][1]
+        assert detections.boxes[0] == [100, 40, 20, 20]
@@ -0,0 +1,127 @@
+"""
+Tests for ModelCatalogue: indexing models/, metadata, sha256 and mtime-based invalidation.
+
+Run: pytest tests/test_model_catalogue.py -v
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import utils.model_catalogue as model_catalogue
+from utils.model_catalogue import ModelCatalogue, sha256_path
+
+METADATA = """description: Ultralytics YOLO11n model
+task: segment
+imgsz:
+- 320
+- 320
+names:
+  0: weed
+  1: crop
+"""
+
+
+def _ncnn(models_dir, name, metadata=None):
+    model_dir = models_dir / name
+    model_dir.mkdir()
+    (model_dir / 'model.ncnn.param').write_bytes(b'param')
+    (model_dir / 'model.ncnn.bin').write_bytes(b'weights')
+    if metadata:
+        (model_dir / 'metadata.yaml').write_text(metadata)
+    return model_dir
+
+
+def _age(path, seconds=60):
+    """Backdate a directory so its mtime is outside the racy window."""
+    past = os.stat(path).st_mtime - seconds
+    os.utime(path, (past, past))
+
+
+class TestModelCatalogue:
+    def test_indexes_pt_files_and_ncnn_dirs(self, tmp_path):
+        (tmp_path / 'best.pt').write_bytes(b'pt')
+        (tmp_path / 'notes.txt').touch()
+        (tmp_path / 'empty_dir').mkdir()
+        _ncnn(tmp_path, 'yolo11n-seg_ncnn_model')
+
+        entries = {e.name: e for e in ModelCatalogue(tmp_path).entries()}
+
+        assert sorted(entries) == ['best.pt', 'yolo11n-seg_ncnn_model']
+        assert entries['best.pt'].format == 'pt' and entries['best.pt'].task is None
+        assert entries['yolo11n-seg_ncnn_model'].format == 'ncnn'
+        assert entries['yolo11n-seg_ncnn_model'].task == 'segment'
+
+    @pytest.mark.skipif(model_catalogue.yaml is None, reason='PyYAML not installed')
+    def test_reads_metadata(self, tmp_path):
+        _ncnn(tmp_path, 'weeds_ncnn_model', METADATA)
+
+        entry = ModelCatalogue(tmp_path).get('weeds_ncnn_model')
+
+        assert entry.task == 'segment'
+        assert entry.names == {0: 'weed', 1: 'crop'}
+        assert entry.imgsz == (320, 320)
+        assert entry.to_dict()['classes'] == ['weed', 'crop']
+
+    def test_sha256_matches_upload_hash(self, tmp_path):
+        model_dir = _ncnn(tmp_path, 'm_ncnn_model')
+        (tmp_path / 'a.pt').write_bytes(b'pt weights')
+        expected = hashlib.sha256()
+        for f in sorted(model_dir.rglob('*')):
+            expected.update(f.read_bytes())
+
+        catalogue = ModelCatalogue(tmp_path)
+
+        assert catalogue.get('m_ncnn_model').sha256 == ''
+        assert catalogue.get('m_ncnn_model', sha256=True).sha256 == expected.hexdigest()
+        assert catalogue.get('m_ncnn_model').sha256 == expected.hexdigest()
+        assert sha256_path(tmp_path / 'a.pt') == hashlib.sha256(b'pt weights').hexdigest()
+
+    def test_unchanged_directory_is_not_rescanned(self, tmp_path):
+        (tmp_path / 'a.pt').touch()
+        _age(tmp_path)
+        catalogue = ModelCatalogue(tmp_path)
+
+        for _ in range(5):
+            assert catalogue.names() == ['a.pt']
+        assert catalogue.scans == 1
+
+    def test_added_and_removed_models_are_picked_up(self, tmp_path):
+        (tmp_path / 'a.pt').touch()
+        _age(tmp_path)
+        catalogue = ModelCatalogue(tmp_path)
+        assert catalogue.names() == ['a.pt']
+
+        (tmp_path / 'b.pt').touch()
+        assert catalogue.names() == ['a.pt', 'b.pt']
+        (tmp_path / 'a.pt').unlink()
+        assert catalogue.names() == ['b.pt']
+
+    def test_hash_dropped_when_model_is_replaced(self, tmp_path):
+        (tmp_path / 'a.pt').write_bytes(b'old')
+        catalogue = ModelCatalogue(tmp_path)
+        old = catalogue.get('a.pt', sha256=True).sha256
+
+        (tmp_path / 'a.pt').write_bytes(b'newer weights')
+        catalogue.invalidate()
+
+        assert catalogue.get('a.pt').sha256 == ''
+        assert catalogue.get('a.pt', sha256=True).sha256 != old
+
+    def test_missing_directory_is_empty(self, tmp_path):
+        catalogue = ModelCatalogue(tmp_path / 'models')
+        assert catalogue.entries() == []
+
+        (tmp_path / 'models').mkdir()
+        (tmp_path / 'models' / 'a.pt').touch()
+        assert catalogue.names() == ['a.pt']
+
+    def test_shared_per_directory(self, tmp_path):
+        assert ModelCatalogue.for_directory(tmp_path) is ModelCatalogue.for_directory(str(tmp_path) + '/.')
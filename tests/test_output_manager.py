@@ -180,6 +180,24 @@ class TestRelayController:
         time.sleep(0.3)
         rc.stop()
 
+    def test_late_job_delay_counts_from_detection(self):
+        """A job received after its detection time (pipelined inference) fires at detection + delay."""
+        rc = self._make_controller()
+        events = []
+        rc.relay = MagicMock()
+        rc.relay.relay_on.side_effect = lambda relay, verbose=False: events.append(('on', time.time()))
+        rc.relay.relay_off.side_effect = lambda relay, verbose=False: events.append(('off', time.time()))
+
+        detected = time.time() - 0.1
+        rc.receive(relay=0, time_stamp=detected, delay=0.2, duration=0.1)
+        time.sleep(0.4)
+        rc.stop()
+
+        (on, on_time), (off, off_time) = events[:2]
+        assert (on, off) == ('on', 'off')
+        assert on_time - detected == pytest.approx(0.2, abs=0.05)
+        assert off_time - on_time == pytest.approx(0.1, abs=0.05)
+
 
 # ---------------------------------------------------------------------------
 # HeadlessStatusIndicator
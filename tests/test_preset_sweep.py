@@ -0,0 +1,144 @@
+"""
+Tests for the sensitivity preset sweep: grid building, label scoring and agreement with GreenOnBrown.inference.
+
+Run: pytest tests/test_preset_sweep.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.greenonbrown import GreenOnBrown, ThresholdProfile
+from utils.preset_sweep import (SWEEP_KEYS, build_grid, evaluate_image, parse_values, rank, read_labels,
+                                run_sweep, score, section_text)
+
+BASE = {'exg_min': 25, 'exg_max': 200, 'hue_min': 39, 'hue_max': 83, 'saturation_min': 50, 'saturation_max': 220,
+        'brightness_min': 60, 'brightness_max': 190, 'min_detection_area': 10}
+
+
+def _field(seed=0, h=240, w=320):
+    rng = np.random.RandomState(seed)
+    img = np.full((h, w, 3), (40, 80, 120), dtype=np.uint8)
+    img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+    for _ in range(rng.randint(3, 8)):
+        cv2.circle(img, (rng.randint(15, w - 15), rng.randint(15, h - 15)), rng.randint(3, 15), (30, 170, 30), -1)
+    return img
+
+
+def _grid(**swept):
+    return build_grid({key: swept.get(key, [BASE[key]]) for key in SWEEP_KEYS})
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for i in range(4):
+        cv2.imwrite(str(tmp_path / f'{i:03d}.png'), _field(i))
+    return tmp_path
+
+
+class TestGrid:
+    @pytest.mark.parametrize('spec, expected', [
+        ('25', [25]),
+        ('30,20,25,20', [20, 25, 30]),
+        ('30:45:5', [30, 35, 40, 45]),
+        ('1:3', [1, 2, 3]),
+    ])
+    def test_parse_values(self, spec, expected):
+        assert parse_values(spec) == expected
+
+    @pytest.mark.parametrize('spec', ['1:5:0', '1:2:3:4', 'a,b'])
+    def test_parse_values_rejects_bad_specs(self, spec):
+        with pytest.raises(ValueError):
+            parse_values(spec)
+
+    def test_grid_skips_inverted_ranges(self):
+        profiles = _grid(hue_min=[30, 60, 90], hue_max=[50, 80])
+
+        pairs = [(p.hue_min, p.hue_max) for p in profiles]
+        assert pairs == [(30, 50), (30, 80), (60, 80)]
+
+
+class TestScoring:
+    def test_read_yolo_labels(self, tmp_path):
+        (tmp_path / 'a.txt').write_text('0 0.5 0.5 0.25 0.5\n1 0.1 0.1 0.1 0.1\n')
+
+        labels = read_labels(str(tmp_path / 'a.png'), (200, 400))
+        only_zero = read_labels(str(tmp_path / 'a.png'), (200, 400), classes={0})
+        missing = read_labels(str(tmp_path / 'b.png'), (200, 400))
+
+        assert labels.tolist() == [[150, 50, 100, 100], [20, 10, 40, 20]]
+        assert only_zero.tolist() == [[150, 50, 100, 100]]
+        assert missing.shape == (0, 4)
+
+    def test_score_counts_centres_inside_labels(self):
+        labels = np.array([[0, 0, 20, 20], [100, 100, 20, 20], [200, 200, 10, 10]], dtype=np.int32)
+        # Two detections in the first label, one in the second, one matching nothing
+        boxes = [[2, 2, 6, 6], [10, 10, 4, 4], [105, 105, 6, 6], [50, 50, 4, 4]]
+
+        assert score(boxes, labels) == (4, 3, 2, 3)
+        assert score([], labels) == (0, 0, 0, 3)
+
+    def test_rank_orders_by_f1(self):
+        profiles = _grid(min_detection_area=[1, 10, 100])
+        counts = np.array([[20, 10, 10, 10], [10, 9, 9, 10], [2, 2, 2, 10]])
+
+        rows = rank(profiles, counts, frames=2)
+
+        assert [row['min_detection_area'] for row in rows] == [10, 1, 100]
+        assert rows[0]['precision'] == pytest.approx(0.9)
+        assert rows[0]['per_frame'] == 5.0
+
+    def test_section_text(self):
+        row = dict(BASE)
+        text = section_text('dusk', row)
+
+        assert text.splitlines()[0] == '[Sensitivity_Dusk]'
+        assert 'min_detection_area = 10' in text
+
+
+class TestEvaluate:
+    @pytest.mark.parametrize('algorithm', ['exhsv', 'exg', 'nexg', 'hsv'])
+    def test_matches_inference_for_every_combination(self, algorithm):
+        frame = _field(3)
+        profiles = _grid(exg_min=[15, 30], hue_min=[30, 45], saturation_min=[30, 60], min_detection_area=[5, 40])
+        detector = GreenOnBrown(algorithm=algorithm)
+        labels = np.array([[0, 0, 160, 240]], dtype=np.int32)
+
+        counts = evaluate_image(frame, profiles, algorithm, detector, labels)
+
+        for profile, row in zip(profiles, counts):
+            _, boxes, _, _ = detector.inference(frame, algorithm=algorithm, profile=profile)
+            assert tuple(row) == score(boxes, labels)
+
+    def test_reference_mode_scores_reference_perfectly(self, image_dir):
+        profiles = _grid(min_detection_area=[BASE['min_detection_area'], 1500])
+        reference = ThresholdProfile(**BASE)
+
+        counts = run_sweep([str(p) for p in sorted(image_dir.glob('*.png'))], profiles, reference=reference,
+                           workers=1)
+        rows = rank(profiles, counts, frames=4)
+
+        assert rows[0]['min_detection_area'] == BASE['min_detection_area']
+        assert rows[0]['f1'] == 1.0
+        assert rows[1]['recall'] < 1.0
+
+    def test_process_pool_matches_in_process(self, image_dir):
+        paths = [str(p) for p in sorted(image_dir.glob('*.png'))]
+        profiles = _grid(exg_min=[15, 30], min_detection_area=[5, 40])
+        reference = ThresholdProfile(**BASE)
+
+        serial = run_sweep(paths, profiles, reference=reference, workers=1)
+        pooled = run_sweep(paths, profiles, reference=reference, workers=2)
+
+        np.testing.assert_array_equal(pooled, serial)
+
+    def test_unknown_algorithm_raises(self):
+        with pytest.raises(ValueError):
+            run_sweep([], _grid(), algorithm='gog')
@@ -0,0 +1,73 @@
+"""
+Tests for the frame loop's actuation steps: lost-track merging and relay assignment.
+
+Run: pytest tests/test_relay_assignment.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.relay_assignment import assign_relays, merge_lost_tracks
+from utils.tracker import ActuationGate
+
+
+class TestMergeLostTracks:
+    def test_lists_not_modified(self):
+        boxes, centres = [[0, 0, 10, 10]], [[5, 5]]
+
+        merged_boxes, merged_centres = merge_lost_tracks(boxes, centres, [[20, 20, 4, 4]], [[22, 22]])
+
+        assert merged_boxes == [[0, 0, 10, 10], [20, 20, 4, 4]]
+        assert merged_centres == [[5, 5], [22, 22]]
+        assert boxes == [[0, 0, 10, 10]] and centres == [[5, 5]]
+
+    def test_arrays_keep_dtype(self):
+        boxes = np.array([[0, 0, 10, 10]], dtype=np.int32)
+        centres = np.array([[5, 5]], dtype=np.int32)
+
+        merged_boxes, merged_centres = merge_lost_tracks(boxes, centres, [[20, 20, 4, 4]], [[22, 22]])
+
+        assert merged_boxes.dtype == np.int32 and merged_boxes.tolist() == [[0, 0, 10, 10], [20, 20, 4, 4]]
+        assert merged_centres.tolist() == [[5, 5], [22, 22]]
+        assert len(boxes) == 1
+
+    def test_nothing_lost(self):
+        boxes = np.empty((0, 4), dtype=np.int32)
+        centres = np.empty((0, 2), dtype=np.int32)
+
+        assert merge_lost_tracks(boxes, centres, [], []) == (boxes, centres)
+
+
+class TestAssignRelays:
+    LANE_WIDTH, RELAY_NUM, Y_THRESH = 160.0, 4, 100
+
+    def _assign(self, centres, **kwargs):
+        return assign_relays(centres, self.Y_THRESH, self.LANE_WIDTH, self.RELAY_NUM, **kwargs)
+
+    def test_lanes_in_zone(self):
+        centres = [[10, 50], [170, 150], [639, 479], [330, 100], [480, 99], [900, 200]]
+
+        assert self._assign(centres) == {1, 2, 3}
+        assert self._assign(np.array(centres, dtype=np.int32)) == {1, 2, 3}
+        assert self._assign(np.empty((0, 2), dtype=np.int32)) == set()
+
+    def test_gate_fires_each_track_once(self):
+        gate = ActuationGate()
+        centres = [[10, 150], [170, 150]]
+
+        assert self._assign(centres, track_ids=[1, 2], gate=gate, hold_s=0.5, now=0.0) == {0, 1}
+        # Track 1 still in the zone, track 3 new in lane 1
+        assert self._assign([[12, 160], [175, 160]], track_ids=[1, 3], gate=gate, hold_s=0.5, now=0.1) == {1}
+        assert self._assign([[12, 170]], track_ids=[1], gate=gate, hold_s=0.5, now=0.7) == {0}
+
+    def test_gated_tracks_outside_zone_not_recorded(self):
+        gate = ActuationGate()
+
+        assert self._assign([[10, 50]], track_ids=[1], gate=gate, hold_s=0.5, now=0.0) == set()
+        assert self._assign([[10, 150]], track_ids=[1], gate=gate, hold_s=0.5, now=0.1) == {0}
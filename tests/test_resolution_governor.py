@@ -0,0 +1,72 @@
+"""
+Tests for ResolutionGovernor: stepping the YOLO input size to keep the ground gap between frames covered.
+
+Run: pytest tests/test_resolution_governor.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.resolution_governor import ResolutionGovernor, parse_ladder
+
+
+class TestParseLadder:
+    def test_sorted_and_deduplicated(self):
+        assert parse_ladder('416, 256,320,256') == (256, 320, 416)
+
+    @pytest.mark.parametrize('spec', ['', '320,300', '0,320', 'big'])
+    def test_rejects_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_ladder(spec)
+
+
+class TestResolutionGovernor:
+    def test_starts_at_nearest_rung(self):
+        assert ResolutionGovernor(start=400).imgsz == 416
+
+    def test_steps_down_when_gap_nears_actuation_length(self):
+        governor = ResolutionGovernor(start=416)
+        # 10 km/h = 2.78 m/s; 100 ms per frame -> 27.8 cm gap against 25 cm of actuation
+        change = governor.update(100, 10.0, 25.0, now=0)
+
+        assert change['imgsz'] == 320 and change['previous'] == 416
+        assert change['reason'] == 'gap'
+        assert change['gap_cm'] == pytest.approx(27.8, abs=0.1)
+        assert governor.imgsz == 320
+
+    def test_hold_time_between_steps(self):
+        governor = ResolutionGovernor(start=512, hold_s=3.0)
+        assert governor.update(100, 10.0, 25.0, now=0) is not None
+        assert governor.update(100, 10.0, 25.0, now=2.0) is None
+        assert governor.update(100, 10.0, 25.0, now=3.5)['imgsz'] == 320
+
+    def test_hysteresis_band_holds(self):
+        governor = ResolutionGovernor(start=320)
+        # Gap at 70% of the length: below the step-down point, too high to step up
+        assert governor.update(70, 10.0, 27.8, now=0) is None
+        assert governor.imgsz == 320
+
+    def test_steps_up_with_margin(self):
+        governor = ResolutionGovernor(start=320)
+        # 20% of the length at 320 px predicts about 34% at 416 px
+        change = governor.update(20, 10.0, 27.8, now=0)
+
+        assert change['imgsz'] == 416 and change['reason'] == 'margin'
+
+    def test_stays_within_ladder(self):
+        governor = ResolutionGovernor(ladder=(256, 320), start=256)
+        assert governor.update(500, 20.0, 10.0, now=0) is None
+        assert governor.update(1, 1.0, 100.0, now=10)['imgsz'] == 320
+        assert governor.update(1, 1.0, 100.0, now=20) is None
+
+    @pytest.mark.parametrize('speed', [None, 0.2])
+    def test_holds_without_speed(self, speed):
+        governor = ResolutionGovernor(start=416)
+        assert governor.update(500, speed, 10.0, now=0) is None
+        assert governor.imgsz == 416
@@ -0,0 +1,116 @@
+"""
+Tests for StaticSceneGate: reusing the last detection result while the vehicle is stopped.
+
+Run: pytest tests/test_scene_gate.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.scene_gate import StaticSceneGate
+
+
+def _field(seed=0, h=480, w=640):
+    rng = np.random.RandomState(seed)
+    img = np.full((h, w, 3), (40, 80, 120), dtype=np.uint8)
+    img = cv2.add(img, rng.randint(0, 25, img.shape).astype(np.uint8))
+    for _ in range(10):
+        cv2.circle(img, (rng.randint(20, w - 20), rng.randint(20, h - 20)), rng.randint(5, 15), (30, 170, 30), -1)
+    return img
+
+
+def _noisy(frame, seed):
+    noise = np.random.RandomState(seed).randint(-6, 7, frame.shape)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+class TestFrameSignal:
+    def test_first_frame_runs_detection(self):
+        gate = StaticSceneGate()
+
+        assert not gate.should_reuse(_field(), now=0.0)
+
+    def test_same_scene_with_sensor_noise_is_reused(self):
+        gate = StaticSceneGate()
+        frame = _field()
+        gate.should_reuse(frame, now=0.0)
+
+        assert all(gate.should_reuse(_noisy(frame, seed), now=0.1 * seed) for seed in range(1, 8))
+        assert gate.reused == 7
+
+    def test_new_weed_forces_detection(self):
+        gate = StaticSceneGate()
+        frame = _field()
+        gate.should_reuse(frame, now=0.0)
+
+        changed = frame.copy()
+        cv2.circle(changed, (300, 200), 12, (30, 170, 30), -1)
+
+        assert not gate.should_reuse(changed, now=0.1)
+        assert gate.reused == 0
+
+    def test_max_age_forces_detection(self):
+        gate = StaticSceneGate(max_age=0.5)
+        frame = _field()
+        gate.should_reuse(frame, now=0.0)
+
+        assert gate.should_reuse(frame, now=0.4)
+        assert not gate.should_reuse(frame, now=0.5)
+        # The detection run restarts the age
+        assert gate.should_reuse(frame, now=0.9)
+
+    def test_gps_speed_vetoes_frame_signal(self):
+        gate = StaticSceneGate(speed_kmh=0.5)
+        frame = _field()
+        gate.should_reuse(frame, now=0.0)
+
+        assert not gate.should_reuse(frame, speed_kmh=3.0, now=0.1)
+        assert gate.should_reuse(frame, speed_kmh=0.2, now=0.2)
+
+    def test_reset_forgets_reference(self):
+        gate = StaticSceneGate()
+        frame = _field()
+        gate.should_reuse(frame, now=0.0)
+        gate.reset()
+
+        assert not gate.should_reuse(frame, now=0.1)
+
+
+class TestGpsSignal:
+    def test_stopped_vehicle_reuses_any_frame(self):
+        gate = StaticSceneGate(signal='gps')
+        gate.should_reuse(_field(0), speed_kmh=0.0, now=0.0)
+
+        assert gate.should_reuse(_field(1), speed_kmh=0.0, now=0.1)
+
+    def test_no_speed_means_moving(self):
+        gate = StaticSceneGate(signal='gps')
+        frame = _field()
+        gate.should_reuse(frame, speed_kmh=None, now=0.0)
+
+        assert not gate.should_reuse(frame, speed_kmh=None, now=0.1)
+
+    def test_both_needs_speed_and_static_frame(self):
+        gate = StaticSceneGate(signal='both')
+        frame = _field()
+        gate.should_reuse(frame, speed_kmh=0.0, now=0.0)
+
+        assert not gate.should_reuse(frame, speed_kmh=None, now=0.1)
+        gate.should_reuse(frame, speed_kmh=0.0, now=0.2)
+        assert not gate.should_reuse(_field(1), speed_kmh=0.0, now=0.3)
+        gate.should_reuse(frame, speed_kmh=0.0, now=0.4)
+        assert gate.should_reuse(frame, speed_kmh=0.0, now=0.5)
+
+
+@pytest.mark.parametrize('kwargs', [{'signal': 'speed'}, {'max_age': 0}])
+def test_invalid_arguments_raise(kwargs):
+    with pytest.raises(ValueError):
+        StaticSceneGate(**kwargs)
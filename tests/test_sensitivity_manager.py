@@ -192,6 +192,24 @@ class TestApplyPreset:
         assert sm.apply_preset('HIGH', owl) is True
         assert sm.apply_preset('Low', owl) is True
 
+    def test_rebuilds_threshold_profile_once(self, tmp_path):
+        from utils.greenonbrown import ThresholdProfile
+
+        config, path = _make_config(tmp_path)
+        sm = SensitivityManager(config, path)
+        owl = _FakeOwl()
+        owl.invert_hue = False
+        builds = []
+
+        def refresh():
+            builds.append(ThresholdProfile.from_attributes(owl))
+        owl.refresh_threshold_profile = refresh
+
+        sm.apply_preset('high', owl)
+        assert len(builds) == 1
+        assert builds[0].exg_min == 22
+        assert builds[0].min_detection_area == 5
+
 
 class TestSaveCustomPreset:
     def test_save_and_retrieve(self, tmp_path):
@@ -1,9 +1,11 @@
 """
-Unit tests for utils/tracker.py — ClassSmoother and CropMaskStabilizer.
+Unit tests for utils/tracker.py — ClassSmoother, CropMaskStabilizer, WeedTracker and ActuationGate.
 
-These are the temporal smoothing layers that sit on top of ByteTrack's
-track IDs. ClassSmoother does majority-vote class assignment per track;
-CropMaskStabilizer persists crop mask positions through detection dropouts.
+ClassSmoother and CropMaskStabilizer are the temporal smoothing layers that sit on
+top of ByteTrack's track IDs. ClassSmoother does majority-vote class assignment per
+track; CropMaskStabilizer persists crop mask positions through detection dropouts.
+WeedTracker is the NumPy tracker for GreenOnBrown detections, and ActuationGate
+fires each tracked weed once per actuation.
 
 Run: pytest tests/test_tracker.py -v
 """
@@ -19,7 +21,7 @@ PROJECT_ROOT = Path(__file__).parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from utils.tracker import ClassSmoother, CropMaskStabilizer
+from utils.tracker import ActuationGate, ClassSmoother, CropMaskStabilizer, WeedTracker
 
 
 # ============================================
@@ -353,3 +355,110 @@ class TestSmootherStabilizerIntegration:
 
         stabilizer.reset()
         assert stabilizer.active_count == 0
+
+
+# ============================================
+# WeedTracker
+# ============================================
+
+def _moving_boxes(frame, step=(0, 12)):
+    """Three weeds of different sizes sliding down the frame together, [x, y, w, h]."""
+    start = np.array([[40, 10, 20, 20], [200, 60, 12, 12], [400, 30, 40, 30]], dtype=np.float64)
+    return start + np.array([*step, 0, 0]) * frame
+
+
+class TestWeedTracker:
+    """IDs, constant-velocity prediction and lost-track persistence."""
+
+    def test_ids_stable_across_frames(self):
+        tracker = WeedTracker()
+        first = tracker.update(_moving_boxes(0))
+        for f in range(1, 10):
+            ids = tracker.update(_moving_boxes(f))
+
+        assert len(set(first.tolist())) == 3
+        assert ids.tolist() == first.tolist()
+
+    def test_small_fast_weed_matched_by_prediction(self):
+        """A 12 px weed moving 30 px per frame never overlaps its last box, only its prediction."""
+        tracker = WeedTracker()
+        boxes = [_moving_boxes(f, step=(0, 30))[1:2] for f in range(6)]
+        ids = [tracker.update(b)[0] for b in boxes]
+
+        assert len(set(ids)) == 1
+
+    def test_lost_track_coasts_at_constant_velocity(self):
+        tracker = WeedTracker(max_age=5)
+        for f in range(5):
+            ids = tracker.update(_moving_boxes(f))
+        # Weed 0 drops out for two frames
+        tracker.update(_moving_boxes(5)[1:])
+        tracker.update(_moving_boxes(6)[1:])
+
+        lost = tracker.get_lost_tracks()
+        assert [t['track_id'] for t in lost] == [ids[0]]
+        assert lost[0]['age'] == 2
+        np.testing.assert_allclose(lost[0]['xyxy'], [40, 82, 60, 102], atol=1)
+
+        # ... and keeps its ID when it comes back
+        assert tracker.update(_moving_boxes(7))[0] == ids[0]
+
+    def test_tracks_expire_after_max_age(self):
+        tracker = WeedTracker(max_age=2)
+        tracker.update(_moving_boxes(0))
+        tracker.update(_moving_boxes(1))
+        for _ in range(3):
+            tracker.update([])
+
+        assert len(tracker) == 0
+        assert tracker.get_lost_tracks() == []
+
+    def test_single_frame_blob_not_persisted(self):
+        tracker = WeedTracker(min_hits=2)
+        tracker.update([[10, 10, 5, 5]])
+        tracker.update([])
+
+        assert tracker.get_lost_tracks() == []
+
+    def test_new_track_starts_at_scene_velocity(self):
+        tracker = WeedTracker()
+        for f in range(4):
+            tracker.update(_moving_boxes(f)[:2])
+        # A newcomer seen once, then dropping out, is predicted with the scene's motion
+        tracker.update(np.vstack([_moving_boxes(4)[:2], [[300, 100, 20, 20]]]))
+        tracker.update(np.vstack([_moving_boxes(5)[:2], [[300, 112, 20, 20]]]))
+        tracker.update(_moving_boxes(6)[:2])
+
+        lost = tracker.get_lost_tracks()
+        assert len(lost) == 1
+        np.testing.assert_allclose(lost[0]['xyxy'][:2], [300, 124], atol=1)
+
+    def test_accepts_int32_arrays_and_empty_input(self):
+        tracker = WeedTracker()
+        assert tracker.update(np.empty((0, 4), dtype=np.int32)).tolist() == []
+        ids = tracker.update(_moving_boxes(0).astype(np.int32))
+        assert ids.dtype == np.int64 and len(ids) == 3
+
+    def test_reset(self):
+        tracker = WeedTracker()
+        tracker.update(_moving_boxes(0))
+        tracker.reset()
+
+        assert len(tracker) == 0
+        assert tracker.update(_moving_boxes(1)).tolist() == [1, 2, 3]
+
+
+class TestActuationGate:
+    """One firing per tracked weed per actuation."""
+
+    def test_fires_once_per_hold(self):
+        gate = ActuationGate()
+        assert gate.due([1, 2], hold_s=0.2, now=0.0).tolist() == [True, True]
+        assert gate.due([1, 2, 3], hold_s=0.2, now=0.1).tolist() == [False, False, True]
+        assert gate.due([1], hold_s=0.2, now=0.25).tolist() == [True]
+
+    def test_reset(self):
+        gate = ActuationGate()
+        gate.due([1], hold_s=1.0, now=0.0)
+        gate.reset()
+        assert gate.due([1], hold_s=1.0, now=0.1).tolist() == [True]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Run a detector over a recorded dataset and write every detection to a columnar file.
+
+Thresholds, algorithm and model come from the OWL config; --preset evaluates one or
+more [Sensitivity_*] presets in turn (one output file each). Frames are processed on a
+process pool with nothing displayed, and frames per second are reported per run.
+
+Usage:
+    python3 tools/batch_inference.py owl_data/ --preset low medium high
+    python3 tools/batch_inference.py field_run.mp4 --algorithm exhsv --workers 4 --output run.npz
+    python3 tools/batch_inference.py owl_data/ --algorithm gog --workers 1 --output gog.parquet
+
+Reading the output (.npz):
+    data = np.load('batch.npz')
+    data['frame'], data['x'], data['y'], data['w'], data['h']      # one row per detection
+    data['frame_source'], data['frame_detections']                 # one row per frame
+"""
+import argparse
+import configparser
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.batch_inference import run_batch, write_columns
+from utils.greenonbrown import ThresholdProfile
+from utils.sensitivity_manager import SensitivityManager
+
+
+def build_spec(config, algorithm, resolution, model_path=None):
+    """Detector spec for run_batch() from the config sections owl.py reads."""
+    detect_classes = [c.strip() for c in config.get('GreenOnGreen', 'detect_classes', fallback='').split(',')
+                      if c.strip()]
+    return {
+        'algorithm': algorithm,
+        'resolution': resolution,
+        'blob_backend': config.get('GreenOnBrown', 'blob_backend', fallback='contours').strip().lower(),
+        'threshold_method': config.get('GreenOnBrown', 'threshold_method', fallback='gaussian'),
+        'model_path': model_path or config.get('GreenOnGreen', 'model_path', fallback='models'),
+        'confidence': config.getfloat('GreenOnGreen', 'confidence', fallback=0.5),
+        'detect_classes': detect_classes or None,
+        'inference_resolution': config.getint('GreenOnGreen', 'inference_resolution', fallback=320),
+        'crop_buffer_px': config.getint('GreenOnGreen', 'crop_buffer_px', fallback=20),
+    }
+
+
+def config_profile(config):
+    """ThresholdProfile from the [GreenOnBrown] section."""
+    values = {name: config.getint('GreenOnBrown', name) for name in ThresholdProfile.FIELDS if name != 'invert_hue'}
+    return ThresholdProfile(invert_hue=config.getboolean('GreenOnBrown', 'invert_hue', fallback=False), **values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline batch inference over a directory, video or image')
+    parser.add_argument('input', help='Directory of images, video file or single image')
+    parser.add_argument('--config', default=str(PROJECT_ROOT / 'config' / 'GENERAL_CONFIG.ini'),
+                        help='OWL config file (default: config/GENERAL_CONFIG.ini)')
+    parser.add_argument('--preset', nargs='+', default=None,
+                        help='Sensitivity preset(s) to evaluate (default: the [GreenOnBrown] thresholds)')
+    parser.add_argument('--algorithm', default=None, help='Detection algorithm (default: [System] algorithm)')
+    parser.add_argument('--model', default=None, help='YOLO model for gog/gog-hybrid (default: [GreenOnGreen])')
+    parser.add_argument('--output', default='batch_inference.npz',
+                        help='Output file, .npz or .parquet; one file per preset (default: batch_inference.npz)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=16, help='Frames per worker task (default: 16)')
+    parser.add_argument('--max-frames', type=int, default=None, help='Stop after this many frames')
+    parser.add_argument('--resolution', default=None,
+                        help='Resize frames to WxH first, as the camera would deliver them (default: as recorded)')
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    if not config.read(args.config):
+        parser.error(f'Cannot read config: {args.config}')
+
+    algorithm = (args.algorithm or config.get('System', 'algorithm', fallback='exhsv')).strip().lower()
+    resolution = tuple(map(int, args.resolution.lower().split('x'))) if args.resolution else None
+    spec = build_spec(config, algorithm, resolution, args.model)
+
+    runs = [(None, config_profile(config))]
+    if args.preset:
+        presets = SensitivityManager(config, args.config)
+        runs = []
+        for name in args.preset:
+            values = presets.get_preset_values(name)
+            if values is None:
+                parser.error(f'Unknown sensitivity preset: {name}')
+            values.setdefault('invert_hue', config.getboolean('GreenOnBrown', 'invert_hue', fallback=False))
+            runs.append((name.lower(), ThresholdProfile(**values)))
+
+    output = Path(args.output)
+    suffix = output.suffix if output.suffix in ('.npz', '.parquet') else '.npz'
+    stem = output.with_suffix('') if output.suffix in ('.npz', '.parquet') else output
+
+    print(f'Input: {args.input}  Algorithm: {algorithm}  Workers: {args.workers or os.cpu_count()}')
+    summary = []
+    for name, profile in runs:
+        spec['profile'] = profile
+        detections, frames, stats = run_batch(args.input, spec, workers=args.workers,
+                                              chunk_size=args.chunk_size, max_frames=args.max_frames)
+        path = write_columns(f'{stem}_{name}{suffix}' if name else f'{stem}{suffix}', detections, frames)
+        summary.append((name or 'config', stats, path))
+        print(f'  {name or "config":>10s}: {stats["frames"]} frames, {stats["detections"]} detections, '
+              f'{stats["fps"]:.1f} FPS -> {path}')
+
+    print()
+    print(f'  {"preset":>10s} {"frames":>7s} {"det/frame":>9s} {"FPS":>7s} {"median":>9s} {"p95":>9s}')
+    for name, stats, _ in summary:
+        per_frame = stats['detections'] / stats['frames'] if stats['frames'] else 0.0
+        print(f'  {name:>10s} {stats["frames"]:7d} {per_frame:9.2f} {stats["fps"]:7.1f} '
+              f'{stats["median_ms"]:7.2f}ms {stats["p95_ms"]:7.2f}ms')
+    print()
+    print('  median/p95: per-frame worker time (decode + detect); FPS: frames / wall time across all workers')
+
+
+if __name__ == '__main__':
+    main()
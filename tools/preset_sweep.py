@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Sweep GreenOnBrown thresholds over recorded imagery and rank every combination.
+
+Each threshold flag takes a single value, a comma list (20,25,30) or an inclusive
+start:stop:step range (30:45:5); unswept thresholds stay at the --preset values.
+Images with YOLO .txt labels (next to the images, or in --labels) are scored on
+precision/recall of detection centres against the label boxes. Without labels, the
+detections of the --reference preset stand in for them, which ranks combinations by
+agreement with that preset rather than by true accuracy.
+
+The best combination is printed as a [Sensitivity_<Name>] section ready to paste into
+the config, or saved directly with --save.
+
+Usage:
+    python3 tools/preset_sweep.py field/images --labels field/labels --exg-min 20:35:5 --hue-min 30:45:5
+    python3 tools/preset_sweep.py owl_data/ --preset medium --min-area 5,10,20 --sat-min 30,50 --save --name dusk
+"""
+import argparse
+import configparser
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.greenonbrown import ThresholdProfile
+from utils.preset_sweep import (SWEEP_ALGORITHMS, SWEEP_KEYS, build_grid, has_labels, list_images, parse_values,
+                                rank, run_sweep, section_text)
+from utils.sensitivity_manager import SensitivityManager
+
+# CLI flag for each swept key
+FLAGS = {
+    'exg_min': 'exg-min', 'exg_max': 'exg-max',
+    'hue_min': 'hue-min', 'hue_max': 'hue-max',
+    'saturation_min': 'sat-min', 'saturation_max': 'sat-max',
+    'brightness_min': 'bright-min', 'brightness_max': 'bright-max',
+    'min_detection_area': 'min-area',
+}
+
+
+def preset_values(presets, name):
+    """Threshold values of a sensitivity preset."""
+    values = presets.get_preset_values(name)
+    if values is None:
+        raise ValueError(f'Unknown sensitivity preset: {name}')
+    return {key: int(values[key]) for key in SWEEP_KEYS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank GreenOnBrown threshold combinations over recorded images')
+    parser.add_argument('input', help='Directory of images or single image')
+    parser.add_argument('--config', default=str(PROJECT_ROOT / 'config' / 'GENERAL_CONFIG.ini'),
+                        help='OWL config file (default: config/GENERAL_CONFIG.ini)')
+    parser.add_argument('--preset', default=None,
+                        help='Preset supplying the unswept thresholds (default: the active preset)')
+    parser.add_argument('--reference', default=None,
+                        help='Preset whose detections stand in for labels on unlabelled images (default: --preset)')
+    parser.add_argument('--labels', default=None, help='Directory of YOLO .txt labels (default: next to the images)')
+    parser.add_argument('--label-classes', default=None, help='Label class ids counted as weeds, e.g. 0,2 (default: all)')
+    parser.add_argument('--algorithm', default=None,
+                        help=f'One of {", ".join(SWEEP_ALGORITHMS)} (default: [System] algorithm, else exhsv)')
+    for key, flag in FLAGS.items():
+        parser.add_argument(f'--{flag}', dest=key, default=None, help=f'{key} values: N, A,B,C or start:stop[:step]')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--max-images', type=int, default=None, help='Use at most this many images')
+    parser.add_argument('--resolution', default=None,
+                        help='Resize images to WxH first, as the camera would deliver them (default: as recorded)')
+    parser.add_argument('--top', type=int, default=20, help='Rows of the ranked table to print (default: 20)')
+    parser.add_argument('--name', default='sweep', help='Name of the best-combination preset (default: sweep)')
+    parser.add_argument('--save', action='store_true', help='Save the best combination as a custom preset')
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    if not config.read(args.config):
+        parser.error(f'Cannot read config: {args.config}')
+    presets = SensitivityManager(config, args.config)
+
+    algorithm = (args.algorithm or config.get('System', 'algorithm', fallback='exhsv')).strip().lower()
+    if algorithm not in SWEEP_ALGORITHMS:
+        if args.algorithm:
+            parser.error(f"Cannot sweep '{algorithm}', must be one of {', '.join(SWEEP_ALGORITHMS)}")
+        algorithm = 'exhsv'
+    resolution = tuple(map(int, args.resolution.lower().split('x'))) if args.resolution else None
+    invert_hue = config.getboolean('GreenOnBrown', 'invert_hue', fallback=False)
+
+    base_name = args.preset or presets.get_active_preset()
+    reference_name = args.reference or base_name
+    try:
+        base = preset_values(presets, base_name)
+        values = {key: parse_values(getattr(args, key)) if getattr(args, key) else [base[key]] for key in SWEEP_KEYS}
+        image_paths = list_images(args.input, args.max_images)
+    except ValueError as e:
+        parser.error(str(e))
+
+    profiles = build_grid(values, invert_hue=invert_hue)
+    if not profiles:
+        parser.error('No valid combinations: every combination has a min above its max')
+    if not image_paths:
+        parser.error(f'No images found in {args.input}')
+
+    reference = None
+    if not has_labels(image_paths, args.labels):
+        try:
+            reference = ThresholdProfile(invert_hue=invert_hue, **preset_values(presets, reference_name))
+        except ValueError as e:
+            parser.error(str(e))
+        print(f'No labels found: scoring against the detections of preset {reference_name}')
+    classes = {int(c) for c in args.label_classes.split(',')} if args.label_classes else None
+
+    print(f'Input: {args.input}  Images: {len(image_paths)}  Algorithm: {algorithm}  '
+          f'Combinations: {len(profiles)}  Workers: {args.workers or os.cpu_count()}')
+    start = time.perf_counter()
+    counts = run_sweep(image_paths, profiles, algorithm=algorithm,
+                       threshold_method=config.get('GreenOnBrown', 'threshold_method', fallback='gaussian'),
+                       reference=reference, labels_dir=args.labels, classes=classes, resolution=resolution,
+                       workers=args.workers)
+    elapsed = time.perf_counter() - start
+    rows = rank(profiles, counts, len(image_paths))
+
+    swept = [key for key in SWEEP_KEYS if len(values[key]) > 1] or list(SWEEP_KEYS)
+    print()
+    print('  ' + ' '.join(f'{FLAGS[key]:>10s}' for key in swept) + f' {"F1":>6s} {"prec":>6s} {"recall":>6s} '
+          f'{"det/frame":>9s}')
+    for row in rows[:args.top]:
+        print('  ' + ' '.join(f'{row[key]:10d}' for key in swept) + f' {row["f1"]:6.3f} {row["precision"]:6.3f} '
+              f'{row["recall"]:6.3f} {row["per_frame"]:9.2f}')
+    print()
+    print(f'  {len(profiles)} combinations x {len(image_paths)} images in {elapsed:.1f}s')
+    print()
+    print(section_text(args.name, rows[0]))
+
+    if args.save:
+        if not presets.save_custom_preset(args.name, {key: rows[0][key] for key in SWEEP_KEYS}):
+            parser.error(f'Failed to save preset {args.name}')
+        print(f'Saved preset {args.name} to {presets.config_path}')
+
+
+if __name__ == '__main__':
+    main()
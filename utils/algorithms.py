@@ -6,29 +6,79 @@ import cv2
 To add a new algorithm the only requirement is that it accepts a BGR (opencv) image and returns a grayscale
 image as an output. If it returns a binary image (like hsv) then it must return a boolean True in addition to the image
 as it has already been thresholded.
+
+The built-in ExG/HSV kernels also accept optional keyword-only `out` and `workspace` arguments. When GreenOnBrown
+passes its per-resolution workspace (see greenonbrown.FrameWorkspace) every intermediate array is reused from frame to
+frame instead of being reallocated. Called without them they allocate as normal. The HSV-based kernels also take
+`bounds`, the precomputed inRange limits from hsv_bounds(), so callers holding a ThresholdProfile skip rebuilding the
+bound arrays on every frame.
 """
 
 
+def _scratch(workspace, name, shape, dtype=np.uint8):
+    """Return a named scratch array from the workspace, or a fresh one when there is no workspace."""
+    if workspace is None:
+        return np.empty(shape, dtype=dtype)
+    return workspace.buffer(name, shape, dtype)
+
+
+def _split_float(image, workspace):
+    """Split a BGR image into three float32 channel arrays."""
+    shape = image.shape[:2]
+    channels = [_scratch(workspace, name, shape) for name in ('blue', 'green', 'red')]
+    channels_f = [_scratch(workspace, f'{name}_f', shape, np.float32) for name in ('blue', 'green', 'red')]
+    # OPTIMIZED: cv2.split is faster than array slicing when we need copies
+    cv2.split(image, channels)
+    for channel, channel_f in zip(channels, channels_f):
+        np.copyto(channel_f, channel)
+
+    return channels_f
+
+
+def hsv_bounds(hue_min, hue_max, brightness_min, brightness_max, saturation_min, saturation_max, invert_hue=False):
+    """
+    Build the inRange limits for an HSV threshold. The result is a tuple of read-only (lower, upper) uint8 pairs
+    that are OR-ed together: one pair normally, two when invert_hue selects hues outside [hue_min, hue_max].
+    """
+    if not invert_hue:
+        ranges = (([hue_min, saturation_min, brightness_min], [hue_max, saturation_max, brightness_max]),)
+    else:
+        ranges = (([0, saturation_min, brightness_min], [hue_min, saturation_max, brightness_max]),
+                  ([hue_max, saturation_min, brightness_min], [180, saturation_max, brightness_max]))
+
+    bounds = []
+    for lower, upper in ranges:
+        lower = np.array(lower, dtype=np.uint8)
+        upper = np.array(upper, dtype=np.uint8)
+        lower.flags.writeable = False
+        upper.flags.writeable = False
+        bounds.append((lower, upper))
+    return tuple(bounds)
+
+
 ##############################
 
-def exg(image):
+def exg(image, *, out=None, workspace=None):
     """
     Takes an image and processes it using ExG. Returns a single channel exG output.
     Developed by Woebbecke et al. 1995.
+    :param out: optional uint8 array to write the result into
+    :param workspace: optional FrameWorkspace supplying scratch buffers
     :return: grayscale image
     """
-    # OPTIMIZED: cv2.split is faster than array slicing when we need copies
-    blue, green, red = cv2.split(image)
-    blue = blue.astype(np.float32)
-    green = green.astype(np.float32)
-    red = red.astype(np.float32)
+    blue, green, red = _split_float(image, workspace)
 
-    image_out = 2 * green - red - blue
+    # 2g - r - b, computed in-place in the green buffer
+    np.multiply(green, 2.0, out=green)
+    np.subtract(green, red, out=green)
+    np.subtract(green, blue, out=green)
     # Clip to 0-255 range then convert (convertScaleAbs takes absolute value)
-    np.clip(image_out, 0, 255, out=image_out)
-    image_out = image_out.astype('uint8')
+    np.clip(green, 0, 255, out=green)
+    if out is None:
+        out = np.empty(image.shape[:2], dtype=np.uint8)
+    np.copyto(out, green, casting='unsafe')
 
-    return image_out
+    return out
 
 
 def maxg(image):
@@ -51,18 +101,19 @@ def maxg(image):
     return image_out
 
 
-def exg_standardised(image):
+def exg_standardised(image, *, out=None, workspace=None):
     '''
     Takes an input image in int8 format and calculates the standardised ExG algorithm
     :param image: image as a BGR array (i.e. opened with opencv not PIL)
+    :param out: optional uint8 array to write the result into
+    :param workspace: optional FrameWorkspace supplying scratch buffers
     :return: returns a grayscale image
     '''
-    blue, green, red = cv2.split(image)
-    blue = blue.astype(np.float32)
-    green = green.astype(np.float32)
-    red = red.astype(np.float32)
+    blue, green, red = _split_float(image, workspace)
 
-    channel_sum = red + green + blue
+    channel_sum = _scratch(workspace, 'channel_sum_f', image.shape[:2], np.float32)
+    np.add(red, green, out=channel_sum)
+    np.add(channel_sum, blue, out=channel_sum)
     np.maximum(channel_sum, 1.0, out=channel_sum)
 
     # Single division: (2g - r - b) / sum (reuse green buffer in-place)
@@ -72,9 +123,12 @@ def exg_standardised(image):
     np.divide(green, channel_sum, out=green)
     np.multiply(green, 255.0, out=green)
     np.clip(green, 0, 255, out=green)
-    image_out = green.astype('uint8')
+    if out is None:
+        out = np.empty(image.shape[:2], dtype=np.uint8)
+    # unsafe cast truncates exactly like astype('uint8')
+    np.copyto(out, green, casting='unsafe')
 
-    return image_out
+    return out
 
 
 def exg_standardised_hue(image,
@@ -84,7 +138,11 @@ def exg_standardised_hue(image,
                          brightness_max=220,
                          saturation_min=30,
                          saturation_max=255,
-                         invert_hue=False):
+                         invert_hue=False,
+                         *,
+                         bounds=None,
+                         out=None,
+                         workspace=None):
     '''
     Takes an image and performs a combined ExG + HSV algorithm
     :param image: image as a BGR array (i.e. opened with opencv not PIL)
@@ -95,43 +153,89 @@ def exg_standardised_hue(image,
     :param saturation_min: minimum saturation
     :param saturation_max: maximum saturation
     :param invert_hue: inverts the hue threshold to exclude anything within the thresholds
+    :param bounds: optional precomputed hsv_bounds(), used instead of the individual thresholds
+    :param out: optional uint8 array to write the result into
+    :param workspace: optional FrameWorkspace supplying scratch buffers
     :return: returns a grayscale image
     '''
-    blue, green, red = cv2.split(image)
-    blue = blue.astype(np.float32)
-    green = green.astype(np.float32)
-    red = red.astype(np.float32)
+    image_out = exg_standardised(image, out=out, workspace=workspace)
+    hsv_thresh, _ = hsv(image, hue_min=hue_min, hue_max=hue_max,
+                        brightness_min=brightness_min, brightness_max=brightness_max,
+                        saturation_min=saturation_min, saturation_max=saturation_max,
+                        invert_hue=invert_hue, bounds=bounds,
+                        out=_scratch(workspace, 'hsv_thresh', image.shape[:2]), workspace=workspace)
 
-    channel_sum = red + green + blue
-    np.maximum(channel_sum, 1.0, out=channel_sum)
+    cv2.bitwise_and(hsv_thresh, image_out, dst=image_out)
 
-    # Single division: (2g - r - b) / sum (reuse green buffer in-place)
-    np.multiply(green, 2.0, out=green)
-    np.subtract(green, red, out=green)
-    np.subtract(green, blue, out=green)
-    np.divide(green, channel_sum, out=green)
-    np.multiply(green, 255.0, out=green)
-    np.clip(green, 0, 255, out=green)
-    image_out = green.astype('uint8')
+    return image_out
 
-    # OPTIMIZED: single inRange on 3-channel HSV (biggest speedup ~1.5x)
-    hsv_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
 
-    if not invert_hue:
-        lower = np.array([hue_min, saturation_min, brightness_min], dtype=np.uint8)
-        upper = np.array([hue_max, saturation_max, brightness_max], dtype=np.uint8)
-        hsv_thresh = cv2.inRange(hsv_image, lower, upper)
-    else:
-        # For inverted hue, select pixels outside the hue range
-        lower1 = np.array([0, saturation_min, brightness_min], dtype=np.uint8)
-        upper1 = np.array([hue_min, saturation_max, brightness_max], dtype=np.uint8)
-        lower2 = np.array([hue_max, saturation_min, brightness_min], dtype=np.uint8)
-        upper2 = np.array([180, saturation_max, brightness_max], dtype=np.uint8)
-        mask1 = cv2.inRange(hsv_image, lower1, upper1)
-        mask2 = cv2.inRange(hsv_image, lower2, upper2)
-        hsv_thresh = cv2.bitwise_or(mask1, mask2)
+def exg_standardised_int(image, *, out=None, workspace=None):
+    '''
+    Integer fixed-point version of exg_standardised. Never leaves uint8/uint16, so there are no float32 copies
+    of the frame. Uses (2g - r - b) == (3g - sum): the uint16 subtract saturates negatives to 0 (the lower clip),
+    and cv2.divide fuses the division, x255 scale and saturation to uint8 (the upper clip) in a single pass.
+    Tolerance: cv2.divide rounds to nearest where the float version truncates, so output is within +1 grey level
+    of exg_standardised (roughly 1 in 5 pixels differ by exactly 1, none by more).
+    :param image: image as a BGR array (i.e. opened with opencv not PIL)
+    :param out: optional uint8 array to write the result into
+    :param workspace: optional FrameWorkspace supplying scratch buffers
+    :return: returns a grayscale image
+    '''
+    shape = image.shape[:2]
+    blue, green, red = cv2.split(image, [_scratch(workspace, name, shape) for name in ('blue', 'green', 'red')])
+
+    channel_sum = _scratch(workspace, 'channel_sum', shape, np.uint16)
+    cv2.add(blue, green, dst=channel_sum, dtype=cv2.CV_16U)
+    cv2.add(channel_sum, red, dst=channel_sum, dtype=cv2.CV_16U)
+
+    numerator = _scratch(workspace, 'numerator', shape, np.uint16)
+    cv2.multiply(green, 3, dst=numerator, dtype=cv2.CV_16U)
+    cv2.subtract(numerator, channel_sum, dst=numerator)
+
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    # integer division by zero (black pixel) returns 0, so no zero-guard is needed
+    cv2.divide(numerator, channel_sum, dst=out, scale=255, dtype=cv2.CV_8U)
+
+    return out
+
+
+def exg_standardised_hue_int(image,
+                             hue_min=30,
+                             hue_max=90,
+                             brightness_min=10,
+                             brightness_max=220,
+                             saturation_min=30,
+                             saturation_max=255,
+                             invert_hue=False,
+                             *,
+                             bounds=None,
+                             out=None,
+                             workspace=None):
+    '''
+    Integer fixed-point version of exg_standardised_hue (see exg_standardised_int for the tolerance)
+    :param image: image as a BGR array (i.e. opened with opencv not PIL)
+    :param hue_min: minimum hue value
+    :param hue_max: maximum hue value
+    :param brightness_min: minimum 'value' or brightness value
+    :param brightness_max: maximum 'value' or brightness value
+    :param saturation_min: minimum saturation
+    :param saturation_max: maximum saturation
+    :param invert_hue: inverts the hue threshold to exclude anything within the thresholds
+    :param bounds: optional precomputed hsv_bounds(), used instead of the individual thresholds
+    :param out: optional uint8 array to write the result into
+    :param workspace: optional FrameWorkspace supplying scratch buffers
+    :return: returns a grayscale image
+    '''
+    image_out = exg_standardised_int(image, out=out, workspace=workspace)
+    hsv_thresh, _ = hsv(image, hue_min=hue_min, hue_max=hue_max,
+                        brightness_min=brightness_min, brightness_max=brightness_max,
+                        saturation_min=saturation_min, saturation_max=saturation_max,
+                        invert_hue=invert_hue, bounds=bounds,
+                        out=_scratch(workspace, 'hsv_thresh', image.shape[:2]), workspace=workspace)
 
-    image_out = hsv_thresh & image_out
+    cv2.bitwise_and(hsv_thresh, image_out, dst=image_out)
 
     return image_out
 
@@ -164,7 +268,11 @@ def hsv(image,
         brightness_max=220,
         saturation_min=30,
         saturation_max=255,
-        invert_hue=False):
+        invert_hue=False,
+        *,
+        bounds=None,
+        out=None,
+        workspace=None):
     """
     Performs an HSV thresholding operation on the input image
     :param image: image as a BGR array (i.e. opened with opencv not PIL)
@@ -175,26 +283,30 @@ def hsv(image,
     :param saturation_min: minimum saturation threshold
     :param saturation_max: maximum saturation threshold
     :param invert_hue: inverts the hue threshold to exclude anything within the thresholds
+    :param bounds: optional precomputed hsv_bounds(), used instead of the individual thresholds
+    :param out: optional uint8 array to write the binary mask into
+    :param workspace: optional FrameWorkspace supplying scratch buffers
     :return: returns a binary image and boolean thresholded or not
     """
+    shape = image.shape[:2]
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+
     # OPTIMIZED: single inRange on 3-channel HSV instead of 3 separate calls
-    hsv_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hsv_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=_scratch(workspace, 'hsv_image', image.shape))
 
-    if not invert_hue:
-        lower = np.array([hue_min, saturation_min, brightness_min], dtype=np.uint8)
-        upper = np.array([hue_max, saturation_max, brightness_max], dtype=np.uint8)
-        out_thresh = cv2.inRange(hsv_image, lower, upper)
-    else:
-        # For inverted hue, select pixels outside the hue range
-        lower1 = np.array([0, saturation_min, brightness_min], dtype=np.uint8)
-        upper1 = np.array([hue_min, saturation_max, brightness_max], dtype=np.uint8)
-        lower2 = np.array([hue_max, saturation_min, brightness_min], dtype=np.uint8)
-        upper2 = np.array([180, saturation_max, brightness_max], dtype=np.uint8)
-        mask1 = cv2.inRange(hsv_image, lower1, upper1)
-        mask2 = cv2.inRange(hsv_image, lower2, upper2)
-        out_thresh = cv2.bitwise_or(mask1, mask2)
-
-    return out_thresh, True
+    if bounds is None:
+        bounds = hsv_bounds(hue_min, hue_max, brightness_min, brightness_max, saturation_min, saturation_max,
+                            invert_hue)
+
+    lower, upper = bounds[0]
+    cv2.inRange(hsv_image, lower, upper, dst=out)
+    # For inverted hue, OR in the second range (pixels above hue_max)
+    for lower, upper in bounds[1:]:
+        mask2 = cv2.inRange(hsv_image, lower, upper, dst=_scratch(workspace, 'hsv_thresh_upper', shape))
+        cv2.bitwise_or(out, mask2, dst=out)
+
+    return out, True
 
 
 # for NIR images only
@@ -0,0 +1,243 @@
+"""
+Offline batch inference for evaluating detectors on recorded datasets.
+
+A directory of images, a video or a single image is streamed through a pool of worker processes, each holding its own
+detector (GreenOnBrown, or GreenOnGreen for 'gog'/'gog-hybrid'). Detections are collected into columns, one row per
+detection, plus a per-frame table, and written to a columnar file (.npz, or .parquet when pyarrow is installed).
+Nothing is drawn or displayed, so throughput is bounded only by decoding and detection.
+
+Used by tools/batch_inference.py.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# One row per detection. class_id is -1 and confidence NaN for GreenOnBrown detections
+DETECTION_COLUMNS = ('frame', 'x', 'y', 'w', 'h', 'cx', 'cy', 'class_id', 'confidence')
+# One row per frame
+FRAME_COLUMNS = ('frame_index', 'frame_source', 'frame_ms', 'frame_detections')
+# Frames per YOLO predict call in pure 'gog' mode
+GOG_BATCH_SIZE = 8
+
+# Per-process detector, created once by the pool initializer
+_worker_detector = None
+_worker_spec = None
+
+
+def make_detector(spec):
+    """
+    Build a detector from a picklable spec dict: 'algorithm' plus optional 'model_path', 'confidence',
+    'detect_classes', 'inference_resolution', 'crop_buffer_px' (GreenOnGreen) or 'blob_backend',
+    'threshold_method' (GreenOnBrown).
+    """
+    algorithm = spec['algorithm']
+    if algorithm in ('gog', 'gog-hybrid'):
+        from utils.greenongreen import GreenOnGreen
+        return GreenOnGreen(model_path=spec.get('model_path', 'models'),
+                            confidence=spec.get('confidence', 0.5),
+                            detect_classes=spec.get('detect_classes'),
+                            hybrid_mode=algorithm == 'gog-hybrid',
+                            inference_resolution=spec.get('inference_resolution', 320),
+                            crop_buffer_px=spec.get('crop_buffer_px', 20))
+
+    from utils.greenonbrown import GreenOnBrown
+    return GreenOnBrown(algorithm=algorithm,
+                        blob_backend=spec.get('blob_backend', 'contours'),
+                        threshold_method=spec.get('threshold_method', 'gaussian'))
+
+
+def iter_sources(path, max_frames=None):
+    """
+    Yield (source, frame) for every frame in path. Directory and single-image frames are None (the worker reads the
+    file, so decoding is parallel too); video frames are decoded here since a video can only be read in order.
+    """
+    if os.path.isdir(path):
+        names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:max_frames]:
+            yield os.path.join(path, name), None
+        return
+
+    if not os.path.isfile(path):
+        raise ValueError(f'[ERROR] Invalid path to image/s: {path}')
+
+    if path.lower().endswith(IMAGE_EXTENSIONS):
+        yield path, None
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f'[ERROR] Cannot open video file: {path}')
+    name = os.path.basename(path)
+    count = 0
+    try:
+        while max_frames is None or count < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield f'{name}:{count}', frame
+            count += 1
+    finally:
+        cap.release()
+
+
+def _init_worker(spec):
+    global _worker_detector, _worker_spec
+    # One detector per process; keep OpenCV from oversubscribing the cores the pool already uses
+    cv2.setNumThreads(1)
+    _worker_spec = spec
+    _worker_detector = make_detector(spec)
+
+
+def _load_frames(chunk, resolution):
+    for _, source, frame in chunk:
+        if frame is None:
+            frame = cv2.imread(source)
+            if frame is None:
+                raise ValueError(f'[ERROR] Cannot read image: {source}')
+        if resolution is not None and frame.shape[1::-1] != tuple(resolution):
+            frame = cv2.resize(frame, tuple(resolution), interpolation=cv2.INTER_AREA)
+        yield frame
+
+
+def _spread_batches(frame_ms, batch_size):
+    """Share each batch's time (decode + detect) equally among its frames; float32 per-frame ms."""
+    frame_ms = np.asarray(frame_ms, dtype=np.float32)
+    for start in range(0, len(frame_ms) if batch_size > 1 else 0, batch_size):
+        batch = frame_ms[start:start + batch_size]
+        batch[:] = batch.sum() / len(batch)
+    return frame_ms
+
+
+def _run_chunk(chunk, detector=None, spec=None):
+    """Detect on a list of (index, source, frame-or-None); returns (detection columns, frame columns) for it."""
+    detector = detector or _worker_detector
+    spec = spec or _worker_spec
+    frames = _load_frames(chunk, spec.get('resolution'))
+
+    # Pure 'gog' predicts GOG_BATCH_SIZE frames in one call, so the time between results lands on each batch's first frame
+    batch_size = GOG_BATCH_SIZE if spec['algorithm'] == 'gog' else 1
+    if spec['algorithm'] in ('gog', 'gog-hybrid'):
+        kwargs = {'profile': spec['profile']} if spec['algorithm'] == 'gog-hybrid' else {'batch_size': batch_size}
+        results = detector.inference_batch(frames, confidence=spec.get('confidence', 0.5), **kwargs)
+    else:
+        results = (result + (None, None) for result in
+                   detector.inference_batch(frames, algorithm=spec['algorithm'], profile=spec['profile']))
+
+    detections = {name: [] for name in DETECTION_COLUMNS}
+    frame_ms = []
+    frame_detections = []
+    t0 = time.perf_counter()
+    for (index, _, _), (boxes, weed_centres, class_ids, confidences) in zip(chunk, results):
+        t1 = time.perf_counter()
+        frame_ms.append((t1 - t0) * 1000)
+        t0 = t1
+
+        count = len(boxes)
+        frame_detections.append(count)
+        detections['frame'].append(np.full(count, index, dtype=np.int32))
+        for column, values in zip(('x', 'y', 'w', 'h'), boxes.T):
+            detections[column].append(values)
+        detections['cx'].append(weed_centres[:, 0])
+        detections['cy'].append(weed_centres[:, 1])
+        detections['class_id'].append(class_ids if class_ids is not None else np.full(count, -1, dtype=np.int32))
+        detections['confidence'].append(confidences if confidences is not None
+                                        else np.full(count, np.nan, dtype=np.float32))
+
+    detections = {name: np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+                  for name, parts in detections.items()}
+    frames = {'frame_index': np.array([index for index, _, _ in chunk], dtype=np.int32),
+              'frame_ms': _spread_batches(frame_ms, batch_size),
+              'frame_detections': np.array(frame_detections, dtype=np.int32)}
+    return detections, frames
+
+
+def run_batch(path, spec, workers=None, chunk_size=16, max_frames=None):
+    """
+    Run the detector described by spec over every frame in path.
+    :param spec: make_detector() spec plus 'profile' (a ThresholdProfile) and optional 'resolution' (w, h)
+    :param workers: worker processes (default: all cores); 1 runs in this process
+    :param chunk_size: frames handed to a worker at a time
+    :return: (detections, frames, stats) where detections and frames are dicts of column arrays
+    """
+    workers = workers or os.cpu_count() or 1
+    sources = []
+
+    def chunks():
+        chunk = []
+        for index, (source, frame) in enumerate(iter_sources(path, max_frames)):
+            sources.append(source)
+            chunk.append((index, source, frame))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    start = time.perf_counter()
+    parts = []
+    if workers == 1:
+        detector = make_detector(spec)
+        for chunk in chunks():
+            parts.append(_run_chunk(chunk, detector, spec))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,)) as pool:
+            # Bounded in-flight queue so a long video is never decoded into memory all at once
+            pending = deque()
+            for chunk in chunks():
+                pending.append(pool.submit(_run_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    parts.append(pending.popleft().result())
+            while pending:
+                parts.append(pending.popleft().result())
+    wall = time.perf_counter() - start
+
+    detections = {name: np.concatenate([part[0][name] for part in parts]) if parts else np.empty(0)
+                  for name in DETECTION_COLUMNS}
+    frames = {name: np.concatenate([part[1][name] for part in parts]) if parts else np.empty(0)
+              for name in ('frame_index', 'frame_ms', 'frame_detections')}
+    frames['frame_source'] = np.array(sources, dtype=str)
+
+    count = len(sources)
+    stats = {
+        'frames': count,
+        'detections': int(len(detections['frame'])),
+        'workers': workers,
+        'wall_s': wall,
+        'fps': count / wall if wall > 0 else 0.0,
+        'median_ms': float(np.median(frames['frame_ms'])) if count else 0.0,
+        'p95_ms': float(np.percentile(frames['frame_ms'], 95)) if count else 0.0,
+    }
+    return detections, frames, stats
+
+
+def write_columns(path, detections, frames):
+    """
+    Write detection and frame columns. '.parquet' writes two files (path and <stem>_frames.parquet) and needs
+    pyarrow; anything else is written as a single compressed .npz holding every column.
+    """
+    path = str(path)
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Writing .parquet needs pyarrow (pip install pyarrow); use a .npz output instead') \
+                from None
+        pq.write_table(pa.table(detections), path)
+        pq.write_table(pa.table(frames), path[:-len('.parquet')] + '_frames.parquet')
+        return path
+
+    if not path.endswith('.npz'):
+        path += '.npz'
+    np.savez_compressed(path, **detections, **frames)
+    return path
@@ -23,7 +23,9 @@ class ConfigValidator:
     REQUIRED_CONFIG = {
         'System': {
             'required_keys': {'algorithm', 'relay_num'},
-            'optional_keys': {'input_file_or_directory', 'actuation_duration', 'delay', 'actuation_zone'}
+            'optional_keys': {'input_file_or_directory', 'actuation_duration', 'delay', 'actuation_zone',
+                              'actuation_zone_only', 'actuation_zone_margin', 'static_reuse', 'static_reuse_signal',
+                              'static_reuse_max_age', 'static_reuse_threshold', 'static_reuse_speed'}
         },
         'Controller': {
             # Base requirements for all controller types
@@ -72,7 +74,10 @@ class ConfigValidator:
         'GreenOnGreen': {
             'required_keys': {'model_path', 'confidence'},
             'optional_keys': {'detect_classes', 'actuation_mode', 'min_detection_pixels',
-                            'inference_resolution', 'crop_buffer_px'}
+                            'inference_resolution', 'crop_buffer_px', 'crop_overlap_max', 'analytic_crop_filter',
+                            'pipelined_inference', 'inference_worker', 'fast_predict', 'tile_columns', 'tile_rows',
+                            'tile_overlap', 'keyframe_interval', 'keyframe_max_travel', 'keyframe_budget_ms',
+                            'resolution_governor', 'resolution_ladder'}
         },
         'GreenOnBrown': {
             'required_keys': {
@@ -80,7 +85,8 @@ class ConfigValidator:
                 'saturation_min', 'saturation_max', 'brightness_min', 'brightness_max',
                 'min_detection_area'
             },
-            'optional_keys': {'invert_hue'}
+            'optional_keys': {'invert_hue', 'blob_backend', 'parallel_bands', 'pyramid_scale', 'threshold_method',
+                              'custom_budget_ms', 'custom_budget_frames', 'custom_budget_action'}
         },
         'DataCollection': {
             'required_keys': {'image_sample_enable', 'sample_method', 'save_directory'},
@@ -114,7 +120,23 @@ class ConfigValidator:
         'min_detection_pixels': ('int', 1, None),
         'inference_resolution': ('int', 160, 1280),
         'crop_buffer_px': ('int', 0, 50),
+        'crop_overlap_max': ('float', 0, 1),
+        'tile_columns': ('int', 1, 8),
+        'tile_rows': ('int', 1, 8),
+        'tile_overlap': ('float', 0, 0.5),
+        'keyframe_interval': ('int', 1, 10),
+        'keyframe_max_travel': ('float', 0.05, 1),
+        'keyframe_budget_ms': ('float', 0, 1000),
+        'resolution_governor': ('bool', None, None),
         'actuation_zone': ('int', 1, 100),
+        'actuation_zone_margin': ('int', 0, 200),
+        'static_reuse_max_age': ('float', 0.05, 10),
+        'static_reuse_threshold': ('int', 0, 255),
+        'static_reuse_speed': ('float', 0, 20),
+        # GreenOnBrown
+        'parallel_bands': ('int', 1, 8),
+        'custom_budget_ms': ('float', 0, 1000),
+        'custom_budget_frames': ('int', 1, 1000),
         # GPIO pins
         'switch_pin': ('pin', 1, 40),
         'detection_mode_pin_up': ('pin', 1, 40),
@@ -135,10 +157,17 @@ class ConfigValidator:
         'detection_enable': ('bool', None, None),
         'log_fps': ('bool', None, None),
         'invert_hue': ('bool', None, None),
+        'actuation_zone_only': ('bool', None, None),
+        'pipelined_inference': ('bool', None, None),
+        'inference_worker': ('bool', None, None),
+        'fast_predict': ('bool', None, None),
+        'analytic_crop_filter': ('bool', None, None),
+        'static_reuse': ('bool', None, None),
         'tracking_enabled': ('bool', None, None),
     }
 
-    VALID_ALGORITHMS = {'exg', 'exgr', 'maxg', 'nexg', 'exhsv', 'hsv', 'gndvi', 'gog', 'gog-hybrid'}
+    VALID_ALGORITHMS = {'exg', 'exgr', 'maxg', 'nexg', 'nexg-int', 'exhsv', 'exhsv-int', 'hsv', 'gndvi',
+                        'gog', 'gog-hybrid'}
 
     @classmethod
     def get_valid_algorithms(cls):
@@ -154,6 +183,11 @@ class ConfigValidator:
     VALID_CONTROLLER_TYPES = {'none', 'ute', 'advanced'}
     VALID_SWITCH_PURPOSES = {'recording', 'detection'}
     VALID_ACTUATION_MODES = {'centre', 'zone'}
+    VALID_BLOB_BACKENDS = {'contours', 'cca'}
+    VALID_PYRAMID_SCALES = {'1', '2', '4'}
+    VALID_THRESHOLD_METHODS = {'gaussian', 'mean', 'lowres'}
+    VALID_SCENE_SIGNALS = {'frame', 'gps', 'both'}
+    VALID_BUDGET_ACTIONS = {'log', 'fallback'}
     VALID_CAMERA_TYPES = {'rpi', 'usb', 'auto'}
     VALID_SAMPLE_METHODS = {'bbox', 'square', 'whole'}
     VALID_BOOLEANS = {'true', 'false', '1', '0', 'yes', 'no', 'on', 'off'}
@@ -301,7 +335,7 @@ class ConfigValidator:
         algorithm = config.get('System', 'algorithm', fallback='').lower()
 
         # For HSV-based algorithms, check HSV ranges make sense together
-        if algorithm in {'hsv', 'exhsv'}:
+        if algorithm in {'hsv', 'exhsv', 'exhsv-int'}:
             try:
                 hue_range = range(config.getint('GreenOnBrown', 'hue_min'),
                                   config.getint('GreenOnBrown', 'hue_max'))
@@ -323,7 +357,7 @@ class ConfigValidator:
                 pass
 
         # For EXG-based algorithms, check EXG range
-        if algorithm in {'exg', 'exgr', 'maxg', 'nexg', 'exhsv'}:
+        if algorithm in {'exg', 'exgr', 'maxg', 'nexg', 'nexg-int', 'exhsv', 'exhsv-int'}:
             try:
                 exg_range = range(config.getint('GreenOnBrown', 'exg_min'),
                                   config.getint('GreenOnBrown', 'exg_max'))
@@ -602,6 +636,58 @@ class ConfigValidator:
         if not is_valid:
             validation_errors.update(sample_errors)
 
+        # Validate blob_backend if present
+        if config.has_option('GreenOnBrown', 'blob_backend'):
+            blob_backend = config.get('GreenOnBrown', 'blob_backend').strip().lower()
+            if blob_backend not in cls.VALID_BLOB_BACKENDS:
+                if 'GreenOnBrown' not in validation_errors:
+                    validation_errors['GreenOnBrown'] = {}
+                validation_errors['GreenOnBrown']['blob_backend'] = (
+                    f'Invalid blob backend. Must be one of: {", ".join(sorted(cls.VALID_BLOB_BACKENDS))}'
+                )
+
+        # Validate pyramid_scale if present
+        if config.has_option('GreenOnBrown', 'pyramid_scale'):
+            pyramid_scale = config.get('GreenOnBrown', 'pyramid_scale').strip()
+            if pyramid_scale not in cls.VALID_PYRAMID_SCALES:
+                if 'GreenOnBrown' not in validation_errors:
+                    validation_errors['GreenOnBrown'] = {}
+                validation_errors['GreenOnBrown']['pyramid_scale'] = (
+                    f'Invalid pyramid scale. Must be one of: {", ".join(sorted(cls.VALID_PYRAMID_SCALES))}'
+                )
+
+        # Validate threshold_method if present: 'method' and/or 'algorithm:method' entries, comma separated
+        if config.has_option('GreenOnBrown', 'threshold_method'):
+            entries = [entry.strip().lower() for entry in config.get('GreenOnBrown', 'threshold_method').split(',')]
+            methods = [entry.rpartition(':')[2].strip() for entry in entries if entry]
+            if any(method not in cls.VALID_THRESHOLD_METHODS for method in methods):
+                if 'GreenOnBrown' not in validation_errors:
+                    validation_errors['GreenOnBrown'] = {}
+                validation_errors['GreenOnBrown']['threshold_method'] = (
+                    f'Invalid threshold method. Use a method or algorithm:method entries with methods from: '
+                    f'{", ".join(sorted(cls.VALID_THRESHOLD_METHODS))}'
+                )
+
+        # Validate static_reuse_signal if present
+        if config.has_option('System', 'static_reuse_signal'):
+            signal = config.get('System', 'static_reuse_signal').strip().lower()
+            if signal not in cls.VALID_SCENE_SIGNALS:
+                if 'System' not in validation_errors:
+                    validation_errors['System'] = {}
+                validation_errors['System']['static_reuse_signal'] = (
+                    f'Invalid static reuse signal. Must be one of: {", ".join(sorted(cls.VALID_SCENE_SIGNALS))}'
+                )
+
+        # Validate custom_budget_action if present
+        if config.has_option('GreenOnBrown', 'custom_budget_action'):
+            action = config.get('GreenOnBrown', 'custom_budget_action').strip().lower()
+            if action not in cls.VALID_BUDGET_ACTIONS:
+                if 'GreenOnBrown' not in validation_errors:
+                    validation_errors['GreenOnBrown'] = {}
+                validation_errors['GreenOnBrown']['custom_budget_action'] = (
+                    f'Invalid budget action. Must be one of: {", ".join(sorted(cls.VALID_BUDGET_ACTIONS))}'
+                )
+
         # Validate actuation_mode if present
         if config.has_option('GreenOnGreen', 'actuation_mode'):
             act_mode = config.get('GreenOnGreen', 'actuation_mode').strip().lower()
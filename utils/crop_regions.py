@@ -0,0 +1,200 @@
+"""
+Crop regions for the hybrid safety filter, tested analytically instead of through a rasterised mask.
+
+Hybrid mode used to draw every crop box and polygon into a full-frame mask, dilate it by the crop
+buffer and then read it at a few dozen weed centres. CropRegions keeps the boxes and polygons as
+they are and answers the same questions directly:
+
+  - contains(): is a point inside a region, or within buffer_px of one? Boxes use a clamped distance,
+    polygons an even-odd crossing test plus the distance to their edges, vectorised over points.
+  - overlap(): what fraction of a weed box lies in the buffered regions? Only the regions near a box
+    are drawn, into a window of the box grown by the buffer, so the answer matches the full mask.
+  - masks(): the full dilated and undilated masks, built on first use for frames that are drawn.
+
+The elliptical dilation kernel of size 2 * buffer_px + 1 is a disc of radius buffer_px, so a point
+is within the dilated mask when its distance to a region is at most buffer_px (up to pixel rounding).
+
+Usage:
+    regions = CropRegions((h, w), buffer_px=20)
+    regions.add_boxes(crop_xyxy)
+    regions.add_polygons(result.masks.xy)
+    keep = ~regions.contains(weed_centres)
+"""
+
+import cv2
+import numpy as np
+
+
+def dilate_kernel(buffer_px):
+    """Elliptical kernel growing a mask by buffer_px, or None for no buffer."""
+    if buffer_px <= 0:
+        return None
+    size = 2 * buffer_px + 1
+    return cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+
+
+class CropRegions:
+    """Crop boxes and polygons of one frame, grown by a buffer.
+
+    Args:
+        shape: Frame (height, width, ...); regions are clipped to it like the mask they replace.
+        buffer_px: Buffer around each region in pixels.
+        kernel: Dilation kernel for masks(); built from buffer_px when None.
+    """
+
+    def __init__(self, shape, buffer_px=0, kernel=None):
+        self.shape = tuple(shape[:2])
+        self.buffer_px = max(0, int(buffer_px))
+        self._kernel = kernel if kernel is not None else dilate_kernel(self.buffer_px)
+        self._boxes = np.empty((0, 4), dtype=np.int64)
+        self._polygons = []   # (K, 2) int32 vertex arrays
+        self._bounds = np.empty((0, 4), dtype=np.int64)  # xyxy bounds of boxes then polygons
+        self._masks = None
+
+    def __len__(self):
+        return len(self._boxes) + len(self._polygons)
+
+    def add_boxes(self, xyxy):
+        """Add crop boxes as (N, 4) x1, y1, x2, y2 corners, truncated to whole pixels."""
+        boxes = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4).astype(np.int64)
+        if len(boxes):
+            self._boxes = np.concatenate([self._boxes, boxes])
+            self._refresh_bounds()
+
+    def add_polygons(self, polygons):
+        """Add crop polygons, each a (K, 2) or (K, 1, 2) vertex array, truncated to whole pixels."""
+        added = [np.asarray(p).reshape(-1, 2).astype(np.int32) for p in polygons]
+        added = [p for p in added if len(p)]
+        if added:
+            self._polygons.extend(added)
+            self._refresh_bounds()
+
+    def _refresh_bounds(self):
+        poly_bounds = [np.concatenate([p.min(axis=0), p.max(axis=0)]) for p in self._polygons]
+        self._bounds = np.concatenate([self._boxes, np.asarray(poly_bounds, dtype=np.int64).reshape(-1, 4)])
+        self._masks = None
+
+    def contains(self, points):
+        """
+        Which points lie in a region or within buffer_px of one.
+
+        Args:
+            points: (N, 2) x, y pixel coordinates.
+
+        Returns:
+            (N,) bool array.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        inside = np.zeros(len(points), dtype=bool)
+        if not len(points) or not len(self):
+            return inside
+        px, py = points[:, :1], points[:, 1:]
+        limit = self.buffer_px ** 2
+
+        if len(self._boxes):
+            x1, y1, x2, y2 = self._boxes.T
+            dx = np.maximum(np.maximum(x1 - px, px - x2), 0)
+            dy = np.maximum(np.maximum(y1 - py, py - y2), 0)
+            inside |= (dx * dx + dy * dy <= limit).any(axis=1)
+
+        bounds = self._bounds[len(self._boxes):]
+        b = self.buffer_px
+        near = ((px >= bounds[:, 0] - b) & (px <= bounds[:, 2] + b)
+                & (py >= bounds[:, 1] - b) & (py <= bounds[:, 3] + b))
+        for j, polygon in enumerate(self._polygons):
+            candidates = np.flatnonzero(near[:, j] & ~inside)
+            if len(candidates):
+                inside[candidates] = self._in_polygon(points[candidates], polygon, limit)
+        return inside
+
+    @staticmethod
+    def _in_polygon(points, polygon, limit):
+        """Points inside polygon (even-odd rule) or within sqrt(limit) of its edges."""
+        v0 = polygon.astype(np.float64)
+        v1 = np.roll(v0, -1, axis=0)
+        px, py = points[:, :1], points[:, 1:]
+        x0, y0, x1, y1 = v0[:, 0], v0[:, 1], v1[:, 0], v1[:, 1]
+
+        # Even-odd crossing test against a ray to +x
+        crosses = (y0 > py) != (y1 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+        inside = (crosses & (px < x_cross)).sum(axis=1) % 2 == 1
+
+        # Distance to the closest point of each edge
+        ex, ey = x1 - x0, y1 - y0
+        length2 = np.maximum(ex * ex + ey * ey, 1e-12)
+        t = np.clip(((px - x0) * ex + (py - y0) * ey) / length2, 0.0, 1.0)
+        dx, dy = px - (x0 + t * ex), py - (y0 + t * ey)
+        return inside | (dx * dx + dy * dy <= limit).any(axis=1)
+
+    def overlap(self, boxes):
+        """
+        Fraction of each box covered by the buffered regions, as the dilated mask would give it.
+
+        Args:
+            boxes: (N, 4) x, y, w, h boxes.
+
+        Returns:
+            (N,) float array; the covered count is taken over the box clipped to the frame and divided
+            by the full box area.
+        """
+        box_arr = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        covered = np.zeros(len(box_arr), dtype=np.float64)
+        area = np.maximum(box_arr[:, 2] * box_arr[:, 3], 1)
+        if not len(box_arr) or not len(self):
+            return covered
+
+        h, w = self.shape
+        b = self.buffer_px
+        x0 = np.clip(box_arr[:, 0], 0, w)
+        y0 = np.clip(box_arr[:, 1], 0, h)
+        x1 = np.clip(box_arr[:, 0] + box_arr[:, 2], 0, w)
+        y1 = np.clip(box_arr[:, 1] + box_arr[:, 3], 0, h)
+        # Regions reaching into each box once grown by the buffer
+        near = ((self._bounds[:, 0] - b < x1[:, None]) & (self._bounds[:, 2] + b >= x0[:, None])
+                & (self._bounds[:, 1] - b < y1[:, None]) & (self._bounds[:, 3] + b >= y0[:, None]))
+        n_boxes = len(self._boxes)
+
+        for i in np.flatnonzero(near.any(axis=1) & (x1 > x0) & (y1 > y0)):
+            # Window of the box grown by the buffer, clipped to the frame like the full mask. It also
+            # takes in the whole of each nearby polygon: OpenCV rasterises a polygon clipped by the
+            # window edge slightly differently from the same polygon drawn whole
+            nearby = np.flatnonzero(near[i])
+            polygons = nearby[nearby >= n_boxes]
+            left = max(0, min([x0[i] - b] + self._bounds[polygons, 0].tolist()))
+            top = max(0, min([y0[i] - b] + self._bounds[polygons, 1].tolist()))
+            right = min(w, max([x1[i] + b] + (self._bounds[polygons, 2] + 1).tolist()))
+            bottom = min(h, max([y1[i] + b] + (self._bounds[polygons, 3] + 1).tolist()))
+            window = np.zeros((bottom - top, right - left), dtype=np.uint8)
+            for j in nearby:
+                if j < n_boxes:
+                    bx1, by1, bx2, by2 = self._boxes[j].tolist()
+                    cv2.rectangle(window, (bx1 - left, by1 - top), (bx2 - left, by2 - top), 255, -1)
+                else:
+                    cv2.drawContours(window, [self._polygons[j - n_boxes].reshape(-1, 1, 2)], -1, 255, -1,
+                                     offset=(-int(left), -int(top)))
+            if self._kernel is not None:
+                window = cv2.dilate(window, self._kernel)
+            covered[i] = cv2.countNonZero(window[y0[i] - top:y1[i] - top, x0[i] - left:x1[i] - left])
+        return covered / area
+
+    def masks(self):
+        """
+        Full-frame crop masks, built once per frame and only when asked for (display, stream, video).
+
+        Returns:
+            (mask, mask_undilated): uint8 masks (255 = crop); the same array when nothing is dilated.
+        """
+        if self._masks is None:
+            undilated = np.zeros(self.shape, dtype=np.uint8)
+            for x1, y1, x2, y2 in self._boxes.tolist():
+                cv2.rectangle(undilated, (x1, y1), (x2, y2), 255, -1)
+            # One call per polygon: a single drawContours call fills overlapping polygons even-odd
+            for polygon in self._polygons:
+                cv2.drawContours(undilated, [polygon.reshape(-1, 1, 2)], -1, 255, -1)
+            mask = undilated
+            if self._kernel is not None and len(self):
+                mask = cv2.dilate(undilated, self._kernel)
+            self._masks = (mask, undilated)
+        return self._masks
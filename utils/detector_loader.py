@@ -0,0 +1,124 @@
+"""
+Background detector loading for live algorithm and model switches.
+
+Building a detector can take seconds on a Pi (YOLO model load, NCNN initialisation, first-inference graph
+setup). The frame loop must not stall for that while the sprayer is moving, so DetectorLoader builds the new
+detector and runs one warm-up inference on a worker thread while the loop keeps detecting with the old one.
+The loop polls once per frame and swaps the finished detector in with a single assignment, so no frame ever
+sees a half-built detector.
+
+Usage:
+    loader = DetectorLoader()
+    loader.request(('gog', model_path), factory=lambda: make('gog'), warmup=lambda d: d.inference(dummy))
+
+    loaded = loader.poll()  # every frame; None until a load finishes
+    if loaded is not None and loaded.error is None:
+        detector = loaded.detector
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LoadedDetector:
+    """Outcome of one background load.
+
+    Attributes:
+        key: What was requested, passed through from request().
+        detector: The built and warmed-up detector, or None if the load failed.
+        error: The exception raised by the factory or warm-up, or None.
+        load_s: Seconds spent in the factory.
+        warmup_s: Seconds spent in the warm-up call.
+    """
+    key: Any
+    detector: Any = None
+    error: Optional[Exception] = None
+    load_s: float = 0.0
+    warmup_s: float = 0.0
+
+
+class DetectorLoader:
+    """Builds one detector at a time on a daemon thread.
+
+    A request made while a load is running is queued, replacing any earlier queued request, and
+    starts once the running load finishes. The running load's result is then dropped, as it is
+    already out of date.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._key = None
+        self._queued = None
+        self._result = None
+
+    @property
+    def loading_key(self):
+        """Key of the newest outstanding request (queued or running), or None when idle."""
+        with self._lock:
+            if self._queued is not None:
+                return self._queued[0]
+            return self._key if self._thread is not None else None
+
+    def request(self, key, factory: Callable[[], Any], warmup: Optional[Callable[[Any], Any]] = None):
+        """Start building a detector in the background.
+
+        Args:
+            key: Identifies the request; returned unchanged in the LoadedDetector.
+            factory: Builds and returns the detector.
+            warmup: Called once with the new detector, e.g. a dummy inference, before it is handed over.
+        """
+        with self._lock:
+            if self._thread is not None and self._result is None:
+                self._queued = (key, factory, warmup)
+                return
+            self._start(key, factory, warmup)
+
+    def poll(self) -> Optional[LoadedDetector]:
+        """Return the finished load once, or None while loading, idle or superseded."""
+        with self._lock:
+            if self._result is None:
+                return None
+            result, self._result, self._thread = self._result, None, None
+            if self._queued is not None:
+                queued, self._queued = self._queued, None
+                logger.info(f"Dropping superseded detector load {result.key}, starting {queued[0]}")
+                self._start(*queued)
+                return None
+            return result
+
+    def _start(self, key, factory, warmup):
+        self._key = key
+        self._result = None
+        self._thread = threading.Thread(target=self._load, args=(key, factory, warmup),
+                                        name='detector-loader', daemon=True)
+        self._thread.start()
+
+    def _load(self, key, factory, warmup):
+        load_s = warmup_s = 0.0
+        start = time.perf_counter()
+        try:
+            detector = factory()
+            load_s = time.perf_counter() - start
+            if warmup is not None:
+                start = time.perf_counter()
+                warmup(detector)
+                warmup_s = time.perf_counter() - start
+            result = LoadedDetector(key, detector, None, load_s, warmup_s)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            if load_s:
+                warmup_s = elapsed
+            else:
+                load_s = elapsed
+            result = LoadedDetector(key, None, e, load_s, warmup_s)
+
+        with self._lock:
+            if self._thread is threading.current_thread():
+                self._result = result
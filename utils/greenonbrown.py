@@ -1,16 +1,259 @@
 #!/usr/bin/env python
-from utils.algorithms import exg, exg_standardised, exg_standardised_hue, hsv, exgr, gndvi, maxg
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from utils.algorithms import (exg, exg_standardised, exg_standardised_hue, exg_standardised_int,
+                              exg_standardised_hue_int, hsv, hsv_bounds, exgr, gndvi, maxg)
 import numpy as np
 import cv2
 
 
 MAX_DETECTIONS = 50
 
+# Blob extraction: 'contours' (findContours, lists) or 'cca' (connectedComponentsWithStats, int32 arrays)
+BLOB_BACKENDS = ('contours', 'cca')
+
+# Rows of context each band computes beyond its own rows: adaptiveThreshold's 31px Gaussian needs 15 and
+# up to 5 close iterations need another 10, so the stitched mask is identical to a full-frame pass
+BAND_OVERLAP = 32
+
+# Coarse-to-fine mode: threshold/label at 1/2 or 1/4 scale, then re-threshold each candidate at full resolution
+PYRAMID_SCALES = (1, 2, 4)
+# Full-resolution context added around each candidate before refining (same reasoning as BAND_OVERLAP)
+PYRAMID_PAD = 32
+# Coarse candidates covering more than this fraction of the frame are cheaper to process at full resolution
+PYRAMID_MAX_COVERAGE = 0.5
+
+# Adaptive threshold stage: 'gaussian' (31px Gaussian-weighted local mean, the original), 'mean' (box mean, computed
+# with a running sum so the cost does not grow with the window) or 'lowres' (box mean computed at 1/LOWRES_FACTOR
+# scale and bilinearly upsampled). Selectable per algorithm, see parse_threshold_method()
+THRESHOLD_METHODS = ('gaussian', 'mean', 'lowres')
+LOWRES_FACTOR = 4
+# Pixels darker than the local mean by at least this much become foreground (adaptiveThreshold's C)
+THRESHOLD_C = 2
+
+# Custom algorithm timing: calls kept per algorithm for the rolling P50/P95
+TIMING_WINDOW = 300
+
+# Built-in algorithms that write into the frame workspace instead of allocating per frame
+WORKSPACE_ALGORITHMS = ('exg', 'nexg', 'nexg-int', 'exhsv', 'exhsv-int', 'hsv')
+
+
+class FrameWorkspace:
+    """
+    Named scratch arrays for a single frame resolution. Buffers are created the first time they are
+    requested and then handed back on every later frame, so steady-state inference does not allocate
+    full-frame arrays. Not thread-safe: one workspace per concurrent inference call.
+    """
+    def __init__(self, shape):
+        self.shape = tuple(shape[:2])
+        self._buffers = {}
+
+    def buffer(self, name, shape, dtype=np.uint8):
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buf
+        return buf
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+
+class RegionWorkspace(FrameWorkspace):
+    """
+    Scratch arrays for regions of varying size within one frame (pyramid refinement crops). Each named buffer is a
+    flat array sized for the whole frame, allocated once; a region gets a contiguous view of its first elements, so
+    crops of any size up to the frame share it instead of reallocating whenever the shape changes.
+    """
+    def buffer(self, name, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        size = int(np.prod(shape))
+        flat = self._buffers.get(name)
+        if flat is None or flat.dtype != dtype or flat.size < size:
+            # Full frame with the requested trailing (channel) dimensions
+            capacity = max(size, int(np.prod(self.shape + shape[2:])))
+            flat = np.empty(capacity, dtype=dtype)
+            self._buffers[name] = flat
+        return flat[:size].reshape(shape)
+
+
+def parse_threshold_method(spec):
+    """
+    Parse a threshold_method setting into {algorithm: method}, with the default method under the key None.
+    A plain method name applies to every algorithm; 'algorithm:method' entries override it, e.g.
+    'gaussian, exhsv:lowres, exg:mean'. A dict in the same form is validated and returned as a copy.
+    """
+    if isinstance(spec, dict):
+        methods = dict(spec)
+    else:
+        methods = {}
+        for entry in str(spec).split(','):
+            entry = entry.strip().lower()
+            if not entry:
+                continue
+            algorithm, _, method = entry.rpartition(':')
+            methods[algorithm.strip() or None] = method.strip()
+    methods.setdefault(None, 'gaussian')
+
+    for algorithm, method in methods.items():
+        if method not in THRESHOLD_METHODS:
+            raise ValueError(f"Unknown threshold method '{method}' for {algorithm or 'default'}, "
+                             f"must be one of {THRESHOLD_METHODS}")
+    return methods
+
+
+@dataclass(frozen=True)
+class ThresholdProfile:
+    """
+    Immutable set of GreenOnBrown thresholds with everything inference() derives from them (the inRange bound
+    arrays, including both ranges for invert_hue, and the params dict) computed once at construction. Callers build
+    a new profile when a threshold changes and swap the reference; a frame that already holds a profile never sees
+    a half-applied update from another thread.
+    """
+    exg_min: int = 30
+    exg_max: int = 250
+    hue_min: int = 30
+    hue_max: int = 90
+    brightness_min: int = 5
+    brightness_max: int = 200
+    saturation_min: int = 30
+    saturation_max: int = 255
+    min_detection_area: int = 1
+    invert_hue: bool = False
+    hsv_bounds: tuple = field(init=False, repr=False, compare=False)
+    params: MappingProxyType = field(init=False, repr=False, compare=False)
+
+    FIELDS = ('exg_min', 'exg_max', 'hue_min', 'hue_max', 'brightness_min', 'brightness_max',
+              'saturation_min', 'saturation_max', 'min_detection_area', 'invert_hue')
+
+    def __post_init__(self):
+        object.__setattr__(self, 'hsv_bounds', hsv_bounds(self.hue_min, self.hue_max,
+                                                          self.brightness_min, self.brightness_max,
+                                                          self.saturation_min, self.saturation_max,
+                                                          self.invert_hue))
+        object.__setattr__(self, 'params', MappingProxyType({name: getattr(self, name) for name in self.FIELDS}))
+
+    def __reduce__(self):
+        # The derived fields (a mappingproxy among them) are rebuilt on unpickle, e.g. in a worker process
+        return self.__class__, tuple(getattr(self, name) for name in self.FIELDS)
+
+    @classmethod
+    def from_attributes(cls, source):
+        """Build a profile from any object carrying the threshold attributes (e.g. the Owl instance)."""
+        return cls(**{name: getattr(source, name) for name in cls.FIELDS})
+
+
+@dataclass(frozen=True)
+class Detections:
+    """
+    What one inference() call found, so the frame can be annotated later by the detector's annotate(), and only
+    when someone will look at it (display, dashboard stream, video), instead of copying and drawing every frame.
+    Holds references rather than copies; nothing here is written to again once the frame is done.
+    """
+    boxes: object = ()
+    contours: object = None
+    label: str = 'WEED'
+    # GreenOnGreen only: tracker IDs, and per-box class ids and confidences as arrays for the box labels
+    track_ids: tuple = ()
+    class_ids: object = None
+    confidences: object = None
+    # GreenOnGreen hybrid only: dilated crop mask and the mask before dilation (the same array if not dilated)
+    crop_mask: object = None
+    crop_mask_undilated: object = None
+    # GreenOnGreen hybrid with analytic_crop_filter: CropRegions in place of the masks, rasterised when drawn
+    crop_regions: object = None
+
+
+class AlgorithmTimings:
+    """
+    Rolling per-algorithm timings of custom colour-index functions, with an optional latency budget. Custom
+    algorithms run unchecked inside the frame loop, so GreenOnBrown times every call; one instance can be shared
+    between detectors so the history survives an algorithm switch.
+    :param budget_ms: per-call budget in milliseconds, 0 for none
+    :param budget_frames: consecutive calls over budget before over_budget() reports it
+    """
+
+    def __init__(self, budget_ms=0.0, budget_frames=30, window=TIMING_WINDOW):
+        self.budget_ms = budget_ms
+        self.budget_frames = budget_frames
+        self._window = window
+        self._times = {}
+        self._calls = {}
+        self._over = {}
+        self._lock = threading.Lock()
+
+    def record(self, algorithm, ms):
+        with self._lock:
+            if algorithm not in self._times:
+                self._times[algorithm] = deque(maxlen=self._window)
+                self._calls[algorithm] = 0
+                self._over[algorithm] = 0
+            self._times[algorithm].append(ms)
+            self._calls[algorithm] += 1
+            if self.budget_ms > 0:
+                self._over[algorithm] = self._over[algorithm] + 1 if ms > self.budget_ms else 0
+
+    def over_budget(self, algorithm):
+        """True once the algorithm has been over budget for budget_frames consecutive calls."""
+        return self.budget_ms > 0 and self._over.get(algorithm, 0) >= self.budget_frames
+
+    def reset_budget(self, algorithm):
+        """Start counting consecutive over-budget calls again, e.g. after the error was logged."""
+        with self._lock:
+            if algorithm in self._over:
+                self._over[algorithm] = 0
+
+    def snapshot(self):
+        """{algorithm: {'calls', 'p50_ms', 'p95_ms', 'over_budget'}} for the MQTT state."""
+        with self._lock:
+            times = {algorithm: np.array(values) for algorithm, values in self._times.items()}
+            calls = dict(self._calls)
+            over = dict(self._over)
+        return {algorithm: {'calls': calls[algorithm],
+                            'p50_ms': round(float(np.percentile(values, 50)), 2),
+                            'p95_ms': round(float(np.percentile(values, 95)), 2),
+                            'over_budget': over[algorithm]}
+                for algorithm, values in times.items()}
+
+
 class GreenOnBrown:
-    def __init__(self, algorithm='exg', label_file='models/labels.txt'):
+    def __init__(self, algorithm='exg', label_file='models/labels.txt', blob_backend='contours', bands=1,
+                 pyramid_scale=1, threshold_method='gaussian', timings=None):
+        if blob_backend not in BLOB_BACKENDS:
+            raise ValueError(f"Unknown blob_backend '{blob_backend}', must be one of {BLOB_BACKENDS}")
+        if bands < 1:
+            raise ValueError(f"bands must be >= 1, got {bands}")
+        if pyramid_scale not in PYRAMID_SCALES:
+            raise ValueError(f"pyramid_scale must be one of {PYRAMID_SCALES}, got {pyramid_scale}")
         self.algorithm = algorithm
+        self.blob_backend = blob_backend
+        self.bands = bands
+        self.pyramid_scale = pyramid_scale
+        self.threshold_methods = parse_threshold_method(threshold_method)
+        # Per-call timing of custom algorithms (see AlgorithmTimings)
+        self.timings = timings if timings is not None else AlgorithmTimings()
         self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
 
+        # Scratch buffers for the current frame size, rebuilt only when the resolution changes.
+        # This makes inference() non-reentrant: use one GreenOnBrown per thread.
+        self._workspace = None
+
+        # Band-parallel mode: N horizontal bands on a thread pool (OpenCV releases the GIL), one workspace each
+        self._band_executor = None
+        self._band_workspaces = []
+        if bands > 1:
+            self._band_executor = ThreadPoolExecutor(max_workers=bands, thread_name_prefix='gob-band')
+
+        # Pyramid mode: separate workspaces for the coarse frame and the (variable size) refinement crops
+        self._coarse_workspace = None
+        self._refine_workspace = None
+
         # Dictionary mapping algorithm names to functions
         self.algorithms = {
             'exg': exg,
@@ -18,17 +261,219 @@ class GreenOnBrown:
             'maxg': maxg,
             'nexg': exg_standardised,
             'exhsv': exg_standardised_hue,
+            'nexg-int': exg_standardised_int,
+            'exhsv-int': exg_standardised_hue_int,
             'hsv': hsv,
             'gndvi': gndvi
         }
+        self._workspace_funcs = {self.algorithms[name] for name in WORKSPACE_ALGORITHMS}
 
         # Discover custom algorithms (file-isolated, AST-validated)
+        self.custom_algorithms = set()
         try:
             from custom_algorithms import discover_custom_algorithms
-            self.algorithms.update(discover_custom_algorithms())
+            custom = discover_custom_algorithms()
+            self.algorithms.update(custom)
+            self.custom_algorithms = set(custom)
         except Exception:
             pass
 
+    def _get_workspace(self, shape):
+        if self._workspace is None or self._workspace.shape != tuple(shape[:2]):
+            self._workspace = FrameWorkspace(shape)
+            self._band_workspaces = [FrameWorkspace(shape) for _ in range(self.bands)]
+            self._coarse_workspace = FrameWorkspace((shape[0] // self.pyramid_scale, shape[1] // self.pyramid_scale))
+            self._refine_workspace = RegionWorkspace(shape)
+        return self._workspace
+
+    def _pyramid_mask(self, image, workspace, func, algorithm, profile):
+        """
+        Coarse-to-fine threshold mask. The frame is thresholded and labelled at 1/pyramid_scale, then each
+        candidate box is re-thresholded at full resolution (with PYRAMID_PAD context) and written into an
+        otherwise empty full-frame mask. Inside candidates the mask is identical to a full-resolution pass;
+        blobs too small to survive the coarse pass are the only recall loss.
+        """
+        scale = self.pyramid_scale
+        height, width = image.shape[:2]
+        coarse_workspace = self._coarse_workspace
+        small = cv2.resize(image, (width // scale, height // scale), interpolation=cv2.INTER_AREA,
+                           dst=coarse_workspace.buffer('small', (height // scale, width // scale, 3)))
+        # Keep the adaptive threshold window the same size on the ground
+        coarse = self._threshold_mask(small, coarse_workspace, func, algorithm, profile,
+                                      block_size=max(3, (31 // scale) | 1))
+        labels = coarse_workspace.buffer('labels', coarse.shape, np.int32)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(coarse, labels=labels, connectivity=8, ltype=cv2.CV_32S)
+        stats = stats[1:].astype(np.int64)
+
+        # One coarse pixel of slack so blob edges lost to downsampling are inside the refined region
+        x0 = np.clip((stats[:, cv2.CC_STAT_LEFT] - 1) * scale, 0, width)
+        y0 = np.clip((stats[:, cv2.CC_STAT_TOP] - 1) * scale, 0, height)
+        x1 = np.clip((stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH] + 1) * scale, 0, width)
+        y1 = np.clip((stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT] + 1) * scale, 0, height)
+
+        coverage = np.sum((x1 - x0 + 2 * PYRAMID_PAD) * (y1 - y0 + 2 * PYRAMID_PAD)) / (height * width)
+        if coverage > PYRAMID_MAX_COVERAGE:
+            return self._threshold_mask(image, workspace, func, algorithm, profile)
+
+        mask = workspace.buffer('pyramid_mask', (height, width))
+        mask.fill(0)
+        for bx0, by0, bx1, by1 in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist()):
+            px0, py0 = max(0, bx0 - PYRAMID_PAD), max(0, by0 - PYRAMID_PAD)
+            px1, py1 = min(width, bx1 + PYRAMID_PAD), min(height, by1 + PYRAMID_PAD)
+            refined = self._threshold_mask(image[py0:py1, px0:px1], self._refine_workspace, func, algorithm, profile)
+            mask[by0:by1, bx0:bx1] = refined[by0 - py0:by1 - py0, bx0 - px0:bx1 - px0]
+
+        return mask
+
+    def _band_rows(self, height):
+        """Split rows into self.bands core ranges, each with its overlap-padded processing range."""
+        edges = np.linspace(0, height, self.bands + 1).astype(int)
+        return [(start, end, max(0, start - BAND_OVERLAP), min(height, end + BAND_OVERLAP))
+                for start, end in zip(edges[:-1], edges[1:])]
+
+    def _inference_bands(self, image, func, algorithm, profile, row_offset=0):
+        """
+        Threshold (and for 'cca', label) each band on the thread pool. Each band processes its rows plus
+        BAND_OVERLAP rows either side and writes only its own rows into the shared full-frame mask.
+        """
+        mask = self._workspace.buffer('morph', image.shape[:2])
+        rows = self._band_rows(image.shape[0])
+
+        def run_band(i):
+            start, end, pad_start, pad_end = rows[i]
+            workspace = self._band_workspaces[i]
+            band_mask = self._threshold_mask(image[pad_start:pad_end], workspace, func, algorithm, profile)
+            mask[start:end] = band_mask[start - pad_start:end - pad_start]
+            if self.blob_backend != 'cca':
+                return None
+            labels = workspace.buffer('labels', (end - start, image.shape[1]), np.int32)
+            count, _, stats, _ = cv2.connectedComponentsWithStats(mask[start:end], labels=labels, connectivity=8,
+                                                                  ltype=cv2.CV_32S)
+            return count, labels, stats
+
+        results = list(self._band_executor.map(run_band, range(len(rows))))
+
+        if self.blob_backend == 'cca':
+            boxes, weed_centres = self._merge_band_components(results, rows, profile.min_detection_area)
+            return None, boxes, weed_centres
+
+        # findContours over the stitched mask is a small fraction of the frame time and merges seams for free
+        return self._blobs_contours(mask, profile.min_detection_area, row_offset)
+
+    @staticmethod
+    def _merge_band_components(results, rows, min_detection_area):
+        """
+        Join per-band connected components that touch across a seam (8-connected), then apply the same
+        area filter and top-k as _blobs_cca. Boxes are ordered by (top, left).
+        """
+        # Give every band's foreground labels a global id (background stays 0 in each band)
+        offsets = np.cumsum([0] + [count - 1 for count, _, _ in results])
+        stats = np.concatenate([band_stats[1:] for _, _, band_stats in results]).astype(np.int64)
+        for (start, _, _, _), offset, n in zip(rows, offsets, np.diff(offsets)):
+            stats[offset:offset + n, cv2.CC_STAT_TOP] += start
+
+        parent = np.arange(len(stats))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(len(results) - 1):
+            upper = results[band][1][-1]
+            lower = results[band + 1][1][0]
+            for shift in (-1, 0, 1):
+                a = upper[max(0, -shift):len(upper) - max(0, shift)]
+                b = lower[max(0, shift):len(lower) - max(0, -shift)]
+                touching = (a > 0) & (b > 0)
+                if not touching.any():
+                    continue
+                pairs = np.unique(np.stack([a[touching] + offsets[band] - 1,
+                                            b[touching] + offsets[band + 1] - 1], axis=1), axis=0)
+                for i, j in pairs:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j:
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        # Pointer-jump every label to its root without a per-component Python loop
+        roots = parent
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+        unique_roots, group = np.unique(roots, return_inverse=True)
+        left = np.full(len(unique_roots), np.iinfo(np.int64).max)
+        top = left.copy()
+        right = np.zeros(len(unique_roots), dtype=np.int64)
+        bottom = right.copy()
+        area = right.copy()
+        np.minimum.at(left, group, stats[:, cv2.CC_STAT_LEFT])
+        np.minimum.at(top, group, stats[:, cv2.CC_STAT_TOP])
+        np.maximum.at(right, group, stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH])
+        np.maximum.at(bottom, group, stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT])
+        np.add.at(area, group, stats[:, cv2.CC_STAT_AREA])
+
+        keep = np.flatnonzero(area > min_detection_area)
+        if keep.size > MAX_DETECTIONS:
+            keep = keep[np.argpartition(area[keep], -MAX_DETECTIONS)[-MAX_DETECTIONS:]]
+        keep = keep[np.lexsort((left[keep], top[keep]))]
+
+        boxes = np.stack([left[keep], top[keep], right[keep] - left[keep], bottom[keep] - top[keep]],
+                         axis=1).astype(np.int32).reshape(-1, 4)
+        weed_centres = boxes[:, :2] + boxes[:, 2:] // 2
+
+        return boxes, weed_centres
+
+    @staticmethod
+    def _blobs_contours(threshold_out, min_detection_area, row_offset=0):
+        # offset shifts contour points (and so boundingRect) from ROI rows back to frame rows
+        contours, _ = cv2.findContours(threshold_out, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=(0, row_offset))
+
+        # Filter by min area, then keep largest MAX_DETECTIONS
+        valid = []
+        for c in contours:
+            area = cv2.contourArea(c)
+            if area > min_detection_area:
+                valid.append((area, c))
+
+        if len(valid) > MAX_DETECTIONS:
+            valid.sort(key=lambda x: x[0], reverse=True)
+            valid = valid[:MAX_DETECTIONS]
+
+        boxes = []
+        weed_centres = []
+        for area, c in valid:
+            x, y, w, h = cv2.boundingRect(c)
+            boxes.append([x, y, w, h])
+            weed_centres.append([x + w // 2, y + h // 2])
+
+        return contours, boxes, weed_centres
+
+    @staticmethod
+    def _blobs_cca(threshold_out, min_detection_area, workspace):
+        """
+        Blob extraction with a single connectedComponentsWithStats call and no per-blob Python loop.
+        Area is the component pixel count (slightly larger than contourArea for the same blob).
+        Returns (N, 4) int32 [x, y, w, h] boxes and (N, 2) int32 [x, y] centres, in label order.
+        """
+        labels = workspace.buffer('labels', threshold_out.shape, np.int32)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(threshold_out, labels=labels, connectivity=8,
+                                                          ltype=cv2.CV_32S)
+        stats = stats[1:]  # label 0 is the background
+        keep = np.flatnonzero(stats[:, cv2.CC_STAT_AREA] > min_detection_area)
+
+        if keep.size > MAX_DETECTIONS:
+            largest = np.argpartition(stats[keep, cv2.CC_STAT_AREA], -MAX_DETECTIONS)[-MAX_DETECTIONS:]
+            keep = np.sort(keep[largest])
+
+        boxes = stats[keep, :4].astype(np.int32)
+        weed_centres = boxes[:, :2] + boxes[:, 2:] // 2
+
+        return boxes, weed_centres
+
     def inference(self, image,
                   exg_min=30,
                   exg_max=250,
@@ -42,77 +487,166 @@ class GreenOnBrown:
                   show_display=False,
                   algorithm='exg',
                   invert_hue=False,
-                  label='WEED'):
-        threshed_already = False
+                  label='WEED',
+                  roi_rows=None,
+                  profile=None):
+        """
+        Detect green blobs in a BGR frame.
+        :param profile: optional ThresholdProfile; when given its thresholds are used and the individual threshold
+                        arguments are ignored, so nothing is rebuilt per frame
+        :param roi_rows: optional (start, end) row range to process; rows outside it are skipped entirely and
+                         the returned boxes, centres and contours are in full-frame coordinates
+        :return: (contours, boxes, weed_centres, image_out); image_out is an annotated copy with show_display,
+                 else the frame itself (annotate() can draw the boxes later)
+        """
+        frame = image
+        row_offset = 0
+        if roi_rows is not None:
+            row_offset = max(0, int(roi_rows[0]))
+            image = image[row_offset:int(roi_rows[1])]
+        workspace = self._get_workspace(image.shape)
 
         # Retrieve the function based on the algorithm name
         func = self.algorithms.get(algorithm, exg_standardised_hue)
+        if profile is None:
+            profile = ThresholdProfile(exg_min=exg_min, exg_max=exg_max, hue_min=hue_min, hue_max=hue_max,
+                                       brightness_min=brightness_min, brightness_max=brightness_max,
+                                       saturation_min=saturation_min, saturation_max=saturation_max,
+                                       min_detection_area=min_detection_area, invert_hue=invert_hue)
+
+        # Band-parallel and pyramid paths only for the built-in per-pixel kernels; maxg/gndvi/custom
+        # normalise over the whole frame, so a band or crop would not match a full-frame pass
+        per_pixel = func in self._workspace_funcs
+        if self.pyramid_scale > 1 and per_pixel:
+            threshold_out = self._pyramid_mask(image, workspace, func, algorithm, profile)
+        elif (self._band_executor is not None and per_pixel
+                and image.shape[0] >= 2 * BAND_OVERLAP * self.bands):
+            threshold_out = None
+            contours, boxes, weed_centres = self._inference_bands(image, func, algorithm, profile, row_offset)
+        else:
+            threshold_out = self._threshold_mask(image, workspace, func, algorithm, profile)
+
+        if threshold_out is not None:
+            if self.blob_backend == 'cca':
+                contours = None
+                boxes, weed_centres = self._blobs_cca(threshold_out, profile.min_detection_area, workspace)
+            else:
+                contours, boxes, weed_centres = self._blobs_contours(threshold_out, profile.min_detection_area,
+                                                                     row_offset)
+
+        if self.blob_backend == 'cca' and row_offset:
+            boxes[:, 1] += row_offset
+            weed_centres[:, 1] += row_offset
 
-        # Handle special cases for functions with additional parameters
-        if algorithm == 'exhsv':
-            output = func(image, hue_min=hue_min, hue_max=hue_max, brightness_min=brightness_min,
-                          brightness_max=brightness_max, saturation_min=saturation_min,
-                          saturation_max=saturation_max, invert_hue=invert_hue)
-        elif algorithm == 'hsv':
-            output, threshed_already = func(image, hue_min=hue_min, hue_max=hue_max, brightness_min=brightness_min,
-                                            brightness_max=brightness_max, saturation_min=saturation_min,
-                                            saturation_max=saturation_max, invert_hue=invert_hue)
+        if show_display:
+            return contours, boxes, weed_centres, self.annotate(frame.copy(), Detections(boxes=boxes, label=label))
+
+        return contours, boxes, weed_centres, frame
+
+    @staticmethod
+    def annotate(image, detections):
+        """
+        Draw detections onto image in place. Nothing is kept between inference() calls, so callers build the
+        record from the boxes inference() returned: Detections(boxes=boxes, label=label).
+        :param image: the frame the detections came from, or a copy of it
+        :return: image
+        """
+        for box in detections.boxes:
+            startX, startY, boxW, boxH = (int(v) for v in box)
+            endX = startX + boxW
+            endY = startY + boxH
+            cv2.putText(image, detections.label, (startX, startY + 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 0, 0), 2)
+            cv2.rectangle(image, (int(startX), int(startY)), (endX, endY), (0, 0, 255), 2)
+
+        return image
+
+    def inference_batch(self, frames, algorithm='exg', profile=None, roi_rows=None, **thresholds):
+        """
+        Detect blobs in a stream of frames (e.g. a recorded dataset) without drawing anything. Thresholds are
+        compiled into one ThresholdProfile for the whole stream; pass profile or the inference() threshold keywords.
+        :param frames: iterable of BGR frames
+        :return: generator of (boxes, weed_centres) per frame as (N, 4) and (N, 2) int32 arrays
+        """
+        if profile is None:
+            profile = ThresholdProfile(**thresholds)
+        for frame in frames:
+            _, boxes, weed_centres, _ = self.inference(frame, algorithm=algorithm, roi_rows=roi_rows, profile=profile)
+            yield (np.asarray(boxes, dtype=np.int32).reshape(-1, 4),
+                   np.asarray(weed_centres, dtype=np.int32).reshape(-1, 2))
+
+    def _threshold_mask(self, image, workspace, func, algorithm, profile, block_size=31):
+        """Colour index, adaptive threshold and morphological close. Returns the binary mask (a workspace buffer)."""
+        threshed_already = False
+        shape = image.shape[:2]
+        builtin = func in self._workspace_funcs
+        timed = algorithm in self.custom_algorithms
+        if timed:
+            start = time.perf_counter()
+
+        # Built-ins write into the workspace and take the profile's precomputed HSV bounds; custom algorithms
+        # (which may shadow a built-in name) allocate as before
+        if builtin and algorithm in ('exhsv', 'exhsv-int'):
+            output = func(image, bounds=profile.hsv_bounds, out=workspace.buffer('index', shape), workspace=workspace)
+        elif builtin and algorithm == 'hsv':
+            output, threshed_already = func(image, bounds=profile.hsv_bounds, out=workspace.buffer('index', shape),
+                                            workspace=workspace)
+        elif builtin:
+            output = func(image, out=workspace.buffer('index', shape), workspace=workspace)
+        elif algorithm in ('exhsv', 'exhsv-int', 'hsv'):
+            hsv_params = {key: profile.params[key] for key in ('hue_min', 'hue_max', 'brightness_min',
+                                                               'brightness_max', 'saturation_min',
+                                                               'saturation_max', 'invert_hue')}
+            output = func(image, **hsv_params)
+            if algorithm == 'hsv':
+                output, threshed_already = output
         else:
-            # Custom algorithms can optionally accept a params dict
-            params = {
-                'exg_min': exg_min, 'exg_max': exg_max,
-                'hue_min': hue_min, 'hue_max': hue_max,
-                'brightness_min': brightness_min, 'brightness_max': brightness_max,
-                'saturation_min': saturation_min, 'saturation_max': saturation_max,
-                'min_detection_area': min_detection_area, 'invert_hue': invert_hue,
-            }
+            # Custom algorithms can optionally accept a params dict (a copy, so they cannot alter the profile)
             try:
-                output = func(image, params)
+                output = func(image, dict(profile.params))
             except TypeError:
                 output = func(image)
             # Custom algorithms may return (image, True) for pre-thresholded output
             if isinstance(output, tuple):
                 output, threshed_already = output[0], bool(output[1])
 
-        weed_centres = []
-        boxes = []
+        if timed:
+            self.timings.record(algorithm, (time.perf_counter() - start) * 1000)
 
         if not threshed_already:
-            np.clip(output, exg_min, exg_max, out=output)
-            output = output.astype(np.uint8)
-            threshold_out = cv2.adaptiveThreshold(output, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV,
-                                                  31, 2)
-            threshold_out = cv2.morphologyEx(threshold_out, cv2.MORPH_CLOSE, self.kernel, iterations=1)
+            np.clip(output, profile.exg_min, profile.exg_max, out=output)
+            if output.dtype != np.uint8:
+                output = output.astype(np.uint8)
+            method = self.threshold_methods.get(algorithm, self.threshold_methods[None])
+            threshold_out = self._adaptive_threshold(output, workspace, method, block_size)
+            threshold_out = cv2.morphologyEx(threshold_out, cv2.MORPH_CLOSE, self.kernel, iterations=1,
+                                             dst=workspace.buffer('morph', shape))
         else:
-            threshold_out = cv2.morphologyEx(output, cv2.MORPH_CLOSE, self.kernel, iterations=5)
-
-        contours, _ = cv2.findContours(threshold_out, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        # Filter by min area, then keep largest MAX_DETECTIONS
-        valid = []
-        for c in contours:
-            area = cv2.contourArea(c)
-            if area > min_detection_area:
-                valid.append((area, c))
-
-        if len(valid) > MAX_DETECTIONS:
-            valid.sort(key=lambda x: x[0], reverse=True)
-            valid = valid[:MAX_DETECTIONS]
+            threshold_out = cv2.morphologyEx(output, cv2.MORPH_CLOSE, self.kernel, iterations=5,
+                                             dst=workspace.buffer('morph', shape))
 
-        for area, c in valid:
-            x, y, w, h = cv2.boundingRect(c)
-            boxes.append([x, y, w, h])
-            weed_centres.append([x + w // 2, y + h // 2])
-
-        if show_display:
-            image_out = image.copy()
-            for box in boxes:
-                startX, startY, boxW, boxH = box
-                endX = startX + boxW
-                endY = startY + boxH
-                cv2.putText(image_out, label, (startX, startY + 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 0, 0), 2)
-                cv2.rectangle(image_out, (int(startX), int(startY)), (endX, endY), (0, 0, 255), 2)
+        return threshold_out
 
-            return contours, boxes, weed_centres, image_out
+    @staticmethod
+    def _adaptive_threshold(output, workspace, method, block_size):
+        """
+        Inverted adaptive threshold of the uint8 colour index against its local mean (foreground where the pixel
+        is at least THRESHOLD_C below it). 'lowres' falls back to 'mean' on crops too small to downsample.
+        """
+        shape = output.shape
+        dst = workspace.buffer('threshold', shape)
+        if method == 'lowres' and min(shape) >= 8 * LOWRES_FACTOR:
+            small_shape = (shape[0] // LOWRES_FACTOR, shape[1] // LOWRES_FACTOR)
+            small = cv2.resize(output, small_shape[::-1], interpolation=cv2.INTER_AREA,
+                               dst=workspace.buffer('lowres_small', small_shape))
+            ksize = max(3, (block_size // LOWRES_FACTOR) | 1)
+            small_mean = cv2.blur(small, (ksize, ksize), dst=workspace.buffer('lowres_small_mean', small_shape),
+                                  borderType=cv2.BORDER_REPLICATE)
+            mean = cv2.resize(small_mean, shape[::-1], interpolation=cv2.INTER_LINEAR,
+                              dst=workspace.buffer('lowres_mean', shape))
+            # mean - pixel saturates at 0, so > THRESHOLD_C - 1 is exactly adaptiveThreshold's inverted test
+            cv2.subtract(mean, output, dst=mean)
+            cv2.threshold(mean, THRESHOLD_C - 1, 255, cv2.THRESH_BINARY, dst=dst)
+            return dst
 
-        return contours, boxes, weed_centres, image
+        adaptive = cv2.ADAPTIVE_THRESH_GAUSSIAN_C if method == 'gaussian' else cv2.ADAPTIVE_THRESH_MEAN_C
+        return cv2.adaptiveThreshold(output, 255, adaptive, cv2.THRESH_BINARY_INV, block_size, THRESHOLD_C, dst=dst)
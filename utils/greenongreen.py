@@ -8,8 +8,12 @@ Hybrid mode: YOLO identifies crop at low resolution, then GreenOnBrown
 runs ExHSV at full resolution on non-crop areas to find weeds.
 """
 
+import itertools
 import logging
+import time
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 
 import cv2
@@ -20,6 +24,10 @@ try:
 except ImportError:
     YOLO = None
 
+from utils.crop_regions import CropRegions, dilate_kernel
+from utils.greenonbrown import Detections
+from utils.model_catalogue import ModelCatalogue, ModelEntry, task_from_name
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,15 +35,31 @@ class GreenOnGreen:
     def __init__(self, model_path='models', confidence=0.5, detect_classes=None,
                  hybrid_mode=False, inference_resolution=320, crop_buffer_px=20,
                  tracking_enabled=False, crop_stabilizer=None,
-                 detection_persist_frames=0):
+                 detection_persist_frames=0, crop_overlap_max=0.0, fast_predict=False,
+                 tiles=(1, 1), tile_overlap=0.2, analytic_crop_filter=False):
         """
         Args:
             model_path: Path to NCNN model dir, .pt file, or parent dir containing models.
             confidence: Detection confidence threshold (0.0-1.0).
             detect_classes: List of class names to detect (None = all).
             hybrid_mode: If True, use YOLO for crop masking + GreenOnBrown for weed detection.
-            inference_resolution: YOLO input resolution for hybrid mode (lower = faster).
+            inference_resolution: YOLO input resolution for hybrid mode, fast_predict and tiles (lower = faster).
+                                  See set_inference_resolution() for live changes.
             crop_buffer_px: Dilation buffer around detected crop in pixels (hybrid mode).
+            crop_overlap_max: Hybrid safety filter. 0 drops weeds whose centre pixel is
+                              in the crop mask; a fraction in (0, 1] instead drops weeds
+                              whose box overlaps the crop mask by more than that fraction.
+            fast_predict: Pure mode with a detect model and no tracking: run YOLO through a
+                          FastPredictor (preallocated letterbox and input tensor) instead of
+                          model.predict().
+            tiles: (columns, rows) of overlapping tiles for pure mode without tracking. Each
+                   tile is sent to YOLO at inference_resolution, so small weeds keep more
+                   pixels than when the whole frame is shrunk. (1, 1) = off.
+            tile_overlap: Fraction of a tile shared with its neighbour (0.0-0.5).
+            analytic_crop_filter: Hybrid mode: test weeds against the crop boxes and polygons
+                                  grown by crop_buffer_px (CropRegions) instead of rasterising
+                                  and dilating a full-frame crop mask every frame. The mask is
+                                  then only built for frames that are drawn.
         """
         if YOLO is None:
             raise ImportError(
@@ -47,11 +71,19 @@ class GreenOnGreen:
         self.confidence = confidence
         self.hybrid_mode = hybrid_mode
         self.inference_resolution = inference_resolution
+        self._pure_imgsz = {}  # imgsz for pure-mode predict/track once set_inference_resolution() is used
         self.crop_buffer_px = crop_buffer_px
+        self.crop_overlap_max = crop_overlap_max
+        self.analytic_crop_filter = analytic_crop_filter
         self._model_filename = ''
         self.model = self._load_model()
         self.task = self.model.task  # 'detect' or 'segment'
         self.detection_mask = None  # Combined binary mask, set after inference (seg only)
+        self.fast_predict = fast_predict
+        self._fast_predictor = None  # FastPredictor, built for the first frame's size
+        self.tiles = tuple(tiles)
+        self.tile_overlap = tile_overlap
+        self._tile_windows = {}  # (height, width) -> tile windows
 
         # Map class names to IDs after model is loaded
         self._detect_class_ids = self._resolve_classes(detect_classes)
@@ -65,6 +97,8 @@ class GreenOnGreen:
         self.last_raw_boxes = []
         self.last_class_ids = []
         self.last_confidences = []
+        # Detections from the most recent inference() call, for annotate()
+        self.last_detections = Detections()
 
         # Hybrid mode: create internal GreenOnBrown, dilation kernel, thread pool
         self._gob = None
@@ -82,63 +116,30 @@ class GreenOnGreen:
                      f'classes={list(self.model.names.values())}, '
                      f'filtering={detect_classes or "all"}')
 
-    @staticmethod
-    def _infer_task(name, model_path=None):
-        """Infer YOLO task from filename or metadata.yaml."""
-        if '-seg' in name.lower() or '_seg' in name.lower():
-            return 'segment'
-        # Fall back to metadata.yaml inside NCNN model directories
-        if model_path is not None:
-            meta = Path(model_path) / 'metadata.yaml'
-            if meta.exists():
-                try:
-                    with open(meta) as f:
-                        for line in f:
-                            if line.startswith('task:'):
-                                task = line.split(':', 1)[1].strip()
-                                if task:
-                                    logger.info(f'Task "{task}" read from metadata.yaml')
-                                    return task
-                except Exception:
-                    pass
-        return None
-
     def _load_model(self):
-        """Load YOLO model -- supports NCNN dirs and .pt files."""
-        if self.model_path.is_dir():
-            # Check if this IS an NCNN model dir (has .param + .bin)
-            if list(self.model_path.glob('*.param')):
-                logger.info(f'Using NCNN model: {self.model_path.name}')
-                self._model_filename = self.model_path.name
-                task = self._infer_task(self.model_path.name, self.model_path)
-                return YOLO(str(self.model_path), task=task)
-
-            # Search for NCNN subdirs first, then .pt files
-            ncnn_dirs = [d for d in self.model_path.iterdir()
-                         if d.is_dir() and list(d.glob('*.param'))]
-            if ncnn_dirs:
-                selected = ncnn_dirs[0]
-                logger.info(f'Using NCNN model: {selected.name}')
-                self._model_filename = selected.name
-                task = self._infer_task(selected.name, selected)
-                return YOLO(str(selected), task=task)
-
-            pt_files = list(self.model_path.glob('*.pt'))
-            if pt_files:
-                logger.info(f'Using PyTorch model: {pt_files[0].name}')
-                self._model_filename = pt_files[0].name
-                task = self._infer_task(pt_files[0].name)
-                return YOLO(str(pt_files[0]), task=task)
-
-            raise FileNotFoundError(f'No YOLO models found in {self.model_path}')
-
+        """Load YOLO model -- supports NCNN dirs and .pt files, looked up in the model catalogue."""
+        if self.model_path.is_dir() and not list(self.model_path.glob('*.param')):
+            # A directory of models: NCNN exports first, then .pt files
+            entries = ModelCatalogue.for_directory(self.model_path).entries()
+            entries = sorted(entries, key=lambda e: e.format != 'ncnn')
+            if not entries:
+                raise FileNotFoundError(f'No YOLO models found in {self.model_path}')
+            entry = entries[0]
         elif self.model_path.exists():
-            logger.info(f'Using model: {self.model_path.name}')
-            self._model_filename = self.model_path.name
-            task = self._infer_task(self.model_path.name)
-            return YOLO(str(self.model_path), task=task)
+            # A single model: its entry in the parent directory's catalogue
+            entry = ModelCatalogue.for_directory(self.model_path.parent).get(self.model_path.name)
+            if entry is None:
+                # Not a .pt file or NCNN export, e.g. an ONNX file: let YOLO work out the format
+                entry = ModelEntry(name=self.model_path.name, path=str(self.model_path),
+                                   format=self.model_path.suffix.lstrip('.'), task=task_from_name(self.model_path.name))
+        else:
+            raise FileNotFoundError(f'Model path does not exist: {self.model_path}')
 
-        raise FileNotFoundError(f'Model path does not exist: {self.model_path}')
+        label = {'ncnn': 'NCNN', 'pt': 'PyTorch'}.get(entry.format, entry.format)
+        logger.info(f'Using {label} model: {entry.name}'
+                    + (f' (task={entry.task})' if entry.task else ''))
+        self._model_filename = entry.name
+        return YOLO(entry.path, task=entry.task)
 
     def _resolve_classes(self, class_names):
         """Map class names to model class IDs. Returns None if all classes."""
@@ -159,10 +160,7 @@ class GreenOnGreen:
 
     def _build_dilate_kernel(self, px):
         """Build elliptical dilation kernel for crop buffer."""
-        if px <= 0:
-            return None
-        size = 2 * px + 1
-        return cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+        return dilate_kernel(px)
 
     def set_crop_buffer(self, px):
         """Update crop buffer and rebuild kernel (only if value changed)."""
@@ -172,6 +170,59 @@ class GreenOnGreen:
         self._dilate_kernel = self._build_dilate_kernel(px)
         logger.info(f'Crop buffer updated to {px}px')
 
+    def set_crop_stabilizer(self, crop_stabilizer):
+        """Use another CropMaskStabilizer, e.g. the one shared with the detector this one replaces."""
+        self._crop_stabilizer = crop_stabilizer
+
+    @staticmethod
+    def _filter_crop_detections(boxes, weed_centres, crop_mask, overlap_max=0.0):
+        """
+        Safety filter: drop ExHSV detections that fall in the (dilated) crop mask, then cap at MAX_DETECTIONS.
+
+        With overlap_max 0 a detection is dropped when its centre pixel is in the mask (or outside the frame).
+        With overlap_max > 0 it is dropped when more than that fraction of its box is covered by the mask.
+        crop_mask may also be a CropRegions, which answers both tests without a full-frame mask.
+        Lists come back as lists and arrays as arrays.
+        """
+        from utils.greenonbrown import MAX_DETECTIONS
+
+        count = len(weed_centres)
+        if count == 0:
+            return boxes, weed_centres
+
+        h, w = crop_mask.shape[:2]
+        analytic = isinstance(crop_mask, CropRegions)
+        if overlap_max > 0 and analytic:
+            keep = crop_mask.overlap(boxes) <= overlap_max
+        elif overlap_max > 0:
+            box_arr = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+            x0 = np.clip(box_arr[:, 0], 0, w)
+            y0 = np.clip(box_arr[:, 1], 0, h)
+            x1 = np.clip(box_arr[:, 0] + box_arr[:, 2], 0, w)
+            y1 = np.clip(box_arr[:, 1] + box_arr[:, 3], 0, h)
+            # countNonZero per box touches only the box pixels; a full-frame integral image costs more
+            # than this for the <= MAX_DETECTIONS boxes GreenOnBrown returns
+            covered = np.array([cv2.countNonZero(crop_mask[top:bottom, left:right])
+                                if bottom > top and right > left else 0
+                                for left, top, right, bottom in zip(x0.tolist(), y0.tolist(),
+                                                                    x1.tolist(), y1.tolist())])
+            area = np.maximum(box_arr[:, 2] * box_arr[:, 3], 1)
+            keep = covered / area <= overlap_max
+        else:
+            centres = np.asarray(weed_centres, dtype=np.int64).reshape(-1, 2)
+            cx, cy = centres[:, 0], centres[:, 1]
+            keep = (cx >= 0) & (cx < w) & (cy >= 0) & (cy < h)
+            if analytic:
+                keep[keep] = ~crop_mask.contains(centres[keep])
+            else:
+                keep[keep] = crop_mask[cy[keep], cx[keep]] == 0
+
+        # Cap after safety filter to limit downstream processing
+        index = np.flatnonzero(keep)[:MAX_DETECTIONS]
+        if isinstance(boxes, np.ndarray):
+            return boxes[index], weed_centres[index]
+        return [boxes[i] for i in index], [weed_centres[i] for i in index]
+
     @staticmethod
     def _build_crop_mask(results, h, w):
         """Build crop mask from a single frame's YOLO results (no stabilization)."""
@@ -181,12 +232,51 @@ class GreenOnGreen:
                 contours_full = [c.astype(np.int32).reshape(-1, 1, 2)
                                  for c in result.masks.xy]
                 cv2.drawContours(mask, contours_full, -1, 255, -1)
-            elif len(result.boxes):
-                for box in result.boxes:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
+            else:
+                for x1, y1, x2, y2 in GreenOnGreen._box_arrays(result.boxes)[0].tolist():
                     cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)
         return mask
 
+    def _build_crop_regions(self, results, shape):
+        """CropRegions of a single frame's YOLO results (no stabilization), grown by the crop buffer."""
+        regions = CropRegions(shape, self.crop_buffer_px, self._dilate_kernel)
+        for result in results:
+            if result.masks is not None:
+                regions.add_polygons(result.masks.xy)
+            else:
+                regions.add_boxes(self._box_arrays(result.boxes)[0])
+        return regions
+
+    def _stabilized_crop_regions(self, shape):
+        """CropRegions of the CropMaskStabilizer's detected and persisted crops, as build_stabilized_mask() draws them."""
+        regions = CropRegions(shape, self.crop_buffer_px, self._dilate_kernel)
+        for info in self._crop_stabilizer.get_all_crop_regions():
+            if info['contour'] is not None:
+                regions.add_polygons([info['contour']])
+            elif len(info['box']) >= 4:
+                x1, y1, x2, y2 = (int(v) for v in info['box'][:4])
+                # The stabilizer fills box[y1:y2, x1:x2]; CropRegions corners are inclusive
+                if x2 > x1 and y2 > y1:
+                    regions.add_boxes([[x1, y1, x2 - 1, y2 - 1]])
+        return regions
+
+    @staticmethod
+    def _box_arrays(yolo_boxes):
+        """
+        One conversion per attribute of an ultralytics Boxes instead of per-box tensor indexing.
+
+        Returns:
+            (xyxy, class_ids, confidences, track_ids): (N, 4) int32 corners truncated like int(),
+            (N,) int32, (N,) float32, and (N,) int64 tracker IDs or None when untracked.
+        """
+        xyxy = yolo_boxes.xyxy.cpu().numpy().reshape(-1, 4).astype(np.int32)
+        class_ids = yolo_boxes.cls.cpu().numpy().reshape(-1).astype(np.int32)
+        confidences = yolo_boxes.conf.cpu().numpy().reshape(-1).astype(np.float32)
+        track_ids = yolo_boxes.id
+        if track_ids is not None:
+            track_ids = track_ids.cpu().numpy().reshape(-1).astype(np.int64)
+        return xyxy, class_ids, confidences, track_ids
+
     # Track stability presets — map user-facing names to ByteTrack params
     TRACK_STABILITY_PRESETS = {
         'low': {
@@ -310,6 +400,16 @@ class GreenOnGreen:
             for tracker in getattr(self.model.predictor, 'trackers', []):
                 tracker.reset()
 
+    def set_inference_resolution(self, imgsz):
+        """
+        Change the YOLO input size between frames, e.g. from the resolution governor.
+
+        Pure-mode predict/track keep the model's own input size until this is called,
+        then use imgsz like hybrid, fast_predict and tiled inference do.
+        """
+        self.inference_resolution = int(imgsz)
+        self._pure_imgsz = {'imgsz': self.inference_resolution}
+
     def update_detect_classes(self, class_names):
         """Hot-update detect_classes filter without reloading the model."""
         self._detect_class_ids = self._resolve_classes(class_names)
@@ -326,7 +426,7 @@ class GreenOnGreen:
                   exg_min=30, exg_max=250, hue_min=30, hue_max=90,
                   saturation_min=30, saturation_max=255,
                   brightness_min=5, brightness_max=200,
-                  min_detection_area=1, invert_hue=False):
+                  min_detection_area=1, invert_hue=False, roi_rows=None, profile=None):
         """
         Run YOLO inference. Returns same tuple as GreenOnBrown.
 
@@ -342,6 +442,10 @@ class GreenOnGreen:
             build_mask: If True and model is segmentation, build self.detection_mask
                         for zone-based actuation. Skipped when False to save CPU.
             exg_min..invert_hue: GreenOnBrown params, only used in hybrid mode.
+            roi_rows: (start, end) rows for the hybrid ExHSV pass; YOLO still sees
+                      the whole frame. Ignored in non-hybrid mode.
+            profile: optional GreenOnBrown ThresholdProfile; replaces exg_min..invert_hue
+                     in hybrid mode. Ignored in non-hybrid mode.
 
         Returns:
             (contours, boxes, weed_centres, image_out)
@@ -349,6 +453,8 @@ class GreenOnGreen:
             - boxes: list of [x, y, w, h]
             - weed_centres: list of [cx, cy]
             - image_out: annotated image if show_display, else original image
+            The detections are also kept in self.last_detections; annotate() draws
+            them later on frames that are actually shown or streamed.
         """
         if self.hybrid_mode:
             return self._hybrid_inference(
@@ -357,12 +463,19 @@ class GreenOnGreen:
                 hue_min=hue_min, hue_max=hue_max,
                 saturation_min=saturation_min, saturation_max=saturation_max,
                 brightness_min=brightness_min, brightness_max=brightness_max,
-                min_detection_area=min_detection_area, invert_hue=invert_hue
+                min_detection_area=min_detection_area, invert_hue=invert_hue,
+                roi_rows=roi_rows, profile=profile
             )
 
         # --- Pure GoG mode ---
         self.detection_mask = None  # Reset each frame
 
+        if not self.tracking_enabled and self.tiles != (1, 1):
+            return self._tiled_inference(image, confidence, show_display, label, build_mask)
+
+        if self.fast_predict and not self.tracking_enabled and self.task == 'detect':
+            return self._fast_inference(image, confidence, show_display, label)
+
         if self.tracking_enabled:
             # Track ALL classes — ClassSmoother in owl.py does class filtering
             results = self.model.track(
@@ -371,7 +484,8 @@ class GreenOnGreen:
                 persist=True,
                 tracker='config/bytetrack_owl.yaml',
                 verbose=False,
-                device='cpu'
+                device='cpu',
+                **self._pure_imgsz
             )
         else:
             results = self.model.predict(
@@ -379,32 +493,18 @@ class GreenOnGreen:
                 conf=confidence,
                 classes=self._detect_class_ids,
                 verbose=False,
-                device='cpu'
+                device='cpu',
+                **self._pure_imgsz
             )
 
-        boxes = []
-        weed_centres = []
+        xyxy = np.empty((0, 4), dtype=np.int32)
+        class_ids = np.empty(0, dtype=np.int32)
+        confidences = np.empty(0, dtype=np.float32)
+        track_ids = None
         contours = None
-        track_ids = []
-        raw_class_ids = []
-        raw_confidences = []
-
         for result in results:
-            has_ids = (self.tracking_enabled
-                       and result.boxes.id is not None
-                       and len(result.boxes.id) > 0)
-
-            # Process bounding boxes (works for both detect and segment)
-            for i, box in enumerate(result.boxes):
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                w, h = x2 - x1, y2 - y1
-                boxes.append([x1, y1, w, h])
-                weed_centres.append([x1 + w // 2, y1 + h // 2])
-
-                if has_ids:
-                    track_ids.append(int(result.boxes.id[i]))
-                    raw_class_ids.append(int(box.cls[0]))
-                    raw_confidences.append(float(box.conf[0]))
+            xyxy, class_ids, confidences, ids = self._box_arrays(result.boxes)
+            track_ids = ids if self.tracking_enabled and ids is not None and len(ids) else None
 
             # Extract mask contours for segmentation models
             if result.masks is not None:
@@ -416,51 +516,232 @@ class GreenOnGreen:
                     self.detection_mask = np.zeros(image.shape[:2], dtype=np.uint8)
                     cv2.drawContours(self.detection_mask, contours, -1, 255, -1)
 
+        if track_ids is None:
+            return self._untracked_result(image, xyxy, confidences, class_ids, contours, show_display, label)
+
         # Store raw tracking data for owl.py's ClassSmoother
-        self.last_track_ids = track_ids
+        boxes, weed_centres = self._xyxy_to_boxes(xyxy)
+        self.last_track_ids = track_ids.tolist()
         self.last_raw_boxes = list(boxes)
-        self.last_class_ids = raw_class_ids
-        self.last_confidences = raw_confidences
+        self.last_class_ids = class_ids.tolist()
+        self.last_confidences = confidences.tolist()
+
+        self.last_detections = Detections(
+            boxes=self.last_raw_boxes, contours=contours, label=label, track_ids=tuple(self.last_track_ids),
+            class_ids=class_ids, confidences=confidences)
+        if show_display:
+            return contours, boxes, weed_centres, self.annotate(image.copy())
+
+        return contours, boxes, weed_centres, image
+
+    def _fast_inference(self, image, confidence, show_display, label):
+        """Pure-mode inference() through the FastPredictor for this frame size."""
+        predictor = self._fast_predictor
+        if (predictor is None or predictor.frame_shape != image.shape[:2]
+                or predictor.imgsz != self.inference_resolution):
+            predictor = self._fast_predictor = FastPredictor(self.model, image.shape, self.inference_resolution)
+            logger.info(f'Fast predictor: {image.shape[1]}x{image.shape[0]} -> {self.inference_resolution}px input')
+
+        xyxy, confidences, class_ids = predictor.predict(image, conf=confidence, classes=self._detect_class_ids)
+        return self._untracked_result(image, xyxy, confidences, class_ids, None, show_display, label)
+
+    def _tiled_inference(self, image, confidence, show_display, label, build_mask):
+        """
+        Pure-mode inference() over overlapping tiles, merged with class-aware NMS.
+
+        PyTorch models get all tiles in one batched predict() call, exported models
+        one call per tile. Detections are moved back
+        to frame coordinates, then duplicates from the overlap bands are merged by
+        class_aware_nms() on intersection over the smaller box, which also catches a
+        weed cut in two by a tile edge. Boxes from the same tile are only compared on
+        IoU, so a small weed inside a larger one's box is kept as YOLO kept it.
+        """
+        h, w = image.shape[:2]
+        windows = self._tile_windows.get((h, w))
+        if windows is None:
+            windows = self._tile_windows[(h, w)] = tile_windows(w, h, *self.tiles, overlap=self.tile_overlap)
+            logger.info(f'Tiled inference: {w}x{h} -> {len(windows)} tiles of '
+                        f'{windows[0][2] - windows[0][0]}x{windows[0][3] - windows[0][1]} '
+                        f'at {self.inference_resolution}px')
+
+        tiles = [image[y0:y1, x0:x1] for x0, y0, x1, y1 in windows]
+        predict = partial(self.model.predict, conf=confidence, classes=self._detect_class_ids,
+                          imgsz=self.inference_resolution, verbose=False, device='cpu')
+        if self._model_filename.endswith('.pt'):
+            results = predict(source=tiles)
+        else:
+            # Exported models (NCNN) are built for a batch of one
+            results = [result for tile in tiles for result in predict(source=tile)]
+
+        xyxy, confidences, class_ids, tile_ids, polygons = [], [], [], [], []
+        for tile, ((x0, y0, _, _), result) in enumerate(zip(windows, results)):
+            xyxy.append(result.boxes.xyxy.cpu().numpy().reshape(-1, 4) + np.float32([x0, y0, x0, y0]))
+            confidences.append(result.boxes.conf.cpu().numpy().reshape(-1))
+            tile_ids.append(np.full(len(confidences[-1]), tile, dtype=np.int32))
+            class_ids.append(result.boxes.cls.cpu().numpy().reshape(-1))
+            if result.masks is not None:
+                polygons.extend(xy + np.float32([x0, y0]) for xy in result.masks.xy)
+        xyxy = np.concatenate(xyxy).astype(np.float32)
+        confidences = np.concatenate(confidences).astype(np.float32)
+        class_ids = np.concatenate(class_ids).astype(np.int32)
+
+        keep = class_aware_nms(xyxy, confidences, class_ids, tile_ids=np.concatenate(tile_ids))
+        contours = None
+        if self.task == 'segment':
+            contours = [polygons[i].astype(np.int32).reshape(-1, 1, 2) for i in keep] if polygons else []
+            if build_mask:
+                self.detection_mask = np.zeros((h, w), dtype=np.uint8)
+                cv2.drawContours(self.detection_mask, contours, -1, 255, -1)
+
+        return self._untracked_result(image, xyxy[keep], confidences[keep], class_ids[keep], contours,
+                                      show_display, label)
 
+    @staticmethod
+    def _xyxy_to_boxes(xyxy):
+        """[x, y, w, h] boxes and [cx, cy] centres as lists from (N, 4) corners, truncated to int."""
+        xyxy = xyxy.astype(np.int32)
+        wh = xyxy[:, 2:] - xyxy[:, :2]
+        return np.hstack([xyxy[:, :2], wh]).tolist(), (xyxy[:, :2] + wh // 2).tolist()
+
+    def _untracked_result(self, image, xyxy, confidences, class_ids, contours, show_display, label):
+        """Store untracked frame-coordinate detections and build inference()'s return tuple."""
+        boxes, weed_centres = self._xyxy_to_boxes(xyxy)
+
+        self.last_track_ids = []
+        self.last_raw_boxes = list(boxes)
+        self.last_class_ids = []
+        self.last_confidences = []
+        self.last_detections = Detections(boxes=self.last_raw_boxes, contours=contours, label=label,
+                                          class_ids=class_ids, confidences=confidences)
         if show_display:
-            image_out = image.copy()
-
-            # Draw segmentation masks if available
-            if contours is not None:
-                overlay = image_out.copy()
-                for contour in contours:
-                    cv2.drawContours(overlay, [contour], -1, (0, 255, 0), -1)
-                cv2.addWeighted(overlay, 0.3, image_out, 0.7, 0, image_out)
-
-            # Draw bounding boxes + labels (green if tracked, red if not)
-            for i, box_data in enumerate(boxes):
-                x, y, w, h = box_data
-                conf_val = float(result.boxes[i].conf[0]) if i < len(result.boxes) else confidence
-                cls_id = int(result.boxes[i].cls[0]) if i < len(result.boxes) else 0
-                cls_name = self.model.names.get(cls_id, label)
-
-                has_track = (self.tracking_enabled and i < len(track_ids)
-                             and track_ids[i] is not None)
-                if has_track:
-                    box_label = f'ID{track_ids[i]} {int(conf_val * 100)}% {cls_name}'
-                    box_color = (0, 200, 0)   # green — tracked
-                else:
-                    box_label = f'{int(conf_val * 100)}% {cls_name}'
-                    box_color = (0, 0, 255)   # red — untracked
-
-                cv2.rectangle(image_out, (x, y), (x + w, y + h), box_color, 2)
-                cv2.putText(image_out, box_label, (x, y - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
-
-            return contours, boxes, weed_centres, image_out
+            return contours, boxes, weed_centres, self.annotate(image.copy())
 
         return contours, boxes, weed_centres, image
 
+    def annotate(self, image, detections=None):
+        """
+        Draw detections (default: those of the last inference() call) onto image in place.
+
+        Pure mode: translucent segmentation masks, then boxes labelled with confidence
+        and class (green with the track ID if tracked, red if not). Hybrid mode: blue
+        crop mask, lighter blue buffer zone and red weed boxes.
+
+        Args:
+            image: The frame the detections came from, or a copy of it.
+            detections: A Detections record; defaults to self.last_detections.
+
+        Returns:
+            image
+        """
+        if detections is None:
+            detections = self.last_detections
+
+        crop_mask, crop_mask_undilated = detections.crop_mask, detections.crop_mask_undilated
+        if detections.crop_regions is not None:
+            # Analytic crop filter: the masks are rasterised here, only for frames that are drawn
+            crop_mask, crop_mask_undilated = detections.crop_regions.masks()
+
+        if crop_mask is not None:
+            # Blue overlay on crop mask
+            crop_overlay = image.copy()
+            crop_overlay[crop_mask_undilated > 0] = (200, 150, 50)
+            cv2.addWeighted(crop_overlay, 0.5, image, 0.5, 0, image)
+
+            # Lighter blue on buffer zone (dilated - original)
+            if crop_mask is not crop_mask_undilated:
+                buffer_zone = cv2.subtract(crop_mask, crop_mask_undilated)
+                if np.any(buffer_zone):
+                    buffer_overlay = image.copy()
+                    buffer_overlay[buffer_zone > 0] = (200, 180, 100)
+                    cv2.addWeighted(buffer_overlay, 0.35, image, 0.65, 0, image)
+
+            # Red boxes on weed detections
+            for box_data in detections.boxes:
+                x, y, w, h = (int(v) for v in box_data)
+                cv2.rectangle(image, (x, y), (x + w, y + h), (0, 0, 255), 2)
+
+            return image
+
+        # Draw segmentation masks if available
+        if detections.contours is not None:
+            overlay = image.copy()
+            for contour in detections.contours:
+                cv2.drawContours(overlay, [contour], -1, (0, 255, 0), -1)
+            cv2.addWeighted(overlay, 0.3, image, 0.7, 0, image)
+
+        # Draw bounding boxes + labels (green if tracked, red if not)
+        track_ids = detections.track_ids
+        for i, box_data in enumerate(detections.boxes):
+            x, y, w, h = box_data
+            if detections.confidences is not None and i < len(detections.confidences):
+                conf_val, cls_id = float(detections.confidences[i]), int(detections.class_ids[i])
+            else:
+                conf_val, cls_id = self.confidence, 0
+            cls_name = self.model.names.get(cls_id, detections.label)
+
+            has_track = (self.tracking_enabled and i < len(track_ids)
+                         and track_ids[i] is not None)
+            if has_track:
+                box_label = f'ID{track_ids[i]} {int(conf_val * 100)}% {cls_name}'
+                box_color = (0, 200, 0)   # green — tracked
+            else:
+                box_label = f'{int(conf_val * 100)}% {cls_name}'
+                box_color = (0, 0, 255)   # red — untracked
+
+            cv2.rectangle(image, (x, y), (x + w, y + h), box_color, 2)
+            cv2.putText(image, box_label, (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+
+        return image
+
+    def inference_batch(self, frames, confidence=0.5, batch_size=8, **hybrid_kwargs):
+        """
+        Detect weeds in a stream of frames (e.g. a recorded dataset) without tracking or drawing.
+
+        In pure GoG mode frames are sent to YOLO batch_size at a time. Hybrid mode
+        runs inference() per frame with hybrid_kwargs (GreenOnBrown thresholds or profile).
+
+        Args:
+            frames: iterable of BGR numpy arrays.
+            confidence: Detection confidence threshold.
+            batch_size: Frames per YOLO predict call (pure GoG mode).
+
+        Yields:
+            (boxes, weed_centres, class_ids, confidences) per frame: (N, 4) and (N, 2)
+            int32 arrays, (N,) int32 class ids and (N,) float32 confidences. Hybrid
+            detections come from ExHSV, so their class id is -1 and confidence NaN.
+        """
+        if self.hybrid_mode:
+            for frame in frames:
+                _, boxes, weed_centres, _ = self.inference(frame, confidence=confidence, **hybrid_kwargs)
+                boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+                yield (boxes, np.asarray(weed_centres, dtype=np.int32).reshape(-1, 2),
+                       np.full(len(boxes), -1, dtype=np.int32), np.full(len(boxes), np.nan, dtype=np.float32))
+            return
+
+        frames = iter(frames)
+        while True:
+            chunk = list(itertools.islice(frames, batch_size))
+            if not chunk:
+                return
+            results = self.model.predict(
+                source=chunk,
+                conf=confidence,
+                classes=self._detect_class_ids,
+                verbose=False,
+                device='cpu'
+            )
+            for result in results:
+                xyxy, class_ids, confidences, _ = self._box_arrays(result.boxes)
+                boxes = np.column_stack([xyxy[:, :2], xyxy[:, 2:] - xyxy[:, :2]]).astype(np.int32)
+                weed_centres = boxes[:, :2] + boxes[:, 2:] // 2
+                yield boxes, weed_centres, class_ids, confidences
+
     def _hybrid_inference(self, image, confidence, show_display,
                           exg_min=30, exg_max=250, hue_min=30, hue_max=90,
                           saturation_min=30, saturation_max=255,
                           brightness_min=5, brightness_max=200,
-                          min_detection_area=1, invert_hue=False):
+                          min_detection_area=1, invert_hue=False, roi_rows=None, profile=None):
         """
         Hybrid pipeline: YOLO crop mask + ExHSV weed detection (parallel).
 
@@ -468,17 +749,20 @@ class GreenOnGreen:
         YOLO runs on the main thread. Both YOLO (NCNN) and ExHSV (OpenCV/NumPy)
         release the GIL, so they achieve true parallelism on separate cores.
 
-        Step 1: Submit ExHSV on full image to thread pool
+        Step 1: Submit ExHSV (full image or roi_rows band) to thread pool
         Step 2: YOLO predict on main thread (the bottleneck)
         Step 3: Build crop_mask at full resolution from masks.xy or boxes.xyxy
         Step 4: Dilate crop_mask by buffer
         Step 5: Wait for ExHSV result
-        Step 6: Filter out any detections whose centre falls in crop mask
-        Step 7: Visualization (if show_display)
+        Step 6: Filter out any detections whose centre (or, with crop_overlap_max, box) falls in crop mask
+        Step 7: Keep the detections for annotate(); draw them now if show_display
+
+        With analytic_crop_filter, steps 3 and 4 collect the crop boxes and polygons into a CropRegions
+        instead, step 6 tests against them directly, and annotate() builds the mask only when drawing.
         """
         h_full, w_full = image.shape[:2]
 
-        # Step 1: Submit ExHSV on full image to background thread
+        # Step 1: Submit ExHSV to background thread (only roi_rows if given)
         exhsv_future = self._executor.submit(
             self._gob.inference,
             image,
@@ -489,7 +773,9 @@ class GreenOnGreen:
             min_detection_area=min_detection_area,
             show_display=False,
             algorithm='exhsv',
-            invert_hue=invert_hue
+            invert_hue=invert_hue,
+            roi_rows=roi_rows,
+            profile=profile
         )
 
         # Step 2: YOLO inference on main thread (imgsz handles resize)
@@ -514,7 +800,8 @@ class GreenOnGreen:
                 device='cpu'
             )
 
-        # Step 3: Build crop mask at full resolution
+        # Step 3: Build crop mask (or crop regions) at full resolution
+        analytic = self.analytic_crop_filter
         if self.tracking_enabled and self._crop_stabilizer:
             # Feed tracked crop detections to stabilizer for temporal persistence
             crop_track_ids = []
@@ -530,10 +817,10 @@ class GreenOnGreen:
                         c.astype(np.int32).reshape(-1, 1, 2)
                         for c in result.masks.xy)
 
-                for i, box in enumerate(result.boxes):
-                    if has_ids:
-                        crop_track_ids.append(int(result.boxes.id[i]))
-                        crop_boxes_xyxy.append(list(map(int, box.xyxy[0])))
+                if has_ids:
+                    xyxy, _, _, ids = self._box_arrays(result.boxes)
+                    crop_track_ids.extend(ids.tolist())
+                    crop_boxes_xyxy.extend(xyxy.tolist())
 
             if crop_track_ids:
                 self._crop_stabilizer.update(
@@ -541,11 +828,12 @@ class GreenOnGreen:
                     crop_boxes_xyxy,
                     contours=crop_contours if crop_contours else None
                 )
-                crop_mask = self._crop_stabilizer.build_stabilized_mask(
-                    (h_full, w_full))
+                crop_mask = (self._stabilized_crop_regions((h_full, w_full)) if analytic
+                             else self._crop_stabilizer.build_stabilized_mask((h_full, w_full)))
             else:
                 # No track IDs available — fall back to per-frame mask
-                crop_mask = self._build_crop_mask(results, h_full, w_full)
+                crop_mask = (self._build_crop_regions(results, (h_full, w_full)) if analytic
+                             else self._build_crop_mask(results, h_full, w_full))
 
             # Paint Kalman-predicted lost crop tracks into the mask
             # ByteTrack predicts where dropped crops moved — fills mask holes
@@ -557,55 +845,351 @@ class GreenOnGreen:
                 x1, y1, x2, y2 = [max(0, int(v)) for v in lc['xyxy']]
                 x2, y2 = min(w_full, x2), min(h_full, y2)
                 if x2 > x1 and y2 > y1:
-                    crop_mask[y1:y2, x1:x2] = 255
+                    if analytic:
+                        crop_mask.add_boxes([[x1, y1, x2 - 1, y2 - 1]])
+                    else:
+                        crop_mask[y1:y2, x1:x2] = 255
         else:
-            crop_mask = self._build_crop_mask(results, h_full, w_full)
-
-        # Step 4: Dilate crop mask by buffer
-        crop_mask_undilated = crop_mask.copy() if show_display else None
-        if self._dilate_kernel is not None and np.any(crop_mask):
-            crop_mask = cv2.dilate(crop_mask, self._dilate_kernel)
+            crop_mask = (self._build_crop_regions(results, (h_full, w_full)) if analytic
+                         else self._build_crop_mask(results, h_full, w_full))
+
+        # Step 4: Dilate crop mask by buffer (CropRegions carry the buffer themselves)
+        # dilate() returns a new array, so the undilated mask needs no copy for annotate()
+        crop_regions = None
+        if analytic:
+            crop_regions = crop_mask
+        else:
+            crop_mask_undilated = crop_mask
+            if self._dilate_kernel is not None and np.any(crop_mask):
+                crop_mask = cv2.dilate(crop_mask, self._dilate_kernel)
 
         # Step 5: Wait for ExHSV result
         cnts, boxes, weed_centres, _ = exhsv_future.result()
 
-        # Step 6: Safety filter — drop detections whose centre falls in crop mask
-        from utils.greenonbrown import MAX_DETECTIONS
-        filtered_boxes = []
-        filtered_centres = []
-        for i, centre in enumerate(weed_centres):
-            cx, cy = centre
-            if 0 <= cy < h_full and 0 <= cx < w_full:
-                if crop_mask[cy, cx] == 0:  # Not in crop zone
-                    filtered_boxes.append(boxes[i])
-                    filtered_centres.append(centre)
-
-        # Cap after safety filter to limit downstream processing
-        filtered_boxes = filtered_boxes[:MAX_DETECTIONS]
-        filtered_centres = filtered_centres[:MAX_DETECTIONS]
+        # Step 6: Safety filter — drop detections whose centre (or box overlap) falls in crop mask
+        filtered_boxes, filtered_centres = self._filter_crop_detections(
+            boxes, weed_centres, crop_mask, self.crop_overlap_max)
 
         # Step 7: Visualization
+        if crop_regions is not None:
+            self.last_detections = Detections(boxes=filtered_boxes, contours=cnts, crop_regions=crop_regions)
+        else:
+            self.last_detections = Detections(
+                boxes=filtered_boxes, contours=cnts,
+                crop_mask=crop_mask, crop_mask_undilated=crop_mask_undilated)
         if show_display:
-            image_out = image.copy()
+            return cnts, filtered_boxes, filtered_centres, self.annotate(image.copy())
 
-            # Blue overlay on crop mask
-            crop_overlay = image_out.copy()
-            crop_overlay[crop_mask_undilated > 0] = (200, 150, 50)
-            cv2.addWeighted(crop_overlay, 0.5, image_out, 0.5, 0, image_out)
+        return cnts, filtered_boxes, filtered_centres, image
 
-            # Lighter blue on buffer zone (dilated - original)
-            if self._dilate_kernel is not None:
-                buffer_zone = cv2.subtract(crop_mask, crop_mask_undilated)
-                if np.any(buffer_zone):
-                    buffer_overlay = image_out.copy()
-                    buffer_overlay[buffer_zone > 0] = (200, 180, 100)
-                    cv2.addWeighted(buffer_overlay, 0.35, image_out, 0.65, 0, image_out)
 
-            # Red boxes on weed detections
-            for box_data in filtered_boxes:
-                x, y, w, h = box_data
-                cv2.rectangle(image_out, (x, y), (x + w, y + h), (0, 0, 255), 2)
+def tile_windows(width, height, columns, rows, overlap=0.2):
+    """
+    Overlapping tiles covering a frame, equal in size per axis.
+
+    Args:
+        width, height: Frame size in pixels.
+        columns, rows: Tile grid.
+        overlap: Fraction of a tile shared with its neighbour.
+
+    Returns:
+        List of (x0, y0, x1, y1) windows, row by row.
+    """
+    def spans(length, count):
+        if count <= 1:
+            return [(0, length)]
+        size = int(np.ceil(length / (count - (count - 1) * overlap)))
+        starts = np.linspace(0, length - size, count).round().astype(int)
+        return [(int(start), int(start) + size) for start in starts]
+
+    return [(x0, y0, x1, y1) for y0, y1 in spans(height, rows) for x0, x1 in spans(width, columns)]
+
+
+def class_aware_nms(xyxy, confidences, class_ids, threshold=0.5, tile_ids=None, iou_threshold=0.7):
+    """
+    Greedy NMS within each class on intersection over the smaller box, across tiles.
+
+    Intersection over union would keep both halves of a weed split by a tile edge
+    alongside the full box from the neighbouring tile; measured against the smaller
+    box, a fragment overlaps the full detection almost completely. Within one tile
+    that would also drop a small weed lying mostly inside a larger weed's box, so
+    boxes from the same tile are compared on IoU, as YOLO's own NMS did.
+
+    Args:
+        xyxy: (N, 4) boxes.
+        confidences: (N,) scores; higher-scored boxes suppress lower ones.
+        class_ids: (N,) class ids; boxes only suppress boxes of the same class.
+        threshold: Suppress boxes from different tiles when intersection / smaller area reaches this.
+        tile_ids: (N,) tile each box came from; None treats every box as from its own tile.
+        iou_threshold: Suppress boxes from the same tile when IoU reaches this (Ultralytics' default).
+
+    Returns:
+        Indices of the kept boxes, highest confidence first.
+    """
+    order = np.argsort(-confidences, kind='stable')
+    xyxy = xyxy[order].astype(np.float32)
+    class_ids = class_ids[order]
+    tile_ids = np.arange(len(order)) if tile_ids is None else np.asarray(tile_ids)[order]
+    areas = np.maximum(xyxy[:, 2] - xyxy[:, 0], 0) * np.maximum(xyxy[:, 3] - xyxy[:, 1], 0)
+
+    # Pairwise suppression matrix in one pass, then the greedy walk is only row lookups
+    iw = np.minimum(xyxy[:, None, 2], xyxy[None, :, 2]) - np.maximum(xyxy[:, None, 0], xyxy[None, :, 0])
+    ih = np.minimum(xyxy[:, None, 3], xyxy[None, :, 3]) - np.maximum(xyxy[:, None, 1], xyxy[None, :, 1])
+    inter = np.maximum(iw, 0) * np.maximum(ih, 0)
+    smaller = np.maximum(np.minimum(areas[:, None], areas[None, :]), 1e-6)
+    union = np.maximum(areas[:, None] + areas[None, :] - inter, 1e-6)
+    same_tile = tile_ids[:, None] == tile_ids[None, :]
+    overlapping = np.where(same_tile, inter / union >= iou_threshold, inter / smaller >= threshold)
+    suppresses = overlapping & (class_ids[:, None] == class_ids[None, :])
+
+    suppressed = np.zeros(len(xyxy), dtype=bool)
+    keep = []
+    for i in range(len(xyxy)):
+        if not suppressed[i]:
+            keep.append(i)
+            suppressed |= suppresses[i]
+    return order[keep]
+
+
+class FastPredictor:
+    """
+    YOLO detect predictor for a fixed frame size and input resolution.
+
+    model.predict() loads the source, letterboxes, converts BGR HWC to RGB CHW and
+    normalises with fresh allocations on every call, although for a camera the frame
+    size never changes. This computes the letterbox geometry once and keeps a reusable
+    input tensor whose grey border is written once; per frame, only the resized image
+    is split into channels and normalised into the window inside the border. The model
+    backend is called directly and boxes are mapped back to the frame with the
+    precomputed scale and pad.
+
+    Detect models only: segmentation masks and tracking need Ultralytics' Results.
+    The canvas is square (imgsz x imgsz), as exported models (NCNN) expect.
+    """
+
+    LETTERBOX_FILL = 114  # Ultralytics' letterbox border colour
+
+    def __init__(self, model, frame_shape, imgsz=320, iou=0.7, max_det=300):
+        """
+        Args:
+            model: The ultralytics YOLO model.
+            frame_shape: (height, width) of every frame passed to predict().
+            imgsz: Model input size in pixels.
+            iou: NMS IoU threshold (Ultralytics' default).
+            max_det: Maximum detections per frame after NMS.
+        """
+        self.model = model
+        self.frame_shape = tuple(frame_shape[:2])
+        self.imgsz = imgsz
+        self.iou = iou
+        self.max_det = max_det
+
+        # Ultralytics LetterBox geometry: scale to fit, centre, pad the rest
+        h, w = self.frame_shape
+        self.scale = min(imgsz / h, imgsz / w)
+        new_w, new_h = int(round(w * self.scale)), int(round(h * self.scale))
+        left, top = int(round((imgsz - new_w) / 2 - 0.1)), int(round((imgsz - new_h) / 2 - 0.1))
+        self._size = (new_w, new_h)
+        self._offset = np.array([left, top, left, top], dtype=np.float32)
+        self._limit = np.array([w, h, w, h], dtype=np.float32)
+
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._channels = [np.empty((new_h, new_w), dtype=np.uint8) for _ in range(3)]
+        self._input = np.full((1, 3, imgsz, imgsz), np.float32(self.LETTERBOX_FILL) / np.float32(255),
+                              dtype=np.float32)
+        # Image area of each input channel, in BGR order so split() channels map straight onto RGB planes
+        self._windows = [self._input[0, c, top:top + new_h, left:left + new_w] for c in (2, 1, 0)]
+
+        # Bound on first predict(): torch, the model backend and NMS
+        self._torch = None
+        self._tensor = None
+        self._backend = None
+        self._nms = None
+
+    def preprocess(self, image):
+        """Letterbox and normalise image into the input buffer. Returns the (1, 3, imgsz, imgsz) float32 buffer."""
+        if image.shape[1::-1] != self._size:
+            image = cv2.resize(image, self._size, dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1], as model.predict() divides by 255
+        for channel, window in zip(cv2.split(image, self._channels), self._windows):
+            np.divide(channel, np.float32(255), out=window)
+        return self._input
+
+    def scale_boxes(self, xyxy):
+        """Map (N, 4) input-pixel xyxy boxes back to frame pixels, in place. Returns xyxy."""
+        xyxy -= self._offset
+        xyxy /= self.scale
+        np.clip(xyxy, 0, self._limit, out=xyxy)
+        return xyxy
+
+    def _bind(self):
+        import torch
+        try:
+            from ultralytics.utils.nms import non_max_suppression
+        except ImportError:
+            from ultralytics.utils.ops import non_max_suppression
+
+        # One regular predict() sets up Ultralytics' predictor and its backend (NCNN, PyTorch, ...)
+        if getattr(self.model, 'predictor', None) is None:
+            self.model.predict(source=np.zeros((*self.frame_shape, 3), dtype=np.uint8), imgsz=self.imgsz,
+                               verbose=False, device='cpu')
+        self._torch = torch
+        self._tensor = torch.from_numpy(self._input)  # shares memory with the input buffer
+        self._backend = self.model.predictor.model
+        self._nms = non_max_suppression
+
+    def _detect(self, conf, classes):
+        """Run the backend and NMS on the input buffer. Returns (N, 6) x1, y1, x2, y2, conf, cls in input pixels."""
+        if self._backend is None:
+            self._bind()
+        with self._torch.inference_mode():
+            preds = self._backend(self._tensor)
+            det = self._nms(preds, conf, self.iou, classes=classes, max_det=self.max_det)[0]
+        return det.cpu().numpy()
+
+    def predict(self, image, conf=0.5, classes=None):
+        """
+        Detect objects in one frame.
 
-            return cnts, filtered_boxes, filtered_centres, image_out
+        Args:
+            image: BGR numpy array of frame_shape.
+            conf: Confidence threshold.
+            classes: Class ids to keep (None = all).
 
-        return cnts, filtered_boxes, filtered_centres, image
+        Returns:
+            (xyxy, confidences, class_ids): (N, 4) float32 frame-pixel boxes, (N,) float32, (N,) int32.
+        """
+        self.preprocess(image)
+        det = self._detect(conf, classes).reshape(-1, 6)
+        xyxy = self.scale_boxes(det[:, :4].astype(np.float32))
+        return xyxy, det[:, 4].astype(np.float32), det[:, 5].astype(np.int32)
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    """
+    One frame's output from InferencePipeline: the inference() tuple plus the per-frame detector state owl.py
+    reads after inference, copied on the worker thread before the next frame can overwrite it. The state keeps
+    the detector's attribute names (and get_lost_tracks()), so it can stand in for the detector in that code.
+    """
+    frame: object
+    source: object
+    capture_time: float
+    contours: object = None
+    boxes: list = field(default_factory=list)
+    weed_centres: list = field(default_factory=list)
+    image_out: object = None
+    last_detections: Detections = field(default_factory=Detections)
+    last_track_ids: list = field(default_factory=list)
+    last_class_ids: list = field(default_factory=list)
+    last_confidences: list = field(default_factory=list)
+    last_raw_boxes: list = field(default_factory=list)
+    detection_mask: object = None
+    lost_tracks: list = field(default_factory=list)
+    inference_ms: float = 0.0
+
+    def get_lost_tracks(self, max_age=None):
+        """The lost tracks collected with this frame, as GreenOnGreen.get_lost_tracks()."""
+        return [t for t in self.lost_tracks if max_age is None or t['age'] <= max_age]
+
+
+class InferencePipeline:
+    """
+    Runs a pure-mode GreenOnGreen's inference() on a worker thread, one frame behind the caller.
+
+    submit() hands frame N to the worker and returns frame N-1's result, so the caller
+    captures, actuates and streams while the model runs and the loop rate approaches
+    1 / inference time instead of 1 / (inference + everything else). Each result keeps
+    the capture timestamp of its frame, so relay timing can allow for the extra frame
+    of latency.
+
+    The detector must only be used through the pipeline while it is running: call
+    drain() before touching the tracker (e.g. reset_tracker()) from another thread.
+
+    Usage:
+        pipeline = InferencePipeline(detector, lost_track_age=5)
+        result = pipeline.submit(frame, time.time(), confidence=0.5)
+        if result is not None:
+            ...  # detections for the previous frame, captured at result.capture_time
+    """
+
+    def __init__(self, detector, lost_track_age=0):
+        """
+        Args:
+            detector: A pure-mode GreenOnGreen.
+            lost_track_age: When tracking, also collect lost tracks up to this many frames
+                            old with each result (0 = don't).
+        """
+        if detector.hybrid_mode:
+            raise ValueError('InferencePipeline only supports pure GreenOnGreen mode')
+        self.detector = detector
+        self.lost_track_age = lost_track_age
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gog-pipeline')
+        self._pending = None
+        self._pending_resolution = None
+
+    def _run(self, frame, source, capture_time, kwargs):
+        detector = self.detector
+        start = time.perf_counter()
+        contours, boxes, weed_centres, image_out = detector.inference(frame, **kwargs)
+        inference_ms = (time.perf_counter() - start) * 1000
+        lost = (detector.get_lost_tracks(max_age=self.lost_track_age)
+                if detector.tracking_enabled and self.lost_track_age > 0 else [])
+        return PipelineResult(
+            frame=frame, source=source, capture_time=capture_time,
+            contours=contours, boxes=boxes, weed_centres=weed_centres, image_out=image_out,
+            last_detections=detector.last_detections,
+            last_track_ids=detector.last_track_ids, last_class_ids=detector.last_class_ids,
+            last_confidences=detector.last_confidences, last_raw_boxes=detector.last_raw_boxes,
+            detection_mask=detector.detection_mask, lost_tracks=lost, inference_ms=inference_ms)
+
+    def submit(self, frame, capture_time, source=None, **kwargs):
+        """
+        Start inference on frame and return the previous frame's result (None for the first frame).
+
+        Args:
+            frame: BGR numpy array; must not be written to until its result is returned.
+            capture_time: time.time() when the frame was captured.
+            source: Anything to hand back with the result, e.g. the uncropped frame.
+            **kwargs: Passed to GreenOnGreen.inference().
+
+        Returns:
+            PipelineResult for the previously submitted frame, or None.
+        """
+        previous = self.drain()
+        self._pending = self._executor.submit(self._run, frame, source, capture_time, kwargs)
+        return previous
+
+    def set_inference_resolution(self, imgsz):
+        """Change the detector's input size now if it is idle, else once the frame in flight is drained."""
+        self._pending_resolution = imgsz
+        if self._pending is None:
+            self._apply_resolution()
+
+    def _apply_resolution(self):
+        """Hand a requested input size to the detector; only call while no frame is in flight."""
+        imgsz, self._pending_resolution = self._pending_resolution, None
+        if imgsz is not None:
+            self.detector.set_inference_resolution(imgsz)
+
+    def drain(self):
+        """Wait for the frame in flight and return its result (None if there is none)."""
+        pending, self._pending = self._pending, None
+        try:
+            return pending.result() if pending is not None else None
+        finally:
+            self._apply_resolution()
+
+    @property
+    def in_flight(self):
+        """True while a submitted frame's result has not been returned yet."""
+        return self._pending is not None
+
+    def close(self):
+        """Discard the frame in flight and stop the worker thread."""
+        try:
+            self.drain()
+        except Exception as e:
+            logger.debug(f'Pipelined inference failed during close: {e}')
+        self._executor.shutdown(wait=True)
+        self._apply_resolution()
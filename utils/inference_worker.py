@@ -0,0 +1,435 @@
+"""
+Out-of-process GreenOnGreen inference: the model and its Python pre/post-processing in a worker process.
+
+NCNN releases the GIL for the forward pass, but Ultralytics letterboxing, NMS, Results wrapping and
+ByteTrack updates are Python and contend for the GIL with the frame loop, the MQTT client and the
+MJPEG streamer. InferenceWorker runs a pure-mode GreenOnGreen in a separate process behind the same
+interface as InferencePipeline (submit, drain, close), slots - 1 frames behind the caller:
+
+  - Frames are copied into a ring of multiprocessing.shared_memory slots, so no image is pickled.
+  - Results come back as compact arrays (boxes, class ids, confidences, track ids, contours and
+    lost tracks). The caller's detector annotates and draws zone masks, only when they are needed.
+  - The class filter and inference resolution are sent with every frame, so owl.py keeps updating
+    its own detector as before and the worker follows.
+  - Nothing waits for the worker: while it loads its model, and while a worker that died or stopped
+    answering is restarted, frames run on an InferencePipeline with the caller's detector. Frames in
+    flight when a worker is lost are dropped; after max_restarts losses in a row the worker is given up.
+
+Usage:
+    worker = InferenceWorker(detector, frame.shape, lost_track_age=5)
+    result = worker.submit(frame, time.time(), confidence=0.5)
+    if result is not None:
+        ...  # PipelineResult for the frame submitted slots - 1 calls ago
+    worker.close()
+"""
+
+import collections
+import logging
+import multiprocessing
+import queue
+import time
+from functools import partial
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from utils.greenonbrown import Detections
+from utils.greenongreen import GreenOnGreen, InferencePipeline, PipelineResult
+
+logger = logging.getLogger(__name__)
+
+# How often a blocked wait checks that the worker is still alive
+POLL_S = 0.1
+# A frame taking this many typical frames (and at least HUNG_MIN_S) means the worker hung
+HUNG_FACTOR = 5
+HUNG_MIN_S = 0.5
+# How long close() lets an idle worker exit before killing it
+CLOSE_WAIT_S = 0.5
+# Track IDs from worker launch n are offset by n * TRACK_ID_OFFSET
+TRACK_ID_OFFSET = 1_000_000
+
+
+class _WorkerLost(Exception):
+    """The worker process exited or stopped answering."""
+
+
+def detector_kwargs(detector):
+    """GreenOnGreen constructor arguments that rebuild a pure-mode detector in the worker."""
+    model_path = detector.model_path
+    # A directory of models resolves to the file the caller's detector picked
+    if detector._model_filename and (model_path / detector._model_filename).exists():
+        model_path = model_path / detector._model_filename
+    return {
+        'model_path': str(model_path),
+        'confidence': detector.confidence,
+        'tracking_enabled': detector.tracking_enabled,
+        'detection_persist_frames': detector.detection_persist_frames,
+        'inference_resolution': detector.inference_resolution,
+        'fast_predict': detector.fast_predict,
+        'tiles': detector.tiles,
+        'tile_overlap': detector.tile_overlap,
+    }
+
+
+def _settings(detector):
+    """Per-frame detector state owl.py changes on its own detector, for the worker to follow."""
+    return detector._detect_class_ids, detector.inference_resolution, dict(detector._pure_imgsz)
+
+
+def _apply_settings(detector, settings):
+    class_ids, imgsz, pure_imgsz = settings
+    if detector._detect_class_ids != class_ids:
+        detector._detect_class_ids = class_ids
+    if (detector.inference_resolution, detector._pure_imgsz) != (imgsz, pure_imgsz):
+        detector.set_inference_resolution(imgsz)
+
+
+def _compact(detector, contours, boxes, lost_tracks, inference_ms):
+    """What the caller needs from one inference() call, as arrays."""
+    detections = detector.last_detections
+    return {
+        'boxes': np.asarray(boxes, dtype=np.int32).reshape(-1, 4),
+        'class_ids': None if detections.class_ids is None else np.asarray(detections.class_ids, dtype=np.int32),
+        'confidences': (None if detections.confidences is None
+                        else np.asarray(detections.confidences, dtype=np.float32)),
+        'track_ids': np.asarray(detections.track_ids, dtype=np.int64),
+        'contours': contours,
+        'label': detections.label,
+        'lost_tracks': lost_tracks,
+        'inference_ms': inference_ms,
+    }
+
+
+def _worker_main(factory, shm_name, frame_shape, slots, lost_track_age, requests, results):
+    """Worker process: load the detector, then run inference() on ring slots until told to stop."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((slots, *frame_shape), dtype=np.uint8, buffer=shm.buf)
+    try:
+        try:
+            detector = factory()
+            # Warm up here, so the first real frame is not held to the load time
+            detector.inference(np.zeros(frame_shape, dtype=np.uint8), show_display=False)
+            if detector.tracking_enabled:
+                detector.reset_tracker()
+        except Exception as e:
+            results.put(('failed', None, repr(e)))
+            return
+        results.put(('ready', None, None))
+
+        while True:
+            message = requests.get()
+            if message is None:
+                return
+            kind, seq, payload = message
+            if kind == 'reset':
+                detector.reset_tracker()
+                continue
+            slot, settings, kwargs = payload
+            try:
+                _apply_settings(detector, settings)
+                start = time.perf_counter()
+                contours, boxes, _, _ = detector.inference(ring[slot], show_display=False, build_mask=False,
+                                                           **kwargs)
+                inference_ms = (time.perf_counter() - start) * 1000
+                lost = (detector.get_lost_tracks(max_age=lost_track_age)
+                        if detector.tracking_enabled and lost_track_age > 0 else [])
+                results.put(('result', seq, _compact(detector, contours, boxes, lost, inference_ms)))
+            except Exception as e:
+                results.put(('error', seq, repr(e)))
+    finally:
+        del ring
+        try:
+            shm.close()
+        except BufferError:
+            pass  # a view of the ring is still referenced; the segment goes with the process
+
+
+class InferenceWorker:
+    """
+    Runs a pure-mode GreenOnGreen's inference() in a worker process fed through shared memory.
+
+    submit() copies frame N into the next ring slot and returns the result of frame N - (slots - 1),
+    so with the default two slots it behaves like InferencePipeline: one frame behind, the model busy
+    on the next frame while the caller handles the previous one.
+
+    The worker loads its own copy of the model (its constructor arguments come from the caller's
+    detector), so a model switch means a new InferenceWorker. Nothing here waits for it: until the
+    worker reports ready, and again while a lost worker is restarted, frames go through an
+    InferencePipeline on the caller's detector. The caller's detector is also used for annotate(),
+    class names and zone masks.
+    """
+
+    def __init__(self, detector, frame_shape, lost_track_age=0, slots=2, factory=None,
+                 start_timeout_s=120.0, result_timeout_s=10.0, max_restarts=5):
+        """
+        Args:
+            detector: A pure-mode GreenOnGreen; the worker mirrors it, and it runs the frames
+                      while the worker is not ready.
+            frame_shape: Shape of the uint8 frames that will be submitted.
+            lost_track_age: When tracking, also collect lost tracks up to this many frames old
+                            with each result (0 = don't).
+            slots: Shared-memory ring slots (>= 2); up to this many frames are in flight.
+            factory: Picklable callable building the worker's detector; defaults to a GreenOnGreen
+                     with the caller's detector's settings.
+            start_timeout_s: Time allowed for the worker to load and warm up the model.
+            result_timeout_s: Longest wait for one frame before the worker counts as hung; once
+                              frames have come back, the limit is HUNG_FACTOR typical frames.
+            max_restarts: Restarts in a row without a result before the worker is given up and
+                          every frame runs in this process.
+        """
+        if detector.hybrid_mode:
+            raise ValueError('InferenceWorker only supports pure GreenOnGreen mode')
+        if slots < 2:
+            raise ValueError('InferenceWorker needs at least 2 ring slots')
+        self.detector = detector
+        self.frame_shape = tuple(frame_shape)
+        self.lost_track_age = lost_track_age
+        self.slots = slots
+        self.start_timeout_s = start_timeout_s
+        self.result_timeout_s = result_timeout_s
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.gave_up = False
+        self._failures = 0      # launches and losses since the last result
+        self._launches = 0
+        self._typical_s = None  # moving average of the worker's time per frame
+        self._factory = factory or partial(GreenOnGreen, **detector_kwargs(detector))
+        self._context = multiprocessing.get_context('spawn')
+        self._local = InferencePipeline(detector, lost_track_age=lost_track_age)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(slots * np.prod(self.frame_shape)))
+        self._ring = np.ndarray((slots, *self.frame_shape), dtype=np.uint8, buffer=self._shm.buf)
+        self._in_flight = collections.deque()   # (seq, frame, source, capture_time, kwargs), oldest first
+        self._seq = 0
+        self._process = None
+        self._ready = False
+        self._closed = False
+        try:
+            self._launch()
+        except Exception:
+            self._local.close()
+            self._release_memory()
+            raise
+
+    def _launch(self):
+        """Start a worker process; it reports 'ready' or 'failed' later, picked up by _poll_start()."""
+        # Fresh queues: nothing a dead worker left behind can be mistaken for a new result
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._process = self._context.Process(
+            target=_worker_main, name='gog-worker', daemon=True,
+            args=(self._factory, self._shm.name, self.frame_shape, self.slots, self.lost_track_age,
+                  self._requests, self._results))
+        self._process.start()
+        self._launches += 1
+        self._ready = False
+        self._start_deadline = time.monotonic() + self.start_timeout_s
+
+    def _poll_start(self):
+        """Check, without waiting, whether a starting worker is ready; relaunch one that failed."""
+        if self._ready or self.gave_up:
+            return
+        try:
+            kind, _, info = self._results.get_nowait()
+        except queue.Empty:
+            if self._process.is_alive() and time.monotonic() < self._start_deadline:
+                return
+            kind, info = 'failed', (f'did not start within {self.start_timeout_s:.0f}s' if self._process.is_alive()
+                                    else f'exited with code {self._process.exitcode}')
+        if kind == 'ready':
+            self._ready = True
+            logger.info(f'Inference worker ready (pid {self._process.pid}, {self.slots} slots)')
+        else:
+            self._lost(f'could not load the detector: {info}')
+
+    def wait_ready(self, timeout_s=None):
+        """Block until the worker is ready (True), given up or timeout_s passes (False). For tools and tests."""
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        while not (self._ready or self.gave_up):
+            self._poll_start()
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            time.sleep(POLL_S / 10)
+        return self._ready
+
+    @property
+    def ready(self):
+        """True once frames go to the worker process."""
+        self._poll_start()
+        return self._ready
+
+    def _get(self, timeout_s):
+        """Next message from the worker, or _WorkerLost if it exits or times out first."""
+        deadline = time.monotonic() + timeout_s
+        while True:
+            try:
+                return self._results.get(timeout=min(POLL_S, timeout_s))
+            except queue.Empty:
+                pass
+            if not self._process.is_alive():
+                raise _WorkerLost(f'exited with code {self._process.exitcode}')
+            if time.monotonic() > deadline:
+                raise _WorkerLost(f'gave no answer within {timeout_s:.1f}s')
+
+    def _hung_after_s(self):
+        """How long the oldest frame may take before the worker counts as hung."""
+        if self._typical_s is None:
+            return self.result_timeout_s
+        return min(self.result_timeout_s, max(HUNG_MIN_S, HUNG_FACTOR * self._typical_s))
+
+    def _kill_process(self):
+        """Stop the worker at once (SIGKILL), without waiting on a hung model."""
+        process = self._process
+        if process is not None and process.is_alive():
+            process.kill()
+            process.join(timeout=POLL_S)
+        for q in (self._requests, self._results):
+            q.close()
+            q.cancel_join_thread()
+
+    def _lost(self, reason):
+        """Drop the worker and its frames in flight, then relaunch it in the background or give up."""
+        dropped = len(self._in_flight)
+        self._in_flight.clear()
+        self._kill_process()
+        if self._ready and self.detector.tracking_enabled:
+            # The caller's tracker has been idle since the worker took over: its tracks are stale
+            self.detector.reset_tracker()
+        self._ready = False
+        self._failures += 1
+        if self._failures > self.max_restarts:
+            self.gave_up = True
+            logger.error(f'Inference worker {reason}, {self._failures} times in a row; '
+                         f'running inference in this process from now on')
+            return
+        self.restarts += 1
+        logger.warning(f'Inference worker {reason}; restarting in the background '
+                       f'({dropped} frame(s) in flight dropped)')
+        self._launch()
+
+    def submit(self, frame, capture_time, source=None, **kwargs):
+        """
+        Send frame to the worker and return the oldest frame's result once the ring is full.
+
+        Args:
+            frame: BGR uint8 numpy array of frame_shape; it is copied, so it may be reused.
+            capture_time: time.time() when the frame was captured.
+            source: Anything to hand back with the result, e.g. the uncropped frame.
+            **kwargs: GreenOnGreen.inference() arguments. show_display and build_mask are
+                      applied here, with this process's detector.
+
+        Returns:
+            PipelineResult for the frame submitted slots - 1 calls ago (one call ago while frames
+            run in this process), or None while the ring fills and right after a worker is lost.
+        """
+        if frame.shape != self.frame_shape:
+            raise ValueError(f'Frame shape {frame.shape} does not match the worker ring {self.frame_shape}')
+        self._poll_start()
+        if not self._ready:
+            return self._local.submit(frame, capture_time, source, **kwargs)
+        # Hand-over: the frame still on the local thread is this call's result, the worker takes this frame
+        handed_over = self._local.drain() if self._local.in_flight else None
+
+        seq, self._seq = self._seq, self._seq + 1
+        slot = seq % self.slots
+        self._ring[slot] = frame
+        worker_kwargs = {k: v for k, v in kwargs.items() if k not in ('show_display', 'build_mask')}
+        self._requests.put(('frame', seq, (slot, _settings(self.detector), worker_kwargs)))
+        self._in_flight.append((seq, frame, source, capture_time, kwargs))
+        if handed_over is not None:
+            return handed_over
+        if len(self._in_flight) < self.slots:
+            return None
+        return self._collect()
+
+    def _collect(self):
+        """Wait for the oldest frame in flight and build its result (None if the worker was lost)."""
+        seq, frame, source, capture_time, kwargs = self._in_flight[0]
+        try:
+            kind, result_seq, payload = self._get(self._hung_after_s())
+        except _WorkerLost as e:
+            self._lost(str(e))
+            return None
+        self._in_flight.popleft()
+        self._failures = 0
+        if kind == 'error':
+            logger.warning(f'Inference worker failed on a frame: {payload}')
+            return PipelineResult(frame=frame, source=source, capture_time=capture_time, image_out=frame)
+        frame_s = payload['inference_ms'] / 1000
+        self._typical_s = frame_s if self._typical_s is None else 0.9 * self._typical_s + 0.1 * frame_s
+        return self._result(frame, source, capture_time, kwargs, payload)
+
+    def _result(self, frame, source, capture_time, kwargs, payload):
+        """PipelineResult from the worker's arrays, as InferencePipeline would have built it."""
+        boxes_arr = payload['boxes']
+        boxes = boxes_arr.tolist()
+        weed_centres = (boxes_arr[:, :2] + boxes_arr[:, 2:] // 2).tolist()
+        contours = payload['contours']
+        class_ids, confidences = payload['class_ids'], payload['confidences']
+        # Each launch's tracker counts from 1 again, like the caller's: keep the IDs apart
+        offset = self._launches * TRACK_ID_OFFSET
+        track_ids = tuple((payload['track_ids'] + offset).tolist())
+        lost_tracks = [dict(track, track_id=track['track_id'] + offset) for track in payload['lost_tracks']]
+        # Own copies, as GreenOnGreen keeps them: owl.py extends result.boxes with lost tracks in place
+        detections = Detections(boxes=list(boxes), contours=contours, label=payload['label'], track_ids=track_ids,
+                                class_ids=class_ids, confidences=confidences)
+
+        detection_mask = None
+        if kwargs.get('build_mask') and contours is not None:
+            detection_mask = np.zeros(frame.shape[:2], dtype=np.uint8)
+            cv2.drawContours(detection_mask, contours, -1, 255, -1)
+        image_out = (self.detector.annotate(frame.copy(), detections) if kwargs.get('show_display')
+                     else frame)
+        tracked = bool(track_ids)
+        return PipelineResult(
+            frame=frame, source=source, capture_time=capture_time,
+            contours=contours, boxes=boxes, weed_centres=weed_centres, image_out=image_out,
+            last_detections=detections, last_track_ids=list(track_ids),
+            last_class_ids=class_ids.tolist() if tracked else [],
+            last_confidences=confidences.tolist() if tracked else [],
+            last_raw_boxes=list(boxes), detection_mask=detection_mask,
+            lost_tracks=lost_tracks, inference_ms=payload['inference_ms'])
+
+    def set_inference_resolution(self, imgsz):
+        """Change the input size between frames; the worker gets it with the next submitted frame."""
+        self._local.set_inference_resolution(imgsz)
+
+    def drain(self):
+        """Wait for every frame in flight and return the newest one's result (None if there is none)."""
+        result = self._local.drain()
+        while self._in_flight:
+            result = self._collect()
+        return result
+
+    def reset_tracker(self):
+        """Reset the worker detector's tracker once the frames in flight are done."""
+        self.drain()
+        if self._process is not None and self._process.is_alive():
+            self._requests.put(('reset', None, None))
+
+    @property
+    def in_flight(self):
+        """True while a submitted frame's result has not been returned yet."""
+        return bool(self._in_flight) or self._local.in_flight
+
+    def close(self):
+        """Discard the frames in flight, stop the worker and free the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.drain()
+        except Exception as e:
+            logger.debug(f'Inference worker failed during close: {e}')
+        self._local.close()
+        if self._ready and self._process.is_alive():
+            # An idle worker exits on None; one still loading its model is killed
+            self._requests.put(None)
+            self._process.join(timeout=CLOSE_WAIT_S)
+        self._kill_process()
+        self._release_memory()
+
+    def _release_memory(self):
+        self._ring = None
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,264 @@
+"""
+Keyframe inference: run the model every k-th frame and carry its detections forward in between.
+
+On a Pi 4 a YOLO model runs at 8-10 Hz while the camera delivers 30 fps. Between model runs the
+ground under the camera only slides along, so the last keyframe's detections (including ByteTrack's
+Kalman-predicted lost tracks) stay valid once they are moved by the image motion since the keyframe.
+
+MotionEstimator measures that motion: the global shift between consecutive frames by phase
+correlation on a small greyscale thumbnail, smoothed by a constant-velocity Kalman filter so a
+low-texture frame (weak correlation peak) is bridged by the predicted velocity.
+
+KeyframeScheduler decides per frame whether the model runs. The gap between keyframes adapts so
+the scene never travels more than max_travel of the frame height between model runs: it shrinks as
+the image (or, while the image gives no reliable reading, the GPS ground speed) speeds up, and
+as the loop slows down. When a keyframe loop fits into budget_ms, the model runs every frame.
+
+Usage:
+    keyframes = KeyframeScheduler(max_interval=3)
+
+    if keyframes.should_run(frame, speed_kmh):
+        boxes, weed_centres = ...  # model inference
+        keyframes.record(contours, boxes, weed_centres, detections)
+    else:
+        contours, boxes, weed_centres, detections = keyframes.predict()
+"""
+
+import dataclasses
+import time
+
+import cv2
+import numpy as np
+
+# Thumbnail width in pixels for phase correlation
+THUMBNAIL_WIDTH = 160
+
+# Smoothing of the loop-time and GPS-calibration averages (weight of the newest sample)
+EMA_ALPHA = 0.2
+
+
+class MotionEstimator:
+    """Global image velocity between consecutive frames, in frame pixels per second.
+
+    Args:
+        min_response: Phase-correlation peak (0-1) below which a measurement is ignored and the
+                      Kalman prediction is used alone.
+        min_texture: Thumbnail grey-level standard deviation below which a frame is too featureless
+                     to measure (bare, evenly lit or over-exposed ground correlates at zero shift).
+        process_noise: Kalman process noise; higher follows speed changes faster.
+        measurement_noise: Kalman measurement noise; higher smooths harder.
+    """
+
+    def __init__(self, min_response=0.05, min_texture=2.0, process_noise=2000.0, measurement_noise=400.0):
+        self.min_response = min_response
+        self.min_texture = min_texture
+        self._kalman = cv2.KalmanFilter(2, 2)
+        self._kalman.transitionMatrix = np.eye(2, dtype=np.float32)
+        self._kalman.measurementMatrix = np.eye(2, dtype=np.float32)
+        self._kalman.processNoiseCov = np.eye(2, dtype=np.float32) * process_noise
+        self._kalman.measurementNoiseCov = np.eye(2, dtype=np.float32) * measurement_noise
+        self._window = None
+        self._previous = None
+        self._scale = 1.0
+        self.response = 0.0
+        self.reset()
+
+    @property
+    def velocity(self):
+        """(vx, vy) in frame pixels per second."""
+        return float(self._kalman.statePost[0, 0]), float(self._kalman.statePost[1, 0])
+
+    @property
+    def measured(self):
+        """True if the last update() had a usable correlation peak."""
+        return self.response >= self.min_response
+
+    def reset(self):
+        """Forget the reference frame and velocity."""
+        self._previous = None
+        self.response = 0.0
+        self._kalman.statePost = np.zeros((2, 1), dtype=np.float32)
+        self._kalman.errorCovPost = np.eye(2, dtype=np.float32) * 1e4
+
+    def update(self, frame, dt):
+        """
+        Measure the shift from the previous frame and advance the filter.
+
+        Args:
+            frame: BGR frame, the same size every call.
+            dt: Seconds since the previous frame.
+
+        Returns:
+            (dx, dy) filtered shift since the previous frame in frame pixels.
+        """
+        h, w = frame.shape[:2]
+        size = (THUMBNAIL_WIDTH, max(1, round(h * THUMBNAIL_WIDTH / w)))
+        # Bilinear to twice the size, then area-average: close to a full INTER_AREA at a fraction of the cost
+        sampled = cv2.resize(frame, (size[0] * 2, size[1] * 2), interpolation=cv2.INTER_LINEAR)
+        sampled = cv2.cvtColor(sampled, cv2.COLOR_BGR2GRAY)
+        grey = cv2.resize(sampled, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+        textured = float(grey.std()) >= self.min_texture
+        reference, self._previous = self._previous, (grey, textured)
+        if reference is None or reference[0].shape != grey.shape or dt <= 0:
+            self.response = 0.0
+            return 0.0, 0.0
+        if self._window is None or self._window.shape != grey.shape:
+            self._window = cv2.createHanningWindow(size, cv2.CV_32F)
+            self._scale = w / THUMBNAIL_WIDTH
+
+        # phaseCorrelate applies the window to its inputs in place
+        previous, previous_textured = reference
+        (dx, dy), self.response = cv2.phaseCorrelate(previous.copy(), grey.copy(), self._window)
+        if not (textured and previous_textured):
+            self.response = 0.0
+        self._kalman.predict()
+        if self.measured:
+            measurement = np.array([[dx], [dy]], dtype=np.float32) * np.float32(self._scale / dt)
+            self._kalman.correct(measurement)
+        else:
+            # Keep the predicted velocity: copy the prediction into the posterior
+            self._kalman.statePost = self._kalman.statePre.copy()
+            self._kalman.errorCovPost = self._kalman.errorCovPre.copy()
+        vx, vy = self.velocity
+        return vx * dt, vy * dt
+
+
+class KeyframeScheduler:
+    """Chooses the frames the model runs on and carries keyframe detections to the others.
+
+    Args:
+        max_interval: Most frames from one keyframe to the next (1 = every frame).
+        max_travel: Largest image motion between keyframes, as a fraction of the frame height.
+        budget_ms: Run the model on every frame while a keyframe loop takes at most this long (0 = off).
+        motion: MotionEstimator; a default one is created if None.
+    """
+
+    def __init__(self, max_interval=3, max_travel=0.25, budget_ms=0.0, motion=None):
+        if max_interval < 1:
+            raise ValueError(f"max_interval must be >= 1, got {max_interval}")
+        self.max_interval = max_interval
+        self.max_travel = max_travel
+        self.budget_ms = budget_ms
+        self.motion = motion or MotionEstimator()
+        self.reset()
+
+    def reset(self):
+        """Drop the keyframe result and timing history, e.g. when detection is toggled or the model changes."""
+        self.motion.reset()
+        self._last_time = None
+        self._last_was_keyframe = False
+        self._keyframe_ms = None      # EMA loop time of frames the model ran on
+        self._frame_s = None          # EMA time per frame, any kind
+        self._px_s_per_kmh = None     # image speed per km/h of ground speed, learned while both are known
+        self._speed_px_s = 0.0
+        self._height = None
+        self._shape = None
+        self._result = None
+        self._shift = np.zeros(2, dtype=np.float64)
+        self.since_keyframe = 0
+        self.keyframes = 0
+        self.predicted = 0
+
+    @property
+    def interval(self):
+        """Current longest gap between keyframes in frames, from the image speed and the loop time."""
+        if not self._speed_px_s or not self._frame_s or not self._height:
+            return self.max_interval
+        travel_per_frame = self._speed_px_s * self._frame_s
+        return int(np.clip(self.max_travel * self._height / travel_per_frame, 1, self.max_interval))
+
+    def should_run(self, frame, speed_kmh=None, now=None):
+        """
+        Advance the motion estimate with this frame and decide whether the model runs on it.
+
+        Args:
+            frame: The (cropped) frame the model would run on.
+            speed_kmh: GPS ground speed, or None without a fix.
+            now: Timestamp of the frame (default: time.time()).
+
+        Returns:
+            True for a keyframe: run the model, then record() the result.
+        """
+        now = time.time() if now is None else now
+        dt = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+        if dt > 0:
+            self._frame_s = dt if self._frame_s is None else self._frame_s + EMA_ALPHA * (dt - self._frame_s)
+            if self._last_was_keyframe:
+                ms = dt * 1000
+                self._keyframe_ms = ms if self._keyframe_ms is None else \
+                    self._keyframe_ms + EMA_ALPHA * (ms - self._keyframe_ms)
+
+        dx, dy = self.motion.update(frame, dt)
+        self._shift += (dx, dy)
+        self._height = frame.shape[0]
+        self._update_speed(speed_kmh)
+
+        run = (self._result is None
+               or frame.shape[:2] != self._shape
+               or self.since_keyframe + 1 >= self.interval
+               or (self.budget_ms > 0 and self._keyframe_ms is not None and self._keyframe_ms <= self.budget_ms))
+        self._last_was_keyframe = run
+        if run:
+            self._shape = frame.shape[:2]
+        else:
+            self.since_keyframe += 1
+        return run
+
+    def _update_speed(self, speed_kmh):
+        """Image speed for the interval: measured, or from GPS through the learned calibration."""
+        image_speed = float(np.hypot(*self.motion.velocity))
+        moving = speed_kmh is not None and speed_kmh > 0.5
+        if self.motion.measured:
+            if moving:
+                ratio = image_speed / speed_kmh
+                self._px_s_per_kmh = ratio if self._px_s_per_kmh is None else \
+                    self._px_s_per_kmh + EMA_ALPHA * (ratio - self._px_s_per_kmh)
+            self._speed_px_s = image_speed
+        elif moving and self._px_s_per_kmh is not None:
+            self._speed_px_s = max(image_speed, self._px_s_per_kmh * speed_kmh)
+        else:
+            self._speed_px_s = image_speed
+
+    def record(self, contours, boxes, weed_centres, detections=None):
+        """Keep a keyframe's final detections (after class smoothing and lost-track merging)."""
+        self._result = (contours, np.asarray(boxes, dtype=np.float64).reshape(-1, 4),
+                        np.asarray(weed_centres, dtype=np.float64).reshape(-1, 2), detections)
+        self._shift[:] = 0
+        self.since_keyframe = 0
+        self.keyframes += 1
+
+    def predict(self):
+        """
+        The last keyframe's detections moved by the image motion since it, for a frame the model skips.
+
+        Boxes whose centre has left the frame are dropped.
+
+        Returns:
+            (contours, boxes, weed_centres, detections) like the keyframe's, boxes and centres as lists.
+        """
+        contours, boxes, centres, detections = self._result
+        h, w = self._shape
+        offset = np.round(self._shift)
+        moved_centres = centres + offset
+        keep = ((moved_centres[:, 0] >= 0) & (moved_centres[:, 0] < w)
+                & (moved_centres[:, 1] >= 0) & (moved_centres[:, 1] < h))
+        moved_boxes = boxes[keep] + np.append(offset, (0, 0))
+        self.predicted += 1
+
+        shift = offset.astype(np.int32)
+        if contours is not None:
+            contours = [c + shift for c in contours]
+        if detections is not None:
+            detections = self._shift_detections(detections, offset, shift)
+        return (contours, moved_boxes.astype(np.int32).tolist(),
+                moved_centres[keep].astype(np.int32).tolist(), detections)
+
+    @staticmethod
+    def _shift_detections(detections, offset, shift):
+        """A copy of a Detections record moved by offset, for annotating predicted frames."""
+        boxes = np.asarray(detections.boxes, dtype=np.float64).reshape(-1, 4)
+        changes = {'boxes': (boxes + np.append(offset, (0, 0))).astype(np.int32).tolist()}
+        if detections.contours is not None:
+            changes['contours'] = [c + shift for c in detections.contours]
+        return dataclasses.replace(detections, **changes)
@@ -0,0 +1,227 @@
+"""
+Model catalogue: an index of the YOLO models in a directory, rebuilt only when the directory changes.
+
+The MQTT heartbeat lists models/ every 2 seconds, and GreenOnGreen globs model directories and
+reads metadata.yaml on every load. The catalogue scans a directory once and keeps one ModelEntry
+per model (.pt file or NCNN export directory): format, task, class names and input size from the
+export's metadata.yaml, and the sha256 the controller uses to verify a deployment.
+
+A rescan happens only when the directory's mtime changes (a model added, removed or renamed),
+plus for a short while after any change, because filesystems store mtimes in coarse ticks and two
+changes within one tick would otherwise look like one. Entries whose own files are unchanged keep
+their parsed metadata and hash, so a rescan costs one listdir and a few stat calls. The sha256 is
+computed on first request and cached until the model's files change.
+
+Usage:
+    catalogue = ModelCatalogue.for_directory('models')
+    names = catalogue.names()
+    entry = catalogue.get('yolo11n_ncnn_model', sha256=True)
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+# A directory changed less than this many seconds before a scan is rescanned on the next call
+RACY_WINDOW_S = 2.0
+
+
+@dataclasses.dataclass(frozen=True)
+class ModelEntry:
+    """One model in the catalogue.
+
+    Attributes:
+        name: File or directory name inside the catalogued directory.
+        path: Full path to the .pt file or NCNN directory.
+        format: 'ncnn' or 'pt'.
+        task: 'detect', 'segment', ... from metadata.yaml or the name, or None if unknown.
+        names: Class id -> class name from metadata.yaml ({} for .pt files, which need torch to read).
+        imgsz: Export input size as (height, width) from metadata.yaml, or None.
+        sha256: Content hash once requested, else ''. NCNN directories hash their files in path order,
+                as the controller does on upload.
+    """
+    name: str
+    path: str
+    format: str
+    task: Optional[str] = None
+    names: dict = dataclasses.field(default_factory=dict)
+    imgsz: Optional[tuple] = None
+    sha256: str = ''
+
+    def to_dict(self):
+        """JSON-ready summary for MQTT state."""
+        return {'format': self.format, 'task': self.task, 'classes': list(self.names.values()),
+                'imgsz': list(self.imgsz) if self.imgsz else None, 'sha256': self.sha256}
+
+
+def sha256_path(path):
+    """sha256 of a file, or of all files under a directory concatenated in sorted path order."""
+    path = Path(path)
+    files = [path] if path.is_file() else [p for p in sorted(path.rglob('*')) if p.is_file()]
+    h = hashlib.sha256()
+    for file in files:
+        with open(file, 'rb') as f:
+            while True:
+                chunk = f.read(65536)
+                if not chunk:
+                    break
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def task_from_name(name):
+    """'segment' for names marked -seg/_seg, else None."""
+    lowered = name.lower()
+    return 'segment' if '-seg' in lowered or '_seg' in lowered else None
+
+
+def read_metadata(model_dir):
+    """
+    Task, class names and input size from an export's metadata.yaml.
+
+    Returns:
+        (task, names, imgsz); (None, {}, None) for anything missing or unreadable. Without
+        PyYAML only the task is read.
+    """
+    meta = Path(model_dir) / 'metadata.yaml'
+    if not meta.exists():
+        return None, {}, None
+    try:
+        if yaml is None:
+            with open(meta) as f:
+                for line in f:
+                    if line.startswith('task:'):
+                        return line.split(':', 1)[1].strip() or None, {}, None
+            return None, {}, None
+        with open(meta) as f:
+            data = yaml.safe_load(f) or {}
+        names = {int(k): str(v) for k, v in (data.get('names') or {}).items()}
+        imgsz = data.get('imgsz')
+        if isinstance(imgsz, int):
+            imgsz = (imgsz, imgsz)
+        return data.get('task') or None, names, tuple(imgsz) if imgsz else None
+    except Exception as e:
+        logger.warning(f'Could not read {meta}: {e}')
+        return None, {}, None
+
+
+class ModelCatalogue:
+    """Cached index of the .pt files and NCNN directories in one directory.
+
+    Args:
+        models_dir: Directory to index; it may not exist yet.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, models_dir):
+        self.models_dir = os.path.abspath(str(models_dir))
+        self._lock = threading.Lock()
+        self._entries = {}         # name -> ModelEntry, in name order
+        self._fingerprints = {}    # name -> stat fingerprint the entry was built from
+        self._dir_mtime = None     # mtime_ns of the directory at the last trusted scan
+        self.scans = 0
+
+    @classmethod
+    def for_directory(cls, models_dir):
+        """The shared catalogue of a directory, so every caller reuses one index."""
+        key = os.path.abspath(str(models_dir))
+        with cls._registry_lock:
+            catalogue = cls._registry.get(key)
+            if catalogue is None:
+                catalogue = cls._registry[key] = cls(key)
+            return catalogue
+
+    def entries(self):
+        """All models, in name order."""
+        with self._lock:
+            self._refresh()
+            return list(self._entries.values())
+
+    def names(self):
+        """Model names (.pt file names and NCNN directory names), in name order."""
+        return [entry.name for entry in self.entries()]
+
+    def get(self, name, sha256=False):
+        """
+        The entry for a model name, or None if it is not in the directory.
+
+        Args:
+            name: File or directory name inside the catalogued directory.
+            sha256: Fill in the content hash, computing it now if it is not cached.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(name)
+            if entry is not None and sha256 and not entry.sha256:
+                entry = self._entries[name] = dataclasses.replace(entry, sha256=sha256_path(entry.path))
+            return entry
+
+    def invalidate(self):
+        """Rescan on the next call, e.g. right after writing a model."""
+        with self._lock:
+            self._dir_mtime = None
+
+    def _refresh(self):
+        """Rescan if the directory changed since the last trusted scan. Call with the lock held."""
+        try:
+            mtime = os.stat(self.models_dir).st_mtime_ns
+        except OSError:
+            self._entries, self._fingerprints, self._dir_mtime = {}, {}, None
+            return
+        if mtime == self._dir_mtime:
+            return
+
+        entries, fingerprints = {}, {}
+        for name in sorted(os.listdir(self.models_dir)):
+            path = os.path.join(self.models_dir, name)
+            fingerprint = self._fingerprint(path)
+            if fingerprint is None:
+                continue
+            if self._fingerprints.get(name) == fingerprint:
+                entries[name] = self._entries[name]
+            else:
+                entries[name] = self._index(name, path)
+            fingerprints[name] = fingerprint
+        self._entries, self._fingerprints = entries, fingerprints
+        self.scans += 1
+        # A change in the same mtime tick as this scan would not move the mtime: look again next time
+        self._dir_mtime = mtime if time.time() - mtime / 1e9 > RACY_WINDOW_S else None
+
+    @staticmethod
+    def _fingerprint(path):
+        """Stat summary of a model's files, or None if path is not a model."""
+        try:
+            if path.endswith('.pt') and os.path.isfile(path):
+                st = os.stat(path)
+                return st.st_size, st.st_mtime_ns
+            if os.path.isdir(path):
+                files = sorted(os.scandir(path), key=lambda e: e.name)
+                if not any(f.name.endswith('.param') for f in files):
+                    return None
+                return tuple((f.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files if f.is_file())
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def _index(name, path):
+        """Build the entry for one model."""
+        if os.path.isdir(path):
+            task, names, imgsz = read_metadata(path)
+            return ModelEntry(name=name, path=path, format='ncnn', task=task_from_name(name) or task,
+                              names=names, imgsz=imgsz)
+        return ModelEntry(name=name, path=path, format='pt', task=task_from_name(name))
@@ -11,12 +11,12 @@ import logging
 import os
 import sys
 import configparser
-from pathlib import Path
 import socket
 
 from collections import deque
 from utils.config_manager import GREENONBROWN_PARAMS
 from utils.directory_manager import scan_sessions, collect_session_files
+from utils.model_catalogue import ModelCatalogue, sha256_path
 
 try:
     import paho.mqtt.client as mqtt
@@ -134,6 +134,14 @@ class OWLMQTTPublisher:
             'brightness_max': None,
             # Actuation state
             'avg_loop_time_ms': 0.0,
+            # Custom algorithm timings: {name: {'calls', 'p50_ms', 'p95_ms', 'over_budget'}}
+            'algorithm_timings': {},
+            # Background detector load: {'status', 'algorithm', 'model', 'load_s', 'warmup_s', 'error'}
+            'detector_load': {},
+            # models/ index: {name: {'format', 'task', 'classes', 'imgsz', 'sha256'}}
+            'model_catalogue': {},
+            # Last resolution governor step: {'imgsz', 'previous', 'gap_cm', 'actuation_length_cm', ...}
+            'resolution_governor': {},
             'actuation_duration': 0.15,
             'delay': 0.0,
             'actuation_source': 'config',
@@ -274,9 +282,10 @@ class OWLMQTTPublisher:
             self.state['available_models'] = self._list_available_models()
             self.state['detect_classes'] = getattr(self.owl_instance, '_detect_classes_list', [])
             gog = getattr(self.owl_instance, '_gog_detector', None)
-            # Use pending model name if OWL hasn't processed the swap yet,
-            # so the dashboard dropdown doesn't snap back to the old model.
-            pending_model = getattr(self.owl_instance, '_pending_model', None)
+            # Use pending model name if OWL hasn't finished the swap yet (queued or
+            # loading in the background), so the dashboard dropdown doesn't snap back.
+            pending_model = (getattr(self.owl_instance, '_pending_model', None)
+                             or getattr(self.owl_instance, '_loading_model', None))
             if pending_model is not None:
                 pass  # keep current_model as set by the set_model handler
             elif gog and hasattr(gog, 'model'):
@@ -502,7 +511,8 @@ class OWLMQTTPublisher:
                     from utils.config_manager import ConfigValidator
                     valid = ConfigValidator.get_valid_algorithms()
                 except Exception:
-                    valid = {'exg', 'exgr', 'maxg', 'nexg', 'exhsv', 'hsv', 'gndvi', 'gog', 'gog-hybrid'}
+                    valid = {'exg', 'exgr', 'maxg', 'nexg', 'nexg-int', 'exhsv', 'exhsv-int', 'hsv', 'gndvi',
+                             'gog', 'gog-hybrid'}
                 if value in valid:
                     self.state['algorithm'] = value
                     if self.owl_instance:
@@ -1003,7 +1013,6 @@ class OWLMQTTPublisher:
         """Download a model file from the controller. Runs in background thread."""
         import urllib.request
         import ssl
-        import hashlib
         import tempfile
 
         models_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
@@ -1069,18 +1078,12 @@ class OWLMQTTPublisher:
                 tmp_path = None
 
                 # Verify SHA256 of extracted directory contents (matches
-                # how the controller computed it at upload time)
+                # how the controller computed it at upload time); the catalogue keeps it
                 if expected_sha256:
-                    h = hashlib.sha256()
-                    for fp in sorted(Path(extract_dir).rglob('*')):
-                        if fp.is_file():
-                            with open(fp, 'rb') as hf:
-                                while True:
-                                    chunk = hf.read(65536)
-                                    if not chunk:
-                                        break
-                                    h.update(chunk)
-                    actual_sha256 = h.hexdigest()
+                    catalogue = self._model_catalogue()
+                    catalogue.invalidate()
+                    entry = catalogue.get(dir_name, sha256=True)
+                    actual_sha256 = entry.sha256 if entry is not None else sha256_path(extract_dir)
                     if actual_sha256 != expected_sha256:
                         import shutil
                         shutil.rmtree(extract_dir)
@@ -1092,14 +1095,7 @@ class OWLMQTTPublisher:
             else:
                 # Verify SHA256 of the file directly
                 if expected_sha256:
-                    h = hashlib.sha256()
-                    with open(tmp_path, 'rb') as f:
-                        while True:
-                            chunk = f.read(65536)
-                            if not chunk:
-                                break
-                            h.update(chunk)
-                    actual_sha256 = h.hexdigest()
+                    actual_sha256 = sha256_path(tmp_path)
                     if actual_sha256 != expected_sha256:
                         raise ValueError(
                             f'SHA256 mismatch: expected {expected_sha256[:12]}..., '
@@ -1123,6 +1119,7 @@ class OWLMQTTPublisher:
                     'error': ''
                 }
                 # Refresh available models list
+                self._model_catalogue().invalidate()
                 self.state['available_models'] = self._list_available_models()
             self._publish_state()
 
@@ -1490,8 +1487,11 @@ class OWLMQTTPublisher:
                 # Convert to int
                 param_value = int(param_value)
 
-            # Update the Owl instance attribute directly
+            # Update the Owl instance attribute directly, then swap in a recompiled threshold profile
             setattr(self.owl_instance, param_name, param_value)
+            refresh = getattr(self.owl_instance, 'refresh_threshold_profile', None)
+            if callable(refresh):
+                refresh()
 
             # Queue trackbar update for main thread (cv2 HighGUI is not thread-safe)
             if self.owl_instance.show_display:
@@ -1550,44 +1550,28 @@ class OWLMQTTPublisher:
             # Other params (model_path, detect_classes, actuation_mode) require restart
             self.logger.info(f"GreenOnGreen.{param_name} updated in config (restart required)")
 
-    def _check_model_available(self):
-        """Check if any YOLO model is available in the models/ directory."""
+    def _model_catalogue(self):
+        """Cached index of the models/ directory, rescanned only when it changes."""
+        models_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
+        return ModelCatalogue.for_directory(models_dir)
+
+    def _model_catalogue_state(self):
+        """Per-model format, task, classes, input size and known sha256 for the dashboard."""
         try:
-            models_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
-            if not os.path.isdir(models_dir):
-                return False
-            # Check for NCNN subdirs (have .param files) or .pt files
-            for item in os.listdir(models_dir):
-                item_path = os.path.join(models_dir, item)
-                if item.endswith('.pt'):
-                    return True
-                if os.path.isdir(item_path):
-                    for f in os.listdir(item_path):
-                        if f.endswith('.param'):
-                            return True
-            return False
+            return {entry.name: entry.to_dict() for entry in self._model_catalogue().entries()}
         except Exception:
-            return False
+            return {}
+
+    def _check_model_available(self):
+        """Check if any YOLO model is available in the models/ directory."""
+        return bool(self._list_available_models())
 
     def _list_available_models(self):
         """List available YOLO models (.pt files and NCNN subdirs) in models/ directory."""
-        models = []
         try:
-            models_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
-            if not os.path.isdir(models_dir):
-                return models
-            for item in sorted(os.listdir(models_dir)):
-                item_path = os.path.join(models_dir, item)
-                if item.endswith('.pt'):
-                    models.append(item)
-                elif os.path.isdir(item_path):
-                    for f in os.listdir(item_path):
-                        if f.endswith('.param'):
-                            models.append(item)
-                            break
+            return self._model_catalogue().names()
         except Exception:
-            pass
-        return models
+            return []
 
     def _handle_gps_update(self, gps_data):
         """Handle GPS updates from dashboard or central controller"""
@@ -1636,9 +1620,10 @@ class OWLMQTTPublisher:
                 'System', 'algorithm', fallback=self.state.get('algorithm', 'exhsv'))
 
             gog = getattr(self.owl_instance, '_gog_detector', None)
-            # Use pending model name if OWL hasn't processed the swap yet,
-            # so the dashboard dropdown doesn't snap back to the old model.
-            pending_model = getattr(self.owl_instance, '_pending_model', None)
+            # Use pending model name if OWL hasn't finished the swap yet (queued or
+            # loading in the background), so the dashboard dropdown doesn't snap back.
+            pending_model = (getattr(self.owl_instance, '_pending_model', None)
+                             or getattr(self.owl_instance, '_loading_model', None))
             if pending_model is not None:
                 # Model swap queued — keep current_model as set by the handler
                 pass
@@ -1656,6 +1641,7 @@ class OWLMQTTPublisher:
             else:
                 self.state['detect_classes'] = getattr(self.owl_instance, '_detect_classes_list', [])
             self.state['available_models'] = self._list_available_models()
+            self.state['model_catalogue'] = self._model_catalogue_state()
 
     def _publish_state(self):
         """Publish current state to MQTT"""
@@ -1676,6 +1662,20 @@ class OWLMQTTPublisher:
             self.state['last_update'] = time.time()
         self._publish_state()
 
+    def set_detector_load(self, info):
+        """Set the state of a background detector load (for owl.py internal use)"""
+        with self.state_lock:
+            self.state['detector_load'] = dict(info)
+            self.state['last_update'] = time.time()
+        self._publish_state()
+
+    def set_resolution_governor(self, change):
+        """Set the last inference resolution step of the governor (for owl.py internal use)"""
+        with self.state_lock:
+            self.state['resolution_governor'] = dict(change, time=time.time())
+            self.state['last_update'] = time.time()
+        self._publish_state()
+
     def set_detection_mode(self, mode):
         """Set detection mode: 0=spot spray, 1=off, 2=blanket (for controller use)"""
         with self.state_lock:
@@ -1791,6 +1791,7 @@ class OWLMQTTPublisher:
             self.state['fan_status'] = stats_dict.get('fan_status', {'is_rpi5': False, 'mode': 'unavailable', 'rpm': 0})
             self.state['owl_running'] = stats_dict.get('owl_running', True)  # owl.py is running if calling this
             self.state['avg_loop_time_ms'] = stats_dict.get('avg_loop_time_ms', 0.0)
+            self.state['algorithm_timings'] = stats_dict.get('algorithm_timings', {})
             self.state['actuation_duration'] = stats_dict.get('actuation_duration', self.state.get('actuation_duration', 0.15))
             self.state['delay'] = stats_dict.get('delay', self.state.get('delay', 0.0))
             self.state['last_update'] = time.time()
@@ -513,7 +513,7 @@ class RelayController:
         records the true time of weed detection from main thread, which is compared to time of relay activation for accurate
         on durations. There will be a minimum on duration of this processing speed ~ 0.3s. Will default to 0 though.
         :param relay: relay id (zero based)
-        :param time_stamp: this is the time of detection
+        :param time_stamp: this is the time of detection (the frame capture time when inference is pipelined)
         :param location: GPS functionality to be added here
         :param delay: on delay to be added in the future
         :param duration: duration of spray
@@ -544,11 +544,14 @@ class RelayController:
             while relay_queue:
                 job = relay_queue.popleft()
                 input_condition.release()
-                # check to make sure time is positive
-                onDur = 0 if (job[3] - (time.time() - job[1])) <= 0 else (job[3] - (time.time() - job[1]))
+                # The spray window is [detection + delay, detection + delay + duration]. Time already passed since
+                # detection (processing, or a frame of pipelined inference) comes off the delay first, then off
+                # the on duration; both are clamped at zero
+                elapsed = time.time() - job[1]
+                onDur = max(0.0, job[3] - max(0.0, elapsed - job[2]))
 
                 if not relay_on:
-                    time.sleep(job[2]) # add in the delay variable
+                    time.sleep(max(0.0, job[2] - elapsed)) # add in the delay variable
                     self.relay.relay_on(relay, verbose=False)
                     if self.status_led:
                         self.status_led.blink(on_time=0.1, n=1, background=True)
@@ -0,0 +1,278 @@
+"""
+Sensitivity preset sweep: score a grid of GreenOnBrown thresholds on recorded images.
+
+Every combination of exg/hue/saturation/brightness/min_detection_area values is run over a folder of field images
+and scored against labels: YOLO-format .txt files (class cx cy w h, normalised) next to the images or in a labels
+directory, or, for unlabelled images, the detections of a reference preset. A detection counts as correct when its
+centre falls inside a label box (what centre-based actuation needs) and a label counts as found when it holds at
+least one detection centre; combinations are ranked by F1.
+
+Each image is handled by one worker process which evaluates every combination on it, so the colour space
+conversions and the colour index are computed once per image. Combinations that share HSV bounds share the inRange
+mask, those that also share exg_min/exg_max share the threshold and contours, and min_detection_area only filters
+the contours. Detections are identical to GreenOnBrown.inference() with the contours blob backend.
+
+Used by tools/preset_sweep.py.
+"""
+
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from utils.algorithms import exg, exg_standardised, exg_standardised_int
+from utils.greenonbrown import MAX_DETECTIONS, FrameWorkspace, GreenOnBrown, ThresholdProfile
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Swept thresholds, in [Sensitivity_*] section order
+SWEEP_KEYS = ('exg_min', 'exg_max', 'hue_min', 'hue_max', 'saturation_min', 'saturation_max',
+              'brightness_min', 'brightness_max', 'min_detection_area')
+
+# Colour index computed once per image, before any threshold is applied; None for hsv (mask only)
+SWEEP_ALGORITHMS = {
+    'exhsv': exg_standardised,
+    'exhsv-int': exg_standardised_int,
+    'nexg': exg_standardised,
+    'nexg-int': exg_standardised_int,
+    'exg': exg,
+    'hsv': None,
+}
+HSV_ALGORITHMS = ('exhsv', 'exhsv-int', 'hsv')
+
+# Per-image counts for each combination: detections, detections inside a label, labels found, labels
+COUNT_COLUMNS = ('detections', 'true_positives', 'labels_found', 'labels')
+
+# Per-process state, created once by the pool initializer
+_worker_state = None
+
+
+def parse_values(spec):
+    """
+    Values for one swept key: '25' or '20,25,30' (a list) or '20:30:5' (start:stop:step, stop included).
+    :return: sorted list of unique ints
+    """
+    spec = str(spec).strip()
+    if ':' in spec:
+        parts = [int(p) for p in spec.split(':')]
+        if len(parts) not in (2, 3) or (len(parts) == 3 and parts[2] <= 0):
+            raise ValueError(f"Invalid range '{spec}', use start:stop or start:stop:step with step > 0")
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) == 3 else 1
+        return list(range(start, stop + 1, step))
+    return sorted({int(v) for v in spec.split(',') if v.strip()})
+
+
+def build_grid(values, invert_hue=False):
+    """
+    Every combination of the per-key value lists, skipping any with a min above its max.
+    :param values: dict of SWEEP_KEYS -> list of ints
+    :return: list of ThresholdProfile
+    """
+    profiles = []
+    for combo in itertools.product(*(values[key] for key in SWEEP_KEYS)):
+        params = dict(zip(SWEEP_KEYS, combo))
+        if any(params[f'{name}_min'] > params[f'{name}_max']
+               for name in ('exg', 'hue', 'saturation', 'brightness')):
+            continue
+        profiles.append(ThresholdProfile(invert_hue=invert_hue, **params))
+    return profiles
+
+
+def list_images(path, max_images=None):
+    """Sorted image paths in a directory (or the single image path)."""
+    if os.path.isdir(path):
+        names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        return [os.path.join(path, name) for name in names[:max_images]]
+    if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+        return [path]
+    raise ValueError(f'[ERROR] Invalid path to image/s: {path}')
+
+
+def read_labels(image_path, shape, labels_dir=None, classes=None):
+    """
+    YOLO label boxes for an image as (M, 4) int32 [x, y, w, h] pixel boxes. The .txt is looked up in labels_dir,
+    or next to the image; a missing file means no weeds. Only the given class ids are kept (default: all).
+    """
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    path = os.path.join(labels_dir or os.path.dirname(image_path), f'{stem}.txt')
+    if not os.path.isfile(path):
+        return np.empty((0, 4), dtype=np.int32)
+
+    rows = np.loadtxt(path, ndmin=2, usecols=(0, 1, 2, 3, 4)) if os.path.getsize(path) else np.empty((0, 5))
+    if classes is not None:
+        rows = rows[np.isin(rows[:, 0].astype(int), list(classes))]
+    h, w = shape[:2]
+    cx, cy, bw, bh = rows[:, 1] * w, rows[:, 2] * h, rows[:, 3] * w, rows[:, 4] * h
+    return np.round(np.stack([cx - bw / 2, cy - bh / 2, bw, bh], axis=1)).astype(np.int32).reshape(-1, 4)
+
+
+def has_labels(image_paths, labels_dir=None):
+    """True if any image has a YOLO .txt label file."""
+    for image_path in image_paths:
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        if os.path.isfile(os.path.join(labels_dir or os.path.dirname(image_path), f'{stem}.txt')):
+            return True
+    return False
+
+
+def score(boxes, labels):
+    """(detections, detections whose centre is inside a label, labels holding a detection centre, labels)."""
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    if len(boxes) == 0 or len(labels) == 0:
+        return len(boxes), 0, 0, len(labels)
+    cx = (boxes[:, 0] + boxes[:, 2] // 2)[:, None]
+    cy = (boxes[:, 1] + boxes[:, 3] // 2)[:, None]
+    inside = ((cx >= labels[:, 0]) & (cx < labels[:, 0] + labels[:, 2])
+              & (cy >= labels[:, 1]) & (cy < labels[:, 1] + labels[:, 3]))
+    return len(boxes), int(inside.any(axis=1).sum()), int(inside.any(axis=0).sum()), len(labels)
+
+
+def _filter_blobs(areas, rects, min_detection_area):
+    """GreenOnBrown._blobs_contours() filtering on precomputed contour areas and bounding rects."""
+    keep = np.flatnonzero(areas > min_detection_area)
+    if keep.size > MAX_DETECTIONS:
+        keep = keep[np.argsort(-areas[keep], kind='stable')[:MAX_DETECTIONS]]
+    return rects[keep]
+
+
+def evaluate_image(frame, profiles, algorithm, detector, labels):
+    """
+    Score every profile on one frame.
+    :param detector: GreenOnBrown supplying the threshold method and morphology kernel
+    :param labels: (M, 4) label boxes
+    :return: (len(profiles), 4) int64 array of COUNT_COLUMNS
+    """
+    shape = frame.shape[:2]
+    workspace = FrameWorkspace(shape)
+    method = detector.threshold_methods.get(algorithm, detector.threshold_methods[None])
+    uses_hsv = algorithm in HSV_ALGORITHMS
+    index_func = SWEEP_ALGORITHMS[algorithm]
+
+    # Computed once per image, whatever the thresholds
+    hsv_image = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV) if uses_hsv else None
+    index = index_func(frame) if index_func is not None else None
+
+    # Group by what each stage depends on: HSV bounds -> exg clip range -> min_detection_area
+    groups = {}
+    for i, profile in enumerate(profiles):
+        hsv_key = (tuple(tuple(limit.tolist()) for pair in profile.hsv_bounds for limit in pair)
+                   if uses_hsv else None)
+        exg_key = (profile.exg_min, profile.exg_max) if algorithm != 'hsv' else None
+        groups.setdefault(hsv_key, (profile, {}))[1].setdefault(exg_key, []).append((i, profile.min_detection_area))
+
+    counts = np.zeros((len(profiles), len(COUNT_COLUMNS)), dtype=np.int64)
+    mask = np.empty(shape, dtype=np.uint8)
+    second = np.empty(shape, dtype=np.uint8)
+    masked = np.empty(shape, dtype=np.uint8)
+    for hsv_key, (first, by_exg) in groups.items():
+        if uses_hsv:
+            bounds = first.hsv_bounds
+            cv2.inRange(hsv_image, bounds[0][0], bounds[0][1], dst=mask)
+            for lower, upper in bounds[1:]:
+                cv2.bitwise_or(mask, cv2.inRange(hsv_image, lower, upper, dst=second), dst=mask)
+
+        for exg_key, members in by_exg.items():
+            if algorithm == 'hsv':
+                threshold_out = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, detector.kernel, iterations=5)
+            else:
+                if uses_hsv:
+                    cv2.bitwise_and(mask, index, dst=masked)
+                else:
+                    np.copyto(masked, index)
+                np.clip(masked, exg_key[0], exg_key[1], out=masked)
+                threshold_out = detector._adaptive_threshold(masked, workspace, method, 31)
+                threshold_out = cv2.morphologyEx(threshold_out, cv2.MORPH_CLOSE, detector.kernel, iterations=1)
+
+            contours, _ = cv2.findContours(threshold_out, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            areas = np.array([cv2.contourArea(c) for c in contours], dtype=np.float64)
+            rects = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+            for i, min_detection_area in members:
+                counts[i] = score(_filter_blobs(areas, rects, min_detection_area), labels)
+
+    return counts
+
+
+def _load_frame(image_path, resolution):
+    frame = cv2.imread(image_path)
+    if frame is None:
+        raise ValueError(f'[ERROR] Cannot read image: {image_path}')
+    if resolution is not None and frame.shape[1::-1] != tuple(resolution):
+        frame = cv2.resize(frame, tuple(resolution), interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def _init_worker(spec):
+    global _worker_state
+    # One image per worker at a time; keep OpenCV from oversubscribing the cores the pool already uses
+    cv2.setNumThreads(1)
+    _worker_state = (spec, GreenOnBrown(algorithm=spec['algorithm'], threshold_method=spec['threshold_method']))
+
+
+def _evaluate_path(image_path, state=None):
+    spec, detector = state or _worker_state
+    frame = _load_frame(image_path, spec.get('resolution'))
+    if spec['reference'] is not None:
+        # Unlabelled: the reference preset's detections stand in for labels
+        _, labels, _, _ = detector.inference(frame, algorithm=spec['algorithm'], profile=spec['reference'])
+        labels = np.asarray(labels, dtype=np.int32).reshape(-1, 4)
+    else:
+        labels = read_labels(image_path, frame.shape, spec.get('labels_dir'), spec.get('classes'))
+    return evaluate_image(frame, spec['profiles'], spec['algorithm'], detector, labels)
+
+
+def run_sweep(image_paths, profiles, algorithm='exhsv', threshold_method='gaussian', reference=None,
+              labels_dir=None, classes=None, resolution=None, workers=None):
+    """
+    Score every profile over every image.
+    :param reference: ThresholdProfile whose detections are used as labels (unlabelled images), or None to read
+                      YOLO labels
+    :param workers: worker processes (default: all cores); 1 runs in this process
+    :return: (len(profiles), 4) int64 array of COUNT_COLUMNS summed over the images
+    """
+    if algorithm not in SWEEP_ALGORITHMS:
+        raise ValueError(f"Cannot sweep '{algorithm}', must be one of {tuple(SWEEP_ALGORITHMS)}")
+    spec = {'algorithm': algorithm, 'threshold_method': threshold_method, 'profiles': profiles,
+            'reference': reference, 'labels_dir': labels_dir, 'classes': classes, 'resolution': resolution}
+    workers = workers or os.cpu_count() or 1
+    totals = np.zeros((len(profiles), len(COUNT_COLUMNS)), dtype=np.int64)
+
+    if workers == 1:
+        state = (spec, GreenOnBrown(algorithm=algorithm, threshold_method=threshold_method))
+        for image_path in image_paths:
+            totals += _evaluate_path(image_path, state)
+        return totals
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,)) as pool:
+        for counts in pool.map(_evaluate_path, image_paths):
+            totals += counts
+    return totals
+
+
+def rank(profiles, counts, frames):
+    """
+    Rows sorted best first by F1, then precision, then fewer detections.
+    :return: list of dicts with the profile's SWEEP_KEYS plus precision, recall, f1 and per_frame
+    """
+    detections, true_positives, found, labels = counts.T.astype(np.float64)
+    precision = np.divide(true_positives, detections, out=np.ones_like(detections), where=detections > 0)
+    recall = np.divide(found, labels, out=np.ones_like(labels), where=labels > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(precision),
+                   where=(precision + recall) > 0)
+
+    order = np.lexsort((detections, -precision, -f1))
+    return [dict({key: getattr(profiles[i], key) for key in SWEEP_KEYS},
+                 precision=float(precision[i]), recall=float(recall[i]), f1=float(f1[i]),
+                 per_frame=float(detections[i] / frames) if frames else 0.0)
+            for i in order]
+
+
+def section_text(name, row):
+    """A ready-to-save [Sensitivity_<Name>] INI section for a rank() row."""
+    lines = [f'[Sensitivity_{name.capitalize()}]'] + [f'{key} = {row[key]}' for key in SWEEP_KEYS]
+    return '\n'.join(lines) + '\n'
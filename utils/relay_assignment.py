@@ -0,0 +1,62 @@
+"""
+Per-frame actuation steps of the OWL frame loop: appending lost (predicted) tracks to a frame's detections and
+choosing the relays its weeds fire.
+
+Detectors return boxes and centres as lists or as (N, k) int32 arrays (GreenOnBrown 'cca' backend), so both helpers
+accept either and never test their truthiness.
+
+Usage:
+    boxes, weed_centres = merge_lost_tracks(boxes, weed_centres, lost_boxes, lost_centres)
+    for relay in assign_relays(weed_centres, y_thresh, lane_width, relay_num, track_ids, gate, duration):
+        relay_controller.receive(relay=relay, ...)
+"""
+
+import numpy as np
+
+
+def merge_lost_tracks(boxes, weed_centres, lost_boxes, lost_centres):
+    """
+    Append lost-track boxes and centres to a frame's detections.
+
+    Args:
+        boxes: [x, y, w, h] boxes as a list or an (N, 4) array.
+        weed_centres: [x, y] centres as a list or an (N, 2) array.
+        lost_boxes: [x, y, w, h] boxes of the lost tracks.
+        lost_centres: [x, y] centres of the lost tracks.
+
+    Returns:
+        (boxes, weed_centres) in the detector's format. The inputs are never modified, so detections cached
+        for drawing or reuse keep only what the detector saw.
+    """
+    if not len(lost_boxes):
+        return boxes, weed_centres
+    if isinstance(boxes, np.ndarray):
+        return (np.concatenate([boxes, np.asarray(lost_boxes, dtype=boxes.dtype).reshape(-1, 4)]),
+                np.concatenate([weed_centres, np.asarray(lost_centres, dtype=weed_centres.dtype).reshape(-1, 2)]))
+    return list(boxes) + list(lost_boxes), list(weed_centres) + list(lost_centres)
+
+
+def assign_relays(weed_centres, y_thresh, lane_width, relay_num, track_ids=None, gate=None, hold_s=0.0, now=None):
+    """
+    Relays to fire for one frame: the lanes of the centres at or below the actuation line.
+
+    Args:
+        weed_centres: [x, y] centres as a list or an (N, 2) array.
+        y_thresh: Actuation line; centres with y >= y_thresh are in the zone.
+        lane_width: Width of one relay's lane in pixels.
+        relay_num: Number of relays; centres past the last lane go to the last relay.
+        track_ids: Track ID per centre, for the gate.
+        gate: Optional ActuationGate; a tracked weed then fires once per hold_s instead of on every frame
+              it spends in the zone.
+        hold_s: Seconds before a gated track may fire again (the actuation duration).
+        now: Timestamp for the gate.
+
+    Returns:
+        Set of relay indices.
+    """
+    centres = np.asarray(weed_centres).reshape(-1, 2)
+    in_zone = centres[:, 1] >= y_thresh
+    if gate is not None and track_ids is not None:
+        in_zone[in_zone] = gate.due(np.asarray(track_ids)[in_zone], hold_s, now=now)
+    lanes = np.minimum((centres[in_zone, 0] / lane_width).astype(np.int64), relay_num - 1)
+    return set(lanes.tolist())
@@ -0,0 +1,116 @@
+"""
+Closed-loop YOLO input resolution: trade detail for loop rate as the ground speed changes.
+
+Between two frames the ground moves speed x loop time. Once that gap grows past the length
+of ground one actuation covers, strips of ground pass under the camera without a frame that
+could fire on them (the same check as ActuationCalculator.check_coverage on the networked
+controller). The model's input size is the largest lever on the loop time, so the governor
+steps it down a fixed ladder while the gap is too close to the actuation length, and back
+up while the larger size would still leave a clear margin.
+
+Hysteresis keeps it from hunting: a step down happens above step_down of the actuation
+length, a step up only when the gap predicted at the next rung (the loop time scaled by the
+input area) stays below step_up, and no step follows another within hold_s, so the rolling
+loop-time average can settle at the new size first. Without a GPS speed the resolution holds.
+
+Usage:
+    governor = ResolutionGovernor(start=320)
+
+    change = governor.update(avg_loop_time_ms, speed_kmh, actuation_length_cm)
+    if change is not None:
+        detector.inference_resolution = change['imgsz']
+"""
+
+import time
+
+DEFAULT_LADDER = (256, 320, 416, 512)
+
+# Below this ground speed (km/h) there is no coverage to protect, matching ActuationCalculator.MIN_SPEED
+MIN_SPEED_KMH = 0.5
+
+
+def parse_ladder(spec):
+    """
+    '256, 320, 416' -> (256, 320, 416), sorted and de-duplicated.
+
+    Raises:
+        ValueError: If an entry is not a positive multiple of 32 (the YOLO stride).
+    """
+    sizes = sorted({int(size) for size in str(spec).split(',') if size.strip()})
+    if not sizes or any(size <= 0 or size % 32 for size in sizes):
+        raise ValueError(f"resolution ladder must be positive multiples of 32, got '{spec}'")
+    return tuple(sizes)
+
+
+class ResolutionGovernor:
+    """Steps the model input size through a ladder to keep the frame-to-frame ground gap covered.
+
+    Args:
+        ladder: Input sizes in pixels, smallest first.
+        start: Initial size; the nearest rung is used.
+        step_down: Step down once the gap exceeds this fraction of the actuation length.
+        step_up: Step up only if the gap predicted at the next rung stays below this fraction.
+        hold_s: Least time between two steps, in seconds.
+    """
+
+    def __init__(self, ladder=DEFAULT_LADDER, start=320, step_down=0.9, step_up=0.6, hold_s=3.0):
+        if not 0 < step_up < step_down:
+            raise ValueError(f"step_up ({step_up}) must be above 0 and below step_down ({step_down})")
+        self.ladder = tuple(sorted(ladder))
+        self.step_down = step_down
+        self.step_up = step_up
+        self.hold_s = hold_s
+        self.index = min(range(len(self.ladder)), key=lambda i: abs(self.ladder[i] - start))
+        self.gap_cm = 0.0
+        self.changes = 0
+        self._last_change = None
+
+    @property
+    def imgsz(self):
+        """Current model input size in pixels."""
+        return self.ladder[self.index]
+
+    def update(self, avg_loop_time_ms, speed_kmh, actuation_length_cm, now=None):
+        """
+        Check the ground gap for the latest loop time and speed, stepping the resolution if needed.
+
+        Args:
+            avg_loop_time_ms: Rolling average frame loop time.
+            speed_kmh: GPS ground speed, or None without a fix.
+            actuation_length_cm: Ground length one actuation covers.
+            now: Timestamp (default: time.time()).
+
+        Returns:
+            None if the size is unchanged, otherwise a dict with the new 'imgsz', the
+            'previous' size, 'gap_cm', 'actuation_length_cm', 'speed_kmh',
+            'avg_loop_time_ms' and 'reason' ('gap' for a step down, 'margin' for a step up).
+        """
+        if speed_kmh is None or speed_kmh < MIN_SPEED_KMH or avg_loop_time_ms <= 0 or actuation_length_cm <= 0:
+            return None
+        now = time.time() if now is None else now
+        self.gap_cm = (speed_kmh / 3.6) * (avg_loop_time_ms / 1000.0) * 100.0
+        if self._last_change is not None and now - self._last_change < self.hold_s:
+            return None
+
+        ratio = self.gap_cm / actuation_length_cm
+        if ratio > self.step_down and self.index > 0:
+            step, reason = -1, 'gap'
+        elif self.index < len(self.ladder) - 1 and \
+                ratio * (self.ladder[self.index + 1] / self.imgsz) ** 2 < self.step_up:
+            step, reason = 1, 'margin'
+        else:
+            return None
+
+        previous = self.imgsz
+        self.index += step
+        self.changes += 1
+        self._last_change = now
+        return {
+            'imgsz': self.imgsz,
+            'previous': previous,
+            'gap_cm': round(self.gap_cm, 1),
+            'actuation_length_cm': round(actuation_length_cm, 1),
+            'speed_kmh': round(speed_kmh, 1),
+            'avg_loop_time_ms': round(avg_loop_time_ms, 1),
+            'reason': reason,
+        }
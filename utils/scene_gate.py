@@ -0,0 +1,117 @@
+"""
+Static-scene gate: skip detection while the vehicle is stopped.
+
+Parked at a headland or gate, the camera sees the same ground frame after
+frame, and running full detection on it at 30 fps only keeps the CPU hot.
+StaticSceneGate decides per frame whether the last detection result can be
+reused instead, from either or both of:
+  - 'frame': a low-resolution greyscale thumbnail compared against the
+    thumbnail of the frame the last result came from (the largest per-pixel
+    difference, so one weed moving into view is not averaged away)
+  - 'gps': ground speed below a threshold (no speed reading means moving)
+
+A result is never reused for longer than max_age seconds, so detection still
+runs a few times a second while stopped, and a GPS speed above the threshold
+always forces detection whatever the frame difference says.
+
+Usage:
+    gate = StaticSceneGate(signal='frame', max_age=1.0)
+
+    if gate.should_reuse(frame, speed_kmh):
+        ...  # reuse the last result
+    else:
+        ...  # run detection; the gate already holds this frame as the reference
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+SCENE_SIGNALS = ('frame', 'gps', 'both')
+
+# Thumbnail width in pixels; each thumbnail pixel averages a block of the frame so sensor noise cancels
+THUMBNAIL_WIDTH = 64
+
+
+class StaticSceneGate:
+    """Decides when the previous detection result is still valid for the current frame.
+
+    Args:
+        signal: 'frame' (thumbnail difference), 'gps' (ground speed) or 'both' (both must agree).
+        max_age: Longest a result is reused for, in seconds.
+        threshold: Largest thumbnail pixel difference (0-255) still treated as the same scene.
+        speed_kmh: Ground speed at or below which the vehicle counts as stopped.
+    """
+
+    def __init__(self, signal='frame', max_age=1.0, threshold=8, speed_kmh=0.5):
+        if signal not in SCENE_SIGNALS:
+            raise ValueError(f"Unknown static scene signal '{signal}', must be one of {SCENE_SIGNALS}")
+        if max_age <= 0:
+            raise ValueError(f"max_age must be > 0, got {max_age}")
+        self.signal = signal
+        self.max_age = max_age
+        self.threshold = threshold
+        self.speed_kmh = speed_kmh
+
+        self._reference = None       # thumbnail of the frame the current result came from
+        self._reference_time = None
+        self._diff = None
+        self.reused = 0              # frames reused since the last detection run
+
+    def reset(self):
+        """Forget the reference frame, e.g. after the detector or its thresholds change."""
+        self._reference = None
+        self._reference_time = None
+        self.reused = 0
+
+    def _thumbnail(self, frame):
+        # INTER_AREA straight from full resolution with a non-integer ratio costs several ms; bilinear sampling
+        # to 4x the thumbnail size and then an exact 4:1 area average is ~20x cheaper and still averages
+        # each thumbnail pixel over 64 frame pixels
+        h, w = frame.shape[:2]
+        size = (THUMBNAIL_WIDTH, max(1, round(h * THUMBNAIL_WIDTH / w)))
+        sampled = cv2.resize(frame, (size[0] * 4, size[1] * 4), interpolation=cv2.INTER_LINEAR)
+        if sampled.ndim == 3:
+            sampled = cv2.cvtColor(sampled, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(sampled, size, interpolation=cv2.INTER_AREA)
+
+    def _frame_static(self, thumb):
+        if self._reference is None or self._reference.shape != thumb.shape:
+            return False
+        if self._diff is None or self._diff.shape != thumb.shape:
+            self._diff = np.empty_like(thumb)
+        cv2.absdiff(thumb, self._reference, dst=self._diff)
+        return int(self._diff.max()) <= self.threshold
+
+    def should_reuse(self, frame, speed_kmh=None, now=None):
+        """
+        True if the last detection result can stand in for this frame. On False the caller must run
+        detection: this frame becomes the new reference.
+
+        Args:
+            frame: The BGR frame about to be processed.
+            speed_kmh: Current ground speed, or None if unknown.
+            now: Timestamp in seconds (default: time.monotonic()).
+        """
+        now = time.monotonic() if now is None else now
+        moving = speed_kmh is not None and speed_kmh > self.speed_kmh
+        fresh = self._reference_time is not None and now - self._reference_time < self.max_age
+
+        thumb = None
+        if self.signal == 'gps':
+            static = speed_kmh is not None and not moving
+        else:
+            thumb = self._thumbnail(frame)
+            static = not moving and self._frame_static(thumb)
+            if self.signal == 'both':
+                static = static and speed_kmh is not None
+
+        if static and fresh:
+            self.reused += 1
+            return True
+
+        self._reference = thumb
+        self._reference_time = now
+        self.reused = 0
+        return False
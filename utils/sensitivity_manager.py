@@ -112,6 +112,11 @@ class SensitivityManager:
         for key, val in values.items():
             setattr(owl_instance, key, val)
 
+        # Recompile the detector's threshold profile once for the whole preset
+        refresh = getattr(owl_instance, 'refresh_threshold_profile', None)
+        if callable(refresh):
+            refresh()
+
         # Queue trackbar updates for main thread (cv2 HighGUI not thread-safe)
         if getattr(owl_instance, 'show_display', False):
             trackbar_map = {
@@ -1,7 +1,7 @@
 """
-Weed tracking utilities for temporal smoothing of GoG/GoG-hybrid detections.
+Weed tracking utilities for temporal smoothing of detections.
 
-Sits on top of Ultralytics built-in ByteTrack (via model.track()) and adds:
+For GoG/GoG-hybrid, sits on top of Ultralytics built-in ByteTrack (via model.track()) and adds:
   - ClassSmoother: majority-vote class assignment per tracked object
   - CropMaskStabilizer: persist crop mask positions through detection dropouts
 
@@ -9,6 +9,10 @@ ByteTrack provides stable track IDs and Kalman-predicted positions but
 overwrites track.cls on every match (no class smoothing). These wrappers
 fill that gap.
 
+For detectors without a tracker of their own (GreenOnBrown):
+  - WeedTracker: NumPy IoU/centroid tracker with constant-velocity prediction
+  - ActuationGate: fire each track at most once per actuation
+
 Usage:
     smoother = ClassSmoother(window=5)
     stabilizer = CropMaskStabilizer(max_age=3)
@@ -17,8 +21,14 @@ Usage:
     smoothed_classes = smoother.update(track_ids, class_ids, confidences)
     stabilizer.update(crop_track_ids, crop_boxes)
     mask = stabilizer.build_stabilized_mask(frame_shape)
+
+    # GreenOnBrown:
+    tracker = WeedTracker(max_age=5)
+    track_ids = tracker.update(boxes)
+    lost = tracker.get_lost_tracks()
 """
 
+import time
 from collections import Counter, deque
 
 import cv2
@@ -193,3 +203,216 @@ class CropMaskStabilizer:
     def reset(self):
         """Clear all tracked crop positions."""
         self._tracks.clear()
+
+
+class WeedTracker:
+    """IoU/centroid tracker with constant-velocity prediction, for detectors without their own tracker.
+
+    Each update() moves every track by its velocity, then matches tracks to the frame's
+    detections greedily by IoU with the predicted box. Small weeds moving more than their
+    own size per frame no longer overlap their prediction, so a detection whose centre lies
+    within centre_gate box sizes of a predicted centre also matches; a track seen only once has no
+    velocity yet, so its gate is widened by new_track_gate. Unmatched tracks coast
+    on their velocity for up to max_age frames and are reported by get_lost_tracks() like
+    ByteTrack's lost tracks. New tracks start with the median velocity of the tracks matched
+    in the same frame: under a moving camera the whole scene slides together.
+
+    All state is kept in parallel arrays; 50 objects update in well under 1 ms.
+
+    Args:
+        max_age: Frames a track is kept without a matching detection.
+        iou_thresh: Least IoU between a predicted box and a detection to match them.
+        centre_gate: Largest centre distance for a match, in mean half-diagonals of the two boxes.
+        new_track_gate: Factor on centre_gate for tracks matched only once (velocity not measured yet).
+        velocity_smoothing: Weight of the newest velocity measurement (0-1).
+        min_hits: Matches a track needs before get_lost_tracks() reports it, so one-frame
+                  noise blobs are not persisted.
+    """
+
+    def __init__(self, max_age=10, iou_thresh=0.1, centre_gate=1.0, new_track_gate=4.0, velocity_smoothing=0.5,
+                 min_hits=2):
+        self.max_age = max_age
+        self.iou_thresh = iou_thresh
+        self.centre_gate = centre_gate
+        self.new_track_gate = new_track_gate
+        self.velocity_smoothing = velocity_smoothing
+        self.min_hits = min_hits
+        self.reset()
+
+    def reset(self):
+        """Drop all tracks, e.g. when detection is toggled or the detector changes."""
+        self._xyxy = np.empty((0, 4), dtype=np.float64)      # predicted (or matched) box this frame
+        self._velocity = np.empty((0, 2), dtype=np.float64)  # px per frame
+        self._anchor = np.empty((0, 2), dtype=np.float64)    # centre at the last match
+        self._ids = np.empty(0, dtype=np.int64)
+        self._age = np.empty(0, dtype=np.int64)              # frames since the last match
+        self._hits = np.empty(0, dtype=np.int64)
+        self._cls = np.empty(0, dtype=np.int64)
+        self._score = np.empty(0, dtype=np.float64)
+        self._next_id = 1
+        self.frame_id = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def update(self, boxes, class_ids=None, confidences=None):
+        """
+        Advance every track one frame and match this frame's detections.
+
+        Args:
+            boxes: (N, 4) [x, y, w, h] boxes, list or array.
+            class_ids: Per-box class ids (default 0).
+            confidences: Per-box scores (default 1.0).
+
+        Returns:
+            (N,) int64 track IDs aligned with boxes.
+        """
+        self.frame_id += 1
+        xywh = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        n = len(xywh)
+        det = np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1)
+        cls = np.zeros(n, dtype=np.int64) if class_ids is None else np.asarray(class_ids, dtype=np.int64)
+        score = np.ones(n) if confidences is None else np.asarray(confidences, dtype=np.float64)
+
+        # Constant-velocity prediction
+        self._xyxy[:, :2] += self._velocity
+        self._xyxy[:, 2:] += self._velocity
+        track_idx, det_idx = self._match(self._xyxy, det)
+
+        # Matched tracks: measure velocity against the last matched centre
+        centres = (det[:, :2] + det[:, 2:]) / 2
+        if len(track_idx):
+            frames = (self._age[track_idx] + 1)[:, None]
+            measured = (centres[det_idx] - self._anchor[track_idx]) / frames
+            # The first measurement replaces the starting guess, later ones are smoothed in
+            weight = np.where(self._hits[track_idx] > 1, self.velocity_smoothing, 1.0)[:, None]
+            self._velocity[track_idx] += weight * (measured - self._velocity[track_idx])
+            self._xyxy[track_idx] = det[det_idx]
+            self._anchor[track_idx] = centres[det_idx]
+            self._age[track_idx] = -1
+            self._hits[track_idx] += 1
+            self._cls[track_idx] = cls[det_idx]
+            self._score[track_idx] = score[det_idx]
+        self._age += 1
+
+        # Expire tracks coasting for longer than max_age
+        keep = self._age <= self.max_age
+        if not keep.all():
+            remap = np.cumsum(keep) - 1
+            track_idx = remap[track_idx]
+            self._select(keep)
+
+        # Unmatched detections start new tracks at the scene's median velocity
+        ids = np.empty(n, dtype=np.int64)
+        ids[det_idx] = self._ids[track_idx]
+        unmatched = np.ones(n, dtype=bool)
+        unmatched[det_idx] = False
+        new = np.flatnonzero(unmatched)
+        if len(new):
+            moving = self._velocity[track_idx][self._hits[track_idx] > 1]
+            start_velocity = np.median(moving, axis=0) if len(moving) else np.zeros(2)
+            new_ids = np.arange(self._next_id, self._next_id + len(new), dtype=np.int64)
+            self._next_id += len(new)
+            ids[new] = new_ids
+            self._xyxy = np.concatenate([self._xyxy, det[new]])
+            self._velocity = np.concatenate([self._velocity, np.broadcast_to(start_velocity, (len(new), 2))])
+            self._anchor = np.concatenate([self._anchor, centres[new]])
+            self._ids = np.concatenate([self._ids, new_ids])
+            self._age = np.concatenate([self._age, np.zeros(len(new), dtype=np.int64)])
+            self._hits = np.concatenate([self._hits, np.ones(len(new), dtype=np.int64)])
+            self._cls = np.concatenate([self._cls, cls[new]])
+            self._score = np.concatenate([self._score, score[new]])
+        return ids
+
+    def get_lost_tracks(self, max_age=None):
+        """
+        Predicted positions of tracks without a detection this frame, as GreenOnGreen.get_lost_tracks().
+
+        Args:
+            max_age: Max frames since last match (None = up to the tracker's max_age).
+
+        Returns:
+            List of dicts: [{'track_id', 'xyxy', 'cls', 'score', 'age'}]
+        """
+        lost = (self._age > 0) & (self._hits >= self.min_hits)
+        if max_age is not None:
+            lost &= self._age <= max_age
+        return [{'track_id': int(self._ids[i]), 'xyxy': self._xyxy[i].copy(), 'cls': int(self._cls[i]),
+                 'score': float(self._score[i]), 'age': int(self._age[i])}
+                for i in np.flatnonzero(lost)]
+
+    def _select(self, keep):
+        for name in ('_xyxy', '_velocity', '_anchor', '_ids', '_age', '_hits', '_cls', '_score'):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _match(self, tracks, det):
+        """Greedy matching on IoU, then centre distance. Returns (track indices, detection indices)."""
+        if not len(tracks) or not len(det):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # Pairwise (tracks x detections) matrices, one coordinate at a time
+        tx1, ty1, tx2, ty2 = (tracks[:, i:i + 1] for i in range(4))
+        dx1, dy1, dx2, dy2 = det.T
+        inter = (np.maximum(np.minimum(tx2, dx2) - np.maximum(tx1, dx1), 0)
+                 * np.maximum(np.minimum(ty2, dy2) - np.maximum(ty1, dy1), 0))
+        tw, th, dw, dh = tx2 - tx1, ty2 - ty1, dx2 - dx1, dy2 - dy1
+        iou = inter / np.maximum(tw * th + dw * dh - inter, 1e-9)
+
+        distance = np.hypot((tx1 + tx2 - dx1 - dx2) / 2, (ty1 + ty2 - dy1 - dy2) / 2)
+        gate = self.centre_gate * (np.hypot(tw, th) + np.hypot(dw, dh)) / 4
+        gate *= np.where(self._hits == 1, self.new_track_gate, 1.0)[:, None]
+        closeness = 1 - distance / np.maximum(gate, 1e-9)
+
+        # IoU matches rank above centre-only matches. Greedy best-first matching, done as rounds of
+        # mutual best pairs: the same result, without walking candidate pairs one by one
+        score = np.where(iou >= self.iou_thresh, 1 + iou, np.maximum(closeness, 0))
+        rows = np.arange(len(tracks))
+        matched_t, matched_d = [], []
+        while True:
+            best_d = score.argmax(axis=1)
+            best_t = score.argmax(axis=0)
+            t = np.flatnonzero((score[rows, best_d] > 0) & (best_t[best_d] == rows))
+            if not len(t):
+                break
+            d = best_d[t]
+            matched_t.append(t)
+            matched_d.append(d)
+            score[t] = 0
+            score[:, d] = 0
+        if not matched_t:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(matched_t), np.concatenate(matched_d)
+
+
+class ActuationGate:
+    """Lets each track trigger actuation at most once per actuation.
+
+    Without it, a weed that stays in the actuation zone for several frames queues
+    a relay job on every one of them, each extending the spray past the weed.
+    """
+
+    def __init__(self):
+        self._fired = {}  # {track_id: time of last firing}
+
+    def due(self, track_ids, hold_s, now=None):
+        """
+        Which of these tracks may fire now; those that may are recorded as fired.
+
+        Args:
+            track_ids: Track IDs of the detections in the actuation zone.
+            hold_s: Seconds after a track fires before it may fire again (the actuation duration).
+            now: Timestamp (default: time.time()).
+
+        Returns:
+            Boolean array aligned with track_ids.
+        """
+        now = time.time() if now is None else now
+        self._fired = {tid: t for tid, t in self._fired.items() if now - t < hold_s}
+        due = np.array([int(tid) not in self._fired for tid in track_ids], dtype=bool)
+        for tid in np.asarray(track_ids)[due].tolist():
+            self._fired[int(tid)] = now
+        return due
+
+    def reset(self):
+        """Forget all firings."""
+        self._fired.clear()